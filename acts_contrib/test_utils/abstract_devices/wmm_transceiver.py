@@ -15,7 +15,7 @@
 #   limitations under the License.
 
 import logging
-import multiprocessing
+import threading
 import time
 
 from datetime import datetime
@@ -47,6 +47,9 @@ DEFAULT_IPERF_PORT = 5201
 DEFAULT_STREAM_TIME = 10
 DEFAULT_IP_ADDR_TIMEOUT = 15
 PROCESS_JOIN_TIMEOUT = 60
+# Streams sleep until this many seconds before their start time, then spin
+START_TIME_SPIN_WINDOW = 0.002
+IP_ADDR_POLL_INTERVAL = 1
 AVAILABLE = True
 UNAVAILABLE = False
 
@@ -190,14 +193,16 @@ class WmmTransceiver(object):
         # server is reserved on the transceiver for that streams use
         self._reserved_servers = {}
 
-        # Maps with shared memory functionality to be used across the parallel
-        # streams. active_streams holds UUIDs of streams that are currently
-        # running on this device (mapped to True, since there is no
-        # multiprocessing set). stream_results maps UUIDs of streams completed
-        # on this device to IPerfResult results for that stream.
-        self._manager = multiprocessing.Manager()
-        self._active_streams = self._manager.dict()
-        self._stream_results = self._manager.dict()
+        # Maps shared by the stream threads. Each stream only sets and pops
+        # its own UUID, so no lock is needed. active_streams holds UUIDs of
+        # streams that are currently running on this device (mapped to True).
+        # stream_results maps UUIDs of streams completed on this device to
+        # IPerfResult results for that stream. stream_start_times maps UUIDs
+        # of streams to the time, seconds since epoch, at which iperf was
+        # actually started.
+        self._active_streams = {}
+        self._stream_results = {}
+        self._stream_start_times = {}
 
         # Holds parameters for streams that are prepared to run asynchronously
         # (i.e. resources have been allocated). Maps UUIDs of the future streams
@@ -208,9 +213,8 @@ class WmmTransceiver(object):
         # have not had their resources reclaimed yet
         self._ran_async_streams = set()
 
-        # Set of stream parallel process, which can be joined if completed
-        # successfully, or  terminated and joined in the event of an error
-        self._running_processes = set()
+        # Set of stream threads, which are joined when cleaning up streams
+        self._running_threads = set()
 
     def run_synchronous_traffic_stream(self, stream_parameters, subnet):
         """Runs a traffic stream with IPerf3 between two WmmTransceivers and
@@ -235,12 +239,11 @@ class WmmTransceiver(object):
 
         self.log.info('Running synchronous stream to %s WmmTransceiver' %
                       receiver.identifier)
+        self._active_streams[uuid] = True
         self._run_traffic(uuid,
                           client,
                           server_ip,
                           server_port,
-                          self._active_streams,
-                          self._stream_results,
                           access_category=access_category,
                           bandwidth=bandwidth,
                           stream_time=stream_time)
@@ -285,7 +288,7 @@ class WmmTransceiver(object):
 
     def start_asynchronous_streams(self, start_time=None):
         """Starts pending asynchronous streams between two WmmTransceivers as
-        parallel processes.
+        parallel threads.
 
         Args:
             start_time: float, time, seconds since epoch, at which to start the
@@ -300,38 +303,35 @@ class WmmTransceiver(object):
             bandwidth = pending_stream_config['bandwidth']
             time = pending_stream_config['time']
 
-            process = multiprocessing.Process(target=self._run_traffic,
-                                              args=[
-                                                  uuid, client, server_ip,
-                                                  server_port,
-                                                  self._active_streams,
-                                                  self._stream_results
-                                              ],
-                                              kwargs={
-                                                  'access_category':
-                                                  access_category,
-                                                  'bandwidth': bandwidth,
-                                                  'stream_time': time,
-                                                  'start_time': start_time
-                                              })
+            thread = threading.Thread(target=self._run_traffic,
+                                      name='wmm_stream_%s' % uuid,
+                                      args=[uuid, client, server_ip,
+                                            server_port],
+                                      kwargs={
+                                          'access_category': access_category,
+                                          'bandwidth': bandwidth,
+                                          'stream_time': time,
+                                          'start_time': start_time
+                                      },
+                                      daemon=True)
 
             # This needs to be set here to ensure its marked active before
             # it even starts.
             self._active_streams[uuid] = True
-            process.start()
+            thread.start()
             self._ran_async_streams.add(uuid)
-            self._running_processes.add(process)
+            self._running_threads.add(thread)
 
         self._pending_async_streams.clear()
 
     def cleanup_asynchronous_streams(self, timeout=PROCESS_JOIN_TIMEOUT):
         """Releases reservations on resources (IPerfClients and IPerfServers)
         that were held for asynchronous streams, both pending and finished.
-        Attempts to join any running processes, logging an error if timeout is
+        Attempts to join any running threads, logging an error if timeout is
         exceeded.
 
         Args:
-            timeout: time, in seconds, to wait for each running process, if any,
+            timeout: time, in seconds, to wait for each running thread, if any,
                 to join
         """
         self.log.info('Cleaning up any asynchronous streams.')
@@ -343,17 +343,15 @@ class WmmTransceiver(object):
             self._return_stream_resources(uuid)
         self._pending_async_streams.clear()
 
-        # Attempts to join any running streams, terminating them after timeout
-        # if necessary.
-        while self._running_processes:
-            process = self._running_processes.pop()
-            process.join(timeout)
-            if process.is_alive():
+        # Attempts to join any running streams. Threads cannot be terminated,
+        # so streams still running after timeout are abandoned.
+        while self._running_threads:
+            thread = self._running_threads.pop()
+            thread.join(timeout)
+            if thread.is_alive():
                 self.log.error(
-                    'Stream process failed to join in %s seconds. Terminating.'
+                    'Stream thread failed to join in %s seconds. Abandoning.'
                     % timeout)
-                process.terminate()
-                process.join()
         self._active_streams.clear()
 
         # Release resources for any finished streams
@@ -369,14 +367,26 @@ class WmmTransceiver(object):
         """
         return self._stream_results.get(uuid, None)
 
+    def get_start_time(self, uuid):
+        """Retrieves the time, seconds since epoch, at which a stream started
+
+        Args:
+            uuid: UUID object, identifier of the stream
+        """
+        return self._stream_start_times.get(uuid, None)
+
     def destroy_resources(self):
         for server in self._iperf_servers:
             server.stop()
+        for client in self._iperf_clients:
+            if type(client) == iperf_client.IPerfClientOverSsh:
+                client.close_ssh()
         self._iperf_servers.clear()
         self._iperf_server_ports.clear()
         self._iperf_clients.clear()
         self._next_server_port = self._port_range_start
         self._stream_results.clear()
+        self._stream_start_times.clear()
 
     @property
     def has_active_streams(self):
@@ -389,28 +399,24 @@ class WmmTransceiver(object):
                      client,
                      server_ip,
                      server_port,
-                     active_streams,
-                     stream_results,
                      access_category=None,
                      bandwidth=None,
                      stream_time=DEFAULT_STREAM_TIME,
                      start_time=None):
         """Runs an iperf3 stream.
 
-        1. Adds stream UUID to active_streams
+        1. Waits for the stream start time
         2. Runs stream
-        3. Saves results to stream_results
-        4. Removes stream UUID from active_streams
+        3. Saves start time and results to stream_start_times and
+           stream_results
+        4. Removes stream UUID from active_streams, which the caller must have
+           added it to
 
         Args:
             uuid: UUID object, identifier for stream
             client: IPerfClient object on device
             server_ip: string, ip address of IPerfServer for stream
             server_port: int, port of the IPerfServer for stream
-            active_streams: multiprocessing.Manager.dict, which holds stream
-                UUIDs of active streams on the device
-            stream_results: multiprocessing.Manager.dict, which maps stream
-                UUIDs of streams to IPerfResult objects
             access_category: string, WMM access category to use with iperf
                 (AC_BK, AC_BE, AC_VI, AC_VO). Unset if None.
             bandwidth: int, bandwidth in mbps to use with iperf. Implies UDP.
@@ -419,13 +425,6 @@ class WmmTransceiver(object):
             start_time: float, time, seconds since epoch, at which to start the
                 stream (for better synchronicity). If None, start immediately.
         """
-        active_streams[uuid] = True
-        # SSH sessions must be started within the process that is going to
-        # use it.
-        if type(client) == iperf_client.IPerfClientOverSsh:
-            with utils.SuppressLogOutput():
-                client.start_ssh()
-
         ac_flag = ''
         bandwidth_flag = ''
         time_flag = '-t %s' % stream_time
@@ -446,18 +445,14 @@ class WmmTransceiver(object):
             % (time_str, stream_time, server_ip, server_port, access_category,
                bandwidth if bandwidth else 'Unlimited'))
 
-        # If present, wait for stream start time
-        if start_time:
-            current_time = time.time()
-            while current_time < start_time:
-                current_time = time.time()
-        path = client.start(server_ip, iperf_flags, '%s' % uuid)
-        stream_results[uuid] = iperf_server.IPerfResult(
-            path, reporting_speed_units='mbps')
-
-        if type(client) == iperf_client.IPerfClientOverSsh:
-            client.close_ssh()
-        active_streams.pop(uuid)
+        try:
+            _sleep_until(start_time)
+            self._stream_start_times[uuid] = time.time()
+            path = client.start(server_ip, iperf_flags, '%s' % uuid)
+            self._stream_results[uuid] = iperf_server.IPerfResult(
+                path, reporting_speed_units='mbps')
+        finally:
+            self._active_streams.pop(uuid, None)
 
     def _get_stream_resources(self, uuid, receiver, subnet):
         """Reserves an IPerfClient and IPerfServer for a stream.
@@ -508,12 +503,9 @@ class WmmTransceiver(object):
                 reserved_client = client
                 break
         else:
+            # Clients, and their ssh sessions, are kept open and reused by
+            # later streams until resources are destroyed.
             reserved_client = iperf_client.create([self._iperf_config])[0]
-            # Due to the nature of multiprocessing, ssh connections must
-            # be started inside the parallel processes, so it must be closed
-            # here.
-            if type(reserved_client) == iperf_client.IPerfClientOverSsh:
-                reserved_client.close_ssh()
 
         self._iperf_clients[reserved_client] = UNAVAILABLE
         self._reserved_clients[uuid] = reserved_client
@@ -539,7 +531,9 @@ class WmmTransceiver(object):
 
     def _reserve_server(self, subnet):
         """Reserves an available IPerfServer for use in a stream from another
-        WmmTransceiver. If none are available, a new one is created.
+        WmmTransceiver. If none are available, a new one is created. Servers
+        keep running after being released, so they can be reused without being
+        restarted.
 
         Args:
             subnet: string, subnet of test network, to retrieve the appropriate
@@ -561,9 +555,10 @@ class WmmTransceiver(object):
             self._iperf_server_ports[reserved_server.port] = reserved_server
 
         self._iperf_servers[reserved_server] = UNAVAILABLE
-        reserved_server.start()
+        if not reserved_server.started:
+            reserved_server.start()
         end_time = time.time() + DEFAULT_IP_ADDR_TIMEOUT
-        while time.time() < end_time:
+        while True:
             if self.wlan_device:
                 addresses = utils.get_interface_ip_addresses(
                     self.wlan_device.device, self._test_interface)
@@ -573,6 +568,9 @@ class WmmTransceiver(object):
             for addr in addresses['ipv4_private']:
                 if utils.ip_in_subnet(addr, subnet):
                     return (addr, reserved_server.port)
+            if time.time() + IP_ADDR_POLL_INTERVAL > end_time:
+                break
+            time.sleep(IP_ADDR_POLL_INTERVAL)
         raise AttributeError(
             'Reserved server has no ipv4 address in the %s subnet' % subnet)
 
@@ -585,7 +583,6 @@ class WmmTransceiver(object):
                 it is the identifying characteristic
         """
         server = self._iperf_server_ports[server_port]
-        server.stop()
         self._iperf_servers[server] = AVAILABLE
 
     def _validate_server_address(self, server_ip, uuid, timeout=60):
@@ -655,6 +652,38 @@ class WmmTransceiver(object):
         return (receiver, access_category, bandwidth, time)
 
 
+def _sleep_until(wake_time):
+    """Sleeps until wake_time, seconds since epoch, if set.
+
+    Sleeps until shortly before wake_time and spins for the rest, which is
+    more precise than a single sleep but does not burn a core while waiting.
+    """
+    if not wake_time:
+        return
+    remaining = wake_time - time.time()
+    if remaining > START_TIME_SPIN_WINDOW:
+        time.sleep(remaining - START_TIME_SPIN_WINDOW)
+    while time.time() < wake_time:
+        pass
+
+
+def get_start_skew(start_times):
+    """Gets the skew, in seconds, between the start times of streams.
+
+    Args:
+        start_times: list of stream start times, seconds since epoch, e.g.,
+            from WmmTransceiver.get_start_time. None entries are ignored.
+
+    Returns:
+        float, the time between the first and last stream start, or None if
+        no stream started.
+    """
+    start_times = [t for t in start_times if t is not None]
+    if not start_times:
+        return None
+    return max(start_times) - min(start_times)
+
+
 class WmmTransceiverLoggerAdapter(logging.LoggerAdapter):
     def process(self, msg, kwargs):
         if self.extra['identifier']:
@@ -18,13 +18,22 @@
 import logging
 import numpy
 import soundfile
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from numpy.lib.stride_tricks import sliding_window_view
 from scipy.signal import blackmanharris
 from scipy.signal import iirnotch
 from scipy.signal import lfilter
 
+import acts_contrib.test_utils.audio_analysis_lib.audio_data as audio_data
+
 # The default block size of pattern matching.
 ANOMALY_DETECTION_BLOCK_SIZE = 120
 
+# The number of test blocks correlated against the golden pattern at once.
+# This bounds the size of the intermediate correlation matrix.
+ANOMALY_DETECTION_BATCH_BLOCKS = 4096
+
 # Only peaks with coefficient greater than 0.01 of the first peak should be
 # considered. Note that this correspond to -40dB in the spectrum.
 DEFAULT_MIN_PEAK_RATIO = 0.01
@@ -47,6 +56,18 @@ ANOMALY_GROUPING_TOLERANCE = 1.0
 # Window size for peak detection.
 PEAK_WINDOW_SIZE_HZ = 20
 
+# The number of frames of an audio file loaded at a time by the get_file_*
+# functions. This bounds their memory usage regardless of the file length.
+FILE_ANALYSIS_BLOCK_FRAMES = 1 << 20
+
+# The number of analysis windows processed at once by THDN_series. This
+# bounds the size of the intermediate 2-D arrays.
+THDN_BATCH_WINDOWS = 256
+
+# Coefficients of the 4-term Blackman-Harris window, as in
+# scipy.signal.blackmanharris.
+_BLACKMAN_HARRIS_COEFFICIENTS = (0.35875, 0.48829, 0.14128, 0.01168)
+
 
 class RMSTooSmallError(Exception):
     """Error when signal RMS is too small."""
@@ -181,6 +202,10 @@ def peak_detection(array, window_size):
     then there is no peak in this window.
     Note that we only consider peak with value greater than 0.
 
+    The maxima of the left and right half windows of every point are found
+    with a sliding maximum, so this runs in linear time regardless of the
+    window size.
+
     Args:
         array: The input array to detect peaks in. Array is a list of
         absolute values of the magnitude of transformed coefficient.
@@ -194,80 +219,66 @@ def peak_detection(array, window_size):
 
     """
     half_window_size = window_size / 2
-    length = len(array)
-
-    def mid_is_peak(array, mid, left, right):
-        """Checks if value at mid is the largest among left to right in array.
-
-        Args:
-            array: A list of numbers.
-            mid: The mid index.
-            left: The left index.
-            rigth: The right index.
-
-        Returns:
-            A tuple (is_peak, next_candidate)
-                  is_peak is True if array[index] is the maximum among numbers
-                  in array between index [left, right] inclusively.
-                  next_candidate is the index of next candidate for peak if
-                  is_peak is False. It is the index of maximum value in
-                  [mid + 1, right]. If is_peak is True, next_candidate is
-                  right + 1.
-
-        """
-        value_mid = array[int(mid)]
-        is_peak = True
-        next_peak_candidate_index = None
-
-        # Check the left half window.
-        for index in range(int(left), int(mid)):
-            if array[index] >= value_mid:
-                is_peak = False
-                break
-
-        # Mid is at the end of array.
-        if mid == right:
-            return is_peak, right + 1
-
-        # Check the right half window and also record next candidate.
-        # Favor the larger index for next_peak_candidate_index.
-        for index in range(int(right), int(mid), -1):
-            if (next_peak_candidate_index is None
-                    or array[index] > array[next_peak_candidate_index]):
-                next_peak_candidate_index = index
-
-        if array[next_peak_candidate_index] >= value_mid:
-            is_peak = False
-
-        if is_peak:
-            next_peak_candidate_index = right + 1
-
-        return is_peak, next_peak_candidate_index
-
-    results = []
-    mid = 0
-    next_candidate_idx = None
-    while mid < length:
-        left = max(0, mid - half_window_size)
-        right = min(length - 1, mid + half_window_size)
+    values = numpy.asarray(array, dtype=float)
+    length = len(values)
 
-        # Only consider value greater than 0.
-        if array[int(mid)] == 0:
-            mid = mid + 1
-            continue
+    # The window of index i covers indices i - left_size to i + right_size.
+    left_size = max(0, int(numpy.ceil(half_window_size)))
+    right_size = max(0, int(half_window_size))
 
-        is_peak, next_candidate_idx = mid_is_peak(array, mid, left, right)
+    # left_max[i] is the maximum of the left half window of index i, and
+    # right_max[i] the one of its right half window.
+    left_max = _sliding_max(
+        numpy.concatenate([numpy.full(left_size, -numpy.inf), values]),
+        left_size)[:length]
+    right_max = _sliding_max(
+        numpy.concatenate([values, numpy.full(right_size, -numpy.inf)]),
+        right_size)[1:length + 1]
 
-        if is_peak:
-            results.append((mid, array[int(mid)]))
+    # Only consider value greater than 0.
+    is_peak = (values != 0) & (values > left_max) & (values > right_max)
 
-        # Use the next candidate found in [mid + 1, right], or right + 1.
-        mid = next_candidate_idx
+    results = [(int(index), array[int(index)])
+               for index in numpy.flatnonzero(is_peak)]
 
     # Sort the peaks by values.
     return sorted(results, key=lambda x: x[1], reverse=True)
 
 
+def _sliding_max(array, size):
+    """Computes the maximum of each window of an array.
+
+    Uses the van Herk/Gil-Werman algorithm: the array is cut in blocks of
+    the window size, so that each window spans the suffix of one block and
+    the prefix of the next one. This takes linear time.
+
+    Args:
+        array: A 1-D numpy array.
+        size: The window size. If 0, the maximum of each empty window is
+            -inf.
+
+    Returns:
+        A numpy array containing max(array[j:j + size]) for each j in
+            range(len(array) - size + 1).
+
+    """
+    n_windows = len(array) - size + 1
+    if n_windows <= 0:
+        return numpy.zeros(0)
+    if size == 0:
+        return numpy.full(n_windows, -numpy.inf)
+
+    n_blocks = -(-len(array) // size)
+    padded = numpy.full(n_blocks * size, -numpy.inf)
+    padded[:len(array)] = array
+    blocks = padded.reshape(n_blocks, size)
+    prefix_max = numpy.maximum.accumulate(blocks, axis=1).ravel()
+    suffix_max = numpy.maximum.accumulate(blocks[:, ::-1],
+                                          axis=1)[:, ::-1].ravel()
+    starts = numpy.arange(n_windows)
+    return numpy.maximum(suffix_max[starts], prefix_max[starts + size - 1])
+
+
 def anomaly_detection(signal,
                       rate,
                       freq,
@@ -305,20 +316,61 @@ def anomaly_detection(signal,
 
     golden_y = _generate_golden_pattern(rate, freq, block_size)
 
-    results = []
-
-    for start in range(0, len(signal), int(block_size / 2)):
-        end = start + block_size
-        test_signal = signal[start:end]
-        matched = _moving_pattern_matching(golden_y, test_signal, threshold)
-        if not matched:
-            results.append(start)
+    results = _get_unmatched_block_starts(golden_y, numpy.asarray(signal),
+                                          block_size, threshold)
 
     results = [float(x) / rate for x in results]
 
     return results
 
 
+def _get_unmatched_block_starts(golden_y,
+                                signal,
+                                block_size,
+                                threshold,
+                                stop=None):
+    """Gets the start indices of the blocks of signal with an anomaly.
+
+    Blocks start from index 0 and proceed in steps of half block size, as in
+    anomaly_detection.
+
+    Args:
+        golden_y: A 1-D array for golden pattern.
+        signal: A 1-D numpy array for 1-channel PCM data.
+        block_size: The block size in samples to detect anomaly.
+        threshold: The threshold of correlation index to be judge as matched.
+        stop: If not None, only the blocks starting before this index are
+            checked.
+
+    Returns:
+        A list containing the start indices of unmatched blocks.
+
+    """
+    step = int(block_size / 2)
+    starts = range(0, len(signal) if stop is None else min(stop, len(signal)),
+                   step)
+    matched = numpy.ones(len(starts), dtype=bool)
+
+    # Blocks that lie entirely within the signal are matched in one batched
+    # pass over a strided view of the signal.
+    n_full_blocks = 0
+    if len(signal) >= block_size:
+        test_blocks = sliding_window_view(signal, block_size)[::step]
+        test_blocks = test_blocks[:len(starts)]
+        matched[:len(test_blocks)] = _batch_pattern_matching(
+            golden_y, test_blocks, threshold)
+        n_full_blocks = len(test_blocks)
+
+    # The last few blocks are truncated by the end of the signal.
+    for index in range(n_full_blocks, len(starts)):
+        start = starts[index]
+        test_signal = signal[start:start + block_size]
+        matched[index] = _moving_pattern_matching(golden_y, test_signal,
+                                                  threshold)
+
+    return [starts[index] for index in numpy.flatnonzero(~matched)]
+
+
 def get_anomaly_durations(signal,
                           rate,
                           freq,
@@ -347,8 +399,26 @@ def get_anomaly_durations(signal,
         bounds (list): a list of (start, end) tuples where start and end are the
             boundaries in seconds of the detected anomaly.
     """
-    bounds = []
     anoms = anomaly_detection(signal, rate, freq, block_size, threshold)
+    return _group_anomalies(anoms, rate, block_size, tolerance)
+
+
+def _group_anomalies(anoms, rate, block_size, tolerance):
+    """Groups anomaly time values into (start, end) tuples.
+
+    Args:
+        anoms (list): sorted time markers in seconds, as returned by
+            anomaly_detection.
+        rate (int): Sampling rate in samples per second.
+        block_size (int): The block size in samples used to detect anomaly.
+        tolerance (float): The number of samples greater than block_size / 2
+            that the sample distance between two anomaly time values can be and
+            still be grouped as the same anomaly.
+    Returns:
+        bounds (list): a list of (start, end) tuples where start and end are the
+            boundaries in seconds of the detected anomaly.
+    """
+    bounds = []
     if len(anoms) == 0:
         return bounds
     end = anoms[0]
@@ -445,6 +515,62 @@ def _moving_pattern_matching(golden_signal, test_signal, threshold):
     return True
 
 
+def _batch_pattern_matching(golden_signal, test_blocks, threshold):
+    """Checks if each test block is similar to any block of golden_signal.
+
+    This is the batched equivalent of calling _moving_pattern_matching on
+    every row of test_blocks. The correlation of every test block with every
+    block of golden signal is computed as one matrix product, processed in
+    batches of ANOMALY_DETECTION_BATCH_BLOCKS test blocks.
+
+    Args:
+        golden_signal: A 1-D array for golden signal.
+        test_blocks: A 2-D array of shape (number of blocks, block length)
+            for the test signal blocks.
+        threshold: The threshold of correlation index to be judge as matched.
+
+    Returns:
+        A 1-D boolean array which is True where a test block is matched.
+
+    Raises:
+        ValueError: if test blocks are longer than golden signal.
+        GoldenSignalNormTooSmallError: if a golden signal block norm is too
+            small.
+
+    """
+    block_length = test_blocks.shape[1]
+    if len(golden_signal) < block_length:
+        raise ValueError('Test signal is longer than golden signal')
+
+    golden_blocks = sliding_window_view(golden_signal, block_length)
+    norm_golden = numpy.linalg.norm(golden_blocks, axis=1)
+    if numpy.any(norm_golden <= _MINIMUM_SIGNAL_NORM):
+        raise GoldenSignalNormTooSmallError(
+            'No meaningful data as norm is too small.')
+    normalized_golden_blocks = golden_blocks / norm_golden[:, numpy.newaxis]
+
+    matched = numpy.zeros(len(test_blocks), dtype=bool)
+    for begin in range(0, len(test_blocks), ANOMALY_DETECTION_BATCH_BLOCKS):
+        end = begin + ANOMALY_DETECTION_BATCH_BLOCKS
+        batch = test_blocks[begin:end]
+        norm_test = numpy.linalg.norm(batch, axis=1)
+        meaningful = norm_test > _MINIMUM_SIGNAL_NORM
+        if not numpy.all(meaningful):
+            logging.info(
+                'Caught %d blocks of test signal that have no meaningful '
+                'norm', numpy.count_nonzero(~meaningful))
+        # Rows are the test blocks, columns are the golden signal blocks.
+        correlation = numpy.dot(batch[meaningful], normalized_golden_blocks.T)
+        max_corr = correlation.max(axis=1) / norm_test[meaningful]
+        batch_matched = max_corr >= threshold
+        if not numpy.all(batch_matched):
+            logging.debug('Got %d unmatched blocks with max_corr: %s',
+                          numpy.count_nonzero(~batch_matched),
+                          max_corr[~batch_matched])
+        matched[begin:end][meaningful] = batch_matched
+    return matched
+
+
 class GoldenSignalNormTooSmallError(Exception):
     """Exception when golden signal norm is too small."""
 
@@ -518,7 +644,7 @@ def THDN(signal, rate, q, freq):
             and noise signal to RMS of original signal.
     """
     # Normalize and window signal.
-    signal -= numpy.mean(signal)
+    signal = signal - numpy.mean(signal)
     windowed = signal * blackmanharris(len(signal))
     # Find fundamental frequency to remove if not specified.
     freq = freq or fundamental_freq(windowed, rate)
@@ -531,6 +657,61 @@ def THDN(signal, rate, q, freq):
     return THDN
 
 
+def THDN_series(signal, rate, step_size, window_size, q, freq):
+    """Measure the THD+N of each moving window of a signal.
+
+    This computes the same values as calling THDN on each window analyzed by
+    max_THDN, but the window function and the notch filter are only computed
+    once and the windows are processed in batches of THDN_BATCH_WINDOWS rows
+    of a strided 2-D view of the signal.
+
+    Args:
+        signal: array representing the signal
+        rate: sample rate of the signal.
+        step_size: how many samples to move the window by for each analysis.
+        window_size: how many samples to analyze each time.
+        q: quality factor for the notch filter.
+        freq: fundamental frequency of the signal. All other frequencies
+            are noise. If not specified, will be calculated using FFT for
+            each window.
+    Returns:
+        series: 1-D numpy array of THD+N values. Value i is for the window
+            starting at sample i * step_size.
+    """
+    signal = numpy.asarray(signal, dtype=float)
+    n_windows = len(range(0, len(signal) - window_size, step_size))
+    series = numpy.zeros(n_windows)
+    if n_windows == 0:
+        return series
+
+    windows = sliding_window_view(signal, window_size)[::step_size]
+    window_function = blackmanharris(window_size)
+    # Notch filter coefficients by fundamental frequency.
+    notch_filters = {}
+    for begin in range(0, n_windows, THDN_BATCH_WINDOWS):
+        end = min(begin + THDN_BATCH_WINDOWS, n_windows)
+        batch = windows[begin:end]
+        centered = batch - batch.mean(axis=1, keepdims=True)
+        windowed = centered * window_function
+        if freq:
+            window_freqs = numpy.full(len(batch), freq)
+        else:
+            dft = numpy.fft.rfft(windowed, axis=1)
+            window_freqs = rate * (numpy.argmax(numpy.abs(dft), axis=1) /
+                                   window_size)
+        noise = numpy.empty_like(windowed)
+        for window_freq in numpy.unique(window_freqs):
+            if window_freq not in notch_filters:
+                notch_filters[window_freq] = iirnotch(
+                    window_freq / (rate / 2.0), q)
+            b, a = notch_filters[window_freq]
+            rows = window_freqs == window_freq
+            noise[rows] = lfilter(b, a, windowed[rows], axis=1)
+        series[begin:end] = numpy.sqrt(
+            numpy.sum(noise**2, axis=1) / numpy.sum(windowed**2, axis=1))
+    return series
+
+
 def max_THDN(signal, rate, step_size, window_size, q, freq):
     """Analyze signal with moving window and find maximum THD+N value.
     Args:
@@ -544,20 +725,97 @@ def max_THDN(signal, rate, step_size, window_size, q, freq):
     Returns:
         greatest_THDN: the greatest THD+N value found across all windows
     """
-    greatest_THDN = 0
-    cur = 0
-    while cur + window_size < len(signal):
-        window = signal[cur:cur + window_size]
-        res = THDN(window, rate, q, freq)
-        cur += step_size
-        if res > greatest_THDN:
-            greatest_THDN = res
+    series = THDN_series(signal, rate, step_size, window_size, q, freq)
+    greatest_THDN = max(series.max(), 0) if len(series) else 0
     return greatest_THDN
 
 
+def _open_audio_file(filename):
+    """Opens an audio file for block-wise analysis.
+
+    PCM wave files are memory-mapped, so their samples are only paged in
+    when accessed. Other formats supported by soundfile are read into memory.
+
+    Args:
+        filename (str): path to the audio file.
+
+    Returns:
+        A tuple (raw_data, rate) where raw_data is an audio_data.AudioRawData
+            object and rate is the sampling rate.
+    """
+    try:
+        with wave.open(filename, 'r') as wave_reader:
+            params = wave_reader.getparams()
+        sample_format = 'S%d_LE' % (params.sampwidth * 8)
+        if sample_format in audio_data.SAMPLE_FORMATS:
+            raw_data = audio_data.AudioRawData(binary=None,
+                                               channel=params.nchannels,
+                                               sample_format=sample_format)
+            raw_data.read_file(
+                filename,
+                offset=audio_data.get_wave_data_offset(filename),
+                n_frames=params.nframes)
+            return raw_data, params.framerate
+    except (wave.Error, EOFError):
+        pass
+
+    logging.debug('%s is not a PCM wave file, reading it into memory.',
+                  filename)
+    with soundfile.SoundFile(filename) as audio_file:
+        raw_data = audio_data.AudioRawData(binary=None,
+                                           channel=audio_file.channels,
+                                           sample_format='S32_LE')
+        raw_data.read_binary(audio_file.buffer_read(dtype='int32'))
+        return raw_data, audio_file.samplerate
+
+
+def _iter_normalized_blocks(raw_data, block_frames, hop_frames=None):
+    """Iterates over blocks of an audio_data.AudioRawData, normalized.
+
+    Args:
+        raw_data: An audio_data.AudioRawData object.
+        block_frames: The number of frames in each block.
+        hop_frames: The number of frames between the starts of two
+            consecutive blocks. Defaults to block_frames.
+
+    Yields:
+        A tuple (start_frame, block) where block is a numpy array of shape
+            (channel, frames) with values normalized to [-1, 1].
+    """
+    saturate_value = audio_data.get_maximum_value_from_sample_format(
+        raw_data.sample_format)
+    for start, block in raw_data.iter_blocks(block_frames, hop_frames):
+        yield start, normalize_signal(block, saturate_value)
+
+
+def _blackmanharris_segment(start, stop, length):
+    """Computes a segment of a Blackman-Harris window.
+
+    Args:
+        start: index of the first sample of the segment.
+        stop: index after the last sample of the segment.
+        length: length of the whole window.
+
+    Returns:
+        A numpy array equal to blackmanharris(length)[start:stop].
+    """
+    if length == 1:
+        return numpy.ones(stop - start)
+    phase = 2.0 * numpy.pi * numpy.arange(start, stop) / (length - 1)
+    window = numpy.zeros(stop - start)
+    for k, coefficient in enumerate(_BLACKMAN_HARRIS_COEFFICIENTS):
+        window += (-1)**k * coefficient * numpy.cos(k * phase)
+    return window
+
+
 def get_file_THDN(filename, q, freq=None):
     """Get THD+N values for each channel of an audio file.
 
+    The file is processed in blocks of FILE_ANALYSIS_BLOCK_FRAMES frames, so
+    the memory usage does not depend on its length. If freq is None, the
+    fundamental frequency is found with an FFT of each whole channel, which
+    needs to hold one channel in memory.
+
     Args:
         filename (str): path to the audio file.
           (supported file types: http://www.mega-nerd.com/libsndfile/#Features)
@@ -568,25 +826,148 @@ def get_file_THDN(filename, q, freq=None):
         channel_results (list): THD+N value for each channel's signal.
             List index corresponds to channel index.
     """
-    audio_file = soundfile.SoundFile(filename)
-    channel_results = []
-    if audio_file.channels == 1:
-        channel_results.append(
-            THDN(signal=audio_file.read(),
-                 rate=audio_file.samplerate,
-                 q=q,
-                 freq=freq))
+    raw_data, rate = _open_audio_file(filename)
+    n_frames = raw_data.n_frames
+
+    # The first pass gets the mean of each channel.
+    channel_sums = numpy.zeros(raw_data.channel)
+    for _, block in _iter_normalized_blocks(raw_data,
+                                            FILE_ANALYSIS_BLOCK_FRAMES):
+        channel_sums += block.sum(axis=1)
+    channel_means = channel_sums / n_frames
+
+    saturate_value = audio_data.get_maximum_value_from_sample_format(
+        raw_data.sample_format)
+    filters = []
+    for ch_no in range(raw_data.channel):
+        channel_freq = freq
+        if not channel_freq:
+            signal = normalize_signal(raw_data.channel_data[ch_no],
+                                      saturate_value)
+            windowed = ((signal - channel_means[ch_no]) *
+                        blackmanharris(n_frames))
+            channel_freq = fundamental_freq(windowed, rate)
+        b, a = iirnotch(channel_freq / (rate / 2.0), q)
+        # The filter state carries over from one block to the next.
+        zi = numpy.zeros(max(len(a), len(b)) - 1)
+        filters.append([b, a, zi])
+
+    # The second pass filters the windowed signal and accumulates energies.
+    noise_energies = numpy.zeros(raw_data.channel)
+    windowed_energies = numpy.zeros(raw_data.channel)
+    for start, block in _iter_normalized_blocks(raw_data,
+                                                FILE_ANALYSIS_BLOCK_FRAMES):
+        window = _blackmanharris_segment(start, start + block.shape[1],
+                                         n_frames)
+        windowed = (block - channel_means[:, numpy.newaxis]) * window
+        windowed_energies += numpy.sum(windowed**2, axis=1)
+        for ch_no, channel_filter in enumerate(filters):
+            b, a, zi = channel_filter
+            noise, channel_filter[2] = lfilter(b, a, windowed[ch_no], zi=zi)
+            noise_energies[ch_no] += numpy.sum(noise**2)
+
+    channel_results = list(numpy.sqrt(noise_energies / windowed_energies))
+    return channel_results
+
+
+def _get_file_segment_THDN_series(filename, start, block_frames, step_size,
+                                  window_size, q, freq):
+    """Measure the THD+N of the moving windows in a segment of a file.
+
+    This is run in worker processes by get_file_THDN_series.
+
+    Args:
+        filename (str): path to the audio file.
+        start: the first frame of the segment.
+        block_frames: the number of frames in the segment.
+        step_size: how many samples to move the window by for each analysis.
+        window_size: how many samples to analyze each time.
+        q (float): quality factor for the notch filter.
+        freq (int|float): fundamental frequency of the signal.
+    Returns:
+        A list of THD+N series for each channel in the segment.
+    """
+    raw_data, rate = _open_audio_file(filename)
+    saturate_value = audio_data.get_maximum_value_from_sample_format(
+        raw_data.sample_format)
+    block = normalize_signal(
+        raw_data.channel_data[:, start:start + block_frames], saturate_value)
+    return [
+        THDN_series(signal, rate, step_size, window_size, q, freq)
+        for signal in block
+    ]
+
+
+def get_file_THDN_series(filename,
+                         step_size,
+                         window_size,
+                         q,
+                         freq=None,
+                         max_workers=None):
+    """Get THD+N values of each analysis window for each channel of file.
+
+    The file is processed in segments of about FILE_ANALYSIS_BLOCK_FRAMES
+    frames, so the memory usage does not depend on its length. Segments are
+    analyzed in a pool of max_workers processes if max_workers is more than
+    one.
+
+    Args:
+        filename (str): path to the audio file.
+          (supported file types: http://www.mega-nerd.com/libsndfile/#Features)
+        step_size: how many samples to move the window by for each analysis.
+        window_size: how many samples to analyze each time.
+        q (float): quality factor for the notch filter.
+        freq (int|float): fundamental frequency of the signal. All other
+            frequencies are noise. If None, will be calculated with FFT.
+        max_workers (int): the number of worker processes. If None or 1, the
+            file is analyzed in the calling process.
+    Returns:
+        channel_results (list): 1-D numpy array of THD+N values for each
+            channel's signal. Value i is for the window starting at sample
+            i * step_size. List index corresponds to channel index.
+    """
+    raw_data, rate = _open_audio_file(filename)
+
+    # Each segment holds a whole number of analysis windows, and consecutive
+    # segments overlap so that no window is split across two segments.
+    windows_per_block = max(1, FILE_ANALYSIS_BLOCK_FRAMES // step_size)
+    hop_frames = windows_per_block * step_size
+    block_frames = window_size + hop_frames
+
+    if max_workers is None or max_workers <= 1:
+        segment_results = [
+            [
+                THDN_series(signal, rate, step_size, window_size, q, freq)
+                for signal in block
+            ] for _, block in _iter_normalized_blocks(
+                raw_data, block_frames, hop_frames)
+        ]
     else:
-        for ch_no, channel in enumerate(audio_file.read().transpose()):
-            channel_results.append(
-                THDN(signal=channel,
-                     rate=audio_file.samplerate,
-                     q=q,
-                     freq=freq))
+        starts = range(0, raw_data.n_frames, hop_frames)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(_get_file_segment_THDN_series, filename,
+                                start, block_frames, step_size, window_size,
+                                q, freq) for start in starts
+            ]
+            segment_results = [future.result() for future in futures]
+
+    channel_results = []
+    for ch_no in range(raw_data.channel):
+        channel_series = [segment[ch_no] for segment in segment_results]
+        if channel_series:
+            channel_results.append(numpy.concatenate(channel_series))
+        else:
+            channel_results.append(numpy.zeros(0))
     return channel_results
 
 
-def get_file_max_THDN(filename, step_size, window_size, q, freq=None):
+def get_file_max_THDN(filename,
+                      step_size,
+                      window_size,
+                      q,
+                      freq=None,
+                      max_workers=None):
     """Get max THD+N value across analysis windows for each channel of file.
 
     Args:
@@ -597,29 +978,16 @@ def get_file_max_THDN(filename, step_size, window_size, q, freq=None):
         q (float): quality factor for the notch filter.
         freq (int|float): fundamental frequency of the signal. All other
             frequencies are noise. If None, will be calculated with FFT.
+        max_workers (int): the number of worker processes, see
+            get_file_THDN_series.
     Returns:
         channel_results (list): max THD+N value for each channel's signal.
             List index corresponds to channel index.
     """
-    audio_file = soundfile.SoundFile(filename)
     channel_results = []
-    if audio_file.channels == 1:
-        channel_results.append(
-            max_THDN(signal=audio_file.read(),
-                     rate=audio_file.samplerate,
-                     step_size=step_size,
-                     window_size=window_size,
-                     q=q,
-                     freq=freq))
-    else:
-        for ch_no, channel in enumerate(audio_file.read().transpose()):
-            channel_results.append(
-                max_THDN(signal=channel,
-                         rate=audio_file.samplerate,
-                         step_size=step_size,
-                         window_size=window_size,
-                         q=q,
-                         freq=freq))
+    for series in get_file_THDN_series(filename, step_size, window_size, q,
+                                       freq, max_workers):
+        channel_results.append(max(series.max(), 0) if len(series) else 0)
     return channel_results
 
 
@@ -630,6 +998,11 @@ def get_file_anomaly_durations(filename,
                                tolerance=ANOMALY_GROUPING_TOLERANCE):
     """Get durations of anomalies for each channel of audio file.
 
+    The file is processed in blocks of about FILE_ANALYSIS_BLOCK_FRAMES
+    frames, so the memory usage does not depend on its length. If freq is
+    None, the fundamental frequency is found with an FFT of the whole first
+    channel, which needs to hold that channel in memory.
+
     Args:
         filename (str): path to the audio file.
           (supported file types: http://www.mega-nerd.com/libsndfile/#Features)
@@ -645,25 +1018,37 @@ def get_file_anomaly_durations(filename,
         channel_results (list): anomaly durations for each channel's signal.
             List index corresponds to channel index.
     """
-    audio_file = soundfile.SoundFile(filename)
-    signal = audio_file.read()
-    freq = freq or fundamental_freq(signal, audio_file.samplerate)
-    channel_results = []
-    if audio_file.channels == 1:
-        channel_results.append(
-            get_anomaly_durations(signal=signal,
-                                  rate=audio_file.samplerate,
-                                  freq=freq,
-                                  block_size=block_size,
-                                  threshold=threshold,
-                                  tolerance=tolerance))
-    else:
-        for ch_no, channel in enumerate(signal.transpose()):
-            channel_results.append(
-                get_anomaly_durations(signal=channel,
-                                      rate=audio_file.samplerate,
-                                      freq=freq,
-                                      block_size=block_size,
-                                      threshold=threshold,
-                                      tolerance=tolerance))
+    raw_data, rate = _open_audio_file(filename)
+    if raw_data.n_frames == 0:
+        raise EmptyDataError('Signal data is empty')
+    if not freq:
+        saturate_value = audio_data.get_maximum_value_from_sample_format(
+            raw_data.sample_format)
+        freq = fundamental_freq(
+            normalize_signal(raw_data.channel_data[0], saturate_value), rate)
+    golden_y = _generate_golden_pattern(rate, freq, block_size)
+
+    # Each block holds a whole number of anomaly detection blocks, and
+    # consecutive blocks overlap so that none of them is split.
+    step = int(block_size / 2)
+    detection_blocks_per_block = max(1, FILE_ANALYSIS_BLOCK_FRAMES // step)
+    block_frames = block_size + (detection_blocks_per_block - 1) * step
+    hop_frames = detection_blocks_per_block * step
+
+    channel_anomalies = [[] for _ in range(raw_data.channel)]
+    for start, block in _iter_normalized_blocks(raw_data, block_frames,
+                                                hop_frames):
+        for ch_no, signal in enumerate(block):
+            unmatched_starts = _get_unmatched_block_starts(golden_y,
+                                                           signal,
+                                                           block_size,
+                                                           threshold,
+                                                           stop=hop_frames)
+            channel_anomalies[ch_no].extend(
+                float(start + x) / rate for x in unmatched_starts)
+
+    channel_results = [
+        _group_anomalies(anoms, rate, block_size, tolerance)
+        for anoms in channel_anomalies
+    ]
     return channel_results
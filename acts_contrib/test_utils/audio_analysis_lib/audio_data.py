@@ -15,6 +15,9 @@
 #   limitations under the License.
 """This module provides abstraction of audio data."""
 
+import os
+import struct
+
 import numpy
 """The dict containing information on how to parse sample from raw data.
 
@@ -48,6 +51,50 @@ def get_maximum_value_from_sample_format(sample_format):
     return 1 << (size_bits - 1)
 
 
+def get_numpy_dtype_from_sample_format(sample_format):
+    """Gets the numpy data type of a sample format.
+
+    Args:
+        sample_format: A key in SAMPLE_FORMAT.
+
+    Returns:
+        The numpy dtype string, e.g. <i4 for 32-bit signed int.
+
+    """
+    sample_format_dict = SAMPLE_FORMATS[sample_format]
+    return '%s%d' % (sample_format_dict['dtype_str'],
+                     sample_format_dict['size_bytes'])
+
+
+def get_wave_data_offset(filename):
+    """Finds the byte offset of the samples in a RIFF wave file.
+
+    Args:
+        filename: The wave file to be read.
+
+    Returns:
+        The offset in bytes of the first sample of the data chunk.
+
+    Raises:
+        AudioRawDataError: if the file is not a RIFF wave file or it has no
+            data chunk.
+
+    """
+    with open(filename, 'rb') as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] != b'RIFF' or header[8:] != b'WAVE':
+            raise AudioRawDataError('%s is not a RIFF wave file' % filename)
+        while True:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                raise AudioRawDataError('No data chunk in %s' % filename)
+            chunk_id, chunk_size = struct.unpack('<4sI', chunk_header)
+            if chunk_id == b'data':
+                return f.tell()
+            # Chunks are padded to an even number of bytes.
+            f.seek(chunk_size + chunk_size % 2, os.SEEK_CUR)
+
+
 class AudioRawDataError(Exception):
     """Error in AudioRawData."""
 
@@ -61,6 +108,7 @@ class AudioRawData(object):
                             channel_data[1][2].
     @property sample_format: The sample format which should be one of the keys
                              in audio_data.SAMPLE_FORMATS.
+    @property n_frames: The number of samples in each channel.
     """
 
     def __init__(self, binary, channel, sample_format):
@@ -76,6 +124,7 @@ class AudioRawData(object):
         self.channel = channel
         self.channel_data = [[] for _ in range(self.channel)]
         self.sample_format = sample_format
+        self.n_frames = 0
         if binary:
             self.read_binary(binary)
 
@@ -88,18 +137,70 @@ class AudioRawData(object):
         Args:
             binary: A string containing binary data.
         """
-        sample_format_dict = SAMPLE_FORMATS[self.sample_format]
+        np_dtype = get_numpy_dtype_from_sample_format(self.sample_format)
+
+        # Wraps the binary data as a 1-D array without copying it.
+        np_array = numpy.frombuffer(binary, dtype=np_dtype)
+        self._set_interleaved_samples(np_array)
 
-        # The data type used in numpy fromstring function. For example,
-        # <i4 for 32-bit signed int.
-        np_dtype = '%s%d' % (sample_format_dict['dtype_str'],
-                             sample_format_dict['size_bytes'])
+    def read_file(self, filename, offset=0, n_frames=None):
+        """Memory-maps samples in a file and fills channel_data.
 
-        # Reads data from a string into 1-D array.
-        np_array = numpy.fromstring(binary, dtype=np_dtype)
+        The samples are not read into memory. channel_data is a view on the
+        mapped file, so only the parts of the file which are accessed are
+        paged in.
+
+        Args:
+            filename: The file containing interleaved samples.
+            offset: The offset in bytes of the first sample in the file.
+            n_frames: The number of frames to map. If None, maps all frames
+                until the end of the file.
+        """
+        np_dtype = numpy.dtype(
+            get_numpy_dtype_from_sample_format(self.sample_format))
+        if n_frames is None:
+            n_bytes = os.path.getsize(filename) - offset
+            n_frames = n_bytes // (np_dtype.itemsize * self.channel)
+        if n_frames == 0:
+            # numpy.memmap does not support mapping an empty region.
+            self._set_interleaved_samples(numpy.zeros(0, dtype=np_dtype))
+            return
+        np_array = numpy.memmap(filename,
+                                dtype=np_dtype,
+                                mode='r',
+                                offset=offset,
+                                shape=(n_frames * self.channel, ))
+        self._set_interleaved_samples(np_array)
+
+    def _set_interleaved_samples(self, np_array):
+        """Shapes interleaved samples into each channel.
 
-        n_frames = len(np_array) / self.channel
+        Args:
+            np_array: A 1-D numpy array containing interleaved samples.
+        """
+        self.n_frames = len(np_array) // self.channel
         # Reshape np_array into an array of shape (n_frames, channel).
-        np_array = np_array.reshape(int(n_frames), self.channel)
-        # Transpose np_arrya so it becomes of shape (channel, n_frames).
+        np_array = np_array[:self.n_frames * self.channel].reshape(
+            self.n_frames, self.channel)
+        # Transpose np_array so it becomes of shape (channel, n_frames).
         self.channel_data = np_array.transpose()
+
+    def iter_blocks(self, block_frames, hop_frames=None):
+        """Iterates over blocks of frames of all channels.
+
+        Blocks are views on channel_data, so no samples are copied.
+
+        Args:
+            block_frames: The number of frames in each block. The last block
+                may be shorter.
+            hop_frames: The number of frames between the starts of two
+                consecutive blocks. Blocks overlap if this is less than
+                block_frames. Defaults to block_frames.
+
+        Yields:
+            A tuple (start_frame, block) where block is an array of shape
+                (channel, frames).
+        """
+        hop_frames = hop_frames or block_frames
+        for start in range(0, self.n_frames, hop_frames):
+            yield start, self.channel_data[:, start:start + block_frames]
@@ -74,7 +74,6 @@ class WaveFile(object):
         self._n_channels = None
         self._sample_width_bits = None
         self._n_frames = None
-        self._binary = None
 
         try:
             self._read_wave_file(filename)
@@ -110,6 +109,10 @@ class WaveFile(object):
             logging.debug('Convert the file using sox: %s', command)
             subprocess.check_call(command)
             self._read_wave_file(converted_file.name)
+            # The converted file is removed on exit, so keep its samples in
+            # memory instead of mapping it.
+            self.raw_data.channel_data = numpy.array(
+                self.raw_data.channel_data)
 
     def _read_wave_file(self, filename):
         """Reads wave file header and samples.
@@ -125,7 +128,6 @@ class WaveFile(object):
         try:
             self._wave_reader = wave.open(filename, 'r')
             self._read_wave_header()
-            self._read_wave_binary()
         except wave.Error as e:
             if 'unknown format: 65534' in str(e):
                 raise WaveFormatExtensibleException()
@@ -135,6 +137,7 @@ class WaveFile(object):
         finally:
             if self._wave_reader:
                 self._wave_reader.close()
+        self._read_wave_binary(filename)
 
     def _read_wave_header(self):
         """Reads wave file header.
@@ -157,13 +160,21 @@ class WaveFile(object):
         if comptype != 'NONE' or compname != 'not compressed':
             raise WaveFileException('Can not support compressed wav file.')
 
-    def _read_wave_binary(self):
-        """Reads in samples in wave file."""
-        self._binary = self._wave_reader.readframes(self._n_frames)
+    def _read_wave_binary(self, filename):
+        """Memory-maps samples in wave file.
+
+        Args:
+            filename: The wave file to be read.
+
+        """
         format_str = 'S%d_LE' % self._sample_width_bits
-        self.raw_data = audio_data.AudioRawData(binary=self._binary,
+        self.raw_data = audio_data.AudioRawData(binary=None,
                                                 channel=self._n_channels,
                                                 sample_format=format_str)
+        data_offset = audio_data.get_wave_data_offset(filename)
+        self.raw_data.read_file(filename,
+                                offset=data_offset,
+                                n_frames=self._n_frames)
 
 
 class QualityCheckerError(Exception):
@@ -438,12 +449,10 @@ def read_audio_file(filename, channel, bit_width, rate):
         raw_data = wavefile.raw_data
         rate = wavefile.rate
     elif filename.endswith('.raw'):
-        binary = None
-        with open(filename, 'rb') as f:
-            binary = f.read()
-        raw_data = audio_data.AudioRawData(binary=binary,
+        raw_data = audio_data.AudioRawData(binary=None,
                                            channel=channel,
                                            sample_format='S%d_LE' % bit_width)
+        raw_data.read_file(filename)
     else:
         raise CheckQualityError('File format for %s is not supported' %
                                 filename)
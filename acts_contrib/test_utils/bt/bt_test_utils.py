@@ -14,11 +14,15 @@
 # License for the specific language governing permissions and limitations under
 # the License.
 
+import collections
+import concurrent.futures
 import logging
+import numpy
 import os
 import random
 import re
 import string
+import subprocess
 import threading
 import time
 try:
@@ -710,16 +714,174 @@ def read_otp(ad):
     return otp_dict
 
 
+# BQR metrics in get_bt_metric output order, True for averagable metrics
+BQR_METRICS = collections.OrderedDict([("rssi", True), ("pwlv", False),
+                                       ("rssi_c0", True), ("rssi_c1", True),
+                                       ("txpw_c0", False), ("txpw_c1", False),
+                                       ("bftx", False), ("divtx", False)])
+# Alternation of all BQR fields, each alternative names its metric
+BQR_REGEX = re.compile("|".join([
+    r"PwLv:\s(?P<pwlv>\S+)", r"RSSI:\s[-](?P<rssi>\d+)",
+    r"RSSI_C0:\s[-](?P<rssi_c0>\d+)", r"RSSI_C1:\s[-](?P<rssi_c1>\d+)",
+    r"\sTxPw_C0:\s(?P<txpw_c0>-?\d+)", r"\sTxPw_C1:\s(?P<txpw_c1>-?\d+)",
+    r"BFTx:\s(?P<bftx>\w+)", r"DivTx:\s(?P<divtx>\w+)"
+]))
+DEFAULT_BQR_TAG = 'Monitoring , Handle:'
+BQR_STREAM_STOP_TIMEOUT = 5
+
+
+class BqrParser(object):
+    """Parses BQR logcat lines into per metric columns in a single pass.
+
+    All metrics of a line are extracted with one search of BQR_REGEX.
+    Columns are aligned by BQR record, with nan for metrics missing from a
+    record, so that they can be used as time-resolved traces.
+
+    Attributes:
+        bqr_tag: tag of the logcat lines to parse.
+        time_stamps: logcat time stamps of the BQR records.
+    """
+
+    def __init__(self, bqr_tag=DEFAULT_BQR_TAG):
+        self.bqr_tag = bqr_tag
+        self.time_stamps = []
+        self._values = {metric: [] for metric in BQR_METRICS}
+
+    def feed(self, line):
+        """Parses one logcat line."""
+        if self.bqr_tag not in line:
+            return
+        record = {}
+        for match in BQR_REGEX.finditer(line):
+            record.setdefault(match.lastgroup,
+                              match.group(match.lastgroup).strip(","))
+        if not record:
+            return
+        self.time_stamps.append(" ".join(line.split(None, 2)[:2]))
+        for metric, averagable in BQR_METRICS.items():
+            value = record.get(metric)
+            if value is None:
+                value = float("nan")
+            elif averagable:
+                value = -int(value)
+            else:
+                value = int(value, 16) if "0x" in value else int(value, 10)
+            self._values[metric].append(value)
+
+    def get_columns(self):
+        """Returns a dict of metric name to numpy array of its values."""
+        return {
+            metric: numpy.array(values, dtype=float)
+            for metric, values in self._values.items()
+        }
+
+    def get_processed_metrics(self):
+        """Returns a dict of metric name to its mean or most common value.
+
+        Averagable metrics are averaged, others are set to their most common
+        value, and metrics without values are set to 'n/a'.
+        """
+        processed_metrics = {}
+        for metric, values in self.get_columns().items():
+            values = values[~numpy.isnan(values)]
+            if not len(values):
+                processed_metrics[metric] = "n/a"
+            elif BQR_METRICS[metric]:
+                processed_metrics[metric] = round(float(numpy.mean(values)),
+                                                  2)
+            else:
+                processed_metrics[metric] = int(
+                    collections.Counter(values.tolist()).most_common(1)[0][0])
+        return processed_metrics
+
+    def save_csv(self, output_file):
+        """Saves the BQR records with their time stamps to a csv file."""
+        metrics_df = pd.DataFrame(self.get_columns())
+        metrics_df.insert(0, "time_stamp", self.time_stamps)
+        metrics_df.to_csv(output_file)
+
+
+class BqrStream(object):
+    """Collects BQR records live from the logcat of a device.
+
+    Streams the logcat lines matching bqr_tag logged since start_time from
+    the device and parses them in a thread until stopped. The device time
+    should be synced with the host, as done in get_bt_metric. Logcat runs in
+    its own adb process, since adb.shell_nb discards the output of commands.
+    """
+
+    def __init__(self, ad, bqr_tag=DEFAULT_BQR_TAG, start_time=None):
+        """
+        Args:
+            ad: android_device object.
+            bqr_tag: tag of the logcat lines to parse.
+            start_time: epoch time in seconds of the first records, defaults
+                to now.
+        """
+        if start_time is None:
+            start_time = time.time()
+        self.serial = ad.serial
+        self.parser = BqrParser(bqr_tag)
+        self._error = None
+        self._proc = subprocess.Popen([
+            "adb", "-s", ad.serial, "logcat", "-v", "year", "-T",
+            "%.3f" % start_time, "-e", bqr_tag
+        ],
+                                      stdout=subprocess.PIPE,
+                                      stderr=subprocess.DEVNULL)
+        self._thread = threading.Thread(target=self._read_lines, daemon=True)
+        self._thread.start()
+
+    def _read_lines(self):
+        try:
+            for line in self._proc.stdout:
+                self.parser.feed(line.decode("utf-8", errors="replace"))
+        except Exception as e:
+            self._error = e
+
+    def stop(self, timeout=BQR_STREAM_STOP_TIMEOUT):
+        """Stops the stream and returns the BqrParser of its records.
+
+        Raises:
+            BtTestUtilsError: if logcat exited with an error before the stream
+                was stopped, or parsing its output failed.
+        """
+        return_code = self._proc.poll()
+        if return_code is None:
+            self._proc.kill()
+        self._proc.wait()
+        self._thread.join(timeout)
+        if self._error is not None:
+            raise BtTestUtilsError("Failed to parse BQR records of %s: %r" %
+                                   (self.serial, self._error))
+        if return_code:
+            raise BtTestUtilsError(
+                "BQR logcat stream of %s exited with code %d" %
+                (self.serial, return_code))
+        return self.parser
+
+
+def _parse_bt_log_metrics(ad, tag, begin_time, end_time, bqr_tag):
+    """Parses the BQR records of a device from its cat_adb_log excerpt."""
+    parser = BqrParser(bqr_tag)
+    bt_rssi_log = ad.cat_adb_log(tag + "_bt_metric", begin_time, end_time)
+    with open(bt_rssi_log, "r", errors="replace") as file_bt_log:
+        for line in file_bt_log:
+            parser.feed(line)
+    return parser
+
+
 def get_bt_metric(ad_list,
                   duration=1,
-                  bqr_tag='Monitoring , Handle:',
+                  bqr_tag=DEFAULT_BQR_TAG,
                   tag='',
-                  log_path=False):
+                  log_path=False,
+                  streaming=False):
     """ Function to get the bt metric from logcat.
 
     Captures logcat for the specified duration and returns the bqr results.
     Takes list of android objects as input. If a single android object is given,
-    converts it into a list.
+    converts it into a list. Devices are processed concurrently.
 
     Args:
         ad_list: list of android_device objects
@@ -727,33 +889,12 @@ def get_bt_metric(ad_list,
         bqr_tag: tag of bt metrics
         tag: tag to be appended to the metrics raw data
         log_path: path of metrics raw data
+        streaming: if True, BQR records are collected live from logcat
+            during duration instead of parsing the captured logcat after it.
 
     Returns:
         process_data: dict of process raw data for each android devices
     """
-
-    # Defining bqr quantites and their regex to extract
-    regex_dict = {
-        "pwlv": "PwLv:\s(\S+)",
-        "rssi": "RSSI:\s[-](\d+)",
-        "rssi_c0": "RSSI_C0:\s[-](\d+)",
-        "rssi_c1": "RSSI_C1:\s[-](\d+)",
-        "txpw_c0": "\sTxPw_C0:\s(-?\d+)",
-        "txpw_c1": "\sTxPw_C1:\s(-?\d+)",
-        "bftx": "BFTx:\s(\w+)",
-        "divtx": "DivTx:\s(\w+)"
-    }
-    metrics_dict = {
-        "rssi": {},
-        "pwlv": {},
-        "rssi_c0": {},
-        "rssi_c1": {},
-        "txpw_c0": {},
-        "txpw_c1": {},
-        "bftx": {},
-        "divtx": {}
-    }
-
     # Converting a single android device object to list
     if not isinstance(ad_list, list):
         ad_list = [ad_list]
@@ -763,110 +904,31 @@ def get_bt_metric(ad_list,
         ad.droid.setTime(int(round(time.time() * 1000)))
         time.sleep(0.5)
 
-    begin_time = utils.get_current_epoch_time()
-    time.sleep(duration)
-    end_time = utils.get_current_epoch_time()
-
-    for ad in ad_list:
-        bt_rssi_log = ad.cat_adb_log(tag + "_bt_metric", begin_time, end_time)
-
-        # Extracting supporting bqr quantities
-        for metric, regex in regex_dict.items():
-            bqr_metric = []
-            file_bt_log = open(bt_rssi_log, "r")
-            for line in file_bt_log:
-                if bqr_tag in line:
-                    if re.findall(regex, line):
-                        m = re.findall(regex, line)[0].strip(",")
-                        bqr_metric.append(m)
-            metrics_dict[metric][ad.serial] = bqr_metric
-            file_bt_log.close()
-
-        # Formatting and saving the raw data
-        metrics_to_be_formatted = [{
-            "name": "rssi",
-            "averagble": "y"
-        }, {
-            "name": "rssi_c0",
-            "averagble": "y"
-        }, {
-            "name": "rssi_c1",
-            "averagble": "y"
-        }, {
-            "name": "pwlv",
-            "averagble": "n"
-        }, {
-            "name": "txpw_c0",
-            "averagble": "n"
-        }, {
-            "name": "txpw_c1",
-            "averagble": "n"
-        }, {
-            "name": "bftx",
-            "averagble": "n"
-        }, {
-            "name": "divtx",
-            "averagble": "n"
-        }]
-        for metric in metrics_to_be_formatted:
-            if metric["averagble"] == "y":
-                metrics_dict[metric["name"]][ad.serial] = [
-                    (-1) * int(x)
-                    for x in metrics_dict[metric["name"]][ad.serial]
-                ]
-            else:
-                metrics_dict[metric["name"]][ad.serial] = [
-                    int(x, 16) if '0x' in x else int(x, 10)
-                    for x in metrics_dict[metric["name"]][ad.serial]
-                ]
+    if streaming:
+        start_time = time.time()
+        streams = [BqrStream(ad, bqr_tag, start_time) for ad in ad_list]
+        time.sleep(duration)
+        parsers = [stream.stop() for stream in streams]
+    else:
+        begin_time = utils.get_current_epoch_time()
+        time.sleep(duration)
+        end_time = utils.get_current_epoch_time()
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=len(ad_list)) as executor:
+            parsers = list(
+                executor.map(
+                    lambda ad: _parse_bt_log_metrics(
+                        ad, tag, begin_time, end_time, bqr_tag), ad_list))
+
+    process_data = {metric: {} for metric in BQR_METRICS}
+    for ad, parser in zip(ad_list, parsers):
         # Saving metrics raw data for each attenuation
         if log_path:
             output_file_name = ad.serial + "_metrics_raw_data_" + tag + ".csv"
-            output_file = os.path.join(log_path, output_file_name)
             os.makedirs(log_path, exist_ok=True)
-            df_save_metrics = {}
-            for item in metrics_dict.items():
-                df_save_metrics[item[0]] = next(iter(item[1].items()))[1]
-            MetricsDict_df = pd.DataFrame({key:pd.Series(value) for key, value in df_save_metrics.items()})
-            MetricsDict_df.to_csv(output_file)
-        # Defining the process_data_dict
-        process_data = {
-            "rssi": {},
-            "pwlv": {},
-            "rssi_c0": {},
-            "rssi_c1": {},
-            "txpw_c0": {},
-            "txpw_c1": {},
-            "bftx": {},
-            "divtx": {}
-        }
-
-        # Computing and returning the raw data
-        for metric in metrics_to_be_formatted:
-            if metric["averagble"] == "y":
-                process_data[metric["name"]][ad.serial] = [
-                    x for x in metrics_dict[metric["name"]][ad.serial]
-                    if x != 0 and x != -127
-                ]
-
-                try:
-                    #DOING AVERAGE
-                    process_data[metric["name"]][ad.serial] = round(
-                        sum(metrics_dict[metric["name"]][ad.serial]) /
-                        len(metrics_dict[metric["name"]][ad.serial]), 2)
-                except ZeroDivisionError:
-                    #SETTING VALUE TO 'n/a'
-                    process_data[metric["name"]][ad.serial] = "n/a"
-            else:
-                try:
-                    #GETTING MOST_COMMON_VALUE
-                    process_data[metric["name"]][ad.serial] = max(
-                        metrics_dict[metric["name"]][ad.serial],
-                        key=metrics_dict[metric["name"]][ad.serial].count)
-                except ValueError:
-                    #SETTING VALUE TO 'n/a'
-                    process_data[metric["name"]][ad.serial] = "n/a"
-
+            parser.save_csv(os.path.join(log_path, output_file_name))
+        for metric, value in parser.get_processed_metrics().items():
+            process_data[metric][ad.serial] = value
     return process_data
 
 
@@ -15,6 +15,7 @@
 #   limitations under the License.
 
 import collections
+import contextlib
 import itertools
 import pyvisa
 import time
@@ -25,6 +26,9 @@ SHORT_SLEEP = 1
 VERY_SHORT_SLEEP = 0.1
 SUBFRAME_DURATION = 0.001
 VISA_QUERY_DELAY = 0.01
+MAX_TIMING_ENTRIES = 10000
+# Time in seconds after which cached settings are read back or resent
+STATE_CACHE_TTL = 10
 
 
 class Keysight5GTestApp(object):
@@ -56,6 +60,14 @@ class Keysight5GTestApp(object):
         self.test_app.read_termination = '\n'
         self.test_app.query_delay = VISA_QUERY_DELAY
         self.last_loaded_scpi = None
+        # Commands queued in batch mode, None if not batching
+        self.command_batch = None
+        # Write-through shadow of instrument settings keyed by SCPI header,
+        # as (value, time cached) tuples
+        self.state_cache = {}
+        self.state_cache_ttl = STATE_CACHE_TTL
+        # Latency of sent commands as (command, seconds) tuples
+        self.command_timing = collections.deque(maxlen=MAX_TIMING_ENTRIES)
 
         inst_id = self.send_cmd('*IDN?', 1)
         if 'Keysight' not in inst_id[0]:
@@ -69,6 +81,7 @@ class Keysight5GTestApp(object):
 
     def destroy(self):
         self.test_app.close()
+        self.clear_state_cache()
 
     ### Programming Utilities
     @staticmethod
@@ -106,6 +119,19 @@ class Keysight5GTestApp(object):
 
     def send_cmd(self, command, read_response=0, check_errors=1):
         "Helper function to write to or query test app."
+        if self.command_batch is not None:
+            if not read_response:
+                self.command_batch.append(command)
+                return None
+            # Queries need all queued settings to be applied
+            self.flush_batch()
+        start_time = time.time()
+        try:
+            return self._send_cmd(command, read_response, check_errors)
+        finally:
+            self.command_timing.append((command, time.time() - start_time))
+
+    def _send_cmd(self, command, read_response, check_errors):
         if read_response:
             try:
                 response = Keysight5GTestApp._format_response(
@@ -135,6 +161,111 @@ class Keysight5GTestApp(object):
                 raise RuntimeError('Lost connection to test app.')
             return None
 
+    @contextlib.contextmanager
+    def batch_commands(self):
+        """Context manager queuing writes and sending them in one message.
+
+        Writes sent within the context are queued and sent as a single
+        semicolon separated message, followed by a single error and
+        operation complete check. Queries flush the queued writes first.
+        """
+        if self.command_batch is not None:
+            yield
+            return
+        self.command_batch = []
+        try:
+            yield
+            self.flush_batch()
+        except:
+            # Queued settings may not have been applied
+            self.clear_state_cache()
+            raise
+        finally:
+            self.command_batch = None
+
+    def flush_batch(self):
+        """Sends all queued writes in a single message."""
+        if not self.command_batch:
+            return
+        commands = self.command_batch
+        self.command_batch = []
+        start_time = time.time()
+        try:
+            self.test_app.write(';:'.join(
+                command.lstrip(':') for command in commands))
+            time.sleep(VISA_QUERY_DELAY)
+            # Read all errors queued by the batch
+            for _ in range(len(commands)):
+                error = self.test_app.query('SYSTem:ERRor?')
+                if 'No error' in error:
+                    break
+                self.log.warning('Commands: {}. Error: {}'.format(
+                    commands, error))
+            self.test_app.query('*OPC?')
+            time.sleep(VISA_QUERY_DELAY)
+        except Exception as e:
+            raise RuntimeError('Lost connection to test app.') from e
+        finally:
+            self.command_timing.append(('BATCH {}'.format(';:'.join(commands)),
+                                        time.time() - start_time))
+
+    def clear_state_cache(self):
+        """Clears all cached settings.
+
+        Settings are then read back from or resent to the instrument. Call
+        after changing instrument settings by other means than this
+        controller, e.g., from the test app front panel.
+        """
+        self.state_cache.clear()
+
+    def _get_cached_state(self, header):
+        """Gets a cached setting, or None if missing or older than the TTL."""
+        value, cache_time = self.state_cache.get(header, (None, 0))
+        if time.monotonic() - cache_time > self.state_cache_ttl:
+            return None
+        return value
+
+    def _set_cached_state(self, header, value):
+        self.state_cache[header] = (value, time.monotonic())
+
+    def _is_cached(self, command):
+        """Checks if the setting written by a command is already applied."""
+        header, _, value = command.partition(' ')
+        return self._get_cached_state(header) == value
+
+    def _send_cached_cmd(self, command):
+        """Sends a setting command unless its value is already applied.
+
+        Returns:
+            True if the command was sent.
+        """
+        if self._is_cached(command):
+            self.log.debug('Skipping command: {}'.format(command))
+            return False
+        self.send_cmd(command)
+        header, _, value = command.partition(' ')
+        self._set_cached_state(header, value)
+        return True
+
+    def get_command_timing(self):
+        """Summarizes the latency of sent commands by SCPI header.
+
+        Returns:
+            command_timing: dict mapping SCPI headers to the number of
+            commands sent, and their total and mean latency in seconds.
+            Batches of commands are summarized under BATCH.
+        """
+        command_timing = collections.OrderedDict()
+        for command, latency in self.command_timing:
+            header = command.partition(' ')[0]
+            timing = command_timing.setdefault(
+                header, collections.OrderedDict(count=0, total=0))
+            timing['count'] += 1
+            timing['total'] += latency
+        for timing in command_timing.values():
+            timing['mean'] = timing['total'] / timing['count']
+        return command_timing
+
     def import_scpi_file(self, file_name, check_last_loaded=0):
         """Function to import SCPI file specified in file_name.
 
@@ -145,6 +276,7 @@ class Keysight5GTestApp(object):
         """
         if file_name == self.last_loaded_scpi and check_last_loaded:
             self.log.info('Skipping SCPI import.')
+        self.clear_state_cache()
         self.send_cmd("SYSTem:SCPI:IMPort '{}'".format(file_name))
         while int(self.send_cmd('SYSTem:SCPI:IMPort:STATus?', 1)):
             self.send_cmd('*OPC?', 1)
@@ -160,7 +292,7 @@ class Keysight5GTestApp(object):
             else:
                 cell_type = kwargs.get('cell_type', args[0])
             cell = kwargs.get('cell', args[1])
-            cell_state = self.get_cell_state(cell_type, cell)
+            cell_state = self.get_cell_state(cell_type, cell, refresh=False)
             if cell_state:
                 self.log.error('Cell must be off when calling {}'.format(
                     func.__name__))
@@ -169,7 +301,7 @@ class Keysight5GTestApp(object):
         return inner
 
     def assert_cell_off(self, cell_type, cell):
-        cell_state = self.get_cell_state(cell_type, cell)
+        cell_state = self.get_cell_state(cell_type, cell, refresh=False)
         if cell_state:
             self.log.error('Cell must be off')
 
@@ -216,19 +348,26 @@ class Keysight5GTestApp(object):
             self.send_cmd('BSE:CONFig:{}:CELL:COUNt?'.format(cell_type), 1))
         return cell_count
 
-    def get_cell_state(self, cell_type, cell):
+    def get_cell_state(self, cell_type, cell, refresh=True):
         """Function to get cell on/off state.
 
         Args:
             cell_type: LTE or NR5G cell
             cell: cell/carrier number
+            refresh: if True, the state is queried from the instrument.
+                Otherwise, the state cached within the last state_cache_ttl
+                seconds is returned if available.
         Returns:
             cell_state: boolean. True if cell on
         """
-        cell_state = int(
-            self.send_cmd(
-                'BSE:CONFig:{}:{}:ACTive:STATe?'.format(
-                    cell_type, Keysight5GTestApp._format_cells(cell)), 1))
+        header = 'BSE:CONFig:{}:{}:ACTive:STATe'.format(
+            cell_type, Keysight5GTestApp._format_cells(cell))
+        if not refresh:
+            cell_state = self._get_cached_state(header)
+            if cell_state is not None:
+                return int(cell_state)
+        cell_state = int(self.send_cmd('{}?'.format(header), 1))
+        self._set_cached_state(header, str(cell_state))
         return cell_state
 
     def wait_for_cell_status(self,
@@ -268,8 +407,10 @@ class Keysight5GTestApp(object):
             cell: cell/carrier number
             state: requested state
         """
-        self.send_cmd('BSE:CONFig:{}:{}:ACTive:STATe {}'.format(
-            cell_type, Keysight5GTestApp._format_cells(cell), state))
+        header = 'BSE:CONFig:{}:{}:ACTive:STATe'.format(
+            cell_type, Keysight5GTestApp._format_cells(cell))
+        self.send_cmd('{} {}'.format(header, state))
+        self._set_cached_state(header, str(int(state)))
 
     def turn_all_cells_off(self):
         for cell in range(self.test_app_settings['lte_cell_count']):
@@ -309,9 +450,12 @@ class Keysight5GTestApp(object):
             cell: cell/carrier number
             band: LTE or NR band (e.g. 1,3,N260, N77)
         """
+        command = 'BSE:CONFig:{}:{}:BAND {}'.format(
+            cell_type, Keysight5GTestApp._format_cells(cell), band)
+        if self._is_cached(command):
+            return
         self.assert_cell_off(cell_type, cell)
-        self.send_cmd('BSE:CONFig:{}:{}:BAND {}'.format(
-            cell_type, Keysight5GTestApp._format_cells(cell), band))
+        self._send_cached_cmd(command)
 
     def set_cell_channel(self, cell_type, cell, channel, arfcn=1):
         """Function to set cell frequency/channel
@@ -437,13 +581,15 @@ class Keysight5GTestApp(object):
             full_bw: boolean controlling if requested power is per channel
                      or subcarrier
         """
-        if full_bw:
-            self.send_cmd('BSE:CONFIG:{}:{}:DL:POWer:CHANnel {}'.format(
-                cell_type, Keysight5GTestApp._format_cells(cell), power))
-        else:
-            self.send_cmd('BSE:CONFIG:{}:{}:DL:POWer:EPRE {}'.format(
-                cell_type, Keysight5GTestApp._format_cells(cell), power))
-        self.send_cmd('BSE:CONFig:{}:APPLY'.format(cell_type))
+        power_header = 'BSE:CONFIG:{}:{}:DL:POWer'.format(
+            cell_type, Keysight5GTestApp._format_cells(cell))
+        power_modes = ['CHANnel', 'EPRE'] if full_bw else ['EPRE', 'CHANnel']
+        # Setting the power in one mode changes the power in the other
+        self.state_cache.pop('{}:{}'.format(power_header, power_modes[1]),
+                             None)
+        if self._send_cached_cmd('{}:{} {}'.format(power_header,
+                                                   power_modes[0], power)):
+            self.send_cmd('BSE:CONFig:{}:APPLY'.format(cell_type))
 
     def set_cell_ul_power_control(self, cell_type, cell, mode, target_power=0):
         """Function configure UL power control
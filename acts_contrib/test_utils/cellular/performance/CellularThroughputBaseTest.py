@@ -102,6 +102,9 @@ class CellularThroughputBaseTest(base_test.BaseTestClass):
             self.log.warning('Cannot perform teardown operations on DUT.')
         try:
             self.keysight_test_app.turn_all_cells_off()
+            self.log.info('Test app command timing: {}'.format(
+                json.dumps(self.keysight_test_app.get_command_timing(),
+                           indent=4)))
             self.keysight_test_app.destroy()
         except:
             self.log.warning('Cannot perform teardown operations on tester.')
@@ -319,82 +322,84 @@ class CellularThroughputBaseTest(base_test.BaseTestClass):
                     result['iperf_throughput']))
 
     def setup_tester(self, testcase_params):
-        # Configure all cells
-        for cell_idx, cell in enumerate(
-                testcase_params['endc_combo_config']['cell_list']):
-            if cell['cell_type'] == 'NR5G':
-                self.keysight_test_app.set_nr_cell_type(
+        # Configure all cells. Settings are sent in batches and unchanged
+        # settings are skipped.
+        with self.keysight_test_app.batch_commands():
+            for cell_idx, cell in enumerate(
+                    testcase_params['endc_combo_config']['cell_list']):
+                if cell['cell_type'] == 'NR5G':
+                    self.keysight_test_app.set_nr_cell_type(
+                        cell['cell_type'], cell['cell_number'],
+                        cell['nr_cell_type'])
+                self.keysight_test_app.set_cell_duplex_mode(
+                    cell['cell_type'], cell['cell_number'], cell['duplex_mode'])
+                self.keysight_test_app.set_cell_band(cell['cell_type'],
+                                                     cell['cell_number'],
+                                                     cell['band'])
+                self.keysight_test_app.set_cell_dl_power(
+                    cell['cell_type'], cell['cell_number'],
+                    testcase_params['cell_power_sweep'][cell_idx][0], 1)
+                self.keysight_test_app.set_cell_input_power(
                     cell['cell_type'], cell['cell_number'],
-                    cell['nr_cell_type'])
-            self.keysight_test_app.set_cell_duplex_mode(
-                cell['cell_type'], cell['cell_number'], cell['duplex_mode'])
-            self.keysight_test_app.set_cell_band(cell['cell_type'],
-                                                 cell['cell_number'],
-                                                 cell['band'])
-            self.keysight_test_app.set_cell_dl_power(
-                cell['cell_type'], cell['cell_number'],
-                testcase_params['cell_power_sweep'][cell_idx][0], 1)
-            self.keysight_test_app.set_cell_input_power(
-                cell['cell_type'], cell['cell_number'],
-               self.testclass_params['input_power'][cell['cell_type']])
-            self.keysight_test_app.set_cell_ul_power_control(
-                cell['cell_type'], cell['cell_number'],
-                self.testclass_params['ul_power_control_mode'],
-                self.testclass_params.get('ul_power_control_target',0)
-            )
-            if cell['cell_type'] == 'NR5G':
-                self.keysight_test_app.set_nr_subcarrier_spacing(
-                    cell['cell_number'], cell['subcarrier_spacing'])
-            if 'channel' in cell:
-                self.keysight_test_app.set_cell_channel(
-                    cell['cell_type'], cell['cell_number'], cell['channel'])
-            self.keysight_test_app.set_cell_bandwidth(cell['cell_type'],
-                                                      cell['cell_number'],
-                                                      cell['dl_bandwidth'])
-            self.keysight_test_app.set_cell_mimo_config(
-                cell['cell_type'], cell['cell_number'], 'DL',
-                cell['dl_mimo_config'])
-            if cell['cell_type'] == 'LTE':
-                self.keysight_test_app.set_lte_cell_transmission_mode(
-                    cell['cell_number'], cell['transmission_mode'])
-                self.keysight_test_app.set_lte_control_region_size(
-                    cell['cell_number'], 1)
-            if cell['ul_enabled'] and cell['cell_type'] == 'NR5G':
+                   self.testclass_params['input_power'][cell['cell_type']])
+                self.keysight_test_app.set_cell_ul_power_control(
+                    cell['cell_type'], cell['cell_number'],
+                    self.testclass_params['ul_power_control_mode'],
+                    self.testclass_params.get('ul_power_control_target',0)
+                )
+                if cell['cell_type'] == 'NR5G':
+                    self.keysight_test_app.set_nr_subcarrier_spacing(
+                        cell['cell_number'], cell['subcarrier_spacing'])
+                if 'channel' in cell:
+                    self.keysight_test_app.set_cell_channel(
+                        cell['cell_type'], cell['cell_number'], cell['channel'])
+                self.keysight_test_app.set_cell_bandwidth(cell['cell_type'],
+                                                          cell['cell_number'],
+                                                          cell['dl_bandwidth'])
                 self.keysight_test_app.set_cell_mimo_config(
-                    cell['cell_type'], cell['cell_number'], 'UL',
-                    cell['ul_mimo_config'])
-
-        if testcase_params.get('force_contiguous_nr_channel', False):
-            self.keysight_test_app.toggle_contiguous_nr_channels(1)
+                    cell['cell_type'], cell['cell_number'], 'DL',
+                    cell['dl_mimo_config'])
+                if cell['cell_type'] == 'LTE':
+                    self.keysight_test_app.set_lte_cell_transmission_mode(
+                        cell['cell_number'], cell['transmission_mode'])
+                    self.keysight_test_app.set_lte_control_region_size(
+                        cell['cell_number'], 1)
+                if cell['ul_enabled'] and cell['cell_type'] == 'NR5G':
+                    self.keysight_test_app.set_cell_mimo_config(
+                        cell['cell_type'], cell['cell_number'], 'UL',
+                        cell['ul_mimo_config'])
+
+            if testcase_params.get('force_contiguous_nr_channel', False):
+                self.keysight_test_app.toggle_contiguous_nr_channels(1)
+
+            if testcase_params['endc_combo_config']['lte_cell_count']:
+                self.keysight_test_app.set_lte_cell_mcs(
+                    'CELL1', testcase_params['lte_dl_mcs_table'],
+                    testcase_params['lte_dl_mcs'],
+                    testcase_params['lte_ul_mcs_table'],
+                    testcase_params['lte_ul_mcs'])
+                self.keysight_test_app.set_lte_ul_mac_padding(
+                    self.testclass_params['lte_ul_mac_padding'])
 
-        if testcase_params['endc_combo_config']['lte_cell_count']:
-            self.keysight_test_app.set_lte_cell_mcs(
-                'CELL1', testcase_params['lte_dl_mcs_table'],
-                testcase_params['lte_dl_mcs'],
-                testcase_params['lte_ul_mcs_table'],
-                testcase_params['lte_ul_mcs'])
-            self.keysight_test_app.set_lte_ul_mac_padding(
-                self.testclass_params['lte_ul_mac_padding'])
-
-        if testcase_params['endc_combo_config']['nr_cell_count']:
+            if testcase_params['endc_combo_config']['nr_cell_count']:
 
-            if 'schedule_scenario' in testcase_params:
-                self.keysight_test_app.set_nr_cell_schedule_scenario(
-                    'CELL1',
-                    testcase_params['schedule_scenario'])
-                if testcase_params['schedule_scenario'] == 'FULL_TPUT':
-                    self.keysight_test_app.set_nr_schedule_slot_ratio(
+                if 'schedule_scenario' in testcase_params:
+                    self.keysight_test_app.set_nr_cell_schedule_scenario(
                         'CELL1',
-                        testcase_params['schedule_slot_ratio'])
-            self.keysight_test_app.set_nr_ul_dft_precoding(
-                'CELL1', testcase_params['transform_precoding'])
-            self.keysight_test_app.set_nr_cell_mcs(
-                'CELL1', testcase_params['nr_dl_mcs'],
-                testcase_params['nr_ul_mcs'])
-            self.keysight_test_app.set_dl_carriers(
-                testcase_params['endc_combo_config']['nr_dl_carriers'])
-            self.keysight_test_app.set_ul_carriers(
-                testcase_params['endc_combo_config']['nr_ul_carriers'])
+                        testcase_params['schedule_scenario'])
+                    if testcase_params['schedule_scenario'] == 'FULL_TPUT':
+                        self.keysight_test_app.set_nr_schedule_slot_ratio(
+                            'CELL1',
+                            testcase_params['schedule_slot_ratio'])
+                self.keysight_test_app.set_nr_ul_dft_precoding(
+                    'CELL1', testcase_params['transform_precoding'])
+                self.keysight_test_app.set_nr_cell_mcs(
+                    'CELL1', testcase_params['nr_dl_mcs'],
+                    testcase_params['nr_ul_mcs'])
+                self.keysight_test_app.set_dl_carriers(
+                    testcase_params['endc_combo_config']['nr_dl_carriers'])
+                self.keysight_test_app.set_ul_carriers(
+                    testcase_params['endc_combo_config']['nr_ul_carriers'])
 
         if testcase_params['endc_combo_config']['lte_cell_count']:
             # Connect flow for LTE and LTE+FR1 ENDC
@@ -503,15 +508,16 @@ class CellularThroughputBaseTest(base_test.BaseTestClass):
         for power_idx in range(len(testcase_params['cell_power_sweep'][0])):
             result = collections.OrderedDict()
             # Set DL cell power
-            for cell_idx, cell in enumerate(
-                    testcase_params['endc_combo_config']['cell_list']):
-                cell_power_array = []
-                current_cell_power = testcase_params['cell_power_sweep'][
-                    cell_idx][power_idx]
-                cell_power_array.append(current_cell_power)
-                self.keysight_test_app.set_cell_dl_power(
-                    cell['cell_type'], cell['cell_number'], current_cell_power,
-                    1)
+            with self.keysight_test_app.batch_commands():
+                for cell_idx, cell in enumerate(
+                        testcase_params['endc_combo_config']['cell_list']):
+                    cell_power_array = []
+                    current_cell_power = testcase_params['cell_power_sweep'][
+                        cell_idx][power_idx]
+                    cell_power_array.append(current_cell_power)
+                    self.keysight_test_app.set_cell_dl_power(
+                        cell['cell_type'], cell['cell_number'],
+                        current_cell_power, 1)
             result['cell_power'] = cell_power_array
             # Start BLER and throughput measurements
             current_throughput = self.run_single_throughput_measurement(testcase_params)
@@ -16,7 +16,9 @@
 
 import datetime
 import gzip
+import hashlib
 import itertools
+import json
 import logging
 import numpy
 import os
@@ -25,12 +27,18 @@ import shutil
 import subprocess
 import zipfile
 from acts import context
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 _DIGITS_REGEX = re.compile(r'-?\d+')
 _TX_PWR_MAX = 100
 _TX_PWR_MIN = -100
 
+# Version of the parsed log data cache files. Bump it when parsing changes so
+# that stale cache files are not used.
+_LOG_DATA_CACHE_VERSION = 1
+
 
 class LastNrPower:
     last_time = 0
@@ -62,6 +70,107 @@ def to_time_sec(time_str, start_time):
     return (to_time(time_str) - start_time).total_seconds()
 
 
+class ColumnBuffer(object):
+    """Growable typed array storing one column of parsed log data.
+
+    Supports the list operations used while parsing logs (append, extend,
+    len, truth value, indexing and iteration). Values are stored in a numpy
+    array whose capacity doubles when full, so appends take amortized
+    constant time. The array property gives a view of the stored values.
+    """
+
+    def __init__(self, values=(), dtype=numpy.float64):
+        values = numpy.asarray(values, dtype=dtype)
+        self._data = numpy.empty(max(16, len(values)), dtype=dtype)
+        self._data[:len(values)] = values
+        self._size = len(values)
+
+    @property
+    def array(self):
+        """Numpy array view of the stored values."""
+        return self._data[:self._size]
+
+    def _reserve(self, size):
+        if size > len(self._data):
+            data = numpy.empty(max(size, 2 * len(self._data)),
+                               dtype=self._data.dtype)
+            data[:self._size] = self.array
+            self._data = data
+
+    def append(self, value):
+        self._reserve(self._size + 1)
+        self._data[self._size] = value
+        self._size += 1
+
+    def extend(self, values):
+        values = numpy.asarray(values, dtype=self._data.dtype)
+        self._reserve(self._size + len(values))
+        self._data[self._size:self._size + len(values)] = values
+        self._size += len(values)
+
+    def __array__(self, dtype=None, copy=None):
+        return self.array if dtype is None else self.array.astype(dtype)
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    def __iter__(self):
+        return iter(self.array.tolist())
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return ColumnBuffer(self.array[key], dtype=self._data.dtype)
+        return self.array[key].item()
+
+    def __repr__(self):
+        return 'ColumnBuffer({})'.format(self.array.tolist())
+
+
+def _time_slice(data, time_column, value_columns, start_time, end_time):
+    """Gets the values of data series in a time range.
+
+    Args:
+        data: object holding the ColumnBuffer columns.
+        time_column: name of the sorted time column.
+        value_columns: names of the value columns sharing the time column.
+        start_time: start of the time range, inclusive.
+        end_time: end of the time range, inclusive.
+    Returns:
+        Dictionary of {column name: numpy array} for the time range.
+    """
+    time_values = getattr(data, time_column).array
+    start = numpy.searchsorted(time_values, start_time, side='left')
+    end = numpy.searchsorted(time_values, end_time, side='right')
+    return {
+        column: getattr(data, column).array[start:end]
+        for column in (time_column, ) + tuple(value_columns)
+    }
+
+
+def _extend_columns(data, other, initial_values):
+    """Appends the columns of other to data and copies changed attributes.
+
+    Args:
+        data: object holding the ColumnBuffer columns to extend.
+        other: object of the same class holding the data to append.
+        initial_values: attributes of a newly created object of the class,
+            used to find the non-column attributes set in other.
+    """
+    for name, value in vars(other).items():
+        if isinstance(value, ColumnBuffer):
+            if hasattr(data, name):
+                getattr(data, name).extend(value)
+            else:
+                setattr(data, name, value[:])
+        elif isinstance(value, RatLogData):
+            continue
+        elif name not in initial_values or value != initial_values[name]:
+            setattr(data, name, value)
+
+
 class LogParser(object):
     """Base class to parse log csv files."""
 
@@ -117,6 +226,12 @@ class LogParser(object):
             r'[OL-AIT] band': self._parse_ul_mimo,
         }
 
+        # Single regex matching any of the PARSER_INFO prefixes. Alternatives
+        # are tried in order, so the first matching prefix wins as when
+        # checking each prefix in turn.
+        self._prefix_regex = re.compile('|'.join(
+            re.escape(line_prefix) for line_prefix in self.PARSER_INFO))
+
         self.SAR_MODES = [
             'none', 'MIN', 'SAV_1', 'SAV_2', 'MAIN', 'PRE_SAV', 'LIMITED-TAPC',
             'MAX', 'none'
@@ -126,6 +241,9 @@ class LogParser(object):
             'Pre-Save', 'Limited TAPC', 'Maximum', ''
         ]
 
+        # Frequency range index of the messages being parsed. Fr-1 as default
+        self.fr_id = 0
+
     def parse_header(self, header_line):
         header = header_line.split(',')
         try:
@@ -138,13 +256,18 @@ class LogParser(object):
         except:
             self.core_id_col = self.timestamp_col
 
+    def match_prefix(self, message):
+        """Returns the PARSER_INFO prefix the message starts with, or None."""
+        match = self._prefix_regex.match(message)
+        return match.group() if match else None
+
     def parse_log(self, log_file, gap_options=0):
         """Extract required data from the exported CSV file."""
 
         log_data = LogData()
         log_data.gap_options = gap_options
         # Fr-1 as default
-        fr_id = 0
+        self.fr_id = 0
 
         with open(log_file, 'r') as file:
             # Read header line
@@ -166,44 +289,64 @@ class LogParser(object):
             start_time = to_time(line_data[self.timestamp_col])
 
             print('Parsing log file ... ', end='', flush=True)
-            for line in file:
-                line_data = line[1:-2].split('","')
-                if len(line_data) < self.message_col + 1:
-                    continue
+            self.parse_lines(file, start_time, log_data)
 
-                message = line_data[self.message_col]
-                if "frIdx 1 " in message:
-                    fr_id = 1
-                elif "frIdx 0 " in message:
-                    fr_id = 0
-                for line_prefix, line_parser in self.PARSER_INFO.items():
-                    if message.startswith(line_prefix):
-                        timestamp = to_time_sec(line_data[self.timestamp_col],
-                                                start_time)
-                        if self.core_id_col == self.timestamp_col:
-                            line_parser(timestamp, message[len(line_prefix):],
-                                        'L1', log_data, fr_id)
-                        else:
-                            if " CC1 " in message:
-                                line_parser(timestamp,
-                                            message[len(line_prefix):], 'L2',
-                                            log_data, fr_id)
-                            else:
-                                line_parser(timestamp,
-                                            message[len(line_prefix):],
-                                            line_data[self.core_id_col],
-                                            log_data, fr_id)
-                        break
-
-            if log_data.nr.tx_pwr_time:
-                if log_data.nr.tx_pwr_time[1] > log_data.nr.tx_pwr_time[0] + 50:
-                    log_data.nr.tx_pwr_time = log_data.nr.tx_pwr_time[1:]
-                    log_data.nr.tx_pwr = log_data.nr.tx_pwr[1:]
-
-            self._find_cur_ant(log_data.lte)
-            self._find_cur_ant(log_data.nr)
+        self.finalize_log_data(log_data)
         return log_data
 
+    def parse_lines(self, lines, start_time, log_data, matched_only=False):
+        """Parses exported CSV lines into log data.
+
+        Each message is dispatched to its parser with a single match against
+        all PARSER_INFO prefixes. parse_header must have been called for the
+        file the lines come from.
+
+        Args:
+            lines: iterable of CSV lines, without the header.
+            start_time: datetime that timestamps are relative to.
+            log_data: LogData object to add the parsed data to.
+            matched_only: if True, messages that do not start with any
+                PARSER_INFO prefix are ignored entirely, as if the lines had
+                been filtered first. Otherwise they can still switch the
+                frequency range index.
+        """
+        for line in lines:
+            line_data = line[1:-2].split('","')
+            if len(line_data) < self.message_col + 1:
+                continue
+
+            message = line_data[self.message_col]
+            line_prefix = self.match_prefix(message)
+            if matched_only and not line_prefix:
+                continue
+            if "frIdx 1 " in message:
+                self.fr_id = 1
+            elif "frIdx 0 " in message:
+                self.fr_id = 0
+            if not line_prefix:
+                continue
+
+            line_parser = self.PARSER_INFO[line_prefix]
+            timestamp = to_time_sec(line_data[self.timestamp_col], start_time)
+            if self.core_id_col == self.timestamp_col:
+                core_id = 'L1'
+            elif " CC1 " in message:
+                core_id = 'L2'
+            else:
+                core_id = line_data[self.core_id_col]
+            line_parser(timestamp, message[len(line_prefix):], core_id,
+                        log_data, self.fr_id)
+
+    def finalize_log_data(self, log_data):
+        """Post-processes log data once all lines have been parsed."""
+        if log_data.nr.tx_pwr_time:
+            if log_data.nr.tx_pwr_time[1] > log_data.nr.tx_pwr_time[0] + 50:
+                log_data.nr.tx_pwr_time = log_data.nr.tx_pwr_time[1:]
+                log_data.nr.tx_pwr = log_data.nr.tx_pwr[1:]
+
+        self._find_cur_ant(log_data.lte)
+        self._find_cur_ant(log_data.nr)
+
     def get_file_start_time(self, log_file):
         # Fr-1 as default
 
@@ -545,8 +688,8 @@ class LogParser(object):
                                                log_data.ant_sel_new,
                                                start_time, end_time)
 
-            log_data.cur_ant_time = sel_time
-            log_data.cur_ant = sel_ant
+            log_data.cur_ant_time = ColumnBuffer(sel_time)
+            log_data.cur_ant = ColumnBuffer(sel_ant)
 
     def get_ant_selection(self, config_time, old_antenna_config,
                           new_antenna_config, start_time, end_time):
@@ -582,46 +725,91 @@ class LogParser(object):
 class RatLogData:
     """Log data structure for each RAT (LTE/NR)."""
 
+    # Data series as {time column: value columns}
+    SERIES = {
+        'rsrp_time': ('rsrp_rx0', 'rsrp_rx1'),
+        'rsrp2_time': ('rsrp2_rx0', 'rsrp2_rx1'),
+        'ant_sel_time': ('ant_sel_old', 'ant_sel_new'),
+        'cur_ant_time': ('cur_ant', ),
+        'tx_pwr_time': ('tx_pwr', ),
+        'tx_avg_pwr_time': ('tx_avg_pwr', ),
+        'sar_mode_time': ('sar_mode', ),
+        'duty_cycle_time': ('duty_cycle', ),
+    }
+
     def __init__(self, label):
 
         self.label = label
 
-        self.rsrp_time = []  # RSRP time
-        self.rsrp_rx0 = []  # RSRP for receive antenna 0
-        self.rsrp_rx1 = []  # RSRP for receive antenna 1
+        self.rsrp_time = ColumnBuffer()  # RSRP time
+        self.rsrp_rx0 = ColumnBuffer()  # RSRP for receive antenna 0
+        self.rsrp_rx1 = ColumnBuffer()  # RSRP for receive antenna 1
 
         # second set of RSRP logs
-        self.rsrp2_time = []  # RSRP time
-        self.rsrp2_rx0 = []  # RSRP for receive antenna 0
-        self.rsrp2_rx1 = []  # RSRP for receive antenna 1
+        self.rsrp2_time = ColumnBuffer()  # RSRP time
+        self.rsrp2_rx0 = ColumnBuffer()  # RSRP for receive antenna 0
+        self.rsrp2_rx1 = ColumnBuffer()  # RSRP for receive antenna 1
 
-        self.ant_sel_time = []  # Antenna selection/switch time
-        self.ant_sel_old = []  # Previous antenna selection
-        self.ant_sel_new = []  # New antenna selection
+        self.ant_sel_time = ColumnBuffer()  # Antenna selection/switch time
+        self.ant_sel_old = ColumnBuffer()  # Previous antenna selection
+        self.ant_sel_new = ColumnBuffer()  # New antenna selection
 
-        self.cur_ant_time = []  # Antenna selection/switch time
-        self.cur_ant = []  # Previous antenna selection
+        self.cur_ant_time = ColumnBuffer()  # Antenna selection/switch time
+        self.cur_ant = ColumnBuffer()  # Previous antenna selection
 
-        self.tx_pwr_time = []  # TX power time
-        self.tx_pwr = []  # TX power
+        self.tx_pwr_time = ColumnBuffer()  # TX power time
+        self.tx_pwr = ColumnBuffer()  # TX power
 
-        self.tx_avg_pwr_time = []
-        self.tx_avg_pwr = []
+        self.tx_avg_pwr_time = ColumnBuffer()
+        self.tx_avg_pwr = ColumnBuffer()
 
-        self.sar_mode = []
-        self.sar_mode_time = []
+        self.sar_mode = ColumnBuffer(dtype=numpy.int64)
+        self.sar_mode_time = ColumnBuffer()
 
         self.df = 1.0  # Duty factor for UL transmission
-        self.duty_cycle = []  # Duty factors for UL transmission
-        self.duty_cycle_time = []  # Duty factors for UL transmission
+        self.duty_cycle = ColumnBuffer()  # Duty factors for UL transmission
+        self.duty_cycle_time = ColumnBuffer()  # Duty factors for UL transmission
         self.initial_power = 0
         self.sar_limit_dbm = None
         self.avg_window_size = 100
 
+    def extend(self, other):
+        """Appends the data series of another RatLogData after this one's.
+
+        Other attributes, e.g. sar_limit_dbm, are copied from the other
+        RatLogData when they were changed from their initial value.
+        """
+        _extend_columns(self, other, vars(RatLogData(other.label)))
+        if other.duty_cycle:
+            self.df = other.df
+
+    def time_slice(self, time_column, start_time, end_time):
+        """Gets a data series in a time range.
+
+        Args:
+            time_column: name of the time column of the series, e.g.
+                'tx_pwr_time'.
+            start_time: start of the time range in seconds, inclusive.
+            end_time: end of the time range in seconds, inclusive.
+        Returns:
+            Dictionary of {column name: numpy array} with the time column
+                and its value columns.
+        """
+        return _time_slice(self, time_column, self.SERIES[time_column],
+                           start_time, end_time)
+
 
 class LogData:
     """Log data structure."""
 
+    # Data series as {time column: value columns}
+    SERIES = {
+        'lte_sar_time': ('lte_sar', ),
+        'nr_sar_time': ('nr_sar', ),
+        'endc_sar_time': ('endc_sar_lte', 'endc_sar_nr'),
+        'volte_time': ('volte_status', ),
+    }
+
     def __init__(self):
         self.lte = RatLogData('LTE')
         self.lte.avg_window_size = 100
@@ -636,35 +824,158 @@ class LogData:
         self.wcdma = RatLogData('WCDMA')
 
         self.fr2 = RatLogData('FR2')
-        self.fr2.rsrp0_time = []
-        self.fr2.rsrp0 = []
-        self.fr2.rsrp1_time = []
-        self.fr2.rsrp1 = []
+        self.fr2.rsrp0_time = ColumnBuffer()
+        self.fr2.rsrp0 = ColumnBuffer()
+        self.fr2.rsrp1_time = ColumnBuffer()
+        self.fr2.rsrp1 = ColumnBuffer()
         self.fr2.avg_window_size = 4
 
-        self.lte_sar_time = []
-        self.lte_sar = []
+        self.lte_sar_time = ColumnBuffer()
+        self.lte_sar = ColumnBuffer()
 
-        self.nr_sar_time = []
-        self.nr_sar = []
+        self.nr_sar_time = ColumnBuffer()
+        self.nr_sar = ColumnBuffer()
 
-        self.endc_sar_time = []
-        self.endc_sar_lte = []
-        self.endc_sar_nr = []
+        self.endc_sar_time = ColumnBuffer()
+        self.endc_sar_lte = ColumnBuffer()
+        self.endc_sar_nr = ColumnBuffer()
 
-        self.volte_time = []
-        self.volte_status = []
+        self.volte_time = ColumnBuffer()
+        self.volte_status = ColumnBuffer(dtype=numpy.int64)
 
         # Options to handle data gaps
         self.gap_options = 0
 
         self.ul_mimo = 0  # Is UL_MIMO
 
+    def extend(self, other):
+        """Appends the data of another LogData after this one's.
+
+        Used to merge the data parsed from consecutive log segments. Other
+        attributes, e.g. ul_mimo, are copied from the other LogData when they
+        were changed from their initial value.
+        """
+        for name, value in vars(other).items():
+            if isinstance(value, RatLogData):
+                getattr(self, name).extend(value)
+        _extend_columns(self, other, vars(LogData()))
+
+    def time_slice(self, time_column, start_time, end_time):
+        """Gets a data series in a time range.
+
+        Args:
+            time_column: name of the time column of the series, e.g.
+                'endc_sar_time'.
+            start_time: start of the time range in seconds, inclusive.
+            end_time: end of the time range in seconds, inclusive.
+        Returns:
+            Dictionary of {column name: numpy array} with the time column
+                and its value columns.
+        """
+        return _time_slice(self, time_column, self.SERIES[time_column],
+                           start_time, end_time)
+
+    def save(self, file_path):
+        """Saves the log data to a .npz file.
+
+        Columns are stored as arrays named '<RAT>.<column>' or '<column>',
+        other attributes are stored as JSON.
+        """
+        arrays = {}
+        scalars = {}
+        for name, value in vars(self).items():
+            if isinstance(value, RatLogData):
+                for rat_name, rat_value in vars(value).items():
+                    key = '{}.{}'.format(name, rat_name)
+                    if isinstance(rat_value, ColumnBuffer):
+                        arrays[key] = rat_value.array
+                    else:
+                        scalars[key] = rat_value
+            elif isinstance(value, ColumnBuffer):
+                arrays[name] = value.array
+            else:
+                scalars[name] = value
+        arrays['_scalars'] = numpy.array(json.dumps(scalars))
+        with open(file_path, 'wb') as file:
+            numpy.savez_compressed(file, **arrays)
+
+    @classmethod
+    def load(cls, file_path):
+        """Loads log data saved with LogData.save."""
+        log_data = cls()
+        with numpy.load(file_path) as npz_file:
+            for key in npz_file.files:
+                value = npz_file[key]
+                if key == '_scalars':
+                    attributes = json.loads(str(value))
+                else:
+                    attributes = {key: ColumnBuffer(value, dtype=value.dtype)}
+                for name, attribute in attributes.items():
+                    owner = log_data
+                    if '.' in name:
+                        rat_name, name = name.split('.', 1)
+                        owner = getattr(log_data, rat_name)
+                    setattr(owner, name, attribute)
+        return log_data
+
+
+def _update_file_hash(file_hash, file_path):
+    """Adds the contents of a file to a hashlib hash object."""
+    with open(file_path, 'rb') as input_file:
+        for chunk in iter(lambda: input_file.read(1 << 20), b''):
+            file_hash.update(chunk)
+
+
+def _filter_log_segment(log_file, skip_first_line):
+    """Reads the messages of an exported CSV log segment to be parsed.
+
+    Runs in a worker process. Only the lines whose message starts with a
+    PARSER_INFO prefix are kept, as in a filtered log, so that the lines can
+    then be parsed in order in the calling process.
+
+    Args:
+        log_file: exported CSV file of the segment.
+        skip_first_line: if True, the first line after the header is skipped
+            because it was used as the time reference.
+    Returns:
+        Tuple of (header line, list of matching lines), or None if the file
+            has no message column.
+    """
+    log_parser = LogParser()
+    with open(log_file, 'r') as file:
+        header_line = file.readline()
+        log_parser.parse_header(header_line)
+        if log_parser.message_col == -1:
+            return None
+        if skip_first_line:
+            file.readline()
+        lines = []
+        for line in file:
+            message = log_parser.get_message(line)
+            if message and log_parser.match_prefix(message):
+                lines.append(line)
+    return header_line, lines
+
 
 class ShannonLogger(object):
 
-    def __init__(self, dut=None, modem_bin=None, filter_file_path=None):
+    def __init__(self,
+                 dut=None,
+                 modem_bin=None,
+                 filter_file_path=None,
+                 max_workers=None):
+        """Initializes the logger.
+
+        Args:
+            dut: AndroidDevice to pull the modem binary from.
+            modem_bin: path to the modem binary, if dut is not given.
+            filter_file_path: DMConsole filter file used for exporting logs.
+            max_workers: number of processes used to export and filter log
+                segments. Defaults to the number of CPUs. If 1, log segments
+                are filtered one after the other in the calling process.
+        """
         self.dm_app = shutil.which(r'DMConsole')
+        self.max_workers = max_workers or os.cpu_count()
         self.dut = dut
         if self.dut:
             self.modem_bin = self.pull_modem_file()
@@ -723,26 +1034,29 @@ class ShannonLogger(object):
                 sdm_files.append(log_file)
         return sorted(set(sdm_files))
 
+    def _get_export_options(self):
+        """Returns the DMConsole options used to export log segments."""
+        export_options = ['traceexport', '-c', '-csv']
+        if self.filter_file:
+            export_options.extend(['-f', self.filter_file])
+        export_options.extend(['-b', self.modem_bin])
+        return export_options
+
     def _export_single_log(self, file):
         temp_file = str(Path(file).with_suffix('.csv'))
-        if self.filter_file:
-            export_cmd = [
-                self.dm_app, 'traceexport', '-c', '-csv', '-f',
-                self.filter_file, '-b', self.modem_bin, '-o', temp_file, file
-            ]
-        else:
-            export_cmd = [
-                self.dm_app, 'traceexport', '-c', '-csv', '-b', self.modem_bin,
-                '-o', temp_file, file
-            ]
+        export_cmd = [self.dm_app] + self._get_export_options() + [
+            '-o', temp_file, file
+        ]
         logging.debug('Executing: {}'.format(export_cmd))
         subprocess.call(export_cmd)
         return temp_file
 
     def _export_logs(self, log_files):
-        csv_files = []
-        for file in log_files:
-            csv_files.append(self._export_single_log(file))
+        # DMConsole runs in its own process, so threads are enough to run
+        # the exports in parallel.
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            csv_files = list(executor.map(self._export_single_log,
+                                          log_files))
         return csv_files
 
     def _filter_log(self, input_filename, output_filename, write_header):
@@ -763,13 +1077,11 @@ class ShannonLogger(object):
 
                 for line in input_file:
                     message = log_parser.get_message(line)
-                    if message:
-                        for filter_str in log_parser.PARSER_INFO:
-                            if message.startswith(filter_str):
-                                output_file.write(line)
-                                break
+                    if message and log_parser.match_prefix(message):
+                        output_file.write(line)
 
-    def _export_filtered_logs(self, csv_files):
+    def _sort_logs_by_start_time(self, csv_files):
+        """Returns the CSV logs with a start time, sorted by start time."""
         start_times = []
         log_parser = LogParser()
         reordered_csv_files = []
@@ -784,6 +1096,10 @@ class ShannonLogger(object):
         print(file_order)
         reordered_csv_files = [reordered_csv_files[i] for i in file_order]
         print(reordered_csv_files)
+        return reordered_csv_files
+
+    def _export_filtered_logs(self, csv_files):
+        reordered_csv_files = self._sort_logs_by_start_time(csv_files)
         log_directory = Path(reordered_csv_files[0]).parent
         exported_file = os.path.join(log_directory, 'modem_log.csv')
         write_header = True
@@ -798,11 +1114,103 @@ class ShannonLogger(object):
         log_data = log_parser.parse_log(log_file, gap_options=0)
         return log_data
 
-    def process_log(self, log_zip_file):
+    def _parse_logs(self, csv_files, gap_options=0):
+        """Extract required data from exported CSV log segments.
+
+        Filters and parses the segments in a single pass, without writing a
+        filtered copy of the logs. Timestamps are relative to the first
+        message of the earliest segment.
+
+        With more than one worker, segments are filtered in a process pool.
+        The matching lines are always parsed in order in the calling process,
+        so the state carried from one message to the next (frequency range
+        index, data gap handling) crosses segment boundaries and the result
+        does not depend on the number of workers.
+        """
+        log_parser = LogParser()
+        log_data = LogData()
+        log_data.gap_options = gap_options
+        csv_files = self._sort_logs_by_start_time(csv_files)
+        if not csv_files:
+            return log_data
+        start_time = log_parser.get_file_start_time(csv_files[0])
+        skip_first_lines = [index == 0 for index in range(len(csv_files))]
+        # Data gap handling state does not carry over from previous logs.
+        LastNrPower.last_time = 0
+        LastNrPower.last_pwr = 0
+        LastLteValue.last_time = 0
+        LastLteValue.last_pwr = 0
+
+        executor = None
+        if self.max_workers > 1:
+            executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            segments = executor.map(_filter_log_segment, csv_files,
+                                    skip_first_lines)
+        else:
+            segments = map(_filter_log_segment, csv_files, skip_first_lines)
+        try:
+            for segment in segments:
+                if segment is None:
+                    continue
+                header_line, lines = segment
+                log_parser.parse_header(header_line)
+                log_parser.parse_lines(lines,
+                                       start_time,
+                                       log_data,
+                                       matched_only=True)
+        finally:
+            if executor:
+                executor.shutdown()
+
+        log_parser.finalize_log_data(log_data)
+        return log_data
+
+    def _get_cache_file(self, log_zip_file, gap_options=0):
+        """Returns the parsed log data cache file for a modem log zip.
+
+        The cache key covers the contents of the zip file, the gap options
+        and the DMConsole export options. The filter file and the modem
+        binary are included by contents rather than by path, since the
+        modem binary is pulled to a new directory for every test run.
+        """
+        file_hash = hashlib.sha256()
+        file_hash.update('{}:{}:'.format(_LOG_DATA_CACHE_VERSION,
+                                         gap_options).encode())
+        for option in self._get_export_options():
+            if option in (self.filter_file,
+                          self.modem_bin) and os.path.isfile(option):
+                _update_file_hash(file_hash, option)
+            else:
+                file_hash.update(option.encode())
+            file_hash.update(b'\0')
+        _update_file_hash(file_hash, log_zip_file)
+        return os.path.join(
+            os.path.dirname(os.path.abspath(log_zip_file)),
+            'parsed_log_{}.npz'.format(file_hash.hexdigest()[:16]))
+
+    def process_log(self, log_zip_file, use_cache=True):
+        """Extracts the log data from a zip file of modem logs.
+
+        Args:
+            log_zip_file: path to the zip file of modem logs.
+            use_cache: if True, the parsed log data is saved next to the zip
+                file and reused when the same logs are processed again.
+        Returns:
+            LogData object.
+        """
+        if use_cache:
+            cache_file = self._get_cache_file(log_zip_file)
+            if os.path.isfile(cache_file):
+                try:
+                    return LogData.load(cache_file)
+                except (OSError, ValueError, KeyError, AttributeError) as e:
+                    logging.warning('Could not load log data cache {}: {}'.format(
+                        cache_file, e))
         sdm_log_files = self.unzip_modem_logs(log_zip_file)
         csv_log_files = self._export_logs(sdm_log_files)
-        exported_log = self._export_filtered_logs(csv_log_files)
-        log_data = self._parse_log(exported_log, 0)
+        log_data = self._parse_logs(csv_log_files, 0)
         for file in itertools.chain(sdm_log_files, csv_log_files):
             os.remove(file)
+        if use_cache:
+            log_data.save(cache_file)
         return log_data
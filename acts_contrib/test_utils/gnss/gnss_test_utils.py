@@ -24,6 +24,7 @@ import posixpath
 import subprocess
 import tempfile
 import functools
+import numpy
 from retry import retry
 from collections import namedtuple
 from datetime import datetime, timedelta
@@ -1097,6 +1098,30 @@ def run_ttff_via_gtw_gpstool(ad, mode, criteria, test_cycle, true_location,
                 "seconds." % (gnss_constant.TTFF_MODE.get(mode), criteria))
     return ttff_data
 
+def _iter_device_file_lines(ad, file_path):
+    """Streams the lines of a device file without holding it in memory.
+
+    The file is read by its own adb exec-out process, since adb.shell_nb
+    discards the output of the command.
+
+    Args:
+        ad: An AndroidDevice object.
+        file_path: path of the file on the device.
+
+    Yields:
+        The lines of the file without line endings.
+    """
+    proc = subprocess.Popen(["adb", "-s", ad.serial, "exec-out", "cat",
+                             file_path], stdout=subprocess.PIPE)
+    try:
+        for line in proc.stdout:
+            yield line.decode("utf-8", errors="replace").rstrip("\r\n")
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        proc.communicate()
+
+
 def parse_gtw_gpstool_log(ad, true_position, api_type="gnss", validate_gnssstatus=False):
     """Process GNSS/FLP API logs from GTW GPSTool and output track_data to
     test_run_info for ACTS plugin to parse and display on MobileHarness as
@@ -1113,7 +1138,6 @@ def parse_gtw_gpstool_log(ad, true_position, api_type="gnss", validate_gnssstatu
         A dict of location reported from GPSTool
             {<utc_time>: TRACK_REPORT, ...}
     """
-    gnssstatus_count = 0
     test_logfile = {}
     track_data = {}
     ant_top4_cn = 0
@@ -1142,20 +1166,17 @@ def parse_gtw_gpstool_log(ad, true_position, api_type="gnss", validate_gnssstatu
             test_logfile = logpath
     if not test_logfile:
         raise signals.TestError("Failed to get test log file in device.")
-    lines = ad.adb.shell("cat %s" % test_logfile).split("\n")
-    gnss_svid_container = gnssstatus_utils.GnssSvidContainer()
-    for line in lines:
+    gnssstatus_table = gnssstatus_utils.GnssStatusTable()
+    track_lats = []
+    track_longs = []
+    track_reports = []
+    for line in _iter_device_file_lines(ad, test_logfile):
         if line.startswith('Fix'):
             try:
-                gnss_status = gnssstatus_utils.GnssStatus(line)
-                gnssstatus_count += 1
+                gnssstatus_table.add_line(line)
             except gnssstatus_utils.RegexParseException as e:
                 ad.log.warn(e)
-                continue
-
-            gnss_svid_container.add_satellite(gnss_status)
-            if validate_gnssstatus:
-                gnss_status.validate_gnssstatus()
+            continue
 
         if "Antenna_History Avg Top4" in line:
             ant_top4_cn = float(line.split(":")[-1].strip())
@@ -1180,9 +1201,11 @@ def parse_gtw_gpstool_log(ad, true_position, api_type="gnss", validate_gnssstatu
             report_time = datetime.strptime(track_utc, gps_datetime_format)
             if track_utc in track_data.keys():
                 continue
-            pe = calculate_position_error(track_lat, track_long, true_position)
+            track_lats.append(track_lat)
+            track_longs.append(track_long)
+            track_reports.append(track_utc)
             track_data[track_utc] = TRACK_REPORT(l5flag=l5flag,
-                                                 pe=pe,
+                                                 pe=None,
                                                  ant_top4cn=ant_top4_cn,
                                                  ant_cn=ant_cn,
                                                  base_top4cn=base_top4_cn,
@@ -1190,6 +1213,14 @@ def parse_gtw_gpstool_log(ad, true_position, api_type="gnss", validate_gnssstatu
                                                  device_time=device_time,
                                                  report_time=report_time,
                                                  )
+    pe_array = calculate_position_errors(track_lats, track_longs, true_position)
+    for track_utc, pe in zip(track_reports, pe_array.tolist()):
+        track_data[track_utc] = track_data[track_utc]._replace(pe=pe)
+    gnssstatus_count = len(gnssstatus_table)
+    if validate_gnssstatus:
+        gnssstatus_table.validate()
+    gnss_svid_container = gnssstatus_utils.GnssSvidContainer()
+    gnss_svid_container.add_table(gnssstatus_table)
     ad.log.info("Total %d gnssstatus samples verified" %gnssstatus_count)
     ad.log.debug(track_data)
     prop_basename = UPLOAD_TO_SPONGE_PREFIX + f"{api_type.upper()}_tracking_"
@@ -1306,28 +1337,45 @@ def process_ttff_by_gtw_gpstool(ad, begin_time, true_position, api_type="gnss"):
     utc_time = epoch_to_human_time(get_current_epoch_time())
     ttff_data = {}
     ttff_loop_time = get_current_epoch_time()
-    while True:
-        if get_current_epoch_time() - ttff_loop_time >= 120000:
-            raise signals.TestError("Fail to search specific GPSService "
-                                    "message in logcat. Abort test.")
-        if not ad.is_adb_logcat_on:
-            ad.start_adb_logcat()
-        logcat_results = ad.search_logcat("write TTFF log", ttff_loop_time)
-        if logcat_results:
-            ttff_loop_time = get_current_epoch_time()
-            ttff_log = logcat_results[-1]["log_message"].split()
-            ttff_loop = int(ttff_log[8].split(":")[-1])
-            ttff_sec = float(ttff_log[11])
-            if ttff_sec != 0.0:
-                ttff_ant_cn = float(ttff_log[18].strip("]"))
-                ttff_base_cn = float(ttff_log[25].strip("]"))
-                if api_type == "gnss":
-                    gnss_results = ad.search_logcat("GPSService: Check item",
-                                                    begin_time)
-                    if gnss_results:
-                        ad.log.debug(gnss_results[-1]["log_message"])
+    location_patterns = {"gnss": "GPSService: Check item",
+                         "flp": "GPSService: FLP Location"}
+    logcat_tailer = tlutils.get_logcat_tailer(ad)
+    ttff_watch = logcat_tailer.watch("write TTFF log",
+                                     begin_time=ttff_loop_time)
+    stop_gps_watch = logcat_tailer.watch("stop gps test",
+                                         begin_time=begin_time)
+    crash_watch = logcat_tailer.watch("Force finishing activity "
+                                      "com.android.gpstool/.GPSTool",
+                                      begin_time=begin_time)
+    logcat_watches = [ttff_watch, stop_gps_watch, crash_watch]
+    location_watch = None
+    if api_type in location_patterns:
+        location_watch = logcat_tailer.watch(location_patterns[api_type],
+                                             begin_time=begin_time)
+        logcat_watches.append(location_watch)
+    try:
+        while True:
+            if get_current_epoch_time() - ttff_loop_time >= 120000:
+                raise signals.TestError("Fail to search specific GPSService "
+                                        "message in logcat. Abort test.")
+            if not ad.is_adb_logcat_on:
+                ad.start_adb_logcat()
+            # TTFF logs before the stop log are matched before it
+            gps_stopped = bool(stop_gps_watch.matches)
+            ttff_results = ttff_watch.get_new_matches(
+                timeout=0 if gps_stopped else 1)
+            for ttff_result in ttff_results:
+                ttff_loop_time = get_current_epoch_time()
+                ttff_log = ttff_result["log_message"].split()
+                ttff_loop = int(ttff_log[8].split(":")[-1])
+                ttff_sec = float(ttff_log[11])
+                if ttff_sec != 0.0:
+                    ttff_ant_cn = float(ttff_log[18].strip("]"))
+                    ttff_base_cn = float(ttff_log[25].strip("]"))
+                    if api_type == "gnss" and location_watch.matches:
+                        ad.log.debug(location_watch.matches[-1]["log_message"])
                         gnss_location_log = \
-                            gnss_results[-1]["log_message"].split()
+                            location_watch.matches[-1]["log_message"].split()
                         ttff_lat = float(
                             gnss_location_log[8].split("=")[-1].strip(","))
                         ttff_lon = float(
@@ -1337,58 +1385,48 @@ def process_ttff_by_gtw_gpstool(ad, begin_time, true_position, api_type="gnss"):
                         utc_time = epoch_to_human_time(loc_time)
                         ttff_haccu = float(
                             gnss_location_log[11].split("=")[-1].strip(","))
-                elif api_type == "flp":
-                    flp_results = ad.search_logcat("GPSService: FLP Location",
-                                                   begin_time)
-                    if flp_results:
-                        ad.log.debug(flp_results[-1]["log_message"])
-                        flp_location_log = flp_results[-1][
+                    elif api_type == "flp" and location_watch.matches:
+                        ad.log.debug(location_watch.matches[-1]["log_message"])
+                        flp_location_log = location_watch.matches[-1][
                             "log_message"].split()
                         ttff_lat = float(flp_location_log[8].split(",")[0])
                         ttff_lon = float(flp_location_log[8].split(",")[1])
                         ttff_haccu = float(flp_location_log[9].split("=")[1])
-                        utc_time = epoch_to_human_time(get_current_epoch_time())
-            else:
-                ttff_ant_cn = float(ttff_log[19].strip("]"))
-                ttff_base_cn = float(ttff_log[26].strip("]"))
-                ttff_lat = 0
-                ttff_lon = 0
-                ttff_haccu = 0
-                utc_time = epoch_to_human_time(get_current_epoch_time())
-            ad.log.debug("TTFF Loop %d - (Lat, Lon) = (%s, %s)" % (ttff_loop,
-                                                                   ttff_lat,
-                                                                   ttff_lon))
-            ttff_pe = calculate_position_error(
-                ttff_lat, ttff_lon, true_position)
-            ttff_data[ttff_loop] = TTFF_REPORT(utc_time=utc_time,
-                                               ttff_loop=ttff_loop,
-                                               ttff_sec=ttff_sec,
-                                               ttff_pe=ttff_pe,
-                                               ttff_ant_cn=ttff_ant_cn,
-                                               ttff_base_cn=ttff_base_cn,
-                                               ttff_haccu=ttff_haccu)
-            ad.log.info("UTC Time = %s, Loop %d = %.1f seconds, "
-                        "Position Error = %.1f meters, "
-                        "Antenna Average Signal = %.1f dbHz, "
-                        "Baseband Average Signal = %.1f dbHz, "
-                        "Horizontal Accuracy = %.1f meters" % (utc_time,
-                                                                 ttff_loop,
-                                                                 ttff_sec,
-                                                                 ttff_pe,
-                                                                 ttff_ant_cn,
-                                                                 ttff_base_cn,
-                                                                 ttff_haccu))
-        stop_gps_results = ad.search_logcat("stop gps test", begin_time)
-        if stop_gps_results:
-            ad.send_keycode("HOME")
-            break
-        crash_result = ad.search_logcat("Force finishing activity "
-                                        "com.android.gpstool/.GPSTool",
-                                        begin_time)
-        if crash_result:
-            raise signals.TestError("GPSTool crashed. Abort test.")
-        # wait 5 seconds to avoid logs not writing into logcat yet
-        time.sleep(5)
+                        utc_time = epoch_to_human_time(
+                            get_current_epoch_time())
+                else:
+                    ttff_ant_cn = float(ttff_log[19].strip("]"))
+                    ttff_base_cn = float(ttff_log[26].strip("]"))
+                    ttff_lat = 0
+                    ttff_lon = 0
+                    ttff_haccu = 0
+                    utc_time = epoch_to_human_time(get_current_epoch_time())
+                ad.log.debug("TTFF Loop %d - (Lat, Lon) = (%s, %s)" % (
+                    ttff_loop, ttff_lat, ttff_lon))
+                ttff_pe = calculate_position_error(
+                    ttff_lat, ttff_lon, true_position)
+                ttff_data[ttff_loop] = TTFF_REPORT(utc_time=utc_time,
+                                                   ttff_loop=ttff_loop,
+                                                   ttff_sec=ttff_sec,
+                                                   ttff_pe=ttff_pe,
+                                                   ttff_ant_cn=ttff_ant_cn,
+                                                   ttff_base_cn=ttff_base_cn,
+                                                   ttff_haccu=ttff_haccu)
+                ad.log.info("UTC Time = %s, Loop %d = %.1f seconds, "
+                            "Position Error = %.1f meters, "
+                            "Antenna Average Signal = %.1f dbHz, "
+                            "Baseband Average Signal = %.1f dbHz, "
+                            "Horizontal Accuracy = %.1f meters" % (
+                                utc_time, ttff_loop, ttff_sec, ttff_pe,
+                                ttff_ant_cn, ttff_base_cn, ttff_haccu))
+            if gps_stopped:
+                ad.send_keycode("HOME")
+                break
+            if crash_watch.matches:
+                raise signals.TestError("GPSTool crashed. Abort test.")
+    finally:
+        for logcat_watch in logcat_watches:
+            logcat_watch.cancel()
     return ttff_data
 
 
@@ -1496,6 +1534,28 @@ def calculate_position_error(latitude, longitude, true_position):
     return radius * c
 
 
+def calculate_position_errors(latitudes, longitudes, true_position):
+    """Vectorized calculate_position_error for arrays of coordinates.
+
+    Args:
+        latitudes: array like of latitudes of location fixes.
+        longitudes: array like of longitudes of location fixes.
+        true_position: [latitude, longitude] of true location coordinate.
+
+    Returns:
+        numpy array of the position errors of the location fixes.
+    """
+    radius = 6371009
+    latitudes = numpy.radians(numpy.asarray(latitudes, dtype=float))
+    longitudes = numpy.radians(numpy.asarray(longitudes, dtype=float))
+    true_latitude, true_longitude = numpy.radians(true_position[:2])
+    a = numpy.sin((latitudes - true_latitude) / 2)**2 + \
+        numpy.cos(true_latitude) * numpy.cos(latitudes) * \
+        numpy.sin((longitudes - true_longitude) / 2)**2
+    c = 2 * numpy.arctan2(numpy.sqrt(a), numpy.sqrt(1 - a))
+    return radius * c
+
+
 def launch_google_map(ad):
     """Launch Google Map via intent.
 
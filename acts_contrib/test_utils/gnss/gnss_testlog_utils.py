@@ -16,7 +16,6 @@
 '''Python Module for GNSS test log utilities.'''
 
 import re as regex
-import datetime
 import functools as fts
 import numpy as npy
 import pandas as pds
@@ -126,6 +125,204 @@ CONFIG_GPSTTFFLOG = {
 LOGPARSE_UTIL_LOGGER = logger.create_logger()
 
 
+def get_regex_literal_prefix(regex_string):
+    """Get the literal text a regex must match first.
+
+    Args:
+      regex_string: regex of a config pattern.
+        Type, Raw String.
+
+    Returns:
+      anchored: whether the regex starts with '^'.
+        Type, Boolean.
+      prefix: literal text every match starts with, may be empty.
+        Type, String.
+    """
+    # A top level alternation may start with any of its branches.
+    escaped = False
+    for char in regex_string:
+        if char == '|' and not escaped:
+            return False, ''
+        escaped = char == '\\' and not escaped
+
+    anchored = regex_string.startswith('^')
+    idx = 1 if anchored else 0
+    prefix = []
+    while idx < len(regex_string):
+        char = regex_string[idx]
+        if char == '\\':
+            literal = regex_string[idx + 1:idx + 2]
+            if not literal or literal.isalnum():
+                break
+            step = 2
+        elif char in '.^$*+?{}[]()|':
+            break
+        else:
+            literal = char
+            step = 1
+        quantifier = regex_string[idx + step:idx + step + 1]
+        if quantifier and quantifier in '*?{':
+            break
+        prefix.append(literal)
+        if quantifier == '+':
+            break
+        idx += step
+    return anchored, ''.join(prefix)
+
+
+class LogLineDispatcher(object):
+    """Match log lines against a configs dictionary of regexes.
+
+    Instead of searching each line with every regex, lines are first
+    dispatched by the literal text the regexes start with. Regexes anchored
+    at the line start are selected with a single combined regex of their
+    prefixes; other regexes are only searched when their prefix is in the
+    line.
+    """
+
+    def __init__(self, configs):
+        """Compile the config regexes.
+
+        Args:
+          configs: configs dictionary, see parse_log_to_df.
+            Type dictionary.
+        """
+        self.cregexes = {}
+        self.columns = {}
+        self._group_indices = {}
+        self._anchored = {}
+        self._unanchored = []
+        for key, regex_string in configs.items():
+            cregex = regex.compile(regex_string)
+            self.cregexes[key] = cregex
+            self.columns[key] = sorted(cregex.groupindex,
+                                       key=cregex.groupindex.get)
+            if cregex.groups != len(self.columns[key]):
+                self._group_indices[key] = [
+                    cregex.groupindex[column] for column in self.columns[key]
+                ]
+            anchored, prefix = get_regex_literal_prefix(regex_string)
+            if anchored and prefix:
+                self._anchored.setdefault(prefix, []).append(key)
+            else:
+                # Anchored regexes fail fast with match.
+                self._unanchored.append(
+                    (prefix, key, cregex.match if anchored else cregex.search))
+
+        # Dispatch each line by its longest matching prefix, along with the
+        # regexes of shorter prefixes it starts with.
+        prefixes = sorted(self._anchored, key=len, reverse=True)
+        self._candidates = {
+            prefix: [(key, self.cregexes[key]) for other in prefixes
+                     if prefix.startswith(other)
+                     for key in self._anchored[other]]
+            for prefix in prefixes
+        }
+        self._prefix_regex = regex.compile('|'.join(
+            regex.escape(prefix) for prefix in prefixes)) if prefixes else None
+
+    def match(self, line):
+        """Get the matches of a log line.
+
+        Args:
+          line: log line.
+            Type, String.
+
+        Returns:
+          matches: list of (config key, match object).
+            Type, list.
+        """
+        matches = []
+        if self._prefix_regex:
+            prefix_match = self._prefix_regex.match(line)
+            if prefix_match:
+                for key, cregex in self._candidates[prefix_match.group()]:
+                    matched_log_object = cregex.match(line)
+                    if matched_log_object:
+                        matches.append((key, matched_log_object))
+        for prefix, key, search in self._unanchored:
+            if prefix in line:
+                matched_log_object = search(line)
+                if matched_log_object:
+                    matches.append((key, matched_log_object))
+        return matches
+
+    def get_values(self, key, matched_log_object):
+        """Get the tuple of named group values of a match."""
+        if key in self._group_indices:
+            return tuple(
+                matched_log_object.group(idx)
+                for idx in self._group_indices[key])
+        return matched_log_object.groups()
+
+
+def _get_parsed_dataframes(dispatcher, datalists, index_rownum):
+    """Build the parsed dataframes from rows of matched values."""
+    parsed_data = {}
+    for key, datalist in datalists.items():
+        if datalist:
+            parsed_data[key] = pds.DataFrame.from_records(
+                datalist, columns=dispatcher.columns[key] + ['rownumber'])
+        else:
+            parsed_data[key] = pds.DataFrame()
+        if index_rownum and not parsed_data[key].empty:
+            parsed_data[key].set_index('rownumber', inplace=True)
+        elif parsed_data[key].empty:
+            LOGPARSE_UTIL_LOGGER.debug(
+                'The parsed dataframe of "%s" is empty.', key)
+    return parsed_data
+
+
+def iter_parse_log_to_df(filename,
+                         configs,
+                         index_rownum=True,
+                         chunk_lines=1000000):
+    r"""Parse log to dictionaries of Pandas dataframes, chunk by chunk.
+
+    Same as parse_log_to_df, but yields the data parsed from every
+    chunk_lines lines of the log, so logs too large to hold in memory can
+    be processed incrementally. Row numbers count from the start of the
+    log.
+
+    Args:
+      filename: log file name.
+        Type String.
+      configs: configs dictionary, see parse_log_to_df.
+        Type dictionary.
+      index_rownum: index row number from raw data.
+        Type Boolean.
+        Default, True.
+      chunk_lines: number of log lines parsed per chunk, None to parse the
+        whole log at once.
+        Type Integer.
+        Default, 1000000.
+
+    Yields:
+      parsed_data: dictionary of data parsed from one chunk.
+        Type dictionary.
+        dict key, the parsed pattern name, such as 'Speed',
+        dict value, the corresponding parsed dataframe.
+    """
+    dispatcher = LogLineDispatcher(configs)
+    datalists = {key: [] for key in configs}
+    rownumber = 0
+    chunk_start = 0
+    with open(filename, 'r') as fid:
+        for rownumber, current_line in enumerate(fid, 1):
+            for key, matched_log_object in dispatcher.match(current_line):
+                datalists[key].append(
+                    dispatcher.get_values(key, matched_log_object) +
+                    (rownumber, ))
+            if chunk_lines and rownumber % chunk_lines == 0:
+                yield _get_parsed_dataframes(dispatcher, datalists,
+                                             index_rownum)
+                datalists = {key: [] for key in configs}
+                chunk_start = rownumber
+    # The last chunk, or the only one of an empty log.
+    if rownumber > chunk_start or rownumber == 0:
+        yield _get_parsed_dataframes(dispatcher, datalists, index_rownum)
+
+
 def parse_log_to_df(filename, configs, index_rownum=True):
     r"""Parse log to a dictionary of Pandas dataframes.
 
@@ -155,41 +352,11 @@ def parse_log_to_df(filename, configs, index_rownum=True):
           'Speed': r'Speed:\s+(?P<Speed>\d+.\d+)',
       }
     """
-    # Init a local config dictionary to hold compiled regex and match dict.
-    configs_local = {}
-    # Construct parsed data dictionary
-    parsed_data = {}
-
-    # Loop the config dictionary to compile regex and init data list
-    for key, regex_string in configs.items():
-        configs_local[key] = {
-            'cregex': regex.compile(regex_string),
-            'datalist': [],
-        }
-
-    # Open the file, loop and parse
-    with open(filename, 'r') as fid:
-
-        for idx_line, current_line in enumerate(fid):
-            for _, config in configs_local.items():
-                matched_log_object = config['cregex'].search(current_line)
-
-                if matched_log_object:
-                    matched_data = matched_log_object.groupdict()
-                    matched_data['rownumber'] = idx_line + 1
-                    config['datalist'].append(matched_data)
-
-    # Loop to generate parsed data from configs list
-    for key, config in configs_local.items():
-        parsed_data[key] = pds.DataFrame(config['datalist'])
-        if index_rownum and not parsed_data[key].empty:
-            parsed_data[key].set_index('rownumber', inplace=True)
-        elif parsed_data[key].empty:
-            LOGPARSE_UTIL_LOGGER.debug(
-                'The parsed dataframe of "%s" is empty.', key)
-
-    # Return parsed data list
-    return parsed_data
+    return next(
+        iter_parse_log_to_df(filename,
+                             configs,
+                             index_rownum=index_rownum,
+                             chunk_lines=None))
 
 
 def parse_gpstool_ttfflog_to_df(filename):
@@ -225,6 +392,54 @@ def parse_gpstool_ttfflog_to_df(filename):
     return ttff_df
 
 
+def get_datetime(date_series, time_series):
+    """Convert date and time string columns to a datetime column.
+
+    Args:
+      date_series: dates formatted as '%Y/%m/%d'.
+        Type, Pandas Series.
+      time_series: times formatted as '%H:%M:%S'.
+        Type, Pandas Series.
+
+    Returns:
+      datetime_series: parsed datetimes.
+        Type, Pandas Series.
+    """
+    return pds.to_datetime(date_series + '-' + time_series,
+                           format='%Y/%m/%d-%H:%M:%S')
+
+
+def add_phone_time(target_df, timestamp_df):
+    """Add the phone time of the latest preceding timestamp to each row.
+
+    Both dataframes are indexed by the log row number. Each row of
+    target_df gets the phone_time and row number of the last timestamp_df
+    row before it, or NaT and NaN if there is none.
+
+    Args:
+      target_df: dataframe to add 'phone_time' and 'time_row_num' columns to.
+        Type, Pandas DataFrame.
+      timestamp_df: timestamp dataframe with a 'phone_time' column.
+        Type, Pandas DataFrame.
+    """
+    if timestamp_df.empty:
+        target_df['phone_time'] = pds.NaT
+        target_df['time_row_num'] = npy.NaN
+        return
+    time_rows = timestamp_df.index.to_numpy()
+    time_idx = npy.searchsorted(time_rows, target_df.index.to_numpy()) - 1
+    has_time = time_idx >= 0
+    time_idx[~has_time] = 0
+    phone_time = timestamp_df['phone_time'].to_numpy()[time_idx]
+    time_row_num = time_rows[time_idx]
+    if not has_time.all():
+        phone_time[~has_time] = npy.datetime64('NaT')
+        time_row_num = time_row_num.astype(float)
+        time_row_num[~has_time] = npy.NaN
+    target_df['phone_time'] = phone_time
+    target_df['time_row_num'] = time_row_num
+
+
 def parse_gpsapilog_to_df(filename):
     """Parse GPS API log to Pandas dataframes.
 
@@ -243,19 +458,6 @@ def parse_gpsapilog_to_df(filename):
         Type, Pandas DataFrame.
         include Provider, Latitude, Longitude, Altitude, GNSSTime, Speed, Bearing
     """
-    def get_phone_time(target_df_row, timestamp_df):
-        """subfunction to get the phone_time."""
-
-        try:
-            row_num = timestamp_df[
-                timestamp_df.index < target_df_row.name].iloc[-1].name
-            phone_time = timestamp_df.loc[row_num]['phone_time']
-        except IndexError:
-            row_num = npy.NaN
-            phone_time = npy.NaN
-
-        return phone_time, row_num
-
     # Get parsed dataframe list
     parsed_data = parse_log_to_df(
         filename=filename,
@@ -264,20 +466,13 @@ def parse_gpsapilog_to_df(filename):
 
     # get DUT Timestamp
     timestamp_df = parsed_data['phone_time']
-    timestamp_df['phone_time'] = timestamp_df.apply(
-        lambda row: datetime.datetime.strptime(row.date + '-' + row.time,
-                                               '%Y/%m/%d-%H:%M:%S'),
-        axis=1)
+    timestamp_df['phone_time'] = get_datetime(timestamp_df['date'],
+                                              timestamp_df['time'])
 
     # Add phone_time from timestamp_df dataframe by row number
     for key in parsed_data:
         if key != 'phone_time':
-            current_df = parsed_data[key]
-            time_n_row_num = current_df.apply(get_phone_time,
-                                              axis=1,
-                                              timestamp_df=timestamp_df)
-            current_df[['phone_time', 'time_row_num'
-                        ]] = pds.DataFrame(time_n_row_num.apply(pds.Series))
+            add_phone_time(parsed_data[key], timestamp_df)
 
     # Get space vehicle info dataframe
     sv_info_df = parsed_data['SpaceVehicle']
@@ -308,10 +503,8 @@ def parse_gpsapilog_to_df(filename):
                             parsed_data[LIST_LOCINFO[0]],
                             on='time_row_num')
     # Convert GNSS Time
-    loc_info_df['gnsstime'] = loc_info_df.apply(
-        lambda row: datetime.datetime.strptime(row.Date + '-' + row.Time,
-                                               '%Y/%m/%d-%H:%M:%S'),
-        axis=1)
+    loc_info_df['gnsstime'] = get_datetime(loc_info_df['Date'],
+                                           loc_info_df['Time'])
 
     return timestamp_df, sv_info_df, sv_stat_df, loc_info_df
 
@@ -342,10 +535,8 @@ def parse_gpsapilog_to_df_v2(filename):
 
     # get DUT Timestamp
     timestamp_df = parsed_data['phone_time']
-    timestamp_df['phone_time'] = timestamp_df.apply(
-        lambda row: datetime.datetime.strptime(row.date + '-' + row.time,
-                                               '%Y/%m/%d-%H:%M:%S'),
-        axis=1)
+    timestamp_df['phone_time'] = get_datetime(timestamp_df['date'],
+                                              timestamp_df['time'])
     # drop logsize, date, time
     parsed_data['phone_time'] = timestamp_df.drop(['logsize', 'date', 'time'],
                                                   axis=1)
@@ -400,10 +591,8 @@ def parse_gpsapilog_to_df_v2(filename):
                             parsed_data[LIST_LOCINFO[0]],
                             on='phone_time')
     # Convert GNSS Time
-    loc_info_df['gnsstime'] = loc_info_df.apply(
-        lambda row: datetime.datetime.strptime(row.Date + '-' + row.Time,
-                                               '%Y/%m/%d-%H:%M:%S'),
-        axis=1)
+    loc_info_df['gnsstime'] = get_datetime(loc_info_df['Date'],
+                                           loc_info_df['Time'])
 
     # Data Conversion
     timestamp_df['logsize'] = timestamp_df['logsize'].astype(int)
@@ -13,7 +13,10 @@
 #   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
-import re
+import array
+import operator
+import sys
+import numpy
 from acts import signals
 from collections import defaultdict
 
@@ -56,10 +59,186 @@ CARRIER_FREQUENCIES = {
 }
 
 
+GNSSSTATUS_COLUMNS = ('used_in_fix', 'constellation', 'svid', 'cn', 'base_cn',
+                      'elev', 'azim', 'frequency_band', 'carrier_frequency')
+GNSSSTATUS_KEYS = ('Fix:', 'Type:', 'SV:', 'C/No:', 'Elevation:', 'Azimuth:',
+                   'Signal:', 'Frequency:', 'EPH:')
+# Token positions of the keys and values of the usual gnssstatus line layout
+_get_gnssstatus_keys = operator.itemgetter(0, 2, 4, 6, 9, 11, 13, 15, 17)
+_get_gnssstatus_values = operator.itemgetter(1, 3, 5, 7, 8, 10, 12, 14, 16)
+
+
 class RegexParseException(Exception):
     pass
 
 
+def parse_gnssstatus(gnssstatus_raw):
+    """Parses a raw gnssstatus line by splitting it into tokens.
+
+    Args:
+        gnssstatus_raw: A gnssstatus line, see GnssStatus.
+
+    Returns:
+        A tuple of the values of GNSSSTATUS_COLUMNS.
+
+    Raises:
+        RegexParseException: if the line is not a gnssstatus line.
+    """
+    tokens = gnssstatus_raw.split()
+    try:
+        if len(tokens) > 17 and _get_gnssstatus_keys(
+                tokens) == GNSSSTATUS_KEYS:
+            (used_in_fix, constellation, svid, cn, base_cn, elev, azim,
+             frequency_band, carrier_frequency) = _get_gnssstatus_values(tokens)
+        else:
+            start = tokens.index('Fix:')
+            fields = {}
+            key = None
+            for token in tokens[start:]:
+                if token in GNSSSTATUS_KEYS:
+                    key = token
+                    fields[key] = []
+                elif key:
+                    fields[key].append(token)
+            if 'EPH:' not in fields:
+                raise ValueError('Missing EPH')
+            used_in_fix, = fields['Fix:']
+            constellation, = fields['Type:']
+            svid, = fields['SV:']
+            cn, base_cn = fields['C/No:']
+            elev, = fields['Elevation:']
+            azim, = fields['Azimuth:']
+            frequency_band, = fields['Signal:']
+            carrier_frequency, = fields['Frequency:']
+        if not cn.endswith(','):
+            raise ValueError('Missing baseband C/No')
+        return (used_in_fix.lower() == 'true', sys.intern(constellation),
+                int(svid), float(cn[:-1]), float(base_cn), float(elev),
+                float(azim), sys.intern(frequency_band),
+                float(carrier_frequency))
+    except (KeyError, ValueError):
+        raise RegexParseException(f'Gnss raw msg parse fail:\n{gnssstatus_raw}\n'
+                                  f'Please check it manually.')
+
+
+class GnssStatusTable:
+    """Columns of gnssstatus lines, parsed without one object per line.
+
+    Numeric values are accumulated in arrays and strings in lists of
+    interned strings.
+
+    Attributes:
+        columns: A dict of column name to values, see GNSSSTATUS_COLUMNS.
+    """
+
+    NUMERIC_TYPECODES = {
+        'used_in_fix': 'b',
+        'svid': 'i',
+        'cn': 'd',
+        'base_cn': 'd',
+        'elev': 'd',
+        'azim': 'd',
+        'carrier_frequency': 'd'
+    }
+
+    def __init__(self):
+        self.columns = {
+            column: array.array(self.NUMERIC_TYPECODES[column])
+            if column in self.NUMERIC_TYPECODES else []
+            for column in GNSSSTATUS_COLUMNS
+        }
+        self._appends = [
+            self.columns[column].append for column in GNSSSTATUS_COLUMNS
+        ]
+
+    def __len__(self):
+        return len(self.columns['svid'])
+
+    def add_line(self, gnssstatus_raw):
+        """Parses and adds a raw gnssstatus line.
+
+        Raises:
+            RegexParseException: if the line is not a gnssstatus line.
+        """
+        for append, value in zip(self._appends,
+                                 parse_gnssstatus(gnssstatus_raw)):
+            append(value)
+
+    def get_columns(self):
+        """Returns a dict of column name to numpy array."""
+        return {
+            column: numpy.array(values, dtype=bool)
+            if column == 'used_in_fix' else numpy.array(values)
+            for column, values in self.columns.items()
+        }
+
+    def get_row(self, idx):
+        """Returns a raw gnssstatus like description of a row."""
+        row = {column: self.columns[column][idx]
+               for column in GNSSSTATUS_COLUMNS}
+        return (f'Fix: {str(bool(row["used_in_fix"])).lower()} '
+                f'Type: {row["constellation"]} SV: {row["svid"]} '
+                f'C/No: {row["cn"]}, {row["base_cn"]} '
+                f'Elevation: {row["elev"]} Azimuth: {row["azim"]} '
+                f'Signal: {row["frequency_band"]} '
+                f'Frequency: {row["carrier_frequency"]}')
+
+    def validate(self):
+        """Validates all rows like GnssStatus.validate_gnssstatus.
+
+        Raises:
+            signals.TestFailure: for unknown constellations or frequency
+                bands, and for values out of range, listing the failures of
+                the first failing row.
+        """
+        columns = self.get_columns()
+        failures = defaultdict(list)
+        for constellation in set(self.columns['constellation']):
+            if constellation not in SVID_RANGE:
+                raise signals.TestFailure(
+                    f'Satellite identify fail: {constellation}')
+        for band_key in set(zip(self.columns['constellation'],
+                                self.columns['frequency_band'])):
+            if band_key[1] not in CARRIER_FREQUENCIES[band_key[0]]:
+                raise signals.TestFailure(
+                    f'Carrier frequency identify fail: {band_key[1]}')
+        constellations = columns['constellation']
+        bands = columns['frequency_band']
+        svids = columns['svid']
+        frequencies = columns['carrier_frequency']
+        svid_valid = numpy.zeros(len(self), dtype=bool)
+        frequency_valid = numpy.zeros(len(self), dtype=bool)
+        for constellation, id_ranges in SVID_RANGE.items():
+            rows = constellations == constellation
+            for id_range in id_ranges:
+                svid_valid |= rows & (svids >= id_range[0]) & (
+                    svids <= id_range[1])
+            for band, target_freq in CARRIER_FREQUENCIES[constellation].items():
+                frequency_valid |= rows & (bands == band) & numpy.isin(
+                    frequencies, target_freq)
+        for idx in numpy.flatnonzero(~svid_valid):
+            failures[idx].append(
+                f'{constellations[idx]} ID {svids[idx]} not in SV Range')
+        for name, column, max_value in [('Ant CN', 'cn', 63),
+                                        ('Base CN', 'base_cn', 63),
+                                        ('Elevation', 'elev', 90),
+                                        ('Azimuth', 'azim', 360)]:
+            values = columns[column]
+            for idx in numpy.flatnonzero((values < 0) | (values > max_value)):
+                failures[idx].append(
+                    f'{name} not in range: {values[idx]}')
+        for idx in numpy.flatnonzero(~frequency_valid):
+            failures[idx].append(
+                f'{constellations[idx]}_{bands[idx]} carrier'
+                f'frequency not in range: {frequencies[idx]}')
+        if failures:
+            idx = min(failures)
+            failure_info = '\n'.join(failures[idx])
+            raise signals.TestFailure(
+                f'Gnsstatus validate failed:\n{self.get_row(idx)}\n'
+                f'{failure_info}')
+
+
 class GnssSvidContainer:
     """A class to hold the satellite svid information
 
@@ -88,6 +267,22 @@ class GnssSvidContainer:
         else:
             self.not_used_in_fix[key].add(gnss_status.svid)
 
+    def add_table(self, gnssstatus_table):
+        """Add the unique satellite svids of a GnssStatusTable into container
+
+        Args:
+            gnssstatus_table: A GnssStatusTable object
+        """
+        columns = gnssstatus_table.columns
+        for used_in_fix, constellation, frequency_band, svid in set(
+                zip(columns['used_in_fix'], columns['constellation'],
+                    columns['frequency_band'], columns['svid'])):
+            key = f'{constellation}_{frequency_band}'
+            if used_in_fix:
+                self.used_in_fix[key].add(svid)
+            else:
+                self.not_used_in_fix[key].add(svid)
+
 
 class GnssStatus:
     """GnssStatus object, it will create an obj with a raw gnssstatus line.
@@ -113,26 +308,13 @@ class GnssStatus:
           / L5
     """
 
-    gnssstatus_re = (
-        r'Fix: (.*) Type: (.*) SV: (.*) C/No: (.*), (.*) '
-        r'Elevation: (.*) Azimuth: (.*) Signal: (.*) Frequency: (.*) EPH')
     failures = []
 
     def __init__(self, gnssstatus_raw):
-        status_res = re.search(self.gnssstatus_re, gnssstatus_raw)
-        if not status_res:
-            raise RegexParseException(f'Gnss raw msg parse fail:\n{gnssstatus_raw}\n'
-                                      f'Please check it manually.')
         self.raw_message = gnssstatus_raw
-        self.used_in_fix = status_res.group(1).lower() == 'true'
-        self.constellation = status_res.group(2)
-        self.svid = int(status_res.group(3))
-        self.cn = float(status_res.group(4))
-        self.base_cn = float(status_res.group(5))
-        self.elev = float(status_res.group(6))
-        self.azim = float(status_res.group(7))
-        self.frequency_band = status_res.group(8)
-        self.carrier_frequency = float(status_res.group(9))
+        (self.used_in_fix, self.constellation, self.svid, self.cn,
+         self.base_cn, self.elev, self.azim, self.frequency_band,
+         self.carrier_frequency) = parse_gnssstatus(gnssstatus_raw)
 
     def validate_gnssstatus(self):
         """A validate function for each property."""
@@ -20,6 +20,8 @@ import os
 import re
 import time
 
+import numpy
+
 import acts.controllers.power_monitor as power_monitor_lib
 import acts.controllers.monsoon as monsoon_controller
 import acts.controllers.iperf_server as ipf
@@ -30,6 +32,7 @@ from acts.metrics.loggers.blackbox import BlackboxMetricLogger
 from acts.controllers.adb_lib.error import AdbError
 from acts_contrib.test_utils.power.loggers.power_metric_logger import PowerMetricLogger
 from acts_contrib.test_utils.power import plot_utils
+from acts_contrib.test_utils.power import power_stats
 
 RESET_BATTERY_STATS = 'dumpsys batterystats --reset'
 IPERF_TIMEOUT = 180
@@ -230,6 +233,7 @@ class PowerBaseTest(base_test.BaseTestClass):
         # Reset result variables
         self.avg_current = 0
         self.samples = []
+        self.power_stats = None
         self.power_result.metric_value = 0
 
         # Set the device into rockbottom state
@@ -394,22 +398,36 @@ class PowerBaseTest(base_test.BaseTestClass):
     def collect_power_data(self):
         """Measure power, plot and take log if needed.
 
+        The Monsoon output file is read once, in chunks, to compute the
+        statistics in self.power_stats and the sample array.
+
         Returns:
-            A MonsoonResult object.
+            A numpy array of samples, in which each row holds a timestamp and
+            the sampled current in Amperes at that time.
         """
         # Collecting current measurement data and plot
-        samples = self.power_monitor_data_collect_save()
+        data_path = self.power_monitor_measure()
 
-        current = [sample[1] for sample in samples]
-        average_current = sum(current) * 1000 / len(current)
+        self.power_stats = power_stats.PowerStats()
+        chunks = []
+        for timestamps, currents in power_stats.read_monsoon_file(data_path):
+            self.power_stats.update(timestamps, currents)
+            chunks.append(numpy.column_stack((timestamps, currents)))
+        samples = numpy.concatenate(chunks) if chunks else numpy.empty((0, 2))
+        self.log.info(self.power_stats.summary())
 
+        average_current = self.power_stats.mean
         self.power_result.metric_value = (average_current * self.mon_voltage)
         self.avg_current = average_current
 
         plot_title = '{}_{}_{}'.format(self.test_name, self.dut.model,
                                        self.dut.build_info['build_id'])
-        plot_utils.current_waveform_plot(samples, self.mon_voltage,
-                                         self.mon_info.data_path, plot_title)
+        if len(samples):
+            plot_utils.current_waveform_plot(samples, self.mon_voltage,
+                                             self.mon_info.data_path,
+                                             plot_title)
+        else:
+            self.log.warning('No samples in {}.'.format(data_path))
 
         return samples
 
@@ -458,13 +476,22 @@ class PowerBaseTest(base_test.BaseTestClass):
     def power_monitor_data_collect_save(self):
         """Current measurement and save the log file.
 
-        Collect current data using Monsoon box and return the path of the
+        Collect current data using Monsoon box and return the samples of the
         log file. Take bug report if requested.
 
         Returns:
             A list of tuples in which the first element is a timestamp and the
             second element is the sampled current in Amperes at that time.
         """
+        data_path = self.power_monitor_measure()
+        return self.power_monitor.get_waveform(file_path=data_path)
+
+    def power_monitor_measure(self):
+        """Current measurement and save the log file.
+
+        Returns:
+            The path of the Monsoon output file.
+        """
 
         tag = '{}_{}_{}'.format(self.test_name, self.dut.model,
                                 self.dut.build_info['build_id'])
@@ -528,7 +555,7 @@ class PowerBaseTest(base_test.BaseTestClass):
 
         self.dut.start_services()
 
-        return self.power_monitor.get_waveform(file_path=data_path)
+        return data_path
 
     def process_iperf_results(self):
         """Get the iperf results and process.
@@ -69,8 +69,10 @@ class PowerCellularLabBaseTest(CBT.CellularBaseTest, PBT.PowerBaseTest):
         samples = super().collect_power_data()
         plot_title = '{}_{}_{}_histogram'.format(
             self.test_name, self.dut.model, self.dut.build_info['build_id'])
-        plot_utils.monsoon_histogram_plot(samples, self.mon_info.data_path,
-                                          plot_title)
+        plot_utils.monsoon_histogram_plot(samples,
+                                          self.mon_info.data_path,
+                                          plot_title,
+                                          stats=self.power_stats)
         return samples
 
     def teardown_test(self):
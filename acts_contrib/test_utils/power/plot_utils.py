@@ -28,7 +28,63 @@ from bokeh.plotting import figure, output_file, save
 from bokeh.layouts import layout
 
 
-def current_waveform_plot(samples, voltage, dest_path, plot_title):
+# Default number of points plotted in current waveforms
+DEFAULT_MAX_PLOT_POINTS = 20000
+# Resolution increase between level of detail tiers of current waveforms
+LOD_TIER_FACTOR = 4
+
+
+def get_min_max_envelope_indices(values, max_points):
+    """Selects the samples to plot to keep the envelope of a waveform.
+
+    The samples are split into max_points / 2 buckets of consecutive samples
+    and the minimum and maximum of each bucket are kept, so that spikes stay
+    visible after decimation.
+
+    Args:
+        values: numpy array of sample values.
+        max_points: maximum number of samples to select.
+    Returns:
+        A sorted numpy array with the indices of the selected samples.
+    """
+    num_samples = len(values)
+    if num_samples <= max_points:
+        return numpy.arange(num_samples)
+    bucket_size = math.ceil(num_samples / max(max_points // 2, 1))
+    num_buckets = math.ceil(num_samples / bucket_size)
+    # Pad the last bucket with copies of its last value
+    padded = numpy.empty(num_buckets * bucket_size, dtype=values.dtype)
+    padded[:num_samples] = values
+    padded[num_samples:] = values[-1]
+    buckets = padded.reshape(num_buckets, bucket_size)
+    offsets = numpy.arange(num_buckets) * bucket_size
+    indices = numpy.concatenate(
+        (offsets + numpy.argmin(buckets, axis=1),
+         offsets + numpy.argmax(buckets, axis=1), [0, num_samples - 1]))
+    return numpy.unique(numpy.minimum(indices, num_samples - 1))
+
+
+def _get_waveform_source(time_ms, current_data, indices):
+    """Creates the data source of a decimated current waveform.
+
+    Each plotted point also carries the sum and count of the samples from
+    its index up to the next plotted point, so that the average current of
+    a selection is computed over all the samples it covers.
+    """
+    return ColumnDataSource(
+        data=dict(x=time_ms[indices],
+                  y=current_data[indices],
+                  sum=numpy.add.reduceat(current_data, indices),
+                  count=numpy.diff(numpy.append(indices, len(current_data))),
+                  color=['navy'] * len(indices)))
+
+
+def current_waveform_plot(samples,
+                          voltage,
+                          dest_path,
+                          plot_title,
+                          max_points=DEFAULT_MAX_PLOT_POINTS,
+                          lod_tiers=1):
     """Plot the current data using bokeh interactive plotting tool.
 
     Plotting power measurement data with bokeh to generate interactive plots.
@@ -36,12 +92,20 @@ def current_waveform_plot(samples, voltage, dest_path, plot_title):
     provided widgets, which make the debugging much easier. To realize that,
     bokeh callback java scripting is used.
 
+    Long captures are decimated to at most max_points points, keeping the
+    minimum and maximum current of each time bucket. The statistics in the
+    data table are computed on all the samples.
+
     Args:
         samples: a list of tuples in which the first element is a timestamp and
           the second element is the sampled current in milli amps at that time.
         voltage: the voltage that was used during the measurement.
         dest_path: destination path.
         plot_title: a filename and title for the plot.
+        max_points: maximum number of points plotted for the whole capture.
+        lod_tiers: number of level of detail tiers embedded in the plot. Each
+          tier has LOD_TIER_FACTOR times more points than the previous one and
+          is shown when zooming in by that factor.
     Returns:
         plot: the plotting object of bokeh, optional, will be needed if multiple
            plots will be combined to one html file.
@@ -50,17 +114,26 @@ def current_waveform_plot(samples, voltage, dest_path, plot_title):
     """
     logging.info('Plotting the power measurement data.')
 
-    duration = samples[-1][0] - samples[0][0]
-    current_data = [sample[1] * 1000 for sample in samples]
-    avg_current = sum(current_data) / len(current_data)
-    color = ['navy'] * len(samples)
-    time_realtime = [
-        datetime.datetime.fromtimestamp(sample[0]) for sample in samples
-    ]
+    samples = numpy.asarray(samples, dtype=float)
+    timestamps = samples[:, 0]
+    current_data = samples[:, 1] * 1000
+    duration = timestamps[-1] - timestamps[0]
+    avg_current = numpy.mean(current_data)
+    # Bokeh shows datetimes as UTC, shift them to show the local time
+    utc_offset = (datetime.datetime.fromtimestamp(timestamps[0]) -
+                  datetime.datetime.utcfromtimestamp(timestamps[0]))
+    time_ms = (timestamps + utc_offset.total_seconds()) * 1000
 
     # Preparing the data and source link for bokehn java callback
-    source = ColumnDataSource(
-        data=dict(x=time_realtime, y=current_data, color=color))
+    sources = []
+    for tier in range(max(lod_tiers, 1)):
+        tier_points = max_points * LOD_TIER_FACTOR**tier
+        sources.append(
+            _get_waveform_source(
+                time_ms, current_data,
+                get_min_max_envelope_indices(current_data, tier_points)))
+        if tier_points >= len(current_data):
+            break
     s2 = ColumnDataSource(
         data=dict(a=[duration],
                   b=[round(avg_current, 2)],
@@ -91,8 +164,18 @@ def current_waveform_plot(samples, voltage, dest_path, plot_title):
                   tools=tools)
     plot.add_tools(bokeh_tools.WheelZoomTool(dimensions='width'))
     plot.add_tools(bokeh_tools.WheelZoomTool(dimensions='height'))
-    plot.line('x', 'y', source=source, line_width=2)
-    plot.circle('x', 'y', source=source, size=0.5, fill_color='color')
+    renderers = []
+    for tier, source in enumerate(sources):
+        renderers.append([
+            plot.line('x', 'y', source=source, line_width=2,
+                      visible=tier == 0),
+            plot.circle('x',
+                        'y',
+                        source=source,
+                        size=0.5,
+                        fill_color='color',
+                        visible=tier == 0)
+        ])
     plot.xaxis.axis_label = 'Time (s)'
     plot.yaxis.axis_label = 'Current (mA)'
     plot.xaxis.formatter = DatetimeTickFormatter(
@@ -103,15 +186,36 @@ def current_waveform_plot(samples, voltage, dest_path, plot_title):
         minsec=["%H:%M:%S"],
         hours=["%H:%M:%S"])
 
+    # Show the tier with enough detail for the visible time range
+    if len(sources) > 1:
+        lod_callback = CustomJS(args=dict(x_range=plot.x_range,
+                                          renderers=renderers,
+                                          full_range=time_ms[-1] - time_ms[0],
+                                          factor=LOD_TIER_FACTOR),
+                                code="""
+        const zoom = full_range / Math.max(x_range.end - x_range.start, 1);
+        const tier = Math.min(renderers.length - 1,
+            Math.max(0, Math.floor(Math.log(zoom) / Math.log(factor))));
+        for (var i = 0; i < renderers.length; i++) {
+          for (var j = 0; j < renderers[i].length; j++) {
+            renderers[i][j].visible = (i == tier)
+          }
+        }
+    """)
+        plot.x_range.js_on_change('start', lod_callback)
+        plot.x_range.js_on_change('end', lod_callback)
+
     # Callback JavaScript
-    source.selected.js_on_change(
-        "indices",
-        CustomJS(args=dict(source=source, mytable=dt),
-                 code="""
+    for source in sources:
+        source.selected.js_on_change(
+            "indices",
+            CustomJS(args=dict(source=source, mytable=dt),
+                     code="""
         const inds = source.selected.indices;
         const d1 = source.data;
         const d2 = mytable.source.data;
         var ym = 0
+        var count = 0
         var ts = 0
         var min=d1['x'][inds[0]]
         var max=d1['x'][inds[0]]
@@ -122,14 +226,15 @@ def current_waveform_plot(samples, voltage, dest_path, plot_title):
         d2['e'] = []
         if (inds.length==0) {return;}
         for (var i = 0; i < inds.length; i++) {
-        ym += d1['y'][inds[i]]
+        ym += d1['sum'][inds[i]]
+        count += d1['count'][inds[i]]
         d1['color'][inds[i]] = "red"
         if (d1['x'][inds[i]] < min) {
           min = d1['x'][inds[i]]}
         if (d1['x'][inds[i]] > max) {
           max = d1['x'][inds[i]]}
         }
-        ym /= inds.length
+        ym /= count
         ts = max - min
         d2['a'].push(Math.round(ts*1000.0)/1000000.0)
         d2['b'].push(Math.round(ym*100.0)/100.0)
@@ -145,7 +250,7 @@ def current_waveform_plot(samples, voltage, dest_path, plot_title):
     return plot, dt
 
 
-def monsoon_histogram_plot(samples, dest_path, plot_title):
+def monsoon_histogram_plot(samples, dest_path, plot_title, stats=None):
     """ Creates a histogram from a monsoon result object.
 
     Args:
@@ -153,14 +258,24 @@ def monsoon_histogram_plot(samples, dest_path, plot_title):
           the second element is the sampled current in milli amps at that time.
         dest_path: destination path
         plot_title: a filename and title for the plot.
+        stats: optional power_stats.PowerStats of the samples. If given, its
+          histogram is plotted instead of computing one from the samples.
     Returns:
         a tuple of arrays containing the values of the histogram and the
         bin edges.
     """
-    milli_amps = [sample[1] * 1000 for sample in samples]
-    hist, edges = numpy.histogram(milli_amps,
-                                  bins=math.ceil(max(milli_amps)),
-                                  range=(0, max(milli_amps)))
+    if stats is not None:
+        num_bins = max(
+            1,
+            min(math.ceil(stats.max_current / stats.histogram_bin_width),
+                len(stats.histogram)))
+        hist = stats.histogram[:num_bins]
+        edges = stats.histogram_edges[:num_bins + 1]
+    else:
+        milli_amps = numpy.asarray(samples, dtype=float)[:, 1] * 1000
+        hist, edges = numpy.histogram(milli_amps,
+                                      bins=math.ceil(max(milli_amps)),
+                                      range=(0, max(milli_amps)))
 
     output_file(os.path.join(dest_path, plot_title + '.html'))
 
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2022 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the 'License');
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an 'AS IS' BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import math
+
+import numpy
+
+# Size of the chunks read from Monsoon output files
+DEFAULT_CHUNK_BYTES = 1 << 22
+# Default histogram range and bin width in mA
+DEFAULT_HISTOGRAM_MAX_CURRENT = 8000
+DEFAULT_HISTOGRAM_BIN_WIDTH = 1.0
+# Default duration of the windows averaged by PowerStats in seconds
+DEFAULT_WINDOW_DURATION = 1.0
+
+
+def read_monsoon_file(file_path, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """Reads the samples of a Monsoon output file in chunks.
+
+    Each line of the file holds a timestamp in seconds, followed by an 's',
+    and a current sample in amps.
+
+    Args:
+        file_path: path to the Monsoon output file.
+        chunk_bytes: approximate size of the chunks read from the file.
+    Yields:
+        A tuple of numpy arrays with the timestamps and the currents in amps
+        of the samples in a chunk. Nothing is yielded for an empty file.
+    Raises:
+        ValueError: if a line does not hold a timestamp and a current.
+    """
+    with open(file_path, 'r') as monsoon_file:
+        while True:
+            lines = monsoon_file.readlines(chunk_bytes)
+            if not lines:
+                return
+            lines = [line.replace('s', ' ') for line in lines if line.strip()]
+            if not lines:
+                continue
+            try:
+                values = numpy.loadtxt(lines, ndmin=2)
+            except ValueError as e:
+                raise ValueError('Malformed Monsoon output file {}: {}'.format(
+                    file_path, e))
+            if values.shape[1] != 2:
+                raise ValueError(
+                    'Malformed Monsoon output file {}'.format(file_path))
+            yield values[:, 0], values[:, 1]
+
+
+class PowerStats(object):
+    """Statistics of current samples, accumulated in a single pass.
+
+    Samples are added in chunks with update(). Memory use does not depend on
+    the number of samples: percentiles are computed from a histogram with
+    fixed bins, and averages over windows of window_duration seconds are kept
+    as one sum and count per window.
+
+    Attributes:
+        count: number of samples.
+        min_current: minimum current in mA.
+        max_current: maximum current in mA.
+        start_time: timestamp of the first sample in seconds.
+        end_time: timestamp of the last sample in seconds.
+        window_duration: duration of the averaged windows in seconds.
+        histogram_edges: edges of the histogram bins in mA.
+        histogram: number of samples in each histogram bin. Samples out of the
+            histogram range are counted in the first or last bin.
+    """
+
+    def __init__(self,
+                 window_duration=DEFAULT_WINDOW_DURATION,
+                 histogram_max_current=DEFAULT_HISTOGRAM_MAX_CURRENT,
+                 histogram_bin_width=DEFAULT_HISTOGRAM_BIN_WIDTH):
+        self.count = 0
+        self.min_current = math.inf
+        self.max_current = -math.inf
+        self.start_time = None
+        self.end_time = None
+        self.window_duration = window_duration
+        self.histogram_bin_width = histogram_bin_width
+        num_bins = math.ceil(histogram_max_current / histogram_bin_width)
+        self.histogram_edges = numpy.arange(num_bins + 1) * histogram_bin_width
+        self.histogram = numpy.zeros(num_bins, dtype=numpy.int64)
+        self._sum = 0.0
+        self._window_sums = numpy.zeros(0)
+        self._window_counts = numpy.zeros(0, dtype=numpy.int64)
+
+    def update(self, timestamps, currents):
+        """Adds a chunk of samples.
+
+        Args:
+            timestamps: numpy array of sample timestamps in seconds.
+            currents: numpy array of current samples in amps.
+        """
+        if not len(currents):
+            return
+        milli_amps = currents * 1000
+        if self.start_time is None:
+            self.start_time = timestamps[0]
+        self.end_time = timestamps[-1]
+        self.count += len(milli_amps)
+        self._sum += numpy.sum(milli_amps)
+        self.min_current = min(self.min_current, numpy.min(milli_amps))
+        self.max_current = max(self.max_current, numpy.max(milli_amps))
+
+        bins = numpy.clip(
+            (milli_amps / self.histogram_bin_width).astype(numpy.int64), 0,
+            len(self.histogram) - 1)
+        self.histogram += numpy.bincount(bins, minlength=len(self.histogram))
+
+        windows = ((timestamps - self.start_time) //
+                   self.window_duration).astype(numpy.int64)
+        num_windows = max(windows[-1] + 1, len(self._window_sums))
+        self._window_sums = numpy.pad(
+            self._window_sums, (0, num_windows - len(self._window_sums)))
+        self._window_counts = numpy.pad(
+            self._window_counts, (0, num_windows - len(self._window_counts)))
+        self._window_sums += numpy.bincount(windows,
+                                            weights=milli_amps,
+                                            minlength=num_windows)
+        self._window_counts += numpy.bincount(windows, minlength=num_windows)
+
+    @property
+    def mean(self):
+        """Average current in mA."""
+        return self._sum / self.count if self.count else 0
+
+    @property
+    def duration(self):
+        """Time between the first and the last sample in seconds."""
+        return self.end_time - self.start_time if self.count else 0
+
+    def energy(self, voltage):
+        """Average energy in mW*s over the duration of the samples."""
+        return self.mean * voltage * self.duration
+
+    def percentile(self, percent):
+        """Gets a percentile of the currents in mA.
+
+        The percentile is the upper edge of the histogram bin it falls in,
+        bounded by the minimum and maximum currents.
+        """
+        if not self.count:
+            return 0
+        cumulative_count = numpy.cumsum(self.histogram)
+        bin_idx = numpy.searchsorted(cumulative_count,
+                                     self.count * percent / 100)
+        return min(max(self.histogram_edges[bin_idx + 1], self.min_current),
+                   self.max_current)
+
+    @property
+    def window_averages(self):
+        """Average current in mA of each window with samples."""
+        has_samples = self._window_counts > 0
+        return (self._window_sums[has_samples] /
+                self._window_counts[has_samples])
+
+    def summary(self):
+        """Gets a string describing the statistics."""
+        return ('{} samples over {:.2f}s: average {:.2f}mA, min {:.2f}mA, '
+                'max {:.2f}mA, median {:.2f}mA, 99th percentile '
+                '{:.2f}mA'.format(self.count, self.duration, self.mean,
+                                  self.min_current, self.max_current,
+                                  self.percentile(50), self.percentile(99)))
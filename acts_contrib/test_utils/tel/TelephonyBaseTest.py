@@ -47,6 +47,7 @@ from acts_contrib.test_utils.tel.tel_ims_utils import activate_wfc_on_device
 from acts_contrib.test_utils.tel.tel_logging_utils import disable_qxdm_logger
 from acts_contrib.test_utils.tel.tel_logging_utils import get_screen_shot_log
 from acts_contrib.test_utils.tel.tel_logging_utils import get_tcpdump_log
+from acts_contrib.test_utils.tel.tel_logging_utils import release_logcat_index
 from acts_contrib.test_utils.tel.tel_logging_utils import set_qxdm_logger_command
 from acts_contrib.test_utils.tel.tel_logging_utils import start_dsp_logger
 from acts_contrib.test_utils.tel.tel_logging_utils import start_qxdm_logger
@@ -88,6 +89,7 @@ from acts_contrib.test_utils.tel.tel_test_utils import toggle_airplane_mode
 from acts_contrib.test_utils.tel.tel_test_utils import unlock_sim
 from acts_contrib.test_utils.tel.tel_test_utils import wait_for_sim_ready_by_adb
 from acts_contrib.test_utils.tel.tel_test_utils import wait_for_sims_ready_by_adb
+from acts_contrib.test_utils.tel.tel_wait_utils import WAIT_METRICS
 from acts_contrib.test_utils.tel.tel_wifi_utils import ensure_wifi_connected
 
 
@@ -505,10 +507,13 @@ class TelephonyBaseTest(BaseTestClass):
                 recover_build_id(ad)
         except Exception as e:
             self.log.error("Failure with %s", e)
+        release_logcat_index(ad)
 
     def teardown_class(self):
         tasks = [(self._teardown_device, [ad]) for ad in self.android_devices]
         multithread_func(self.log, tasks)
+        WAIT_METRICS.log_summary(self.log)
+        WAIT_METRICS.reset()
         return True
 
     def setup_test(self):
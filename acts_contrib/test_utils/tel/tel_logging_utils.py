@@ -14,10 +14,13 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import array
+import bisect
 from datetime import datetime
 import os
 import re
 import shutil
+import threading
 import time
 
 from acts import utils
@@ -44,6 +47,12 @@ _LS_GET_LOG_STATUS_SHELL = 'getprop vendor.sys.modem.logging.status'
 _LS_START_LS_TIMEOUT_SECS = 30
 _LS_STOP_LS_TIMEOUT_SECS = 30
 
+LOGCAT_POLL_INTERVAL = 0.2
+LOGCAT_TIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+LOGCAT_LINE_REGEX = re.compile(r"(\S+\s\S+)")
+LOGCAT_DATE_REGEX = re.compile(r"\d{4}-\d{2}-\d{2}$")
+LOGCAT_MESSAGE_ID_REGEX = re.compile(r".*\[(\d+)\]")
+
 def check_if_tensor_platform(ad):
     """Check if current platform belongs to the Tensor platform
 
@@ -537,14 +546,483 @@ def get_tcpdump_log(ad, test_name="", begin_time=None):
     return True
 
 
+class LogcatWatch(object):
+    """Logcat lines matching a pattern, collected by a LogcatTailer.
+
+    Matches use the search_logcat format, i.e., dicts with the full
+    log_message, the time_stamp string and the datetime_obj. Watches can be
+    used as context managers to remove them from the tailer on exit.
+
+    Attributes:
+        pattern: compiled regular expression matched against each line.
+        matches: list of matching lines found so far.
+    """
+    def __init__(self, tailer, pattern, callback=None, begin_time=None,
+                 end_time=None):
+        self.tailer = tailer
+        self.pattern = re.compile(pattern)
+        self.callback = callback
+        self.begin_time = _epoch_to_datetime(begin_time)
+        self.end_time = _epoch_to_datetime(end_time)
+        self.matches = []
+        self._next_match = 0
+        self._match_event = threading.Event()
+        # Matches from the tailer wait here until the history is added
+        self._pending = []
+        self._cancelled = False
+        self._lock = threading.RLock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.cancel()
+
+    def _on_line(self, line):
+        """Records a line if it matches and is within the time range."""
+        if not self.pattern.search(line):
+            return
+        log = _parse_logcat_line(line)
+        if log is None:
+            return
+        if self.begin_time and log["datetime_obj"] < self.begin_time:
+            return
+        if self.end_time and log["datetime_obj"] > self.end_time:
+            return
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(log)
+            else:
+                self._add_matches([log])
+
+    def _add_history(self, logs):
+        """Records the matches logged before the watch was registered."""
+        with self._lock:
+            pending = self._pending
+            self._pending = None
+            self._add_matches(logs + pending)
+
+    def _add_matches(self, logs):
+        for log in logs:
+            if self._cancelled:
+                return
+            self.matches.append(log)
+            self._match_event.set()
+            if self.callback:
+                self.callback(log)
+
+    def wait(self, timeout):
+        """Waits for at least one match.
+
+        Args:
+            timeout: maximum time to wait in seconds.
+
+        Returns:
+            All matches found so far, an empty list on timeout.
+        """
+        self._match_event.wait(timeout)
+        return list(self.matches)
+
+    def get_new_matches(self, timeout=0):
+        """Gets the matches found since the previous call.
+
+        Args:
+            timeout: maximum time in seconds to wait for a new match.
+        """
+        if self._next_match == len(self.matches):
+            self._match_event.clear()
+            if self._next_match == len(self.matches):
+                self._match_event.wait(timeout)
+        new_matches = self.matches[self._next_match:]
+        self._next_match += len(new_matches)
+        return new_matches
+
+    def cancel(self):
+        """Stops collecting matches, also from within the callback."""
+        self._cancelled = True
+        self.tailer.remove_watch(self)
+
+
+class LogcatTailer(object):
+    """Follows the adb logcat file of a device and dispatches new lines.
+
+    Instead of rescanning the whole logcat file with search_logcat for every
+    poll, a tailer thread reads the lines appended to the file since its
+    last read and checks them once against a combined pattern of all
+    registered watches. The thread only runs while watches are registered.
+    Lines logged before a watch is registered are searched in the
+    LogcatIndex of the logcat file.
+    """
+    def __init__(self, ad, poll_interval=LOGCAT_POLL_INTERVAL):
+        self.ad = ad
+        self.logcat_path = _get_logcat_path(ad)
+        self.poll_interval = poll_interval
+        self._offset = 0
+        self._watches = []
+        self._combined_pattern = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def watch(self, pattern, callback=None, begin_time=None, end_time=None):
+        """Registers a pattern to match against logcat lines.
+
+        Lines already written to the logcat file are matched when the watch
+        is registered, so that matches after begin_time are found like with
+        search_logcat.
+
+        Args:
+            pattern: regular expression to search in each line.
+            callback: function called with each match, from the tailer
+                thread for new lines. Callbacks may cancel their watch.
+            begin_time: only lines with later time stamps are matched.
+            end_time: only lines with earlier time stamps are matched.
+
+        Returns:
+            A LogcatWatch collecting the matching lines.
+        """
+        logcat_watch = LogcatWatch(self, pattern, callback, begin_time,
+                                   end_time)
+        logcat_index = _get_logcat_index(self.ad.serial, self.logcat_path)
+        with self._lock:
+            if not self._watches:
+                # Lines indexed while no watch was registered are skipped
+                self._offset = logcat_index.indexed_size
+            history_offset = self._offset
+            self._watches.append(logcat_watch)
+            self._combined_pattern = re.compile("|".join(
+                "(?:%s)" % watch.pattern.pattern for watch in self._watches))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._follow,
+                                                daemon=True)
+                self._thread.start()
+        # The tailer thread may have read further since the first update
+        logcat_index.update()
+        logcat_watch._add_history(
+            logcat_index.search([pattern],
+                                begin_time,
+                                end_time,
+                                end_offset=history_offset))
+        return logcat_watch
+
+    def remove_watch(self, logcat_watch):
+        """Unregisters a watch, stopping the tailer after the last one."""
+        with self._lock:
+            if logcat_watch not in self._watches:
+                return
+            self._watches.remove(logcat_watch)
+            self._combined_pattern = re.compile("|".join(
+                "(?:%s)" % watch.pattern.pattern
+                for watch in self._watches)) if self._watches else None
+
+    def _follow(self):
+        while True:
+            with self._lock:
+                if not self._watches:
+                    self._thread = None
+                    return
+                lines = self._read_new_lines()
+                watches = list(self._watches)
+            # Callbacks run without the lock so that they can cancel watches
+            for line in lines:
+                for logcat_watch in watches:
+                    logcat_watch._on_line(line)
+            time.sleep(self.poll_interval)
+
+    def _read_new_lines(self):
+        """Reads the new lines matching the pattern of any watch."""
+        try:
+            file_size = os.path.getsize(self.logcat_path)
+        except OSError:
+            return []
+        if file_size < self._offset:
+            # Logcat file was recreated
+            self._offset = 0
+        if file_size == self._offset:
+            return []
+        lines = []
+        with open(self.logcat_path, "rb") as logcat_file:
+            logcat_file.seek(self._offset)
+            for raw_line in logcat_file:
+                # Partial last lines are read again once complete
+                if not raw_line.endswith(b"\n"):
+                    break
+                self._offset += len(raw_line)
+                line = raw_line.decode("utf-8", errors="replace").rstrip()
+                if self._combined_pattern.search(line):
+                    lines.append(line)
+        return lines
+
+
+class LogcatIndex(object):
+    """Time stamps and byte offsets of the logcat lines of a device.
+
+    Lines are read incrementally from the adb logcat file on each update.
+    Only the time stamp of each line, as an integer sorting like the time
+    stamp string, and the byte offset of the line in the file are kept,
+    sorted by time stamp. Time ranges are found by binary search and the
+    lines within a range are read back from the file when searched.
+
+    Attributes:
+        logcat_path: path of the adb logcat file.
+    """
+    def __init__(self, logcat_path):
+        self.logcat_path = logcat_path
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self._time_keys = array.array("q")
+        self._offsets = array.array("q")
+        self._day_keys = {}
+        self._fraction_digits = None
+        self._offset = 0
+
+    def __len__(self):
+        return len(self._offsets)
+
+    @property
+    def indexed_size(self):
+        """Size in bytes of the part of the logcat file indexed so far."""
+        return self._offset
+
+    def update(self):
+        """Indexes the lines appended to the logcat file since last update."""
+        with self._lock:
+            try:
+                file_size = os.path.getsize(self.logcat_path)
+            except OSError:
+                return
+            if file_size < self._offset:
+                # Logcat file was recreated
+                self._clear()
+            if file_size == self._offset:
+                return
+            num_lines = len(self._offsets)
+            offset = self._offset
+            with open(self.logcat_path, "rb") as logcat_file:
+                logcat_file.seek(offset)
+                for raw_line in logcat_file:
+                    # Partial last lines are indexed once complete
+                    if not raw_line.endswith(b"\n"):
+                        break
+                    self._add_line(raw_line, offset)
+                    offset += len(raw_line)
+            self._offset = offset
+            time_keys = self._time_keys
+            if any(time_keys[idx] < time_keys[idx - 1]
+                   for idx in range(max(num_lines, 1), len(time_keys))):
+                self._sort()
+
+    def _add_line(self, raw_line, offset):
+        # Format: date time pid tid level tag: message
+        fields = raw_line.split(None, 5)
+        if len(fields) < 6:
+            return
+        date = fields[0].decode("ascii", errors="replace")
+        if not LOGCAT_DATE_REGEX.match(date):
+            return
+        time = fields[1].decode("ascii", errors="replace")
+        try:
+            time_key = self._get_time_key(date, time)
+        except ValueError:
+            return
+        if self._fraction_digits is None:
+            self._fraction_digits = len(time.rpartition(".")[2])
+        self._time_keys.append(time_key)
+        self._offsets.append(offset)
+
+    def _get_time_key(self, date, time):
+        """Converts logcat date and time strings to a sortable integer.
+
+        Raises:
+            ValueError: if the date or time are malformed.
+        """
+        day_key = self._day_keys.get(date)
+        if day_key is None:
+            day_key = datetime.strptime(date, "%Y-%m-%d").toordinal() * 10**12
+            self._day_keys[date] = day_key
+        clock, _, fraction = time.partition(".")
+        return (day_key + int(clock.replace(":", "")) * 10**6 +
+                int(fraction[:6].ljust(6, "0")))
+
+    def _sort(self):
+        order = sorted(range(len(self._offsets)),
+                       key=self._time_keys.__getitem__)
+        self._time_keys = array.array(
+            "q", [self._time_keys[idx] for idx in order])
+        self._offsets = array.array("q",
+                                    [self._offsets[idx] for idx in order])
+
+    def _to_time_key(self, time):
+        """Converts a datetime or epoch time in ms like the indexed lines."""
+        time_stamp = _epoch_to_datetime(time).strftime(LOGCAT_TIME_FORMAT)
+        if self._fraction_digits:
+            time_stamp = time_stamp[:len(time_stamp) - 6 +
+                                    self._fraction_digits]
+        return self._get_time_key(*time_stamp.split(" "))
+
+    def get_range(self, begin_time=None, end_time=None):
+        """Gets the indices of the lines within a time range.
+
+        Args:
+            begin_time: datetime or epoch time in ms of the first line.
+            end_time: datetime or epoch time in ms of the last line.
+
+        Returns:
+            A range of line indices.
+        """
+        begin_idx = 0
+        end_idx = len(self._offsets)
+        if begin_time:
+            begin_idx = bisect.bisect_left(self._time_keys,
+                                           self._to_time_key(begin_time))
+        if end_time:
+            end_idx = bisect.bisect_right(self._time_keys,
+                                          self._to_time_key(end_time))
+        return range(begin_idx, end_idx)
+
+    def read_lines(self, line_range, end_offset=None):
+        """Reads the indexed lines of a range of indices from the file.
+
+        Args:
+            line_range: range of line indices, see get_range.
+            end_offset: only lines starting before this byte offset are read.
+
+        Yields:
+            The lines in time stamp order, without line endings.
+        """
+        with self._lock:
+            offsets = self._offsets[line_range.start:line_range.stop]
+        position = None
+        with open(self.logcat_path, "rb") as logcat_file:
+            for offset in offsets:
+                if end_offset is not None and offset >= end_offset:
+                    continue
+                # Lines logged in order are read without seeking
+                if offset != position:
+                    logcat_file.seek(offset)
+                raw_line = logcat_file.readline()
+                position = offset + len(raw_line)
+                yield raw_line.decode("utf-8", errors="replace").rstrip("\r\n")
+
+    def search(self, patterns, begin_time=None, end_time=None,
+               end_offset=None):
+        """Searches indexed lines matching any of the given patterns.
+
+        Args:
+            patterns: list of regular expressions.
+            begin_time: datetime or epoch time in ms, only later lines are
+                searched.
+            end_time: datetime or epoch time in ms, only earlier lines are
+                searched.
+            end_offset: only lines starting before this byte offset are
+                searched.
+
+        Returns:
+            A list of dicts in search_logcat format, i.e., with the full
+            log_message, the time_stamp string, the datetime_obj and the
+            message_id, sorted by time stamp.
+        """
+        combined_pattern = re.compile("|".join(
+            "(?:%s)" % pattern for pattern in patterns))
+        result = []
+        try:
+            for line in self.read_lines(self.get_range(begin_time, end_time),
+                                        end_offset):
+                if combined_pattern.search(line):
+                    log = _parse_logcat_line(line)
+                    if log:
+                        result.append(log)
+        except OSError:
+            # Logcat file was removed since the last update
+            pass
+        return result
+
+
+_logcat_indices = {}
+_logcat_indices_lock = threading.Lock()
+
+
+def get_logcat_index(ad):
+    """Gets the updated LogcatIndex of a device, shared by all callers.
+
+    Indices are kept per logcat file, so a new index is created when the
+    device log path changes.
+    """
+    return _get_logcat_index(ad.serial, _get_logcat_path(ad))
+
+
+def _get_logcat_index(serial, logcat_path):
+    with _logcat_indices_lock:
+        if (serial, logcat_path) not in _logcat_indices:
+            _logcat_indices[(serial, logcat_path)] = LogcatIndex(logcat_path)
+        logcat_index = _logcat_indices[(serial, logcat_path)]
+    logcat_index.update()
+    return logcat_index
+
+
+def release_logcat_index(ad):
+    """Drops the LogcatIndex of all logcat files of a device."""
+    with _logcat_indices_lock:
+        for key in [key for key in _logcat_indices if key[0] == ad.serial]:
+            del _logcat_indices[key]
+
+
+_logcat_tailers = {}
+_logcat_tailers_lock = threading.Lock()
+
+
+def get_logcat_tailer(ad):
+    """Gets the LogcatTailer of a device, shared by all callers."""
+    logcat_path = _get_logcat_path(ad)
+    with _logcat_tailers_lock:
+        if (ad.serial, logcat_path) not in _logcat_tailers:
+            _logcat_tailers[(ad.serial, logcat_path)] = LogcatTailer(ad)
+        return _logcat_tailers[(ad.serial, logcat_path)]
+
+
+def _get_logcat_path(ad):
+    return os.path.join(ad.device_log_path, "adblog_%s_debug.txt" % ad.serial)
+
+
+def _epoch_to_datetime(epoch_time):
+    """Converts epoch time in milliseconds to datetime, None if not set.
+
+    Datetime objects are returned as is.
+    """
+    if not epoch_time:
+        return None
+    if isinstance(epoch_time, datetime):
+        return epoch_time
+    return datetime.fromtimestamp(epoch_time / 1000)
+
+
+def _parse_logcat_line(line):
+    """Parses a logcat line in the format returned by search_logcat."""
+    match = LOGCAT_LINE_REGEX.match(line)
+    if not match:
+        return None
+    try:
+        time_obj = datetime.strptime(match.group(1), LOGCAT_TIME_FORMAT)
+    except ValueError:
+        return None
+    message_id = LOGCAT_MESSAGE_ID_REGEX.match(line, match.end())
+    return {
+        "log_message": line,
+        "time_stamp": match.group(1),
+        "datetime_obj": time_obj,
+        "message_id": message_id.group(1) if message_id else None
+    }
+
+
 def wait_for_log(ad, pattern, begin_time=None, end_time=None, max_wait_time=120):
-    """Wait for logcat logs matching given pattern. This function searches in
-    logcat for strings matching given pattern by using search_logcat per second
-    until max_wait_time reaches.
+    """Wait for logcat logs matching given pattern. This function follows
+    logcat with the LogcatTailer of the device until a line matches the given
+    pattern or max_wait_time reaches.
 
     Args:
         ad: android device object
-        pattern: pattern to be searched in grep format
+        pattern: regular expression to be searched in each line
         begin_time: only the lines in logcat with time stamps later than
             begin_time will be searched.
         end_time: only the lines in logcat with time stamps earlier than
@@ -555,19 +1033,12 @@ def wait_for_log(ad, pattern, begin_time=None, end_time=None, max_wait_time=120)
         All matched lines will be returned. If no line matches the given pattern
         None will be returned.
     """
-    start_time = datetime.now()
-    while True:
-        ad.log.info(
-            '====== Searching logcat for "%s" ====== ', pattern)
-        res = ad.search_logcat(
-            pattern, begin_time=begin_time, end_time=end_time)
-        if res:
-            return res
-        time.sleep(1)
-        stop_time = datetime.now()
-        passed_time = (stop_time - start_time).total_seconds()
-        if passed_time > max_wait_time:
-            return
+    ad.log.info('====== Waiting for logcat "%s" ====== ', pattern)
+    with get_logcat_tailer(ad).watch(pattern,
+                                     begin_time=begin_time,
+                                     end_time=end_time) as logcat_watch:
+        res = logcat_watch.wait(max_wait_time)
+    return res or None
 
 
 def extract_test_log(log, src_file, dst_file, test_tag):
@@ -20,6 +20,7 @@ import statistics
 
 from acts import signals
 from acts_contrib.test_utils.tel.tel_defines import INVALID_SUB_ID
+from acts_contrib.test_utils.tel.tel_logging_utils import get_logcat_index
 from acts_contrib.test_utils.tel.tel_subscription_utils import get_slot_index_from_data_sub_id
 from acts_contrib.test_utils.tel.tel_subscription_utils import get_slot_index_from_voice_sub_id
 from acts_contrib.test_utils.tel.tel_subscription_utils import get_subid_from_slot_index
@@ -215,11 +216,11 @@ def parse_setup_data_call(ad, apn='internet', dds_switch=False):
             LTE
     """
     ad.log.info('====== Start to search logcat ====== ')
-    logcat = ad.search_logcat(
-        r'%s\|%s\|%s\|%s' % (
-            SET_PREFERRED_DATA_MODEM,
-            SETUP_DATA_CALL,
-            UNSOL_DATA_CALL_LIST_CHANGED, IS_CAPTIVEPORTAL))
+    logcat = get_logcat_index(ad).search([
+        SET_PREFERRED_DATA_MODEM,
+        SETUP_DATA_CALL,
+        UNSOL_DATA_CALL_LIST_CHANGED,
+        re.escape(IS_CAPTIVEPORTAL)])
 
     if not logcat:
         return False
@@ -517,8 +518,8 @@ def parse_setup_data_call_on_iwlan(ad):
         avg_data_call_setup_time: average of data call setup time
     """
     ad.log.info('====== Start to search logcat ====== ')
-    logcat = ad.search_logcat(r'%s\|%s' % (
-        IWLAN_DATA_SERVICE, WHI_IWLAN_DATA_SERVICE))
+    logcat = get_logcat_index(ad).search([
+        IWLAN_DATA_SERVICE, WHI_IWLAN_DATA_SERVICE])
 
     found_iwlan_data_service = 1
     if not logcat:
@@ -767,8 +768,8 @@ def parse_deactivate_data_call(ad):
         avg_deactivate_data_call_time: average of data call deactivation time
     """
     ad.log.info('====== Start to search logcat ====== ')
-    logcat = ad.search_logcat(
-        r'%s\|%s' % (DEACTIVATE_DATA_CALL, UNSOL_DATA_CALL_LIST_CHANGED))
+    logcat = get_logcat_index(ad).search(
+        [DEACTIVATE_DATA_CALL, UNSOL_DATA_CALL_LIST_CHANGED])
     if not logcat:
         return False
 
@@ -948,8 +949,8 @@ def parse_deactivate_data_call_on_iwlan(ad):
         avg_deactivate_data_call_time: average of data call deactivation time
     """
     ad.log.info('====== Start to search logcat ====== ')
-    logcat = ad.search_logcat(r'%s\|%s' % (
-        IWLAN_DATA_SERVICE, WHI_IWLAN_DATA_SERVICE))
+    logcat = get_logcat_index(ad).search([
+        IWLAN_DATA_SERVICE, WHI_IWLAN_DATA_SERVICE])
 
     found_iwlan_data_service = 1
     if not logcat:
@@ -1189,9 +1190,10 @@ def parse_ims_reg(
     }
 
     ad.log.info('====== Start to search logcat ======')
-    logcat = ad.search_logcat('%s\|%s' % (
-        start_command[reboot_or_apm][str(slot)][rat],
-        end_command[str(slot)][rat]))
+    logcat_index = get_logcat_index(ad)
+    patterns = [start_command[reboot_or_apm][str(slot)][rat],
+                end_command[str(slot)][rat]]
+    logcat = logcat_index.search(patterns)
 
     if not logcat:
         raise signals.TestFailure('Failed',
@@ -1229,13 +1231,7 @@ def parse_ims_reg(
             ad.log.info('Parsing end time: %s', end_time)
 
             temp_keyword_dict = copy.deepcopy(keyword_dict)
-            for line in logcat:
-                if begin_time and line['datetime_obj'] < begin_time:
-                    continue
-
-                if end_time and line['datetime_obj'] > end_time:
-                    break
-
+            for line in logcat_index.search(patterns, begin_time, end_time):
                 for key in temp_keyword_dict:
                     if temp_keyword_dict[key] and not isinstance(
                         temp_keyword_dict[key], dict):
@@ -1642,16 +1638,14 @@ def parse_sms_delivery_time(log, ad_mo, ad_mt, rat='4g'):
         None
     """
     ad_mo.log.info('====== Start to search logcat ====== ')
-    mo_logcat = ad_mo.search_logcat(
-        r'%s\|%s\|%s\|%s' % (
-            SMS_SEND_TEXT_MESSAGE,
-            SEND_SMS,
-            SEND_SMS_REQUEST_OVER_IMS,
-            SEND_SMS_RESPONSE_OVER_IMS))
+    mo_logcat = get_logcat_index(ad_mo).search([
+        SMS_SEND_TEXT_MESSAGE,
+        SEND_SMS,
+        SEND_SMS_REQUEST_OVER_IMS,
+        SEND_SMS_RESPONSE_OVER_IMS])
     ad_mt.log.info('====== Start to search logcat ====== ')
-    mt_logcat = ad_mt.search_logcat(
-        r'%s\|%s\|%s' % (
-            UNSOL_RESPONSE_NEW_SMS, SMS_RECEIVED, SMS_RECEIVED_OVER_IMS))
+    mt_logcat = get_logcat_index(ad_mt).search(
+        [UNSOL_RESPONSE_NEW_SMS, SMS_RECEIVED, SMS_RECEIVED_OVER_IMS])
 
     for msg in mo_logcat:
         ad_mo.log.info(msg["log_message"])
@@ -1760,12 +1754,12 @@ def parse_mms(ad_mo, ad_mt):
     mt_setup_time_list = []
 
     ad_mo.log.info('====== Start to search logcat ====== ')
-    mo_logcat = ad_mo.search_logcat(MMS_SERVICE)
+    mo_logcat = get_logcat_index(ad_mo).search([MMS_SERVICE])
     for msg in mo_logcat:
         ad_mo.log.info(msg["log_message"])
 
     ad_mt.log.info('====== Start to search logcat ====== ')
-    mt_logcat = ad_mt.search_logcat(MMS_SERVICE)
+    mt_logcat = get_logcat_index(ad_mt).search([MMS_SERVICE])
     for msg in mt_logcat:
         ad_mt.log.info(msg["log_message"])
 
@@ -1874,9 +1868,9 @@ def parse_cst_reg(ad, slot, search_intervals=None):
         }
     }
     ad.log.info('====== Start to search logcat ====== ')
-    logcat = ad.search_logcat(
-        '%s\|%s' % (
-            cst['ims_registered'][str(slot)], cst['iwlan'][str(slot)]))
+    logcat_index = get_logcat_index(ad)
+    patterns = [cst['ims_registered'][str(slot)], cst['iwlan'][str(slot)]]
+    logcat = logcat_index.search(patterns)
 
     for line in logcat:
         msg = line["log_message"]
@@ -1899,13 +1893,7 @@ def parse_cst_reg(ad, slot, search_intervals=None):
             ad.log.info('Parsing end time: %s', end_time)
 
             temp_keyword_dict = copy.deepcopy(keyword_dict)
-            for line in logcat:
-                if begin_time and line['datetime_obj'] < begin_time:
-                    continue
-
-                if end_time and line['datetime_obj'] > end_time:
-                    break
-
+            for line in logcat_index.search(patterns, begin_time, end_time):
                 for key in temp_keyword_dict:
                     if temp_keyword_dict[key] and not isinstance(
                         temp_keyword_dict[key], dict):
@@ -1948,20 +1936,14 @@ def check_ims_cst_reg(ad, slot, search_interval=None):
         '0': IMS_REGISTERED_CST_SLOT0,
         '1': IMS_REGISTERED_CST_SLOT1
     }
-    logcat = ad.search_logcat('%s' % ims_cst_reg[str(slot)])
     if isinstance(search_interval, list):
         try:
             begin_time, end_time = search_interval
         except Exception as e:
             ad.log.error(e)
 
-        for line in logcat:
-            if begin_time and line['datetime_obj'] < begin_time:
-                continue
-
-            if end_time and line['datetime_obj'] > end_time:
-                break
-
+        for line in get_logcat_index(ad).search(
+                [ims_cst_reg[str(slot)]], begin_time, end_time):
             res = re.findall(ims_cst_reg[str(slot)], line['log_message'])
             if res:
                 ad.log.info(
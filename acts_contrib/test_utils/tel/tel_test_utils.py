@@ -18,6 +18,7 @@ from typing import Sequence
 from future import standard_library
 standard_library.install_aliases()
 
+import functools
 import json
 import logging
 import re
@@ -116,6 +117,8 @@ from acts_contrib.test_utils.tel.tel_subscription_utils import get_subid_from_sl
 from acts_contrib.test_utils.tel.tel_subscription_utils import get_outgoing_voice_sub_id
 from acts_contrib.test_utils.tel.tel_subscription_utils import get_incoming_voice_sub_id
 from acts_contrib.test_utils.tel.tel_subscription_utils import set_incoming_voice_sub_id
+from acts_contrib.test_utils.tel.tel_wait_utils import DEFAULT_STATE_WAITER
+from acts_contrib.test_utils.tel.tel_wait_utils import StateWaiter
 from acts.utils import adb_shell_ping
 from acts.utils import load_config
 from acts.logger import epoch_to_log_line_timestamp
@@ -1903,43 +1906,27 @@ def get_carrier_provisioning_for_subscription(ad, feature_flag,
 
 def _wait_for_droid_in_state(log, ad, max_time, state_check_func, *args,
                              **kwargs):
-    while max_time >= 0:
-        if state_check_func(log, ad, *args, **kwargs):
-            return True
-
-        time.sleep(WAIT_TIME_BETWEEN_STATE_CHECK)
-        max_time -= WAIT_TIME_BETWEEN_STATE_CHECK
-
-    return False
+    return DEFAULT_STATE_WAITER.wait(
+        lambda: state_check_func(log, ad, *args, **kwargs),
+        max_time,
+        name=state_check_func.__name__)
 
 
 def _wait_for_droid_in_state_for_subscription(
         log, ad, sub_id, max_time, state_check_func, *args, **kwargs):
-    while max_time >= 0:
-        if state_check_func(log, ad, sub_id, *args, **kwargs):
-            return True
-
-        time.sleep(WAIT_TIME_BETWEEN_STATE_CHECK)
-        max_time -= WAIT_TIME_BETWEEN_STATE_CHECK
-
-    return False
+    return DEFAULT_STATE_WAITER.wait(
+        lambda: state_check_func(log, ad, sub_id, *args, **kwargs),
+        max_time,
+        name=state_check_func.__name__)
 
 
 def _wait_for_droids_in_state(log, ads, max_time, state_check_func, *args,
                               **kwargs):
-    while max_time > 0:
-        success = True
-        for ad in ads:
-            if not state_check_func(log, ad, *args, **kwargs):
-                success = False
-                break
-        if success:
-            return True
-
-        time.sleep(WAIT_TIME_BETWEEN_STATE_CHECK)
-        max_time -= WAIT_TIME_BETWEEN_STATE_CHECK
-
-    return False
+    return DEFAULT_STATE_WAITER.wait_all(
+        [functools.partial(state_check_func, log, ad, *args, **kwargs)
+         for ad in ads],
+        max_time,
+        name=state_check_func.__name__)
 
 
 def _is_attached(log, ad, voice_or_data):
@@ -2964,12 +2951,10 @@ def wait_for_state(state_check_func,
                    checking_interval=WAIT_TIME_BETWEEN_STATE_CHECK,
                    *args,
                    **kwargs):
-    while max_wait_time >= 0:
-        if state_check_func(*args, **kwargs) == state:
-            return True
-        time.sleep(checking_interval)
-        max_wait_time -= checking_interval
-    return False
+    return StateWaiter(interval=checking_interval).wait(
+        lambda: state_check_func(*args, **kwargs) == state,
+        max_wait_time,
+        name=getattr(state_check_func, '__name__', None))
 
 
 def power_off_sim_by_adb(ad, sim_slot_id,
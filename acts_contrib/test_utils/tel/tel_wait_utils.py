@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2022 - Google
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import bisect
+import collections
+import concurrent.futures
+import logging
+import threading
+import time
+
+from acts_contrib.test_utils.tel.tel_defines import WAIT_TIME_BETWEEN_STATE_CHECK
+
+# Upper bin edges in seconds of the wait latency histograms
+WAIT_LATENCY_BINS = (1, 2, 5, 10, 20, 30, 60, 120, 300)
+MAX_WAIT_WORKERS = 8
+
+
+class WaitMetrics(object):
+    """Latency histograms of state waits, keyed by the state check name."""
+
+    def __init__(self, bins=WAIT_LATENCY_BINS):
+        self.bins = tuple(bins)
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, latency, success):
+        with self._lock:
+            metrics = self._metrics.setdefault(
+                name, {
+                    'count': 0,
+                    'timeouts': 0,
+                    'total_time': 0,
+                    'max_time': 0,
+                    'histogram': [0] * (len(self.bins) + 1)
+                })
+            metrics['count'] += 1
+            metrics['total_time'] += latency
+            metrics['max_time'] = max(metrics['max_time'], latency)
+            if not success:
+                metrics['timeouts'] += 1
+            metrics['histogram'][bisect.bisect_left(self.bins, latency)] += 1
+
+    def get_summary(self):
+        """Gets the wait metrics.
+
+        Returns:
+            A dict mapping state check names to the number of waits and
+            timeouts, the mean and max wait time in seconds and the wait time
+            histogram. The last histogram count is for waits longer than the
+            last bin edge.
+        """
+        summary = collections.OrderedDict()
+        with self._lock:
+            for name in sorted(self._metrics):
+                metrics = self._metrics[name]
+                summary[name] = collections.OrderedDict([
+                    ('count', metrics['count']),
+                    ('timeouts', metrics['timeouts']),
+                    ('mean_time', metrics['total_time'] / metrics['count']),
+                    ('max_time', metrics['max_time']),
+                    ('bins', list(self.bins)),
+                    ('histogram', list(metrics['histogram']))
+                ])
+        return summary
+
+    def log_summary(self, log=logging):
+        for name, metrics in self.get_summary().items():
+            log.info(
+                "Waited %s times for %s, %s timeouts, mean %.1fs, max %.1fs",
+                metrics['count'], name, metrics['timeouts'],
+                metrics['mean_time'], metrics['max_time'])
+
+    def reset(self):
+        with self._lock:
+            self._metrics.clear()
+
+
+# Wait metrics shared by all state waits of the process
+WAIT_METRICS = WaitMetrics()
+
+
+class StateWaiter(object):
+    """Polls state checks until they pass or a deadline expires.
+
+    Deadlines use the monotonic clock, so the time spent in the checks counts
+    against the maximum wait time. The polling interval starts at interval
+    and is multiplied by backoff after each failed check, up to max_interval.
+
+    Attributes:
+        interval: initial time in seconds between checks.
+        backoff: factor applied to the interval after each failed check.
+        max_interval: maximum time in seconds between checks.
+        metrics: WaitMetrics recording the latency of each wait.
+    """
+
+    def __init__(self,
+                 interval=WAIT_TIME_BETWEEN_STATE_CHECK,
+                 backoff=1,
+                 max_interval=None,
+                 metrics=WAIT_METRICS):
+        self.interval = interval
+        self.backoff = backoff
+        self.max_interval = max(max_interval or interval, interval)
+        self.metrics = metrics
+
+    def _poll(self, check_func, deadline, waker=None):
+        interval = self.interval
+        while True:
+            if check_func():
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if waker:
+                waker(min(interval, remaining))
+            else:
+                time.sleep(min(interval, remaining))
+            interval = min(interval * self.backoff, self.max_interval)
+
+    def wait(self, check_func, max_time, name=None, waker=None):
+        """Waits for a state check to pass.
+
+        Args:
+            check_func: function without arguments returning True when the
+                expected state is reached.
+            max_time: maximum time in seconds to wait for.
+            name: name of the wait in the metrics, defaults to the name of
+                check_func.
+            waker: optional function of a timeout returning early when the
+                state may have changed, e.g., on an SL4A event, used instead
+                of sleeping between checks.
+        Returns:
+            True if the check passed before the deadline, False otherwise.
+        """
+        start_time = time.monotonic()
+        success = self._poll(check_func, start_time + max_time, waker)
+        self.metrics.record(name or _get_name(check_func),
+                            time.monotonic() - start_time, success)
+        return success
+
+    def wait_all(self, check_funcs, max_time, name=None, wakers=None):
+        """Waits concurrently for several state checks to pass.
+
+        Each check is polled in its own thread until it passes, so a device
+        reaching its state early is not checked again while waiting for the
+        others. Once all checks passed, they are all checked again, since an
+        early device may have left its state in the meantime. The checks
+        failing again are polled until the deadline.
+
+        Args:
+            check_funcs: list of functions without arguments returning True
+                when the expected state is reached, e.g., one per device.
+            max_time: maximum time in seconds to wait for all checks.
+            name: name of the wait in the metrics, defaults to the name of
+                the first check_func.
+            wakers: optional list of wakers, one per check_func.
+        Returns:
+            True if all checks passed before the deadline, False otherwise.
+        """
+        if not check_funcs:
+            return True
+        wakers = wakers or [None] * len(check_funcs)
+        start_time = time.monotonic()
+        deadline = start_time + max_time
+        if len(check_funcs) == 1:
+            success = self._poll(check_funcs[0], deadline, wakers[0])
+        else:
+            with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=min(len(check_funcs),
+                                    MAX_WAIT_WORKERS)) as executor:
+                pending = list(range(len(check_funcs)))
+                while True:
+                    futures = [
+                        executor.submit(self._poll, check_funcs[idx],
+                                        deadline, wakers[idx])
+                        for idx in pending
+                    ]
+                    success = all([future.result() for future in futures])
+                    if not success:
+                        break
+                    pending = [
+                        idx for idx, check_func in enumerate(check_funcs)
+                        if not check_func()
+                    ]
+                    if not pending:
+                        break
+                    if time.monotonic() >= deadline:
+                        success = False
+                        break
+        self.metrics.record(name or _get_name(check_funcs[0]),
+                            time.monotonic() - start_time, success)
+        return success
+
+
+def _get_name(func):
+    func = getattr(func, 'func', func)
+    return getattr(func, '__name__', repr(func))
+
+
+# Waiter with the default polling interval shared by tel_test_utils
+DEFAULT_STATE_WAITER = StateWaiter()
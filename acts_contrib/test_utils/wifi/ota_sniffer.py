@@ -14,21 +14,31 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
-import csv
+import collections
+import json
 import os
 import posixpath
 import time
 import zipfile
+
+import numpy
 import acts_contrib.test_utils.wifi.wifi_test_utils as wutils
 
 from acts import context
 from acts import logger
-from acts import utils
 from acts.controllers.utils_lib import ssh
 
 WifiEnums = wutils.WifiEnums
 SNIFFER_TIMEOUT = 6
 
+# Tshark columns stored as strings, all other columns are numeric
+TSHARK_STRING_COLUMNS = ('ta', 'ra', 'bssid', 'ba_bm', 'bf_report')
+DATA_FRAME_TYPE = 2
+# Bandwidth in MHz of the wlan_radio 11n and 11ac bandwidth field values
+HT_BW_MHZ = {0: 20, 1: 40}
+VHT_BW_MHZ = {0: 20, 1: 40, 4: 80, 11: 160}
+MIN_FRAME_ARRAY_SIZE = 4096
+
 
 def create(configs):
     """Factory method for sniffer.
@@ -154,47 +164,213 @@ class MockSniffer(OtaSnifferBase):
         return log_file
 
 
+def _parse_tshark_number(value):
+    """Parses a numeric tshark field.
+
+    Boolean fields are printed as True/False or 1/0 depending on the tshark
+    version, flags may be printed in hex and multi-valued fields, e.g., per
+    antenna RSSI, as comma separated lists of which the first value is used.
+
+    Returns:
+        The field value as a float, nan if empty or not numeric.
+    """
+    if not value:
+        return numpy.nan
+    value = value.split(',', 1)[0]
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    if value == 'True':
+        return 1.0
+    if value == 'False':
+        return 0.0
+    try:
+        return float(int(value, 16))
+    except ValueError:
+        return numpy.nan
+
+
+class TsharkDumpParser(object):
+    """Parses tshark field dumps into typed columns and station summaries.
+
+    Lines are fed one at a time so that captures are processed in a single
+    pass. Numeric fields are stored in a growable float array, with nan for
+    missing values, and string fields, e.g., MAC addresses, in lists. Per
+    station summaries, keyed by transmitter address, are updated as frames
+    are parsed.
+
+    Attributes:
+        columns: names of the ^ separated fields of each line.
+        num_frames: number of parsed frames.
+        num_invalid_lines: number of lines with the wrong number of fields.
+    """
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.num_frames = 0
+        self.num_invalid_lines = 0
+        self._numeric_columns = [
+            column for column in self.columns
+            if column not in TSHARK_STRING_COLUMNS
+        ]
+        self._string_columns = [
+            column for column in self.columns
+            if column in TSHARK_STRING_COLUMNS
+        ]
+        self._numeric_indices = [
+            self.columns.index(column) for column in self._numeric_columns
+        ]
+        self._string_indices = [
+            self.columns.index(column) for column in self._string_columns
+        ]
+        self._numeric_values = numpy.empty(
+            (MIN_FRAME_ARRAY_SIZE, len(self._numeric_columns)))
+        self._string_values = [[] for _ in self._string_columns]
+        self._interned_strings = {}
+        self._station_stats = {}
+
+    def feed(self, line):
+        """Parses one line of a tshark field dump."""
+        fields = line.rstrip('\r\n').split('^')
+        if len(fields) != len(self.columns):
+            self.num_invalid_lines += 1
+            return
+        if self.num_frames == len(self._numeric_values):
+            self._numeric_values = numpy.resize(
+                self._numeric_values,
+                (2 * self.num_frames, len(self._numeric_columns)))
+        numeric_values = [
+            _parse_tshark_number(fields[idx]) for idx in self._numeric_indices
+        ]
+        self._numeric_values[self.num_frames] = numeric_values
+        string_values = [
+            self._interned_strings.setdefault(fields[idx], fields[idx])
+            for idx in self._string_indices
+        ]
+        for values, value in zip(self._string_values, string_values):
+            values.append(value)
+        self.num_frames += 1
+        frame = dict(zip(self._numeric_columns, numeric_values))
+        frame.update(zip(self._string_columns, string_values))
+        self._update_station_stats(frame)
+
+    def _update_station_stats(self, frame):
+        station = frame.get('ta')
+        if not station:
+            return
+        if station not in self._station_stats:
+            self._station_stats[station] = {
+                'frames': 0,
+                'data_frames': 0,
+                'retries': 0,
+                'bytes': 0,
+                'airtime': 0,
+                'mcs': collections.Counter(),
+                'nss': collections.Counter(),
+                'bw': collections.Counter(),
+                'rssi': collections.Counter()
+            }
+        stats = self._station_stats[station]
+        stats['frames'] += 1
+        if frame.get('retry') == 1:
+            stats['retries'] += 1
+        if not numpy.isnan(frame.get('rssi', numpy.nan)):
+            stats['rssi'][int(round(frame['rssi']))] += 1
+        frame_len = frame.get('frame_len', numpy.nan)
+        if not numpy.isnan(frame_len):
+            stats['bytes'] += int(frame_len)
+            # Payload airtime in seconds, excluding preambles and IFS
+            data_rate = frame.get('wlan_data_rate', numpy.nan)
+            if data_rate > 0:
+                stats['airtime'] += 8 * frame_len / data_rate / 1e6
+        if frame.get('type') != DATA_FRAME_TYPE:
+            return
+        stats['data_frames'] += 1
+        mcs = frame.get('vht_mcs', numpy.nan)
+        nss = frame.get('vht_nss', numpy.nan)
+        if numpy.isnan(mcs):
+            mcs = frame.get('11ac_mcs', numpy.nan)
+        if numpy.isnan(mcs):
+            # HT MCS indices encode the number of spatial streams
+            mcs = frame.get('11n_mcs_index', numpy.nan)
+            if numpy.isnan(mcs):
+                mcs = frame.get('radiotap_mcs_index', numpy.nan)
+            if not numpy.isnan(mcs):
+                nss = mcs // 8 + 1
+                mcs = mcs % 8
+        if not numpy.isnan(mcs):
+            stats['mcs'][int(mcs)] += 1
+        if not numpy.isnan(nss):
+            stats['nss'][int(nss)] += 1
+        bw = frame.get('11ac_bw', numpy.nan)
+        if not numpy.isnan(bw):
+            stats['bw'][VHT_BW_MHZ.get(int(bw), int(bw))] += 1
+        else:
+            bw = frame.get('11n_bw', numpy.nan)
+            if not numpy.isnan(bw):
+                stats['bw'][HT_BW_MHZ.get(int(bw), int(bw))] += 1
+
+    def get_columns(self):
+        """Gets the parsed frames as columns.
+
+        Returns:
+            columns: OrderedDict mapping column names to numpy arrays, float
+            arrays for numeric columns and unicode arrays for string columns.
+        """
+        columns = collections.OrderedDict()
+        numeric_idx = dict(
+            (column, idx) for idx, column in enumerate(self._numeric_columns))
+        string_idx = dict(
+            (column, idx) for idx, column in enumerate(self._string_columns))
+        for column in self.columns:
+            if column in numeric_idx:
+                columns[column] = self._numeric_values[:self.num_frames,
+                                                       numeric_idx[column]]
+            else:
+                columns[column] = numpy.array(
+                    self._string_values[string_idx[column]], dtype=str)
+        return columns
+
+    def save_columns(self, file_path):
+        """Saves the parsed columns to a compressed numpy .npz file."""
+        numpy.savez_compressed(file_path, **self.get_columns())
+
+    def get_station_summaries(self):
+        """Summarizes the frames sent by each station.
+
+        Returns:
+            summaries: OrderedDict mapping transmitter addresses, sorted by
+            number of frames, to the number of frames, data frames, retries
+            and bytes, the retry rate, the payload airtime in seconds, the
+            MCS, NSS and bandwidth (MHz) histograms of data frames and the
+            RSSI histogram, mean and median of all frames.
+        """
+        summaries = collections.OrderedDict()
+        for station, stats in sorted(self._station_stats.items(),
+                                     key=lambda item: -item[1]['frames']):
+            summary = collections.OrderedDict()
+            for key in ['frames', 'data_frames', 'retries', 'bytes']:
+                summary[key] = stats[key]
+            summary['retry_rate'] = stats['retries'] / stats['frames']
+            summary['airtime'] = stats['airtime']
+            for key in ['mcs', 'nss', 'bw', 'rssi']:
+                summary['{}_histogram'.format(key)] = collections.OrderedDict(
+                    sorted(stats[key].items()))
+            if stats['rssi']:
+                rssi_values = numpy.repeat(list(stats['rssi'].keys()),
+                                           list(stats['rssi'].values()))
+                summary['rssi_mean'] = float(numpy.mean(rssi_values))
+                summary['rssi_median'] = float(numpy.median(rssi_values))
+            else:
+                summary['rssi_mean'] = float('nan')
+                summary['rssi_median'] = float('nan')
+            summaries[station] = summary
+        return summaries
+
+
 class TsharkSnifferBase(OtaSnifferBase):
     """Class that implements Tshark based sniffer controller. """
 
-    TYPE_SUBTYPE_DICT = {
-        '0': 'Association Requests',
-        '1': 'Association Responses',
-        '2': 'Reassociation Requests',
-        '3': 'Resssociation Responses',
-        '4': 'Probe Requests',
-        '5': 'Probe Responses',
-        '8': 'Beacon',
-        '9': 'ATIM',
-        '10': 'Disassociations',
-        '11': 'Authentications',
-        '12': 'Deauthentications',
-        '13': 'Actions',
-        '24': 'Block ACK Requests',
-        '25': 'Block ACKs',
-        '26': 'PS-Polls',
-        '27': 'RTS',
-        '28': 'CTS',
-        '29': 'ACK',
-        '30': 'CF-Ends',
-        '31': 'CF-Ends/CF-Acks',
-        '32': 'Data',
-        '33': 'Data+CF-Ack',
-        '34': 'Data+CF-Poll',
-        '35': 'Data+CF-Ack+CF-Poll',
-        '36': 'Null',
-        '37': 'CF-Ack',
-        '38': 'CF-Poll',
-        '39': 'CF-Ack+CF-Poll',
-        '40': 'QoS Data',
-        '41': 'QoS Data+CF-Ack',
-        '42': 'QoS Data+CF-Poll',
-        '43': 'QoS Data+CF-Ack+CF-Poll',
-        '44': 'QoS Null',
-        '46': 'QoS CF-Poll (Null)',
-        '47': 'QoS CF-Ack+CF-Poll (Null)'
-    }
-
     TSHARK_COLUMNS = [
         'frame_number', 'frame_time_relative', 'mactime', 'frame_len', 'rssi',
         'channel', 'ta', 'ra', 'bssid', 'type', 'subtype', 'duration', 'seq',
@@ -204,16 +380,6 @@ class TsharkSnifferBase(OtaSnifferBase):
         'vht_gi', 'vht_coding', 'ba_bm', 'fc_status', 'bf_report'
     ]
 
-    TSHARK_OUTPUT_COLUMNS = [
-        'frame_number', 'frame_time_relative', 'mactime', 'ta', 'ra', 'bssid',
-        'rssi', 'channel', 'frame_len', 'Info', 'radio_datarate',
-        'radiotap_mcs_index', 'pwrmgmt', 'phy', 'vht_nss', 'vht_mcs',
-        'vht_datarate', '11ac_mcs', '11ac_bw', 'vht_gi', 'vht_coding',
-        'wlan_data_rate', '11n_mcs_index', '11n_bw', 'mcs_gi', 'type',
-        'subtype', 'duration', 'seq', 'retry', 'moredata', 'ds', 'ba_bm',
-        'fc_status', 'bf_report'
-    ]
-
     TSHARK_FIELDS_LIST = [
         'frame.number', 'frame.time_relative', 'radiotap.mactime', 'frame.len',
         'radiotap.dbm_antsignal', 'wlan_radio.channel', 'wlan.ta', 'wlan.ra',
@@ -237,7 +403,9 @@ class TsharkSnifferBase(OtaSnifferBase):
         self.sniffer_output_file_type = config['output_file_type']
         self.sniffer_snap_length = config['snap_length']
         self.sniffer_interface = config['interface']
+        self.keep_raw_dump = config.get('keep_raw_dump', True)
         self.sniffer_disabled = False
+        self.station_summaries = collections.OrderedDict()
 
         #Logging into sniffer
         self.log.info('Logging into sniffer.')
@@ -365,42 +533,35 @@ class TsharkSnifferBase(OtaSnifferBase):
             self.log.debug('Sniffer process may have stopped succesfully.')
 
     def _process_tshark_dump(self, log_file):
-        """ Process tshark dump for better readability.
+        """ Parses tshark dump into columns and per station summaries.
 
-        Processes tshark dump for better readability and saves it to a file.
-        Adds an info column at the end of each row. Format of the info columns:
-        subtype of the frame, sequence no and retry status.
+        Streams the tshark field dump through a TsharkDumpParser, saves the
+        typed columns to a compressed .npz file and the per station summaries
+        to a json file. The text dump is kept next to them unless keep_raw_dump
+        is set to false in the sniffer config.
 
         Args:
             log_file : unprocessed sniffer output
         Returns:
-            log_file : processed sniffer output
+            columns_file : path to the .npz file of parsed columns
         """
-        temp_dump_file = os.path.join(self.log_path, 'sniffer_temp_dump.csv')
-        utils.exe_cmd('cp {} {}'.format(log_file, temp_dump_file))
-
-        with open(temp_dump_file, 'r') as input_csv, open(log_file,
-                                                          'w') as output_csv:
-            reader = csv.DictReader(input_csv,
-                                    fieldnames=self.TSHARK_COLUMNS,
-                                    delimiter='^')
-            writer = csv.DictWriter(output_csv,
-                                    fieldnames=self.TSHARK_OUTPUT_COLUMNS,
-                                    delimiter='\t')
-            writer.writeheader()
-            for row in reader:
-                if row['subtype'] in self.TYPE_SUBTYPE_DICT:
-                    row['Info'] = '{sub} S={seq} retry={retry_status}'.format(
-                        sub=self.TYPE_SUBTYPE_DICT[row['subtype']],
-                        seq=row['seq'],
-                        retry_status=row['retry'])
-                else:
-                    row['Info'] = '{} S={} retry={}\n'.format(
-                        row['subtype'], row['seq'], row['retry'])
-                writer.writerow(row)
-
-        utils.exe_cmd('rm -f {}'.format(temp_dump_file))
-        return log_file
+        parser = TsharkDumpParser(self.TSHARK_COLUMNS)
+        with open(log_file, 'r', errors='replace') as dump_file:
+            for line in dump_file:
+                parser.feed(line)
+        if parser.num_invalid_lines:
+            self.log.warning('Skipped {} malformed tshark lines.'.format(
+                parser.num_invalid_lines))
+
+        file_prefix = os.path.splitext(log_file)[0]
+        columns_file = file_prefix + '.npz'
+        parser.save_columns(columns_file)
+        self.station_summaries = parser.get_station_summaries()
+        with open(file_prefix + '_summary.json', 'w') as summary_file:
+            json.dump(self.station_summaries, summary_file, indent=4)
+        if not self.keep_raw_dump:
+            os.remove(log_file)
+        return columns_file
 
     def start_capture(self, network, chan, bw, duration=60):
         """Starts sniffer capture on the specified machine.
@@ -29,8 +29,7 @@ from acts_contrib.test_utils.wifi import wifi_test_utils as wutils
 from acts_contrib.test_utils.wifi.wifi_performance_test_utils import ping_utils
 from acts_contrib.test_utils.wifi.wifi_performance_test_utils import qcom_utils
 from acts_contrib.test_utils.wifi.wifi_performance_test_utils import brcm_utils
-
-from concurrent.futures import ThreadPoolExecutor
+from acts_contrib.test_utils.wifi.wifi_performance_test_utils import measurement_executor
 
 SHORT_SLEEP = 1
 MED_SLEEP = 6
@@ -51,18 +50,37 @@ CHANNEL_TO_BAND_MAP = {
 
 # Decorators
 def nonblocking(f):
-    """Creates a decorator transforming function calls to non-blocking"""
+    """Creates a decorator transforming function calls to non-blocking
+
+    Calls are run by the shared measurement executor, in the pool of the
+    AndroidDevice they target, or in the host pool if they target none.
+    """
 
     def wrap(*args, **kwargs):
-        executor = ThreadPoolExecutor(max_workers=1)
-        thread_future = executor.submit(f, *args, **kwargs)
-        # Ensure resources are freed up when executor ruturns or raises
-        executor.shutdown(wait=False)
-        return thread_future
+        return measurement_executor.MEASUREMENT_EXECUTOR.submit(
+            get_measurement_pool_name(*args, **kwargs), f, args, kwargs)
 
     return wrap
 
 
+def get_measurement_pool_name(*args, **kwargs):
+    """Gets the measurement executor pool for a function call."""
+    for arg in list(args) + list(kwargs.values()):
+        if isinstance(arg, AndroidDevice):
+            return arg.serial
+    return measurement_executor.DEFAULT_POOL
+
+
+def cancel_measurements(pool_name=None):
+    """Cancels pending and running non-blocking measurements.
+
+    Args:
+        pool_name: measurement pool, i.e., device serial, to cancel
+            measurements in. All pools if None.
+    """
+    return measurement_executor.MEASUREMENT_EXECUTOR.cancel(pool_name)
+
+
 def detect_wifi_platform(dut):
     if hasattr(dut, 'wifi_platform'):
         return dut.wifi_platform
@@ -251,7 +269,7 @@ def get_ping_stats(src_device, dest_address, ping_duration, ping_interval,
     else:
         raise TypeError('Unable to ping using src_device of type %s.' %
                         type(src_device))
-    return ping_utils.PingResult(ping_output.splitlines())
+    return ping_utils.PingResult(ping_output.splitlines(), ping_count)
 
 
 @nonblocking
@@ -323,6 +341,76 @@ def atten_by_label(atten_list, path_label, atten_level):
             atten.set_atten(atten_level, retry=True)
 
 
+def adaptive_atten_sweep(atten_range,
+                         measure,
+                         is_failing,
+                         coarse_step=4,
+                         confirm_failures=2,
+                         max_initial_failures=None):
+    """Sweeps attenuation adaptively to find where a test starts failing.
+
+    Instead of measuring every point of atten_range, the function first
+    measures every coarse_step-th point until confirm_failures consecutive
+    coarse points fail, and then bisects between the last passing and the
+    first failing coarse points. This finds the same edge as a linear sweep
+    when failures are monotonic in attenuation, with a fraction of the
+    measurements.
+
+    Args:
+        atten_range: list of attenuations to sweep, in increasing order.
+        measure: function that sets an attenuation and returns the result of
+            a measurement at that attenuation.
+        is_failing: function that returns True if a measurement result is
+            failing, e.g., ping loss above the range threshold.
+        coarse_step: number of atten_range points between coarse points.
+        confirm_failures: number of consecutive failing coarse points after
+            which the coarse sweep stops.
+        max_initial_failures: number of consecutive failing coarse points
+            allowed before the first passing point. Defaults to
+            confirm_failures.
+    Returns:
+        sweep_results: list of (atten_range index, measurement result) tuples
+            sorted by attenuation.
+    """
+    if max_initial_failures is None:
+        max_initial_failures = confirm_failures
+    results = {}
+
+    def measure_failing(idx):
+        results[idx] = measure(atten_range[idx])
+        return is_failing(results[idx])
+
+    # Coarse sweep, ending on the last point of the attenuation range
+    coarse_indices = list(range(0, len(atten_range), max(coarse_step, 1)))
+    if coarse_indices and coarse_indices[-1] != len(atten_range) - 1:
+        coarse_indices.append(len(atten_range) - 1)
+    last_pass = None
+    first_fail = None
+    num_failures = 0
+    for idx in coarse_indices:
+        if measure_failing(idx):
+            if first_fail is None:
+                first_fail = idx
+            num_failures = num_failures + 1
+            if num_failures >= (confirm_failures if last_pass is not None
+                                else max_initial_failures):
+                break
+        else:
+            last_pass = idx
+            first_fail = None
+            num_failures = 0
+
+    # Bisect between the last passing and first failing points
+    if last_pass is not None and first_fail is not None:
+        while first_fail - last_pass > 1:
+            idx = (last_pass + first_fail) // 2
+            if measure_failing(idx):
+                first_fail = idx
+            else:
+                last_pass = idx
+    return sorted(results.items())
+
+
 def get_atten_for_target_rssi(target_rssi, attenuators, dut, ping_server):
     """Function to estimate attenuation to hit a target RSSI.
 
@@ -610,10 +698,11 @@ def get_connected_rssi_nb(dut,
                           first_measurement_delay=0,
                           disconnect_warning=True,
                           ignore_samples=0,
-                          interface='wlan0'):
+                          interface='wlan0',
+                          device_loop=False):
     return get_connected_rssi(dut, num_measurements, polling_frequency,
                               first_measurement_delay, disconnect_warning,
-                              ignore_samples, interface)
+                              ignore_samples, interface, device_loop)
 
 
 @detect_wifi_decorator
@@ -623,7 +712,8 @@ def get_connected_rssi(dut,
                        first_measurement_delay=0,
                        disconnect_warning=True,
                        ignore_samples=0,
-                       interface='wlan0'):
+                       interface='wlan0',
+                       device_loop=False):
     """Gets all RSSI values reported for the connected access point/BSSID.
 
     Args:
@@ -632,10 +722,15 @@ def get_connected_rssi(dut,
         polling_frequency: time to wait between RSSI measurements
         disconnect_warning: boolean controlling disconnection logging messages
         ignore_samples: number of leading samples to ignore
+        interface: wifi interface to get RSSI for
+        device_loop: if True, all measurements are taken by a single shell
+            loop on the device instead of one adb call per command, which
+            keeps the polling frequency accurate at short intervals
     Returns:
         connected_rssi: dict containing the measurements results for
         all reported RSSI values (signal_poll, per chain, etc.) and their
-        statistics
+        statistics. Measurements are lists, as tests use list operations
+        on them, e.g., count() in WifiRssiTest.
     """
 
 
@@ -16,11 +16,15 @@
 
 import bokeh, bokeh.plotting, bokeh.io
 import collections
-import itertools
 import json
-import math
+import os
+import numpy
 from acts_contrib.test_utils.wifi import wifi_performance_test_utils as wputils
 
+# Formats of the plot data saved alongside figures
+JSON_FORMAT = 'json'
+NPZ_FORMAT = 'npz'
+
 
 # Plotting Utilities
 class BokehFigure():
@@ -61,6 +65,7 @@ class BokehFigure():
     ]
 
     TOOLS = ('box_zoom,box_select,pan,crosshair,redo,undo,reset,hover,save')
+    PLOT_DATA_FORMAT = NPZ_FORMAT
 
     def __init__(self,
                  title=None,
@@ -77,6 +82,9 @@ class BokehFigure():
                  x_axis_type='auto',
                  sizing_mode='scale_both',
                  json_file=None):
+        # Incremented when lines are added, to skip rewriting unchanged data
+        self._data_version = 0
+        self._saved_data = {}
         if json_file:
             self.load_from_json(json_file)
         else:
@@ -113,7 +121,7 @@ class BokehFigure():
         ]
         hover_set = []
         for line in self.figure_data:
-            hover_set.extend(line['hover_text'].keys())
+            hover_set.extend((line['hover_text'] or {}).keys())
         hover_set = set(hover_set)
         for item in hover_set:
             tooltips.append((item, '@{}'.format(item)))
@@ -124,21 +132,40 @@ class BokehFigure():
             bokeh.models.tools.WheelZoomTool(dimensions='height'))
 
     def _filter_line(self, x_data, y_data, hover_text=None):
-        """Function to remove NaN points from bokeh plots."""
-        x_data_filtered = []
-        y_data_filtered = []
+        """Function to remove NaN points from bokeh plots.
+
+        Missing x values and hover text of points are padded with NaN and
+        empty strings respectively.
+        """
+        y_array = numpy.asarray(y_data, dtype=float).ravel()
+        x_array = numpy.asarray(x_data).ravel()
+        num_points = max(len(x_array), len(y_array))
+        if len(y_array) < num_points:
+            y_array = numpy.concatenate(
+                [y_array, numpy.full(num_points - len(y_array), numpy.nan)])
+        if len(x_array) < num_points:
+            if x_array.dtype.kind in 'biu':
+                x_array = x_array.astype(float)
+            elif x_array.dtype.kind not in 'fmM':
+                x_array = x_array.astype(object)
+            x_array = numpy.concatenate([
+                x_array,
+                numpy.full(num_points - len(x_array),
+                           'NaT' if x_array.dtype.kind in 'mM' else numpy.nan,
+                           dtype=x_array.dtype)
+            ])
+        keep_idx = numpy.flatnonzero(~numpy.isnan(y_array))
         hover_text_filtered = {}
-        for idx, xy in enumerate(
-                itertools.zip_longest(x_data, y_data, fillvalue=float('nan'))):
-            if not math.isnan(xy[1]):
-                x_data_filtered.append(xy[0])
-                y_data_filtered.append(xy[1])
-                if hover_text:
-                    for key, value in hover_text.items():
-                        hover_text_filtered.setdefault(key, [])
-                        hover_text_filtered[key].append(
-                            value[idx] if len(value) > idx else '')
-        return x_data_filtered, y_data_filtered, hover_text_filtered
+        if hover_text:
+            for key, value in hover_text.items():
+                value = list(value[:num_points]) + [''] * (num_points -
+                                                           len(value))
+                hover_text_filtered[key] = [value[idx] for idx in keep_idx]
+        x_array = x_array[keep_idx]
+        # tolist() converts datetime64[ns] values to integer nanoseconds
+        x_data_filtered = (list(x_array) if x_array.dtype.kind in 'mM' else
+                           x_array.tolist())
+        return x_data_filtered, y_array[keep_idx].tolist(), hover_text_filtered
 
     def add_line(self,
                  x_data,
@@ -191,6 +218,7 @@ class BokehFigure():
             'y_axis': y_axis
         })
         self.fig_property['num_lines'] += 1
+        self._data_version += 1
 
     def add_scatter(self,
                     x_data,
@@ -220,6 +248,8 @@ class BokehFigure():
         if marker == None:
             marker = self.MARKERS[self.fig_property['num_lines'] %
                                   len(self.MARKERS)]
+        if isinstance(hover_text, list):
+            hover_text = {'info': hover_text}
         self.figure_data.append({
             'x_data': x_data,
             'y_data': y_data,
@@ -234,6 +264,37 @@ class BokehFigure():
             'y_axis': y_axis
         })
         self.fig_property['num_lines'] += 1
+        self._data_version += 1
+
+    def _get_sources(self):
+        """Gets ColumnDataSources of the lines of the figure.
+
+        Lines with the same x data and hover text share one source, in which
+        each line has its own y column.
+
+        Returns:
+            A list of (source, y column name) tuples, one per line.
+        """
+        source_groups = {}
+        line_sources = []
+        for line in self.figure_data:
+            hover_text = line['hover_text'] or {}
+            group_key = _get_values_key(line['x_data'], hover_text)
+            group = source_groups.get(group_key)
+            if group is None:
+                group = {
+                    'data': dict(hover_text, x=line['x_data']),
+                    'num_lines': 0
+                }
+                source_groups[group_key] = group
+            y_column = 'y{}'.format(group['num_lines'])
+            group['data'][y_column] = line['y_data']
+            group['num_lines'] += 1
+            line_sources.append((group, y_column))
+        for group in source_groups.values():
+            group['source'] = bokeh.models.ColumnDataSource(data=group['data'])
+        return [(group['source'], y_column)
+                for group, y_column in line_sources]
 
     def generate_figure(self, output_file=None, save_json=True):
         """Function to generate and save BokehFigure.
@@ -243,14 +304,11 @@ class BokehFigure():
         """
         self.init_plot()
         two_axes = False
-        for line in self.figure_data:
-            data_dict = {'x': line['x_data'], 'y': line['y_data']}
-            for key, value in line['hover_text'].items():
-                data_dict[key] = value
-            source = bokeh.models.ColumnDataSource(data=data_dict)
+        for line, (source, y_column) in zip(self.figure_data,
+                                            self._get_sources()):
             if line['width'] > 0:
                 self.plot.line(x='x',
-                               y='y',
+                               y=y_column,
                                legend_label=line['legend'],
                                line_width=line['width'],
                                color=line['color'],
@@ -271,7 +329,7 @@ class BokehFigure():
             if line['marker'] in self.MARKERS:
                 marker_func = getattr(self.plot, line['marker'])
                 marker_func(x='x',
-                            y='y',
+                            y=y_column,
                             size=line['marker_size'],
                             legend_label=line['legend'],
                             line_color=line['color'],
@@ -318,47 +376,167 @@ class BokehFigure():
         return self.plot
 
     def load_from_json(self, file_path):
-        with open(file_path, 'r') as json_file:
-            fig_dict = json.load(json_file)
+        """Loads a figure from plot data saved in json or npz format."""
+        if file_path.endswith('.' + NPZ_FORMAT):
+            fig_dict = self._load_npz(file_path)
+        else:
+            with open(file_path, 'r') as json_file:
+                fig_dict = json.load(json_file)
         self.fig_property = fig_dict['fig_property']
         self.figure_data = fig_dict['figure_data']
 
-    def _save_figure_json(self, output_file):
-        """Function to save a json format of a figure"""
-        figure_dict = collections.OrderedDict(fig_property=self.fig_property,
-                                              figure_data=self.figure_data)
-        output_file = output_file.replace('.html', '_plot_data.json')
-        with open(output_file, 'w') as outfile:
-            json.dump(wputils.serialize_dict(figure_dict), outfile, indent=4)
+    @staticmethod
+    def _load_npz(file_path):
+        with numpy.load(file_path) as npz_file:
+            fig_dict = json.loads(str(npz_file['metadata']))
+            for line in fig_dict['figure_data']:
+                columns = line.pop('columns')
+                for key, column in columns.pop('hover_text', {}).items():
+                    line['hover_text'][key] = npz_file[column].tolist()
+                for key, column in columns.items():
+                    line[key] = npz_file[column].tolist()
+        return fig_dict
 
-    def save_figure(self, output_file, save_json=True):
+    @staticmethod
+    def _get_column(values):
+        """Gets a numeric or string array of values, None if not possible."""
+        if not isinstance(values, (list, tuple, numpy.ndarray)):
+            return None
+        try:
+            column = numpy.asarray(values)
+        except ValueError:
+            return None
+        if column.ndim != 1 or column.dtype.kind not in 'biufU':
+            return None
+        return column
+
+    def _save_npz(self, output_file):
+        """Saves figure data as compressed columns with json metadata."""
+        arrays = {}
+        figure_data = []
+        for idx, line in enumerate(self.figure_data):
+            line = dict(line, columns={})
+            for key in ['x_data', 'y_data']:
+                column = self._get_column(line[key])
+                if column is not None:
+                    arrays['line{}_{}'.format(idx, key)] = column
+                    line['columns'][key] = 'line{}_{}'.format(idx, key)
+                    line[key] = None
+            if isinstance(line['hover_text'], dict):
+                line['hover_text'] = dict(line['hover_text'])
+                line['columns']['hover_text'] = {}
+                for key_idx, (key, value) in enumerate(
+                        line['hover_text'].items()):
+                    column = self._get_column(value)
+                    if column is not None:
+                        name = 'line{}_hover{}'.format(idx, key_idx)
+                        arrays[name] = column
+                        line['columns']['hover_text'][key] = name
+                        line['hover_text'][key] = None
+            figure_data.append(line)
+        metadata = collections.OrderedDict(fig_property=self.fig_property,
+                                           figure_data=figure_data)
+        arrays['metadata'] = numpy.array(
+            json.dumps(metadata, default=_serialize_value))
+        with open(output_file, 'wb') as outfile:
+            numpy.savez_compressed(outfile, **arrays)
+
+    def _save_figure_data(self, output_file, data_format=None):
+        """Function to save the plot data of a figure.
+
+        The data is only written if lines were added since it was last saved
+        to output_file.
+
+        Args:
+            output_file: string specifying plot data file path
+            data_format: json or npz, defaults to PLOT_DATA_FORMAT
+        """
+        data_format = data_format or self.PLOT_DATA_FORMAT
+        if (self._saved_data.get(output_file) == self._data_version
+                and os.path.exists(output_file)):
+            return
+        if data_format == NPZ_FORMAT:
+            self._save_npz(output_file)
+        elif data_format == JSON_FORMAT:
+            figure_dict = collections.OrderedDict(
+                fig_property=self.fig_property, figure_data=self.figure_data)
+            with open(output_file, 'w') as outfile:
+                json.dump(wputils.serialize_dict(figure_dict),
+                          outfile,
+                          separators=(',', ':'))
+        else:
+            raise ValueError('Unsupported plot data format: {}'.format(
+                data_format))
+        self._saved_data[output_file] = self._data_version
+
+    def save_figure(self, output_file, save_json=True, data_format=None):
         """Function to save BokehFigure.
 
         Args:
             output_file: string specifying output file path
-            save_json: flag controlling json outputs
+            save_json: flag controlling plot data outputs
+            data_format: json or npz, defaults to PLOT_DATA_FORMAT
         """
         if save_json:
-            self._save_figure_json(output_file)
+            data_format = data_format or self.PLOT_DATA_FORMAT
+            self._save_figure_data(
+                output_file.replace('.html',
+                                    '_plot_data.{}'.format(data_format)),
+                data_format)
         bokeh.io.output_file(output_file)
         bokeh.io.save(self.plot)
 
     @staticmethod
-    def save_figures(figure_array, output_file_path, save_json=True):
+    def save_figures(figure_array,
+                     output_file_path,
+                     save_json=True,
+                     data_format=None):
         """Function to save list of BokehFigures in one file.
 
         Args:
             figure_array: list of BokehFigure object to be plotted
             output_file: string specifying output file path
+            save_json: flag controlling plot data outputs
+            data_format: json or npz, defaults to PLOT_DATA_FORMAT
         """
         for idx, figure in enumerate(figure_array):
             figure.generate_figure()
             if save_json:
-                json_file_path = output_file_path.replace(
-                    '.html', '{}-plot_data.json'.format(idx))
-                figure._save_figure_json(json_file_path)
+                figure_data_format = data_format or figure.PLOT_DATA_FORMAT
+                figure._save_figure_data(
+                    output_file_path.replace(
+                        '.html', '{}-plot_data.{}'.format(
+                            idx, figure_data_format)), figure_data_format)
         plot_array = [figure.plot for figure in figure_array]
         all_plots = bokeh.layouts.column(children=plot_array,
                                          sizing_mode='scale_width')
         bokeh.plotting.output_file(output_file_path)
         bokeh.plotting.save(all_plots)
+
+
+def _get_values_key(x_data, hover_text):
+    """Gets a hashable key, equal for lines with equal x data and hover text.
+
+    Lines with unhashable values get a unique key.
+    """
+    key = (tuple(x_data),
+           tuple((name, tuple(hover_text[name]))
+                 for name in sorted(hover_text)))
+    try:
+        hash(key)
+    except TypeError:
+        return object()
+    return key
+
+
+def _serialize_value(value):
+    """Serializes numpy values and other objects not supported by json."""
+    if isinstance(value, numpy.ndarray):
+        if value.dtype.kind in 'mM':
+            return value.astype(str).tolist()
+        return value.tolist()
+    if isinstance(value, (numpy.datetime64, numpy.timedelta64)):
+        return str(value)
+    if isinstance(value, numpy.generic):
+        return value.item()
+    return str(value)
@@ -15,6 +15,7 @@
 #   limitations under the License.
 
 import collections
+import concurrent.futures
 import hashlib
 import itertools
 import logging
@@ -23,6 +24,8 @@ import numpy
 import re
 import statistics
 import time
+from acts_contrib.test_utils.wifi.wifi_performance_test_utils import measurement_executor
+from acts_contrib.test_utils.wifi.wifi_performance_test_utils import shell_sampler
 
 VERY_SHORT_SLEEP = 0.5
 SHORT_SLEEP = 1
@@ -167,7 +170,8 @@ def get_connected_rssi(dut,
                        first_measurement_delay=0,
                        disconnect_warning=True,
                        ignore_samples=0,
-                       interface='wlan0'):
+                       interface='wlan0',
+                       device_loop=False):
     # yapf: disable
     connected_rssi = collections.OrderedDict(
         [('time_stamp', []),
@@ -179,17 +183,18 @@ def get_connected_rssi(dut,
 
     # yapf: enable
     previous_bssid = 'disconnected'
-    t0 = time.time()
-    time.sleep(first_measurement_delay)
-    for idx in range(num_measurements):
-        measurement_start_time = time.time()
-        connected_rssi['time_stamp'].append(measurement_start_time - t0)
+    rssi_commands = [('status', 'wpa_cli -i {} status'.format(interface))]
+    if interface == 'wlan0':
+        rssi_commands.append(('phy_rssi_ant', 'wl phy_rssi_ant'))
+    else:
+        rssi_commands.append(
+            ('signal_poll', 'wpa_cli -i {} signal_poll'.format(interface)))
+    for time_stamp, outputs in shell_sampler.iter_shell_samples(
+            dut, rssi_commands, num_measurements, polling_frequency,
+            first_measurement_delay, device_loop):
+        connected_rssi['time_stamp'].append(time_stamp)
         # Get signal poll RSSI
-        try:
-            status_output = dut.adb.shell(
-                'wpa_cli -i {} status'.format(interface))
-        except:
-            status_output = ''
+        status_output = outputs['status'] or ''
         match = re.search('bssid=.*', status_output)
         if match:
             current_bssid = match.group(0).split('=')[1]
@@ -218,7 +223,7 @@ def get_connected_rssi(dut,
 
         if interface == 'wlan0':
             try:
-                per_chain_rssi = dut.adb.shell('wl phy_rssi_ant')
+                per_chain_rssi = outputs['phy_rssi_ant']
                 chain_0_rssi = re.search(
                     r'rssi\[0\]\s(?P<chain_0_rssi>[0-9\-]*)', per_chain_rssi)
                 if chain_0_rssi:
@@ -243,11 +248,7 @@ def get_connected_rssi(dut,
             connected_rssi['signal_poll_avg_rssi']['data'].append(
                 combined_rssi)
         else:
-            try:
-                signal_poll_output = dut.adb.shell(
-                    'wpa_cli -i {} signal_poll'.format(interface))
-            except:
-                signal_poll_output = ''
+            signal_poll_output = outputs['signal_poll'] or ''
             match = re.search('RSSI=.*', signal_poll_output)
             if match:
                 temp_rssi = int(match.group(0).split('=')[1])
@@ -262,8 +263,6 @@ def get_connected_rssi(dut,
                     RSSI_ERROR_VAL)
             connected_rssi['chain_0_rssi']['data'].append(RSSI_ERROR_VAL)
             connected_rssi['chain_1_rssi']['data'].append(RSSI_ERROR_VAL)
-        measurement_elapsed_time = time.time() - measurement_start_time
-        time.sleep(max(0, polling_frequency - measurement_elapsed_time))
 
     # Statistics, Statistics
     for key, val in connected_rssi.copy().items():
@@ -463,6 +462,10 @@ class LinkLayerStats():
         self.llstats_cumulative = self._empty_llstats()
         self.llstats_incremental = self._empty_llstats()
         self.bandwidth = None
+        self._collection_future = None
+        self._series_mcs_index = collections.OrderedDict()
+        self._series_phy_rates = []
+        self._series_samples = []
 
     def update_stats(self):
         if self.llstats_enabled:
@@ -496,6 +499,140 @@ class LinkLayerStats():
         self.llstats_cumulative = self._empty_llstats()
         self.llstats_incremental = self._empty_llstats()
 
+    def start_collection(self, duration, interval=1):
+        """Starts collecting time-resolved llstats in the background.
+
+        A shell loop on the device dumps llstats every interval seconds and
+        streams them back over a single adb shell. Counters are not cleared
+        by the collector, so update_stats results are unaffected.
+
+        Args:
+            duration: maximum collection time in seconds.
+            interval: time between llstats samples in seconds.
+        """
+        self._series_mcs_index = collections.OrderedDict()
+        self._series_phy_rates = []
+        self._series_samples = []
+        self._collection_future = None
+        if not self.llstats_enabled:
+            return
+        if not self.bandwidth:
+            try:
+                wl_join = self.dut.adb.shell('wl status')
+                self.bandwidth = int(
+                    re.search(self.BW_REGEX, wl_join).group('bandwidth'))
+            except:
+                logging.warning('Failed to get bandwidth. '
+                                'Not collecting llstats.')
+                return
+        self._collection_future = (
+            measurement_executor.MEASUREMENT_EXECUTOR.submit(
+                self.dut.serial,
+                self._collect_stats,
+                (max(int(duration / interval), 1), interval),
+                long_running=True))
+
+    def stop_collection(self, timeout=10):
+        """Stops the background collection and returns the collected series.
+
+        Returns:
+            llstats_series: dict containing the sample time stamps, the mcs
+            ids and phy rates, the tx/rx mpdus and tx retries per sample
+            (rows) and mcs (columns), and per sample summaries: mean tx/rx
+            phy rate, rx PER, and tx/rx aggregation.
+        """
+        if self._collection_future is not None:
+            measurement_executor.MEASUREMENT_EXECUTOR.cancel_task(
+                self._collection_future)
+            try:
+                self._collection_future.result(timeout)
+            except concurrent.futures.TimeoutError:
+                logging.warning(
+                    'llstats collection did not stop within {}s.'.format(
+                        timeout))
+            except concurrent.futures.CancelledError:
+                logging.debug('llstats collection cancelled before starting.')
+            except Exception:
+                logging.warning('llstats collection failed.', exc_info=True)
+        return self._get_llstats_series()
+
+    def _collect_stats(self, num_samples, interval):
+        previous_counts = numpy.zeros((3, 0))
+        previous_fcs = numpy.zeros(2)
+        for time_stamp, outputs in shell_sampler.iter_shell_samples(
+                self.dut, [('llstats', self.LLSTATS_CMD)],
+                num_samples,
+                interval,
+                device_loop=True):
+            llstats_output = outputs['llstats'] or ''
+            mcs_stats = collections.OrderedDict()
+            if re.search(self.RX_REGEX, llstats_output):
+                mcs_stats = self._parse_mcs_stats(llstats_output)
+            mpdu_stats = self._parse_mpdu_stats(llstats_output)
+            for mcs_string, mcs_stat in mcs_stats.items():
+                if mcs_string not in self._series_mcs_index:
+                    mcs_id = mcs_stat['mcs_id']
+                    self._series_mcs_index[mcs_string] = len(
+                        self._series_mcs_index)
+                    self._series_phy_rates.append(
+                        RATE_TABLE[mcs_id.mode][mcs_id.num_streams][
+                            mcs_id.bandwidth][mcs_id.mcs])
+            # Rows are tx mpdu, rx mpdu and tx retries
+            counts = numpy.zeros((3, len(self._series_mcs_index)))
+            for mcs_string, mcs_stat in mcs_stats.items():
+                counts[:, self._series_mcs_index[mcs_string]] = [
+                    mcs_stat['txmpdu'], mcs_stat['rxmpdu'],
+                    int(mcs_stat['retries'])
+                ]
+            previous_counts = numpy.pad(
+                previous_counts,
+                ((0, 0), (0, counts.shape[1] - previous_counts.shape[1])))
+            fcs = numpy.array(
+                [mpdu_stats['rx_good_fcs'], mpdu_stats['rx_bad_fcs']])
+            # Counters reset by update_stats restart from zero
+            count_deltas = numpy.where(counts >= previous_counts,
+                                       counts - previous_counts, counts)
+            fcs_deltas = numpy.where(fcs >= previous_fcs, fcs - previous_fcs,
+                                     fcs)
+            previous_counts = counts
+            previous_fcs = fcs
+            self._series_samples.append(
+                (time_stamp, count_deltas, fcs_deltas,
+                 mpdu_stats['tx_aggregation'], mpdu_stats['rx_aggregation']))
+
+    def _get_llstats_series(self):
+        num_mcs = len(self._series_mcs_index)
+        num_samples = len(self._series_samples)
+        counts = numpy.zeros((num_samples, 3, num_mcs))
+        fcs = numpy.zeros((num_samples, 2))
+        for idx, (_, count_deltas, fcs_deltas, _,
+                  _) in enumerate(self._series_samples):
+            counts[idx, :, :count_deltas.shape[1]] = count_deltas
+            fcs[idx] = fcs_deltas
+        phy_rates = numpy.array(self._series_phy_rates)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            mean_tx_phy_rate = (counts[:, 0, :] @ phy_rates /
+                                numpy.sum(counts[:, 0, :], axis=1))
+            mean_rx_phy_rate = (counts[:, 1, :] @ phy_rates /
+                                numpy.sum(counts[:, 1, :], axis=1))
+            rx_per = fcs[:, 1] / numpy.sum(fcs, axis=1) * 100
+        llstats_series = collections.OrderedDict(
+            time_stamp=numpy.array(
+                [sample[0] for sample in self._series_samples]),
+            mcs_ids=list(self._series_mcs_index),
+            phy_rates=phy_rates,
+            tx_mpdu=counts[:, 0, :],
+            rx_mpdu=counts[:, 1, :],
+            tx_retries=counts[:, 2, :],
+            mean_tx_phy_rate=mean_tx_phy_rate,
+            mean_rx_phy_rate=mean_rx_phy_rate,
+            rx_per=rx_per,
+            tx_aggregation=numpy.array(
+                [sample[3] for sample in self._series_samples]),
+            rx_aggregation=numpy.array(
+                [sample[4] for sample in self._series_samples]))
+        return llstats_series
+
     def _empty_llstats(self):
         return collections.OrderedDict(mcs_stats=collections.OrderedDict(),
                                        mpdu_stats=collections.OrderedDict(),
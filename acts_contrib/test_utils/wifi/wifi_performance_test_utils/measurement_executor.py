@@ -0,0 +1,265 @@
+#!/usr/bin/env python3.4
+#
+#   Copyright 2022 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the 'License');
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an 'AS IS' BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import collections
+import concurrent.futures
+import logging
+import statistics
+import threading
+import time
+
+DEFAULT_POOL = 'host'
+DEFAULT_MAX_WORKERS = 4
+MAX_TASK_METRICS = 1000
+
+TaskMetrics = collections.namedtuple(
+    'TaskMetrics', ['name', 'pool', 'queue_time', 'run_time', 'status'])
+
+_current_task = threading.local()
+
+
+def is_cancelled():
+    """Checks if the measurement task of the current thread should stop.
+
+    Long running measurements call this function between samples to stop
+    early when their task is cancelled or has timed out. It always returns
+    False outside of measurement tasks.
+    """
+    task = getattr(_current_task, 'task', None)
+    return task is not None and task.is_cancelled()
+
+
+class _Task(object):
+    """Cancellation state of a submitted measurement task."""
+
+    def __init__(self, name, pool_name, timeout):
+        self.name = name
+        self.pool_name = pool_name
+        self.submit_time = time.time()
+        self.start_time = None
+        self.deadline = self.submit_time + timeout if timeout else None
+        self.cancel_event = threading.Event()
+
+    def is_cancelled(self):
+        return self.cancel_event.is_set() or (self.deadline is not None and
+                                              time.time() > self.deadline)
+
+
+class MeasurementExecutor(object):
+    """Bounded thread pools running non-blocking measurements.
+
+    Tasks are run in named pools, typically one per device, each with at most
+    max_workers threads. Pools are created on first use and reused by all
+    later tasks, and the run time of each task is recorded in task_metrics.
+    Long running tasks, e.g., collectors sampling for a whole iperf run, get
+    a thread of their own so that they do not hold a pool worker and delay
+    the short measurements queued behind them.
+
+    Attributes:
+        max_workers: maximum number of threads per pool.
+        task_metrics: TaskMetrics of the most recent tasks.
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS):
+        self.max_workers = max_workers
+        self.task_metrics = collections.deque(maxlen=MAX_TASK_METRICS)
+        self._pools = {}
+        self._tasks = {}
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def _get_pool(self, pool_name):
+        with self._lock:
+            if pool_name not in self._pools:
+                self._pools[pool_name] = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='measurement_{}'.format(pool_name))
+            return self._pools[pool_name]
+
+    def submit(self,
+               pool_name,
+               function,
+               args=(),
+               kwargs=None,
+               timeout=None,
+               long_running=False):
+        """Runs a function in a pool of the executor.
+
+        Args:
+            pool_name: name of the pool to run the function in.
+            function: function to run.
+            args: positional arguments of the function.
+            kwargs: keyword arguments of the function.
+            timeout: time in seconds after which the task is cancelled.
+            long_running: if True, the function is run on a dedicated thread
+                instead of a pool worker. The task still belongs to the pool
+                for cancellation and metrics.
+        Returns:
+            A concurrent.futures.Future of the function result.
+        """
+        kwargs = kwargs or {}
+        task = _Task(function.__name__, pool_name, timeout)
+
+        def run_task():
+            task.start_time = time.time()
+            _current_task.task = task
+            try:
+                return function(*args, **kwargs)
+            finally:
+                _current_task.task = None
+
+        if not long_running:
+            future = self._get_pool(pool_name).submit(run_task)
+            with self._lock:
+                self._tasks[future] = task
+            future.add_done_callback(self._on_task_done)
+            return future
+
+        future = concurrent.futures.Future()
+        # The task starts right away, so it is stopped through its cancel
+        # event rather than by cancelling the future.
+        future.set_running_or_notify_cancel()
+
+        def run_thread():
+            try:
+                result = run_task()
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+        thread = threading.Thread(target=run_thread,
+                                  name='measurement_{}_{}'.format(
+                                      pool_name, task.name),
+                                  daemon=True)
+        with self._lock:
+            self._tasks[future] = task
+            self._threads = [
+                thread for thread in self._threads if thread.is_alive()
+            ]
+            self._threads.append(thread)
+        future.add_done_callback(self._on_task_done)
+        thread.start()
+        return future
+
+    def _on_task_done(self, future):
+        with self._lock:
+            task = self._tasks.pop(future, None)
+        if task is None:
+            return
+        end_time = time.time()
+        if future.cancelled() or task.start_time is None:
+            queue_time = end_time - task.submit_time
+            run_time = 0
+        else:
+            queue_time = task.start_time - task.submit_time
+            run_time = end_time - task.start_time
+        if future.cancelled() or task.is_cancelled():
+            status = 'cancelled'
+        elif future.exception() is not None:
+            status = 'failed'
+        else:
+            status = 'done'
+        self.task_metrics.append(
+            TaskMetrics(task.name, task.pool_name, queue_time, run_time,
+                        status))
+
+    def cancel(self, pool_name=None):
+        """Cancels pending and running tasks.
+
+        Pending tasks are not started. Running tasks are notified and stop at
+        their next is_cancelled() check.
+
+        Args:
+            pool_name: pool to cancel tasks in. All pools if None.
+        Returns:
+            The number of cancelled tasks.
+        """
+        with self._lock:
+            tasks = [(future, task) for future, task in self._tasks.items()
+                     if pool_name is None or task.pool_name == pool_name]
+        for future, task in tasks:
+            task.cancel_event.set()
+            future.cancel()
+        if tasks:
+            logging.debug('Cancelled {} measurement tasks.'.format(len(tasks)))
+        return len(tasks)
+
+    def cancel_task(self, future):
+        """Cancels the task of a future returned by submit()."""
+        with self._lock:
+            task = self._tasks.get(future)
+        if task is not None:
+            task.cancel_event.set()
+        future.cancel()
+
+    def get_result(self, future, timeout=None):
+        """Waits for the result of a task and cancels it on timeout.
+
+        Raises:
+            concurrent.futures.TimeoutError: if the task did not finish
+                within timeout seconds.
+        """
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            self.cancel_task(future)
+            raise
+
+    def get_metrics_summary(self):
+        """Summarizes task_metrics by function name.
+
+        Returns:
+            A dict mapping function names to the number of tasks, the number
+            of cancelled and failed tasks, and the mean and max queue and run
+            times in seconds.
+        """
+        metrics_by_name = collections.OrderedDict()
+        for metrics in self.task_metrics:
+            metrics_by_name.setdefault(metrics.name, []).append(metrics)
+        summary = collections.OrderedDict()
+        for name, metrics_list in metrics_by_name.items():
+            queue_times = [metrics.queue_time for metrics in metrics_list]
+            run_times = [metrics.run_time for metrics in metrics_list]
+            statuses = [metrics.status for metrics in metrics_list]
+            summary[name] = collections.OrderedDict([
+                ('count', len(metrics_list)),
+                ('cancelled', statuses.count('cancelled')),
+                ('failed', statuses.count('failed')),
+                ('mean_queue_time', statistics.mean(queue_times)),
+                ('max_queue_time', max(queue_times)),
+                ('mean_run_time', statistics.mean(run_times)),
+                ('max_run_time', max(run_times))
+            ])
+        return summary
+
+    def shutdown(self, wait=True):
+        """Cancels all tasks and stops the threads of all pools."""
+        self.cancel()
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+            threads = self._threads
+            self._threads = []
+        for pool in pools:
+            pool.shutdown(wait=wait)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+
+# Executor shared by all non-blocking measurements of the process
+MEASUREMENT_EXECUTOR = MeasurementExecutor()
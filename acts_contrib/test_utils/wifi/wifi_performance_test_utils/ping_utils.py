@@ -14,11 +14,79 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import collections
 import re
 
+import numpy
+
 RTT_REGEX = re.compile(r'^\[(?P<timestamp>\S+)\] .*? time=(?P<rtt>\S+)')
 LOSS_REGEX = re.compile(r'(?P<loss>\S+)% packet loss')
 
+DEFAULT_PERCENTILES = (50, 90, 95, 99)
+# Default interarrival histogram bin edges in seconds
+DEFAULT_INTERARRIVAL_BINS = (0, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10)
+MIN_ARRAY_SIZE = 1024
+
+
+class PingParser(object):
+    """Parses ping output line by line into preallocated arrays.
+
+    Attributes:
+        packet_loss_percentage: The total percentage of packets lost.
+        num_lines: number of parsed lines.
+    """
+    def __init__(self, expected_count=None):
+        self.packet_loss_percentage = 100
+        self.num_lines = 0
+        self._size = 0
+        array_size = max(expected_count or 0, MIN_ARRAY_SIZE)
+        self._timestamps = numpy.empty(array_size)
+        self._rtts = numpy.empty(array_size)
+        self._sequence_numbers = numpy.empty(array_size)
+
+    def feed(self, line):
+        """Parses one line of ping output."""
+        self.num_lines += 1
+        time_idx = line.find('time=')
+        if time_idx >= 0 and line.startswith('['):
+            seq_idx = line.find('icmp_seq=')
+            try:
+                timestamp = float(line[1:line.index(']')])
+                rtt = float(line[time_idx + 5:].split(None, 1)[0])
+                seq = float(line[seq_idx + 9:].split(None, 1)[0]
+                            ) if seq_idx >= 0 else numpy.nan
+            except ValueError:
+                return
+            if self._size == len(self._rtts):
+                self._timestamps = numpy.resize(self._timestamps,
+                                                2 * self._size)
+                self._rtts = numpy.resize(self._rtts, 2 * self._size)
+                self._sequence_numbers = numpy.resize(
+                    self._sequence_numbers, 2 * self._size)
+            self._timestamps[self._size] = timestamp
+            self._rtts[self._size] = rtt
+            self._sequence_numbers[self._size] = seq
+            self._size += 1
+        elif 'loss' in line:
+            match = re.search(LOSS_REGEX, line)
+            if match:
+                self.packet_loss_percentage = float(match.group('loss'))
+
+    @property
+    def timestamps(self):
+        """Absolute timestamps of the replies."""
+        return self._timestamps[:self._size]
+
+    @property
+    def rtts(self):
+        """Round trip times of the replies."""
+        return self._rtts[:self._size]
+
+    @property
+    def sequence_numbers(self):
+        """ICMP sequence numbers of the replies, nan if not reported."""
+        return self._sequence_numbers[:self._size]
+
 
 class PingResult(object):
     """An object that contains the results of running ping command.
@@ -28,37 +96,42 @@ class PingResult(object):
         packet_loss_percentage: The total percentage of packets lost.
         transmission_times: The list of PingTransmissionTimes containing the
             timestamps gathered for transmitted packets.
-        rtts: An list-like object enumerating all round-trip-times of
-            transmitted packets.
-        timestamps: A list-like object enumerating the beginning timestamps of
-            each packet transmission.
-        ping_interarrivals: A list-like object enumerating the amount of time
-            between the beginning of each subsequent transmission.
+        rtts: A numpy array of all round-trip-times of transmitted packets.
+        timestamps: A numpy array of the beginning timestamps of each packet
+            transmission, relative to the first one.
+        ping_interarrivals: A numpy array of the amount of time between the
+            beginning of each subsequent transmission.
+        sequence_numbers: A numpy array of the ICMP sequence numbers of each
+            transmission, nan if not reported by ping.
     """
-    def __init__(self, ping_output):
-        self.packet_loss_percentage = 100
-        self.transmission_times = []
-
-        self.rtts = _ListWrap(self.transmission_times, lambda entry: entry.rtt)
-        self.timestamps = _ListWrap(self.transmission_times,
-                                    lambda entry: entry.timestamp)
-        self.ping_interarrivals = _PingInterarrivals(self.transmission_times)
-
-        self.start_time = 0
+    def __init__(self, ping_output, expected_count=None):
+        """Parses ping output.
+
+        Args:
+            ping_output: iterable of ping output lines, e.g., a list or a
+                stream.
+            expected_count: expected number of transmissions, used to size
+                the result arrays.
+        """
+        parser = PingParser(expected_count)
         for line in ping_output:
-            if 'loss' in line:
-                match = re.search(LOSS_REGEX, line)
-                self.packet_loss_percentage = float(match.group('loss'))
-            if 'time=' in line:
-                match = re.search(RTT_REGEX, line)
-                if self.start_time == 0:
-                    self.start_time = float(match.group('timestamp'))
-                self.transmission_times.append(
-                    PingTransmissionTimes(
-                        float(match.group('timestamp')) - self.start_time,
-                        float(match.group('rtt'))))
-        self.connected = len(
-            ping_output) > 1 and self.packet_loss_percentage < 100
+            parser.feed(line)
+        self.packet_loss_percentage = parser.packet_loss_percentage
+        self.start_time = parser.timestamps[0] if len(parser.timestamps) else 0
+        self.timestamps = parser.timestamps - self.start_time
+        self.rtts = parser.rtts.copy()
+        self.sequence_numbers = parser.sequence_numbers.copy()
+        self.ping_interarrivals = numpy.diff(self.timestamps)
+        self.connected = parser.num_lines > 1 and (
+            self.packet_loss_percentage < 100)
+
+    @property
+    def transmission_times(self):
+        return [
+            PingTransmissionTimes(timestamp, rtt)
+            for timestamp, rtt in zip(self.timestamps.tolist(),
+                                      self.rtts.tolist())
+        ]
 
     def __getitem__(self, item):
         if item == 'rtt':
@@ -69,12 +142,78 @@ class PingResult(object):
             return self.packet_loss_percentage
         raise ValueError('Invalid key. Please use an attribute instead.')
 
-    def as_dict(self):
+    def get_loss_bursts(self):
+        """Gets the lengths of bursts of consecutive lost packets.
+
+        Lost packets are detected from gaps in the ICMP sequence numbers of
+        replies, so losses after the last reply are not counted.
+        """
+        sequence_numbers = self.sequence_numbers[~numpy.isnan(
+            self.sequence_numbers)]
+        gaps = numpy.diff(numpy.sort(sequence_numbers)) - 1
+        return gaps[gaps > 0].astype(int)
+
+    def get_stats(self,
+                  percentiles=DEFAULT_PERCENTILES,
+                  interarrival_bins=DEFAULT_INTERARRIVAL_BINS):
+        """Computes ping statistics.
+
+        Args:
+            percentiles: RTT percentiles to compute.
+            interarrival_bins: bin edges of the interarrival histogram in
+                seconds. Longer interarrivals are counted in the last bin.
+        Returns:
+            stats: dict containing RTT mean, min, max, percentiles and jitter,
+            i.e., mean absolute difference between consecutive RTTs, loss
+            bursts counts and lengths, and the interarrival histogram.
+        """
+        stats = collections.OrderedDict()
+        if len(self.rtts):
+            stats['rtt_mean'] = float(numpy.mean(self.rtts))
+            stats['rtt_min'] = float(numpy.min(self.rtts))
+            stats['rtt_max'] = float(numpy.max(self.rtts))
+            for percentile, value in zip(
+                    percentiles, numpy.percentile(self.rtts, percentiles)):
+                stats['rtt_p{}'.format(percentile)] = float(value)
+        else:
+            for key in ['rtt_mean', 'rtt_min', 'rtt_max'] + [
+                    'rtt_p{}'.format(percentile) for percentile in percentiles
+            ]:
+                stats[key] = float('nan')
+        stats['rtt_jitter'] = float(numpy.mean(numpy.abs(numpy.diff(
+            self.rtts)))) if len(self.rtts) > 1 else float('nan')
+        loss_bursts = self.get_loss_bursts()
+        stats['loss_burst_count'] = len(loss_bursts)
+        stats['max_loss_burst'] = int(loss_bursts.max()) if len(
+            loss_bursts) else 0
+        histogram, _ = numpy.histogram(numpy.minimum(
+            self.ping_interarrivals, interarrival_bins[-1]),
+                                       bins=interarrival_bins)
+        stats['interarrival_histogram'] = collections.OrderedDict(
+            bins=list(interarrival_bins), counts=histogram.tolist())
+        return stats
+
+    def as_dict(self, compact=False):
+        """Gets a JSON serializable dict of the ping results.
+
+        Args:
+            compact: if True, timestamps are rounded to microseconds, the
+                interarrivals, which can be computed from timestamps, are
+                omitted, and ping statistics are included.
+        """
+        if compact:
+            return {
+                'connected': 1 if self.connected else 0,
+                'rtt': self.rtts.tolist(),
+                'time_stamp': numpy.round(self.timestamps, 6).tolist(),
+                'packet_loss_percentage': self.packet_loss_percentage,
+                'stats': self.get_stats()
+            }
         return {
             'connected': 1 if self.connected else 0,
-            'rtt': list(self.rtts),
-            'time_stamp': list(self.timestamps),
-            'ping_interarrivals': list(self.ping_interarrivals),
+            'rtt': self.rtts.tolist(),
+            'time_stamp': self.timestamps.tolist(),
+            'ping_interarrivals': self.ping_interarrivals.tolist(),
             'packet_loss_percentage': self.packet_loss_percentage
         }
 
@@ -89,37 +228,3 @@ class PingTransmissionTimes(object):
     def __init__(self, timestamp, rtt):
         self.rtt = rtt
         self.timestamp = timestamp
-
-
-class _ListWrap(object):
-    """A convenient helper class for treating list iterators as native lists."""
-    def __init__(self, wrapped_list, func):
-        self.__wrapped_list = wrapped_list
-        self.__func = func
-
-    def __getitem__(self, key):
-        return self.__func(self.__wrapped_list[key])
-
-    def __iter__(self):
-        for item in self.__wrapped_list:
-            yield self.__func(item)
-
-    def __len__(self):
-        return len(self.__wrapped_list)
-
-
-class _PingInterarrivals(object):
-    """A helper class for treating ping interarrivals as a native list."""
-    def __init__(self, ping_entries):
-        self.__ping_entries = ping_entries
-
-    def __getitem__(self, key):
-        return (self.__ping_entries[key + 1].timestamp -
-                self.__ping_entries[key].timestamp)
-
-    def __iter__(self):
-        for index in range(len(self.__ping_entries) - 1):
-            yield self[index]
-
-    def __len__(self):
-        return max(0, len(self.__ping_entries) - 1)
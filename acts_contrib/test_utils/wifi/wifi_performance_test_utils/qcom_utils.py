@@ -24,6 +24,7 @@ import statistics
 import numpy
 import time
 from acts import asserts
+from acts_contrib.test_utils.wifi.wifi_performance_test_utils import shell_sampler
 
 SHORT_SLEEP = 1
 MED_SLEEP = 6
@@ -48,7 +49,8 @@ def get_connected_rssi(dut,
                        first_measurement_delay=0,
                        disconnect_warning=True,
                        ignore_samples=0,
-                       interface='wlan0'):
+                       interface='wlan0',
+                       device_loop=False):
     # yapf: disable
     connected_rssi = collections.OrderedDict(
         [('time_stamp', []),
@@ -59,17 +61,17 @@ def get_connected_rssi(dut,
          ('chain_1_rssi', empty_rssi_result())])
     # yapf: enable
     previous_bssid = 'disconnected'
-    t0 = time.time()
-    time.sleep(first_measurement_delay)
-    for idx in range(num_measurements):
-        measurement_start_time = time.time()
-        connected_rssi['time_stamp'].append(measurement_start_time - t0)
+    rssi_commands = [
+        ('status', 'wpa_cli -i {} status'.format(interface)),
+        ('signal_poll', 'wpa_cli -i {} signal_poll'.format(interface)),
+        ('station_dump', STATION_DUMP.format(interface))
+    ]
+    for time_stamp, outputs in shell_sampler.iter_shell_samples(
+            dut, rssi_commands, num_measurements, polling_frequency,
+            first_measurement_delay, device_loop):
+        connected_rssi['time_stamp'].append(time_stamp)
         # Get signal poll RSSI
-        try:
-            status_output = dut.adb.shell(
-                'wpa_cli -i {} status'.format(interface))
-        except:
-            status_output = ''
+        status_output = outputs['status'] or ''
         match = re.search('bssid=.*', status_output)
         if match:
             current_bssid = match.group(0).split('=')[1]
@@ -86,11 +88,7 @@ def get_connected_rssi(dut,
             connected_rssi['ssid'].append(ssid)
         else:
             connected_rssi['ssid'].append('disconnected')
-        try:
-            signal_poll_output = dut.adb.shell(
-                'wpa_cli -i {} signal_poll'.format(interface))
-        except:
-            signal_poll_output = ''
+        signal_poll_output = outputs['signal_poll'] or ''
         match = re.search('FREQUENCY=.*', signal_poll_output)
         if match:
             frequency = int(match.group(0).split('=')[1])
@@ -116,10 +114,7 @@ def get_connected_rssi(dut,
                 RSSI_ERROR_VAL)
 
         # Get per chain RSSI
-        try:
-            per_chain_rssi = dut.adb.shell(STATION_DUMP.format(interface))
-        except:
-            per_chain_rssi = ''
+        per_chain_rssi = outputs['station_dump'] or ''
         match = re.search('.*signal avg:.*', per_chain_rssi)
         if match:
             per_chain_rssi = per_chain_rssi[per_chain_rssi.find('[') +
@@ -132,8 +127,6 @@ def get_connected_rssi(dut,
         else:
             connected_rssi['chain_0_rssi']['data'].append(RSSI_ERROR_VAL)
             connected_rssi['chain_1_rssi']['data'].append(RSSI_ERROR_VAL)
-        measurement_elapsed_time = time.time() - measurement_start_time
-        time.sleep(max(0, polling_frequency - measurement_elapsed_time))
 
     # Compute mean RSSIs. Only average valid readings.
     # Output RSSI_ERROR_VAL if no valid connected readings found.
@@ -378,6 +371,13 @@ class LinkLayerStats():
         self.llstats_cumulative = self._empty_llstats()
         self.llstats_incremental = self._empty_llstats()
 
+    def start_collection(self, duration, interval=1):
+        logging.warning('Time-resolved llstats not supported on this '
+                        'platform.')
+
+    def stop_collection(self, timeout=10):
+        return collections.OrderedDict()
+
     def _empty_llstats(self):
         return collections.OrderedDict(mcs_stats=collections.OrderedDict(),
                                        summary=collections.OrderedDict())
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3.4
+#
+#   Copyright 2022 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the 'License');
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an 'AS IS' BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import collections
+import datetime
+import json
+import sqlite3
+import threading
+
+import numpy
+
+# Test case parameters stored in indexed columns of the results table
+KEY_FIELDS = ('channel', 'mode', 'traffic_type', 'traffic_direction',
+              'chain_mask')
+RESULTS_STORE_FILE = 'results.db'
+CURRENT_RUN = 'current'
+ALL_RUNS = 'all'
+
+StoredResult = collections.namedtuple(
+    'StoredResult',
+    ['result_id', 'run_id', 'test_class', 'test_name', 'params', 'scalars',
+     'extras'])
+
+
+def _to_json(value):
+    return json.dumps(value, default=_serialize_value, sort_keys=True)
+
+
+def _serialize_value(value):
+    """Serializes numpy values and other objects not supported by json."""
+    if isinstance(value, numpy.ndarray):
+        return value.tolist()
+    if isinstance(value, numpy.generic):
+        return value.item()
+    if isinstance(value, tuple):
+        return list(value)
+    return str(value)
+
+
+class ResultsStore(object):
+    """SQLite store of performance test results.
+
+    Each result holds the test case parameters, with KEY_FIELDS in indexed
+    columns, scalar results, json serializable extras, e.g., hover text, and
+    metric series measured over attenuation. Series are stored as one row per
+    point, so that results can be aggregated over attenuation in SQL. Results
+    are tagged with the run_id of the store that added them, so a store file
+    shared across runs enables cross-run comparisons.
+
+    Attributes:
+        db_path: path to the SQLite database file.
+        run_id: identifier of the current run.
+    """
+
+    def __init__(self, db_path, run_id=None):
+        self.db_path = db_path
+        self.run_id = run_id or datetime.datetime.now().strftime(
+            '%Y-%m-%d_%H-%M-%S-%f')
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        key_columns = ''.join(
+            ', {} TEXT'.format(field) for field in KEY_FIELDS)
+        with self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS results (result_id INTEGER '
+                'PRIMARY KEY, run_id TEXT, test_class TEXT, test_name TEXT{}, '
+                'params TEXT, scalars TEXT, extras TEXT)'.format(key_columns))
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS points (result_id INTEGER, '
+                'metric TEXT, point_idx INTEGER, attenuation REAL, '
+                'value REAL)')
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS results_keys ON results (run_id, '
+                'test_class, {})'.format(', '.join(KEY_FIELDS)))
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS results_test_name ON results '
+                '(test_name)')
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS points_metric ON points '
+                '(metric, result_id)')
+
+    def close(self):
+        """Closes the database, the store cannot be used afterwards."""
+        with self._lock:
+            self._connection.close()
+
+    def add_result(self,
+                   test_class,
+                   test_name,
+                   testcase_params,
+                   attenuation=None,
+                   series=None,
+                   scalars=None,
+                   extras=None):
+        """Adds a test result to the store.
+
+        Args:
+            test_class: name of the test class.
+            test_name: name of the test case.
+            testcase_params: dict of test case parameters.
+            attenuation: list of attenuations at which series were measured.
+            series: dict mapping metric names to lists of values measured at
+                each attenuation. Series shorter than attenuation are padded
+                with NaN.
+            scalars: dict of scalar results, e.g., metrics.
+            extras: dict of other json serializable results.
+        Returns:
+            The result_id of the stored result.
+        """
+        attenuation = numpy.asarray(
+            attenuation if attenuation is not None else [], dtype=float)
+        points = []
+        for metric, values in (series or {}).items():
+            values = numpy.asarray(values, dtype=float)[:len(attenuation)]
+            padded_values = numpy.full(len(attenuation), numpy.nan)
+            padded_values[:len(values)] = values
+            points.append((metric, padded_values))
+        key_values = [
+            _to_json(testcase_params.get(field)) for field in KEY_FIELDS
+        ]
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                'INSERT INTO results (run_id, test_class, test_name, {}, '
+                'params, scalars, extras) VALUES ({})'.format(
+                    ', '.join(KEY_FIELDS),
+                    ', '.join(['?'] * (len(KEY_FIELDS) + 6))),
+                [self.run_id, test_class, test_name] + key_values + [
+                    _to_json(testcase_params),
+                    _to_json(scalars or {}),
+                    _to_json(extras or {})
+                ])
+            result_id = cursor.lastrowid
+            self._connection.executemany(
+                'INSERT INTO points VALUES (?, ?, ?, ?, ?)',
+                ((result_id, metric, idx, atten,
+                  None if numpy.isnan(value) else value)
+                 for metric, values in points
+                 for idx, (atten, value) in enumerate(
+                     zip(attenuation.tolist(), values.tolist()))))
+        return result_id
+
+    def _get_filter(self, run_id, test_class, key_fields):
+        """Gets an SQL WHERE clause and its arguments to select results."""
+        conditions = []
+        args = []
+        if run_id != ALL_RUNS:
+            conditions.append('run_id = ?')
+            args.append(self.run_id if run_id == CURRENT_RUN else run_id)
+        if test_class is not None:
+            conditions.append('test_class = ?')
+            args.append(test_class)
+        for field, value in key_fields.items():
+            if field not in KEY_FIELDS:
+                raise ValueError('{} is not a key field.'.format(field))
+            conditions.append('{} = ?'.format(field))
+            args.append(_to_json(value))
+        clause = ' WHERE ' + ' AND '.join(conditions) if conditions else ''
+        return clause, args
+
+    def get_results(self,
+                    test_class=None,
+                    test_name=None,
+                    run_id=CURRENT_RUN,
+                    **key_fields):
+        """Gets stored results in insertion order.
+
+        Args:
+            test_class: name of the test class, any class if None.
+            test_name: name of the test case, any test if None.
+            run_id: run to get results from, CURRENT_RUN or ALL_RUNS.
+            key_fields: values of KEY_FIELDS to filter results by.
+        Returns:
+            A list of StoredResult.
+        """
+        clause, args = self._get_filter(run_id, test_class, key_fields)
+        if test_name is not None:
+            clause += ' AND test_name = ?' if clause else ' WHERE test_name = ?'
+            args.append(test_name)
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT result_id, run_id, test_class, test_name, params, '
+                'scalars, extras FROM results{} ORDER BY result_id'.format(
+                    clause), args).fetchall()
+        return [
+            StoredResult(row[0], row[1], row[2], row[3], json.loads(row[4]),
+                         json.loads(row[5]), json.loads(row[6]))
+            for row in rows
+        ]
+
+    def get_run_ids(self):
+        """Gets the ids of all runs in the store, oldest first."""
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT run_id FROM results GROUP BY run_id '
+                'ORDER BY MIN(result_id)').fetchall()
+        return [row[0] for row in rows]
+
+    def get_series(self, result_ids, metric):
+        """Gets a metric series of several results with a single query.
+
+        Args:
+            result_ids: list of result ids.
+            metric: name of the metric series.
+        Returns:
+            A dict mapping result ids to (attenuation, values) numpy arrays.
+            Results without the series are omitted.
+        """
+        series = collections.OrderedDict()
+        if not result_ids:
+            return series
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT result_id, attenuation, value FROM points WHERE '
+                'metric = ? AND result_id IN ({}) ORDER BY result_id, '
+                'point_idx'.format(', '.join(['?'] * len(result_ids))),
+                [metric] + list(result_ids)).fetchall()
+        if not rows:
+            return series
+        data = numpy.array(rows, dtype=float)
+        ids = data[:, 0].astype(int)
+        split_idx = numpy.flatnonzero(numpy.diff(ids)) + 1
+        series_by_id = {
+            int(chunk[0, 0]): (chunk[:, 1], chunk[:, 2])
+            for chunk in numpy.split(data, split_idx)
+        }
+        for result_id in result_ids:
+            if result_id in series_by_id:
+                series[result_id] = series_by_id[result_id]
+        return series
+
+    def aggregate(self,
+                  metric,
+                  group_by=KEY_FIELDS,
+                  test_class=None,
+                  run_id=CURRENT_RUN,
+                  **key_fields):
+        """Aggregates a metric over attenuation across results.
+
+        Args:
+            metric: name of the metric series to aggregate.
+            group_by: KEY_FIELDS to group results by.
+            test_class: name of the test class, any class if None.
+            run_id: run to aggregate results from, CURRENT_RUN or ALL_RUNS.
+            key_fields: values of KEY_FIELDS to filter results by.
+        Returns:
+            An OrderedDict mapping tuples of group_by values, in the order in
+            which groups were first added, to dicts of attenuation, mean, min,
+            max and count numpy arrays, NaN values excluded.
+        """
+        for field in group_by:
+            if field not in KEY_FIELDS:
+                raise ValueError('{} is not a key field.'.format(field))
+        clause, args = self._get_filter(run_id, test_class, key_fields)
+        clause = clause.replace(' WHERE ', ' AND ', 1)
+        group_columns = ''.join('results.{}, '.format(field)
+                                for field in group_by)
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT {0}MIN(points.result_id), points.attenuation, '
+                'AVG(points.value), MIN(points.value), MAX(points.value), '
+                'COUNT(points.value) FROM points JOIN results ON '
+                'points.result_id = results.result_id WHERE points.metric = '
+                '?{1} GROUP BY {0}points.attenuation ORDER BY '
+                'points.attenuation'.format(group_columns, clause),
+                [metric] + args).fetchall()
+        groups = {}
+        for row in rows:
+            group = tuple(json.loads(value) for value in row[:len(group_by)])
+            groups.setdefault(group, []).append(row[len(group_by):])
+        aggregates = collections.OrderedDict()
+        for group in sorted(groups,
+                            key=lambda group: min(row[0]
+                                                  for row in groups[group])):
+            data = numpy.array([row[1:] for row in groups[group]],
+                               dtype=float)
+            aggregates[group] = collections.OrderedDict([
+                ('attenuation', data[:, 0]), ('mean', data[:, 1]),
+                ('min', data[:, 2]), ('max', data[:, 3]),
+                ('count', data[:, 4].astype(int))
+            ])
+        return aggregates
+
+
+class GoldenResults(object):
+    """In-memory index of golden result files.
+
+    Golden files are matched to tests by name, loaded on first use and kept
+    in memory, so each file is only read once per test class.
+    """
+
+    def __init__(self, golden_files_list):
+        self.golden_files_list = list(golden_files_list)
+        self._results = {}
+
+    def get_path(self, test_name):
+        """Gets the path of the golden file of a test.
+
+        Raises:
+            KeyError: if no golden file matches the test name.
+        """
+        try:
+            return next(file_name for file_name in self.golden_files_list
+                        if test_name in file_name)
+        except StopIteration:
+            raise KeyError('No golden results for {}'.format(test_name))
+
+    def get(self, test_name):
+        """Gets the golden results dict of a test."""
+        golden_path = self.get_path(test_name)
+        if golden_path not in self._results:
+            with open(golden_path, 'r') as golden_file:
+                golden_results = json.load(golden_file)
+            golden_results['total_attenuation'] = (
+                numpy.asarray(golden_results['attenuation'], dtype=float) +
+                golden_results['fixed_attenuation']).tolist()
+            self._results[golden_path] = golden_results
+        return self._results[golden_path]
+
+    def get_limits(self,
+                   test_name,
+                   total_attenuation,
+                   abs_tolerance,
+                   pct_tolerance,
+                   metric='throughput_receive',
+                   num_neighbors=3):
+        """Computes limits of a metric from the golden results of a test.
+
+        At each attenuation, the limits are derived from the golden values at
+        the num_neighbors closest golden attenuations, widened by the larger
+        of the absolute and percent tolerances. Lower limits are at least 0.
+
+        Args:
+            test_name: name of the test.
+            total_attenuation: list of attenuations to compute limits at.
+            abs_tolerance: absolute tolerance of the metric.
+            pct_tolerance: tolerance in percent of the metric.
+            metric: name of the golden metric.
+            num_neighbors: number of golden points used for each limit.
+        Returns:
+            dict containing attenuation, lower_limit and upper_limit lists.
+        """
+        golden_results = self.get(test_name)
+        golden_attenuation = numpy.asarray(golden_results['total_attenuation'])
+        golden_values = numpy.asarray(golden_results[metric], dtype=float)
+        total_attenuation = numpy.asarray(total_attenuation, dtype=float)
+        distances = numpy.abs(total_attenuation[:, numpy.newaxis] -
+                              golden_attenuation[numpy.newaxis, :])
+        closest_idx = numpy.argsort(distances, axis=1,
+                                    kind='stable')[:, :num_neighbors]
+        closest_values = golden_values[closest_idx]
+        min_values = closest_values.min(axis=1)
+        max_values = closest_values.max(axis=1)
+        lower_limit = numpy.maximum(
+            min_values - numpy.maximum(abs_tolerance,
+                                       min_values * pct_tolerance / 100), 0)
+        upper_limit = max_values + numpy.maximum(
+            abs_tolerance, max_values * pct_tolerance / 100)
+        return {
+            'attenuation': total_attenuation.tolist(),
+            'lower_limit': lower_limit.tolist(),
+            'upper_limit': upper_limit.tolist()
+        }
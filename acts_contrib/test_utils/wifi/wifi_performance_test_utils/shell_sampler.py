@@ -0,0 +1,185 @@
+#!/usr/bin/env python3.4
+#
+#   Copyright 2022 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the 'License');
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an 'AS IS' BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import collections
+import logging
+import subprocess
+import time
+from acts_contrib.test_utils.wifi.wifi_performance_test_utils import measurement_executor
+
+RECORD_MARKER = '##SAMPLE##'
+SECTION_MARKER = '##OUTPUT##'
+
+
+def get_device_loop_command(commands, num_samples, interval):
+    """Builds a shell loop that runs commands periodically on a device.
+
+    Each iteration prints a record marker with the device time, followed by
+    a section marker and the output of each command. Iterations start every
+    interval seconds, or as soon as the previous one ends if the commands
+    take longer.
+
+    Args:
+        commands: list of (name, shell command) tuples.
+        num_samples: number of loop iterations.
+        interval: time between iterations in seconds.
+    Returns:
+        The shell command string.
+    """
+    command_list = ''.join("echo '{} {}'; {{ {}; }} 2>&1; ".format(
+        SECTION_MARKER, name, command.strip().rstrip(';'))
+                           for name, command in commands)
+    return ('i=0; while [ $i -lt {} ]; do sleep {} & '
+            'echo "{} $(date +%s.%N)"; {}i=$((i+1)); wait; done'.format(
+                num_samples, interval, RECORD_MARKER, command_list))
+
+
+def parse_device_loop_output(lines):
+    """Parses the output of a device loop command record by record.
+
+    Args:
+        lines: iterable of output lines, e.g., read from a running process.
+    Yields:
+        A tuple of the device timestamp (None if unavailable) and an ordered
+        dict with the output of each command of a record.
+    """
+    timestamp = None
+    outputs = None
+    name = None
+    section = []
+    for line in lines:
+        if line.startswith(RECORD_MARKER):
+            if outputs is not None:
+                if name is not None:
+                    outputs[name] = ''.join(section)
+                yield timestamp, outputs
+            try:
+                timestamp = float(line[len(RECORD_MARKER):])
+            except ValueError:
+                timestamp = None
+            outputs = collections.OrderedDict()
+            name = None
+        elif line.startswith(SECTION_MARKER) and outputs is not None:
+            if name is not None:
+                outputs[name] = ''.join(section)
+            name = line[len(SECTION_MARKER):].strip()
+            section = []
+        elif outputs is not None and name is not None:
+            section.append(line)
+    if outputs is not None:
+        if name is not None:
+            outputs[name] = ''.join(section)
+        yield timestamp, outputs
+
+
+def start_device_loop(dut, commands, num_samples, interval):
+    """Starts a device loop with its output piped back to the host.
+
+    adb.shell_nb discards the output of the command, so the loop is started
+    in its own adb shell process.
+
+    Args:
+        dut: AndroidDevice to run commands on.
+        commands: list of (name, shell command) tuples.
+        num_samples: number of loop iterations.
+        interval: time between iterations in seconds.
+    Returns:
+        The subprocess.Popen object of the adb shell process.
+    """
+    return subprocess.Popen([
+        'adb', '-s', dut.serial, 'shell',
+        get_device_loop_command(commands, num_samples, interval)
+    ],
+                            stdout=subprocess.PIPE,
+                            stderr=subprocess.STDOUT)
+
+
+def _iter_process_lines(process):
+    for line in iter(process.stdout.readline, b''):
+        yield line.decode('utf-8', errors='replace')
+
+
+def iter_shell_samples(dut,
+                       commands,
+                       num_samples,
+                       interval,
+                       first_sample_delay=0,
+                       device_loop=False):
+    """Runs shell commands periodically and yields their outputs.
+
+    By default, each command is run with a separate adb shell call, and the
+    calls of a sample are followed by a sleep to keep the sampling interval.
+    With device_loop, all samples are taken by a single shell loop running
+    on the device. Its output is streamed back and parsed as it arrives,
+    which removes adb round trips from the sampling interval.
+
+    Sampling stops early if it runs in a cancelled measurement task.
+
+    Args:
+        dut: AndroidDevice to run commands on.
+        commands: list of (name, shell command) tuples.
+        num_samples: number of samples.
+        interval: time between samples in seconds.
+        first_sample_delay: time to wait before the first sample.
+        device_loop: if True, run the commands in a device side loop.
+    Yields:
+        A tuple of the sample time relative to the call of the function, and
+        a dict with the output of each command, or None if a command failed.
+    """
+    t0 = time.time()
+    time.sleep(first_sample_delay)
+    if not device_loop:
+        for idx in range(num_samples):
+            if measurement_executor.is_cancelled():
+                logging.debug('Sampling cancelled.')
+                return
+            sample_start_time = time.time()
+            outputs = collections.OrderedDict()
+            for name, command in commands:
+                try:
+                    outputs[name] = dut.adb.shell(command)
+                except:
+                    outputs[name] = None
+            yield sample_start_time - t0, outputs
+            sample_elapsed_time = time.time() - sample_start_time
+            time.sleep(max(0, interval - sample_elapsed_time))
+        return
+
+    process = start_device_loop(dut, commands, num_samples, interval)
+    first_timestamp = None
+    try:
+        for timestamp, outputs in parse_device_loop_output(
+                _iter_process_lines(process)):
+            if measurement_executor.is_cancelled():
+                logging.debug('Sampling cancelled.')
+                return
+            if timestamp is None or first_timestamp is None:
+                # Use host time for the first sample or if device time is
+                # not available.
+                sample_time = time.time() - t0
+                if timestamp is not None:
+                    first_timestamp = timestamp
+                    first_sample_time = sample_time
+            else:
+                sample_time = first_sample_time + timestamp - first_timestamp
+            for name, _ in commands:
+                outputs.setdefault(name, None)
+            yield sample_time, outputs
+    finally:
+        if process.poll() is None:
+            logging.debug('Stopping device sampling loop.')
+            process.kill()
+        process.wait()
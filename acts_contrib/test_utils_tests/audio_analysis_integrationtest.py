@@ -19,7 +19,10 @@
 import logging
 import numpy
 import os
+import tempfile
+import time
 import unittest
+import wave
 
 import acts_contrib.test_utils.audio_analysis_lib.audio_analysis as audio_analysis
 import acts_contrib.test_utils.audio_analysis_lib.audio_data as audio_data
@@ -101,6 +104,38 @@ class SpectralAnalysisTest(unittest.TestCase):
         logging.debug('Compare the result')
         self.assertEqual(dummy_answer, improved_answer)
 
+    def test_peak_detection_pathological(self):
+        """Checks plateaus, all-zero runs and odd window sizes."""
+        arrays = [
+            numpy.zeros(50),
+            numpy.ones(50),
+            numpy.repeat(numpy.random.randint(0, 4, 20), 5).astype(float),
+            numpy.random.randint(0, 3, 200).astype(float),
+            numpy.concatenate([numpy.zeros(30), [1, 2, 2, 1],
+                               numpy.zeros(30), [3]]),
+            numpy.arange(100, dtype=float),
+            numpy.arange(100, 0, -1, dtype=float),
+        ]
+        for array in arrays:
+            for window_size in [2, 3, 4, 5, 10, 11, 1000]:
+                self.assertEqual(
+                    self.dummy_peak_detection(array, window_size),
+                    audio_analysis.peak_detection(array, window_size),
+                    'window_size %d on %s' % (window_size, array))
+
+    def test_peak_detection_benchmark(self):
+        array = numpy.random.uniform(0, 1, 100000)
+        window_size = 64
+        start_time = time.time()
+        dummy_answer = self.dummy_peak_detection(array, window_size)
+        dummy_secs = time.time() - start_time
+        start_time = time.time()
+        improved_answer = audio_analysis.peak_detection(array, window_size)
+        improved_secs = time.time() - start_time
+        logging.debug('Dummy peak detection: %.3fs, sliding max: %.3fs',
+                      dummy_secs, improved_secs)
+        self.assertEqual(dummy_answer, improved_answer)
+
     def test_spectral_analysis(self):
         rate = 48000
         length_in_secs = 0.5
@@ -353,6 +388,254 @@ class AnomalyTest(unittest.TestCase):
             self.check_anomaly()
 
 
+class AnomalyDetectionBenchmarkTest(unittest.TestCase):
+    def setUp(self):
+        """Creates a long sine wave with noise and a few anomalies."""
+        numpy.random.seed(0)
+
+        self.block_size = 120
+        self.rate = 48000
+        self.freq = 440
+        samples = 5 * self.rate
+        x = numpy.arange(samples) / float(self.rate)
+        self.y = numpy.sin(self.freq * 2.0 * numpy.pi * x)
+        self.y += numpy.random.standard_normal(samples) * 0.1
+        for anomaly_start_secs in [0.5, 1.7, 3.2]:
+            anomaly_start = int(anomaly_start_secs * self.rate)
+            self.y[anomaly_start:anomaly_start + 240] = 0
+        self.y[int(4.1 * self.rate):int(4.2 * self.rate)] = 2
+
+    def dummy_anomaly_detection(self, signal, rate, freq, block_size,
+                                threshold):
+        """Detects anomaly by matching each block one at a time.
+
+        Args:
+            signal: A 1-D array-like object for 1-channel PCM data.
+            rate: Sampling rate in samples per second.
+            freq: The expected frequency of signal.
+            block_size: The block size in samples to detect anomaly.
+            threshold: The threshold of correlation index to be judge as
+                matched.
+
+        Returns:
+            A list containing time markers in seconds that have an anomaly
+                within block_size samples.
+
+        """
+        golden_y = audio_analysis._generate_golden_pattern(
+            rate, freq, block_size)
+        results = []
+        for start in range(0, len(signal), int(block_size / 2)):
+            test_signal = signal[start:start + block_size]
+            if not audio_analysis._moving_pattern_matching(
+                    golden_y, test_signal, threshold):
+                results.append(start)
+        return [float(x) / rate for x in results]
+
+    def test_anomaly_detection_large(self):
+        threshold = audio_analysis.PATTERN_MATCHING_THRESHOLD
+        start_time = time.time()
+        dummy_answer = self.dummy_anomaly_detection(self.y, self.rate,
+                                                    self.freq,
+                                                    self.block_size,
+                                                    threshold)
+        dummy_secs = time.time() - start_time
+        start_time = time.time()
+        batched_answer = audio_analysis.anomaly_detection(
+            self.y, self.rate, self.freq, self.block_size, threshold)
+        batched_secs = time.time() - start_time
+        logging.debug('Per-block detection: %.3fs, batched detection: %.3fs',
+                      dummy_secs, batched_secs)
+        self.assertTrue(dummy_answer)
+        self.assertEqual(dummy_answer, batched_answer)
+
+    def test_anomaly_detection_truncated_tail(self):
+        """Checks the blocks cut short by the end of the signal."""
+        signal = self.y[:self.rate // 10 + self.block_size // 3]
+        signal[-10:] = 0
+        threshold = audio_analysis.PATTERN_MATCHING_THRESHOLD
+        self.assertEqual(
+            self.dummy_anomaly_detection(signal, self.rate, self.freq,
+                                         self.block_size, threshold),
+            audio_analysis.anomaly_detection(signal, self.rate, self.freq,
+                                             self.block_size, threshold))
+
+    def test_anomaly_detection_short_signal(self):
+        """Checks a signal shorter than one block."""
+        signal = self.y[:self.block_size // 2 + 5]
+        threshold = audio_analysis.PATTERN_MATCHING_THRESHOLD
+        self.assertEqual(
+            self.dummy_anomaly_detection(signal, self.rate, self.freq,
+                                         self.block_size, threshold),
+            audio_analysis.anomaly_detection(signal, self.rate, self.freq,
+                                             self.block_size, threshold))
+
+
+class THDNTest(unittest.TestCase):
+    def setUp(self):
+        """Creates a sine wave with noise and a burst of distortion."""
+        numpy.random.seed(0)
+        self.rate = 48000
+        self.freq = 1000
+        samples = self.rate // 2
+        x = numpy.arange(samples) / float(self.rate)
+        self.y = numpy.sin(self.freq * 2.0 * numpy.pi * x)
+        self.y += numpy.random.standard_normal(samples) * 0.01
+        self.y[10000:10500] = numpy.clip(self.y[10000:10500], -0.3, 0.3)
+        self.step_size = 500
+        self.window_size = 2400
+
+    def dummy_THDN_series(self, signal, freq):
+        """Computes THD+N of each moving window one at a time."""
+        return [
+            audio_analysis.THDN(signal[cur:cur + self.window_size], self.rate,
+                                10, freq)
+            for cur in range(0,
+                             len(signal) - self.window_size, self.step_size)
+        ]
+
+    def test_THDN_does_not_modify_signal(self):
+        y = self.y + 1
+        expected = y.copy()
+        audio_analysis.THDN(y, self.rate, 10, self.freq)
+        numpy.testing.assert_array_equal(y, expected)
+
+    def test_THDN_series(self):
+        series = audio_analysis.THDN_series(self.y, self.rate, self.step_size,
+                                            self.window_size, 10, self.freq)
+        numpy.testing.assert_allclose(
+            series, self.dummy_THDN_series(self.y, self.freq), rtol=1e-9)
+
+    def test_THDN_series_without_freq(self):
+        series = audio_analysis.THDN_series(self.y, self.rate, self.step_size,
+                                            self.window_size, 10, None)
+        numpy.testing.assert_allclose(series,
+                                      self.dummy_THDN_series(self.y, None),
+                                      rtol=1e-9)
+
+    def test_max_THDN(self):
+        greatest_THDN = audio_analysis.max_THDN(self.y, self.rate,
+                                                self.step_size,
+                                                self.window_size, 10,
+                                                self.freq)
+        self.assertAlmostEqual(greatest_THDN,
+                               max(self.dummy_THDN_series(self.y, self.freq)))
+
+    def test_max_THDN_short_signal(self):
+        greatest_THDN = audio_analysis.max_THDN(self.y[:self.window_size],
+                                                self.rate, self.step_size,
+                                                self.window_size, 10,
+                                                self.freq)
+        self.assertEqual(greatest_THDN, 0)
+
+
+class FileAnalysisTest(unittest.TestCase):
+    def setUp(self):
+        """Writes a stereo wave file of sine waves with an anomaly."""
+        numpy.random.seed(0)
+        self.rate = 48000
+        self.freq = 1000
+        samples = self.rate
+        x = numpy.arange(samples) / float(self.rate)
+        left = 0.5 * numpy.sin(self.freq * 2.0 * numpy.pi * x)
+        right = 0.5 * numpy.sin(self.freq * 2.0 * numpy.pi * x + 1)
+        left += numpy.random.standard_normal(samples) * 0.01
+        left[20000:20500] = 0
+        self.signal = numpy.stack([left, right])
+        pcm = numpy.round(self.signal.transpose() * 32767).astype('<i2')
+        # The signal as read back by soundfile.
+        self.signal = pcm.transpose() / 32768.0
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.temp_dir.name, 'test.wav')
+        with wave.open(self.filename, 'wb') as wave_writer:
+            wave_writer.setnchannels(2)
+            wave_writer.setsampwidth(2)
+            wave_writer.setframerate(self.rate)
+            wave_writer.writeframes(pcm.tobytes())
+
+        # Forces the files to be analyzed in several blocks.
+        self.block_frames = audio_analysis.FILE_ANALYSIS_BLOCK_FRAMES
+        audio_analysis.FILE_ANALYSIS_BLOCK_FRAMES = 7000
+
+    def tearDown(self):
+        audio_analysis.FILE_ANALYSIS_BLOCK_FRAMES = self.block_frames
+        self.temp_dir.cleanup()
+
+    def test_read_file_matches_read_binary(self):
+        with open(self.filename, 'rb') as f:
+            binary = f.read()
+        offset = audio_data.get_wave_data_offset(self.filename)
+        in_memory = audio_data.AudioRawData(binary[offset:], 2, 'S16_LE')
+        mapped = audio_data.AudioRawData(None, 2, 'S16_LE')
+        mapped.read_file(self.filename, offset=offset)
+        self.assertEqual(mapped.n_frames, self.rate)
+        numpy.testing.assert_array_equal(in_memory.channel_data,
+                                         mapped.channel_data)
+        blocks = [block for _, block in mapped.iter_blocks(7000)]
+        numpy.testing.assert_array_equal(numpy.concatenate(blocks, axis=1),
+                                         mapped.channel_data)
+
+    def test_get_file_THDN(self):
+        expected = [
+            audio_analysis.THDN(channel.copy(), self.rate, 10, self.freq)
+            for channel in self.signal
+        ]
+        results = audio_analysis.get_file_THDN(self.filename, 10, self.freq)
+        numpy.testing.assert_allclose(results, expected, rtol=1e-9)
+
+    def test_get_file_THDN_without_freq(self):
+        expected = [
+            audio_analysis.THDN(channel.copy(), self.rate, 10, None)
+            for channel in self.signal
+        ]
+        results = audio_analysis.get_file_THDN(self.filename, 10)
+        numpy.testing.assert_allclose(results, expected, rtol=1e-9)
+
+    def test_get_file_max_THDN(self):
+        step_size = 1000
+        window_size = 4800
+        expected = []
+        for channel in self.signal:
+            expected.append(
+                max(
+                    audio_analysis.THDN(
+                        channel[cur:cur + window_size].copy(), self.rate,
+                        10, self.freq)
+                    for cur in range(0, self.rate - window_size, step_size)))
+        results = audio_analysis.get_file_max_THDN(self.filename, step_size,
+                                                   window_size, 10,
+                                                   self.freq)
+        numpy.testing.assert_allclose(results, expected, rtol=1e-9)
+
+    def test_get_file_THDN_series_with_process_pool(self):
+        expected = audio_analysis.get_file_THDN_series(self.filename, 1000,
+                                                       4800, 10, self.freq)
+        self.assertEqual(len(expected[0]), len(range(0, self.rate - 4800,
+                                                     1000)))
+        results = audio_analysis.get_file_THDN_series(self.filename,
+                                                      1000,
+                                                      4800,
+                                                      10,
+                                                      self.freq,
+                                                      max_workers=2)
+        for channel_results, channel_expected in zip(results, expected):
+            numpy.testing.assert_array_equal(channel_results,
+                                             channel_expected)
+
+    def test_get_file_anomaly_durations(self):
+        expected = [
+            audio_analysis.get_anomaly_durations(channel, self.rate,
+                                                 self.freq)
+            for channel in self.signal
+        ]
+        results = audio_analysis.get_file_anomaly_durations(
+            self.filename, self.freq)
+        self.assertTrue(results[0])
+        self.assertFalse(results[1])
+        self.assertEqual(results, expected)
+
+
 if __name__ == '__main__':
     logging.basicConfig(
         level=logging.DEBUG,
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2022 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import io
+import re
+import subprocess
+import time
+import unittest
+from unittest import mock
+
+import numpy
+
+from acts_contrib.test_utils.bt import bt_test_utils
+
+BQR_LINES = [
+    '2022-05-03 17:39:29.120  1234  5678 I bt_btif_bqr: Monitoring , '
+    'Handle: 0x0003, Packet_Types: 0x0011, PwLv: 2, RSSI: -45, SNR: 20, '
+    'RSSI_C0: -44, RSSI_C1: -47, TxPw_C0: 10, TxPw_C1: -3, BFTx: 0x1, '
+    'DivTx: 0x0\n',
+    '2022-05-03 17:39:29.220  1234  5678 I bt_btif_bqr: Monitoring , '
+    'Handle: 0x0003, Packet_Types: 0x0011, PwLv: 0xa, RSSI: -46, SNR: 21, '
+    'RSSI_C0: -45, RSSI_C1: -48, TxPw_C0: 10, TxPw_C1: -3, BFTx: 0x1, '
+    'DivTx: 0x0\n',
+    # Record without antenna fields
+    '2022-05-03 17:39:29.320  1234  5678 I bt_btif_bqr: Monitoring , '
+    'Handle: 0x0003, PwLv: 2, RSSI: -50, SNR: 18\n',
+    # BQR fields without the BQR tag
+    '2022-05-03 17:39:29.330  1234  5678 I bt_btif_bqr: Handle: 0x0003, '
+    'RSSI: -10, SNR: 18\n',
+    '2022-05-03 17:39:29.420  1234  5678 I bt_btif_bqr: Monitoring , '
+    'Handle: 0x0003, PwLv: 3, RSSI: -47, RSSI_C0: -46, RSSI_C1: -49, '
+    'TxPw_C0: -2, TxPw_C1: 4, BFTx: 0x0, DivTx: 0x1\n',
+    '2022-05-03 17:39:29.500  1234  5678 I bt_stack: Connection state\n',
+]
+
+# Per metric regular expressions used before the combined BQR_REGEX
+LEGACY_BQR_REGEXES = {
+    'pwlv': r'PwLv:\s(\S+)',
+    'rssi': r'RSSI:\s[-](\d+)',
+    'rssi_c0': r'RSSI_C0:\s[-](\d+)',
+    'rssi_c1': r'RSSI_C1:\s[-](\d+)',
+    'txpw_c0': r'\sTxPw_C0:\s(-?\d+)',
+    'txpw_c1': r'\sTxPw_C1:\s(-?\d+)',
+    'bftx': r'BFTx:\s(\w+)',
+    'divtx': r'DivTx:\s(\w+)'
+}
+
+
+def parse_legacy_bqr_metrics(lines, bqr_tag=bt_test_utils.DEFAULT_BQR_TAG):
+    """Parses each metric from all lines like get_bt_metric used to."""
+    metrics = {}
+    for metric, regex in LEGACY_BQR_REGEXES.items():
+        values = [
+            re.findall(regex, line)[0].strip(',') for line in lines
+            if bqr_tag in line and re.findall(regex, line)
+        ]
+        if bt_test_utils.BQR_METRICS[metric]:
+            metrics[metric] = [-int(value) for value in values]
+        else:
+            metrics[metric] = [
+                int(value, 16) if '0x' in value else int(value, 10)
+                for value in values
+            ]
+    return metrics
+
+
+class BqrParserTest(unittest.TestCase):
+    """Unit tests for bt_test_utils.BqrParser."""
+
+    def setUp(self):
+        self.parser = bt_test_utils.BqrParser()
+        for line in BQR_LINES:
+            self.parser.feed(line)
+
+    def test_columns_match_legacy_parsing(self):
+        legacy_metrics = parse_legacy_bqr_metrics(BQR_LINES)
+        for metric, values in self.parser.get_columns().items():
+            self.assertEqual(values[~numpy.isnan(values)].tolist(),
+                             legacy_metrics[metric], metric)
+
+    def test_columns_are_aligned_by_record(self):
+        self.assertEqual(self.parser.time_stamps, [
+            '2022-05-03 17:39:29.120', '2022-05-03 17:39:29.220',
+            '2022-05-03 17:39:29.320', '2022-05-03 17:39:29.420'
+        ])
+        columns = self.parser.get_columns()
+        self.assertEqual(columns['rssi'].tolist(), [-45, -46, -50, -47])
+        self.assertEqual(columns['pwlv'].tolist(), [2, 10, 2, 3])
+        self.assertTrue(numpy.isnan(columns['txpw_c0'][2]))
+        self.assertEqual(columns['txpw_c0'][3], -2)
+
+    def test_processed_metrics(self):
+        self.assertEqual(
+            self.parser.get_processed_metrics(), {
+                'rssi': -47.0,
+                'pwlv': 2,
+                'rssi_c0': -45.0,
+                'rssi_c1': -48.0,
+                'txpw_c0': 10,
+                'txpw_c1': -3,
+                'bftx': 1,
+                'divtx': 0
+            })
+
+    def test_missing_metrics(self):
+        parser = bt_test_utils.BqrParser()
+        parser.feed(BQR_LINES[2])
+        processed_metrics = parser.get_processed_metrics()
+        self.assertEqual(processed_metrics['rssi'], -50)
+        self.assertEqual(processed_metrics['rssi_c0'], 'n/a')
+        self.assertEqual(processed_metrics['bftx'], 'n/a')
+
+
+class BqrStreamTest(unittest.TestCase):
+    """Unit tests for bt_test_utils.BqrStream."""
+
+    def setUp(self):
+        self.ad = mock.Mock()
+        self.ad.serial = 'local'
+        # Like job.run_async, shell_nb discards the output of the command
+        self.ad.adb.shell_nb.return_value.stdout = None
+
+    def test_stream_starts_at_start_time(self):
+        logcat = subprocess.Popen
+        with mock.patch('subprocess.Popen') as popen:
+            # Prints the records and keeps running like logcat
+            popen.side_effect = lambda args, **kwargs: logcat([
+                'sh', '-c', 'printf %s "$0"; exec sleep 30', ''.join(BQR_LINES)
+            ], **kwargs)
+            stream = bt_test_utils.BqrStream(self.ad,
+                                             start_time=1651599569.1234)
+            deadline = time.time() + 5
+            while (len(stream.parser.time_stamps) < 4
+                   and time.time() < deadline):
+                time.sleep(0.01)
+            parser = stream.stop()
+        self.assertEqual(popen.call_args[0][0], [
+            'adb', '-s', 'local', 'logcat', '-v', 'year', '-T',
+            '1651599569.123', '-e', 'Monitoring , Handle:'
+        ])
+        self.assertEqual(len(parser.time_stamps), 4)
+
+    @mock.patch('subprocess.Popen')
+    def test_logcat_error_is_raised(self, popen):
+        proc = popen.return_value
+        proc.stdout = io.BytesIO(b'adb: device offline\n')
+        proc.poll.return_value = 1
+        stream = bt_test_utils.BqrStream(self.ad)
+        with self.assertRaisesRegex(bt_test_utils.BtTestUtilsError,
+                                    'exited with code 1'):
+            stream.stop()
+
+    @mock.patch('subprocess.Popen')
+    def test_reader_error_is_raised(self, popen):
+        proc = popen.return_value
+        proc.stdout = mock.MagicMock()
+        proc.stdout.__iter__.side_effect = OSError('broken pipe')
+        proc.poll.return_value = None
+        stream = bt_test_utils.BqrStream(self.ad)
+        with self.assertRaisesRegex(bt_test_utils.BtTestUtilsError,
+                                    'broken pipe'):
+            stream.stop()
+        proc.kill.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2022 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import unittest
+from unittest import mock
+
+from acts_contrib.test_utils.cellular import keysight_5g_testapp
+
+NO_ERROR = '+0,"No error"'
+TEST_APP_CONFIG = {
+    'brand': 'Keysight',
+    'model': 'TestApp',
+    'ip_address': '127.0.0.1',
+    'hislip_interface': 'hislip0'
+}
+
+
+class FakeTestAppResource(object):
+    """Fake pyvisa resource of the Keysight test app."""
+
+    def __init__(self):
+        self.writes = []
+        self.queries = []
+        self.errors = []
+        self.cell_state = 0
+        self.write_error = None
+
+    def write(self, command):
+        if self.write_error:
+            raise self.write_error
+        self.writes.append(command)
+
+    def query(self, command):
+        self.queries.append(command)
+        if command == '*IDN?':
+            return 'Keysight Technologies,E7515B'
+        if command.endswith('COUNt?'):
+            return '2'
+        if command.endswith('ACTive:STATe?'):
+            return str(self.cell_state)
+        if command == 'SYSTem:ERRor?':
+            return self.errors.pop(0) if self.errors else NO_ERROR
+        return '1'
+
+    def close(self):
+        pass
+
+
+class Keysight5GTestAppTest(unittest.TestCase):
+    """Unit tests for keysight_5g_testapp.Keysight5GTestApp."""
+
+    def setUp(self):
+        self.resource = FakeTestAppResource()
+        resource_manager = mock.Mock()
+        resource_manager.open_resource.return_value = self.resource
+        patchers = [
+            mock.patch.object(keysight_5g_testapp.pyvisa,
+                              'ResourceManager',
+                              return_value=resource_manager),
+            mock.patch.object(keysight_5g_testapp, 'VISA_QUERY_DELAY', 0)
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.test_app = keysight_5g_testapp.Keysight5GTestApp(TEST_APP_CONFIG)
+        self.resource.writes.clear()
+        self.resource.queries.clear()
+
+    def test_batch_commands(self):
+        with self.test_app.batch_commands():
+            self.test_app.set_cell_duplex_mode('NR5G', 1, 'TDD')
+            self.test_app.set_cell_bandwidth('NR5G', 1, 'BW100')
+            # Writes are queued until the end of the batch
+            self.assertEqual(self.resource.writes, [])
+        self.assertEqual(self.resource.writes, [
+            'BSE:CONFig:NR5G:CELL1:DUPLEX:MODe TDD;:'
+            'BSE:CONFig:NR5G:CELL1:DL:BW BW100'
+        ])
+        self.assertEqual(self.resource.queries.count('*OPC?'), 1)
+        self.assertIsNone(self.test_app.command_batch)
+
+    def test_query_flushes_batch(self):
+        with self.test_app.batch_commands():
+            self.test_app.set_cell_bandwidth('NR5G', 1, 'BW100')
+            self.test_app.get_cell_count('NR5G')
+            self.assertEqual(self.resource.writes,
+                             ['BSE:CONFig:NR5G:CELL1:DL:BW BW100'])
+            self.test_app.set_cell_bandwidth('NR5G', 2, 'BW50')
+        self.assertEqual(self.resource.writes[-1],
+                         'BSE:CONFig:NR5G:CELL2:DL:BW BW50')
+
+    def test_flush_batch_errors(self):
+        self.test_app.set_cell_dl_power('NR5G', 1, -50, True)
+        self.assertTrue(self.test_app.state_cache)
+        connection_error = IOError('VI_ERROR_CONN_LOST')
+        self.resource.write_error = connection_error
+        with self.assertRaises(RuntimeError) as context:
+            with self.test_app.batch_commands():
+                self.test_app.set_cell_bandwidth('NR5G', 1, 'BW100')
+        self.assertIs(context.exception.__cause__, connection_error)
+        # Settings may not have been applied, so the cache is cleared
+        self.assertEqual(self.test_app.state_cache, {})
+
+    def test_cache_skips_unchanged_settings(self):
+        self.test_app.set_cell_dl_power('NR5G', 1, -50, True)
+        num_writes = len(self.resource.writes)
+        self.test_app.set_cell_dl_power('NR5G', 1, -50, True)
+        self.assertEqual(len(self.resource.writes), num_writes)
+        self.test_app.set_cell_dl_power('NR5G', 1, -60, True)
+        self.assertIn('BSE:CONFIG:NR5G:CELL1:DL:POWer:CHANnel -60',
+                      self.resource.writes)
+        # Cleared or expired settings are resent
+        num_writes = len(self.resource.writes)
+        self.test_app.clear_state_cache()
+        self.test_app.set_cell_dl_power('NR5G', 1, -60, True)
+        self.assertGreater(len(self.resource.writes), num_writes)
+        num_writes = len(self.resource.writes)
+        self.test_app.state_cache_ttl = -1
+        self.test_app.set_cell_dl_power('NR5G', 1, -60, True)
+        self.assertGreater(len(self.resource.writes), num_writes)
+
+    def test_scpi_import_invalidates_cache(self):
+        self.test_app.set_cell_band('NR5G', 1, 'N78')
+        with mock.patch.object(self.resource, 'query', return_value='0'):
+            self.test_app.import_scpi_file('config.scpi')
+        num_writes = len(self.resource.writes)
+        self.test_app.set_cell_band('NR5G', 1, 'N78')
+        self.assertEqual(self.resource.writes[num_writes:],
+                         ['BSE:CONFig:NR5G:CELL1:BAND N78'])
+
+    def test_cell_state_reads(self):
+        self.test_app.set_cell_state('NR5G', 1, 0)
+        # The cell is turned on outside of the controller
+        self.resource.cell_state = 1
+        self.assertEqual(self.test_app.get_cell_state('NR5G', 1,
+                                                      refresh=False), 0)
+        self.assertEqual(self.test_app.get_cell_state('NR5G', 1), 1)
+        self.assertEqual(self.test_app.get_cell_state('NR5G', 1,
+                                                      refresh=False), 1)
+        # Cached states expire
+        self.resource.cell_state = 0
+        self.test_app.state_cache_ttl = -1
+        self.assertEqual(self.test_app.get_cell_state('NR5G', 1,
+                                                      refresh=False), 0)
+
+    def test_command_timing(self):
+        self.test_app.set_cell_bandwidth('NR5G', 1, 'BW100')
+        self.test_app.set_cell_bandwidth('NR5G', 2, 'BW100')
+        command_timing = self.test_app.get_command_timing()
+        self.assertEqual(command_timing['BSE:CONFig:NR5G:CELL1:DL:BW']['count'],
+                         1)
+        self.assertIn('*OPC?', command_timing)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2022 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from unittest import mock
+
+import numpy
+
+from acts_contrib.test_utils.cellular.performance import shannon_log_parser
+
+CSV_HEADER = 'Index,PC Time,Core ID,Message,Source\n'
+CSV_LINE = '"{}","{}","{}","{}","modem"\n'
+START_TIME = datetime.datetime(2022, 1, 1, 10, 0, 0)
+
+# Messages of each segment as (seconds from start, message). The frequency
+# range switches and the Tx power gaps cross the segment boundaries.
+SEGMENTS = [
+    [(0, 'LT12 PUSCH_Power 10'), (0.1, '###[AS] RSRP[-9000 -9100]'),
+     (0.2, '[RF NR SUB6] PD : CC0 (monitoring) target_pwr 120 frIdx 0 '),
+     (0.3, 'random noise'), (0.4, 'LT12 PUSCH_Power 11'),
+     (0.5, '[RF NR SUB6] PD : CC0 (monitoring) target_pwr 130 frIdx 1 ')],
+    [(2.0, '[RF NR SUB6] PD : CC0 (monitoring) target_pwr 140 '),
+     (2.5, 'LT12 PUSCH_Power 12'),
+     (2.6, '[RF NR SUB6] PD : CC0 (monitoring) target_pwr 150 frIdx 0 '),
+     (3.0, '[SAR][DYNAMIC] EN-DC(2) UsedAvgSarLTE 500 600')],
+    [(5.0, '[RF NR SUB6] PD : CC0 (monitoring) target_pwr 160 '),
+     (5.2, 'LT12 PUSCH_Power 13'), (5.3, '###[AS] RSRP[-8000 -8100]')],
+]
+
+
+def get_log_data_columns(log_data):
+    """Gets all columns of a LogData object as {name: numpy array}."""
+    columns = {}
+    for name, value in vars(log_data).items():
+        if isinstance(value, shannon_log_parser.RatLogData):
+            for rat_name, rat_value in vars(value).items():
+                if isinstance(rat_value, shannon_log_parser.ColumnBuffer):
+                    columns['{}.{}'.format(name, rat_name)] = rat_value.array
+        elif isinstance(value, shannon_log_parser.ColumnBuffer):
+            columns[name] = value.array
+    return columns
+
+
+class ColumnBufferTest(unittest.TestCase):
+    """Unit tests for shannon_log_parser.ColumnBuffer."""
+
+    def test_append_and_extend(self):
+        column = shannon_log_parser.ColumnBuffer()
+        self.assertFalse(column)
+        for value in range(100):
+            column.append(value)
+        column.extend([100.5, 101.5])
+        self.assertEqual(len(column), 102)
+        self.assertEqual(column[0], 0)
+        self.assertEqual(column[-1], 101.5)
+        self.assertEqual(list(column)[:3], [0, 1, 2])
+        numpy.testing.assert_array_equal(numpy.asarray(column)[98:],
+                                         [98, 99, 100.5, 101.5])
+
+    def test_slice_and_dtype(self):
+        column = shannon_log_parser.ColumnBuffer([1, 2, 3, 4],
+                                                 dtype=numpy.int64)
+        column.append(5)
+        column_slice = column[1:3]
+        self.assertIsInstance(column_slice, shannon_log_parser.ColumnBuffer)
+        self.assertEqual(column_slice.array.dtype, numpy.int64)
+        numpy.testing.assert_array_equal(column_slice.array, [2, 3])
+        # Slices are copies and do not change the original column
+        column_slice.append(10)
+        self.assertEqual(len(column), 5)
+
+
+class LogDataTest(unittest.TestCase):
+    """Unit tests for shannon_log_parser.LogData."""
+
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.log_dir)
+
+    def get_log_data(self, start_time):
+        log_data = shannon_log_parser.LogData()
+        log_data.lte.tx_pwr_time.extend(start_time + numpy.arange(10))
+        log_data.lte.tx_pwr.extend(numpy.arange(10) * 2)
+        log_data.lte.sar_mode_time.append(start_time)
+        log_data.lte.sar_mode.append(3)
+        log_data.endc_sar_time.append(start_time)
+        log_data.endc_sar_lte.append(0.5)
+        log_data.endc_sar_nr.append(0.25)
+        return log_data
+
+    def test_save_and_load(self):
+        log_data = self.get_log_data(0)
+        log_data.lte.sar_limit_dbm = 20
+        log_data.ul_mimo = 1
+        file_path = os.path.join(self.log_dir, 'log_data.npz')
+        log_data.save(file_path)
+        loaded_data = shannon_log_parser.LogData.load(file_path)
+        loaded_columns = get_log_data_columns(loaded_data)
+        for name, values in get_log_data_columns(log_data).items():
+            numpy.testing.assert_array_equal(loaded_columns[name],
+                                             values,
+                                             err_msg=name)
+        self.assertEqual(loaded_data.lte.sar_mode.array.dtype, numpy.int64)
+        self.assertEqual(loaded_data.lte.sar_limit_dbm, 20)
+        self.assertEqual(loaded_data.ul_mimo, 1)
+        self.assertEqual(loaded_data.nr.label, 'NR CC0')
+
+    def test_extend(self):
+        log_data = self.get_log_data(0)
+        log_data.ul_mimo = 1
+        other_data = self.get_log_data(10)
+        other_data.lte.sar_limit_dbm = 20
+        other_data.nr.initial_power = 5
+        log_data.extend(other_data)
+        numpy.testing.assert_array_equal(log_data.lte.tx_pwr_time.array,
+                                         numpy.arange(20))
+        self.assertEqual(len(log_data.endc_sar_nr), 2)
+        self.assertEqual(log_data.lte.sar_limit_dbm, 20)
+        self.assertEqual(log_data.nr.initial_power, 5)
+        self.assertEqual(log_data.ul_mimo, 1)
+        self.assertEqual(log_data.lte.label, 'LTE')
+
+    def test_time_slice(self):
+        log_data = self.get_log_data(0)
+        tx_pwr_slice = log_data.lte.time_slice('tx_pwr_time', 2.5, 5)
+        numpy.testing.assert_array_equal(tx_pwr_slice['tx_pwr_time'],
+                                         [3, 4, 5])
+        numpy.testing.assert_array_equal(tx_pwr_slice['tx_pwr'], [6, 8, 10])
+        sar_slice = log_data.time_slice('endc_sar_time', 1, 2)
+        self.assertEqual(len(sar_slice['endc_sar_lte']), 0)
+
+
+class ShannonLoggerCacheTest(unittest.TestCase):
+    """Unit tests for the parsed log data cache of ShannonLogger."""
+
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.log_zip_file = os.path.join(self.log_dir, 'modem_logs.zip')
+        with zipfile.ZipFile(self.log_zip_file, 'w') as zip_file:
+            zip_file.writestr('log_0.sdm', 'segment 0')
+        self.modem_bin = os.path.join(self.log_dir, 'modem.bin')
+        with open(self.modem_bin, 'w') as file:
+            file.write('modem binary')
+        self.filter_file = os.path.join(self.log_dir, 'filter.txt')
+        with open(self.filter_file, 'w') as file:
+            file.write('filter 1')
+
+    def tearDown(self):
+        shutil.rmtree(self.log_dir)
+
+    def get_logger(self, filter_file_path=None):
+        return shannon_log_parser.ShannonLogger(
+            modem_bin=self.modem_bin, filter_file_path=filter_file_path)
+
+    def test_cache_key(self):
+        cache_file = self.get_logger()._get_cache_file(self.log_zip_file)
+        self.assertEqual(self.get_logger()._get_cache_file(self.log_zip_file),
+                         cache_file)
+        filtered_cache_file = self.get_logger(
+            self.filter_file)._get_cache_file(self.log_zip_file)
+        self.assertNotEqual(filtered_cache_file, cache_file)
+        # Changing the filter file contents invalidates the cache
+        with open(self.filter_file, 'w') as file:
+            file.write('filter 2')
+        self.assertNotEqual(
+            self.get_logger(self.filter_file)._get_cache_file(
+                self.log_zip_file), filtered_cache_file)
+        # So does changing the modem binary or the gap options
+        self.assertNotEqual(
+            self.get_logger()._get_cache_file(self.log_zip_file,
+                                              gap_options=1), cache_file)
+        with open(self.modem_bin, 'w') as file:
+            file.write('other modem binary')
+        self.assertNotEqual(
+            self.get_logger()._get_cache_file(self.log_zip_file), cache_file)
+
+    def test_cache_hit_and_miss(self):
+        logger = self.get_logger()
+        log_data = shannon_log_parser.LogData()
+        log_data.lte.tx_pwr_time.extend([1, 2, 3])
+        log_data.lte.tx_pwr.extend([10, 11, 12])
+        with mock.patch.object(logger, '_export_logs', return_value=[]), \
+                mock.patch.object(logger, '_parse_logs',
+                                  return_value=log_data) as parse_logs:
+            first_data = logger.process_log(self.log_zip_file)
+            self.assertEqual(parse_logs.call_count, 1)
+            self.assertTrue(
+                os.path.isfile(logger._get_cache_file(self.log_zip_file)))
+            cached_data = logger.process_log(self.log_zip_file)
+            self.assertEqual(parse_logs.call_count, 1)
+            logger.process_log(self.log_zip_file, use_cache=False)
+            self.assertEqual(parse_logs.call_count, 2)
+            # A different filter file misses the cache
+            logger.filter_file = self.filter_file
+            logger.process_log(self.log_zip_file)
+            self.assertEqual(parse_logs.call_count, 3)
+        self.assertIs(first_data, log_data)
+        numpy.testing.assert_array_equal(cached_data.lte.tx_pwr.array,
+                                         [10, 11, 12])
+
+
+class ShannonLoggerTest(unittest.TestCase):
+    """Unit tests for shannon_log_parser.ShannonLogger log parsing."""
+
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.csv_files = []
+        # Segments are listed out of order to check sorting by start time
+        for index, segment in reversed(list(enumerate(SEGMENTS))):
+            csv_file = os.path.join(self.log_dir, 'log_{}.csv'.format(index))
+            with open(csv_file, 'w') as file:
+                file.write(CSV_HEADER)
+                for line_index, (seconds, message) in enumerate(segment):
+                    timestamp = START_TIME + datetime.timedelta(
+                        seconds=seconds)
+                    file.write(
+                        CSV_LINE.format(line_index,
+                                        timestamp.strftime('%H:%M:%S.%f'),
+                                        'L1', message))
+            self.csv_files.append(csv_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.log_dir)
+
+    def parse_logs(self, max_workers):
+        logger = shannon_log_parser.ShannonLogger(modem_bin='modem.bin',
+                                                  max_workers=max_workers)
+        return logger._parse_logs(self.csv_files)
+
+    def test_parallel_parsing_matches_serial_parsing(self):
+        serial_columns = get_log_data_columns(self.parse_logs(1))
+        parallel_columns = get_log_data_columns(self.parse_logs(3))
+        self.assertEqual(serial_columns.keys(), parallel_columns.keys())
+        for name, values in serial_columns.items():
+            numpy.testing.assert_array_equal(parallel_columns[name],
+                                             values,
+                                             err_msg=name)
+
+    def test_state_crosses_segment_boundaries(self):
+        log_data = self.parse_logs(3)
+        # FR1 Tx power is not logged while the FR2 index is set at the end
+        # of the first segment.
+        self.assertNotIn(14, log_data.nr.tx_pwr)
+        self.assertEqual(log_data.nr.tx_pwr[-1], 16)
+        # LTE Tx power gaps across segments are filled with interpolated
+        # values, so there are more points than logged values.
+        self.assertGreater(len(log_data.lte.tx_pwr), 4)
+        numpy.testing.assert_allclose(log_data.lte.rsrp_rx0, [-90, -80])
+        self.assertEqual(log_data.endc_sar_time[0], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
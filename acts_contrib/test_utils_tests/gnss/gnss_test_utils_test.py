@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2022 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import os
+import subprocess
+import tempfile
+import unittest
+from unittest import mock
+
+from acts_contrib.test_utils.gnss import gnss_test_utils
+
+FIX_LOG_TEMPLATE = """\
+Read: 2022/05/03 10:00:{second:02d}.000
+Antenna_History Avg Top4: 30.5
+Antenna_History Avg: 28.5
+Baseband_History Avg Top4: 29.5
+Baseband_History Avg: 27.5
+L5 used in fix: true
+Latitude: 25.0
+Longitude: 121.5
+Time: 2022/05/03 10:00:{second:02d}.500
+"""
+
+REAL_POPEN = subprocess.Popen
+
+
+def local_popen(args, **kwargs):
+    """Runs "adb -s <serial> exec-out <command>" processes on the host."""
+    if isinstance(args, list) and args[:1] == ["adb"]:
+        args = args[4:]
+    return REAL_POPEN(args, **kwargs)
+
+
+class LocalAdb(object):
+    """Runs adb shell commands on the host."""
+
+    def shell(self, command):
+        return subprocess.check_output(command, shell=True).decode("utf-8")
+
+    def shell_nb(self, command):
+        # Like job.run_async, the output of the command is discarded
+        return subprocess.Popen(command,
+                                shell=True,
+                                stdout=subprocess.DEVNULL,
+                                stderr=subprocess.STDOUT)
+
+
+class LocalDevice(object):
+    def __init__(self):
+        self.adb = LocalAdb()
+        self.serial = "local"
+        self.log = mock.Mock()
+
+
+class ParseGtwGpstoolLogTest(unittest.TestCase):
+    """Unit tests for gnss_test_utils.parse_gtw_gpstool_log."""
+
+    def setUp(self):
+        self.log_dir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.log_dir.name, "api_log.txt"), "w") as f:
+            for second in range(40):
+                f.write(FIX_LOG_TEMPLATE.format(second=second))
+
+    def tearDown(self):
+        self.log_dir.cleanup()
+
+    @mock.patch("subprocess.Popen", side_effect=local_popen)
+    def test_parse_gtw_gpstool_log(self, popen):
+        with mock.patch.object(gnss_test_utils, "GNSSSTATUS_LOG_PATH",
+                               self.log_dir.name + "/"):
+            track_data = gnss_test_utils.parse_gtw_gpstool_log(
+                LocalDevice(), [25.0, 121.5])
+        self.assertEqual(len(track_data), 40)
+        report = track_data["2022/05/03 10:00:39.500"]
+        self.assertEqual(report.l5flag, "true")
+        self.assertAlmostEqual(report.pe, 0)
+        self.assertEqual(report.ant_top4cn, 30.5)
+        self.assertEqual(report.base_cn, 27.5)
+        self.assertEqual(report.device_time.second, 39)
+        self.assertIn(["adb", "-s", "local", "exec-out", "cat"],
+                      [call[0][0][:5] for call in popen.call_args_list])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2022 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import datetime
+import os
+import re
+import tempfile
+import unittest
+
+import numpy
+import pandas
+
+from acts_contrib.test_utils.gnss import gnss_testlog_utils
+
+SV_LINE = ('Fix: true Type: GPS SV: {sv} C/No: {cno:.1f} Elevation: 45.0 '
+           'Azimuth: 120.0 Signal: L1 Frequency: 1575.42 EPH: true '
+           'ALM: true\n')
+SV_WBB_LINE = ('Fix: true Type: GPS SV: {sv} C/No: {cno:.1f}, 28.2 '
+               'Elevation: 10.0 Azimuth: 20.0 Signal: L5 '
+               'Frequency: 1176.45 EPH: true ALM: true\n')
+SV_STAT_NAMES = [
+    'History Avg Top4', 'Current Avg Top4', 'History Avg', 'Current Avg'
+]
+
+
+def write_gpsapilog(filename, num_epochs):
+    """Writes a GPS API log with one fix per second.
+
+    Returns:
+      The number of lines written.
+    """
+    lines = 0
+    phone_time = datetime.datetime(2022, 1, 1, 10, 0, 0)
+    with open(filename, 'w') as log_file:
+        # Lines logged before the first timestamp have no phone time.
+        log_file.write(SV_LINE.format(sv=1, cno=30.0))
+        lines += 1
+        for epoch in range(num_epochs):
+            phone_time += datetime.timedelta(seconds=1)
+            time_string = phone_time.strftime('%Y/%m/%d %H:%M:%S')
+            epoch_lines = ['{} Read: {} bytes\n'.format(time_string, epoch)]
+            epoch_lines += [
+                SV_LINE.format(sv=sv, cno=20.0 + epoch % 10 + sv)
+                for sv in range(epoch % 4)
+            ]
+            epoch_lines.append(SV_WBB_LINE.format(sv=9, cno=30.1))
+            epoch_lines += [
+                '{}_{} : 30.0\n'.format(rf_path, name)
+                for rf_path in ['Antenna', 'Baseband']
+                for name in SV_STAT_NAMES
+            ]
+            epoch_lines += [
+                '{} : {:.1f}\n'.format(name, 25.0 + epoch % 7)
+                for name in SV_STAT_NAMES
+            ]
+            epoch_lines += [
+                'L5 used in fix: true\n', 'L5 engaging rate: 50.0%\n',
+                'Provider: gps\n', 'Latitude: 37.{}\n'.format(epoch),
+                'Longitude: -122.{}\n'.format(epoch), 'Altitude: 10.5\n',
+                'Time: {}\n'.format(time_string), 'Speed: 0.0\n',
+                'Bearing: 1.0\n'
+            ]
+            log_file.writelines(epoch_lines)
+            lines += len(epoch_lines)
+    return lines
+
+
+def dummy_add_phone_time(target_df, timestamp_df):
+    """Adds phone time row by row, for comparison with add_phone_time."""
+    def get_phone_time(target_df_row):
+        try:
+            row_num = timestamp_df[
+                timestamp_df.index < target_df_row.name].iloc[-1].name
+            phone_time = timestamp_df.loc[row_num]['phone_time']
+        except IndexError:
+            row_num = numpy.NaN
+            phone_time = numpy.NaN
+        return phone_time, row_num
+
+    time_n_row_num = target_df.apply(get_phone_time, axis=1)
+    target_df[['phone_time', 'time_row_num'
+               ]] = pandas.DataFrame(time_n_row_num.apply(pandas.Series))
+
+
+class ParseLogTest(unittest.TestCase):
+    """Unit tests for parse_log_to_df and iter_parse_log_to_df."""
+
+    def setUp(self):
+        self.log_dir = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self.log_dir.name, 'gpsapi.txt')
+        write_gpsapilog(self.log_file, 50)
+
+    def tearDown(self):
+        self.log_dir.cleanup()
+
+    def test_get_regex_literal_prefix(self):
+        self.assertEqual(
+            gnss_testlog_utils.get_regex_literal_prefix(r'^L5\s+used'),
+            (True, 'L5'))
+        self.assertEqual(
+            gnss_testlog_utils.get_regex_literal_prefix(r'C\/No:\s+(\d+)'),
+            (False, 'C/No:'))
+        self.assertEqual(
+            gnss_testlog_utils.get_regex_literal_prefix(r'^Speeds?:'),
+            (True, 'Speed'))
+        self.assertEqual(
+            gnss_testlog_utils.get_regex_literal_prefix(r'^Fix|^Time'),
+            (False, ''))
+
+    def test_parse_log_to_df_matches_every_regex(self):
+        configs = {
+            'Time': r'^Time:\s+(?P<Date>\S+)\s+(?P<Time>\S+)',
+            'AnyTime': r'(\d+):(?P<Minute>\d+):(?P<Second>\d+)',
+            'T': r'^T',
+            'L5': r'^L5 (used|engaging)',
+            'Fix': r'^Fix|^Provider',
+        }
+        parsed_data = gnss_testlog_utils.parse_log_to_df(self.log_file,
+                                                         configs,
+                                                         index_rownum=False)
+        with open(self.log_file, 'r') as log_file:
+            lines = log_file.readlines()
+        for key, regex_string in configs.items():
+            cregex = re.compile(regex_string)
+            expected = [
+                dict(match.groupdict(), rownumber=idx_line + 1)
+                for idx_line, match in enumerate(map(cregex.search, lines))
+                if match
+            ]
+            pandas.testing.assert_frame_equal(parsed_data[key],
+                                              pandas.DataFrame(expected))
+
+    def test_iter_parse_log_to_df(self):
+        parsed_data = gnss_testlog_utils.parse_log_to_df(
+            self.log_file, gnss_testlog_utils.CONFIG_GPSAPILOG)
+        chunks = list(
+            gnss_testlog_utils.iter_parse_log_to_df(
+                self.log_file,
+                gnss_testlog_utils.CONFIG_GPSAPILOG,
+                chunk_lines=100))
+        self.assertEqual(len(chunks), 13)
+        for key, parsed_df in parsed_data.items():
+            chunk_dfs = [chunk[key] for chunk in chunks]
+            if parsed_df.empty:
+                self.assertTrue(all(df.empty for df in chunk_dfs))
+            else:
+                pandas.testing.assert_frame_equal(pandas.concat(chunk_dfs),
+                                                  parsed_df)
+
+    def test_parse_empty_log(self):
+        open(self.log_file, 'w').close()
+        parsed_data = gnss_testlog_utils.parse_log_to_df(
+            self.log_file, gnss_testlog_utils.CONFIG_GPSTTFFLOG)
+        self.assertTrue(parsed_data['ttff_info'].empty)
+
+
+class ParseGpsApiLogTest(unittest.TestCase):
+    """Unit tests for parse_gpsapilog_to_df."""
+
+    def setUp(self):
+        self.log_dir = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self.log_dir.name, 'gpsapi.txt')
+
+    def tearDown(self):
+        self.log_dir.cleanup()
+
+    def test_add_phone_time(self):
+        write_gpsapilog(self.log_file, 200)
+        parsed_data = gnss_testlog_utils.parse_log_to_df(
+            self.log_file, gnss_testlog_utils.CONFIG_GPSAPILOG)
+        timestamp_df = parsed_data['phone_time']
+        timestamp_df['phone_time'] = gnss_testlog_utils.get_datetime(
+            timestamp_df['date'], timestamp_df['time'])
+        for key in ['SpaceVehicle', 'Latitude']:
+            expected_df = parsed_data[key].copy()
+            dummy_add_phone_time(expected_df, timestamp_df)
+            gnss_testlog_utils.add_phone_time(parsed_data[key], timestamp_df)
+            pandas.testing.assert_frame_equal(parsed_data[key], expected_df)
+        self.assertTrue(
+            pandas.isna(parsed_data['SpaceVehicle']['phone_time'].iloc[0]))
+
+    def test_parse_gpsapilog_to_df(self):
+        write_gpsapilog(self.log_file, 100)
+        timestamp_df, sv_info_df, sv_stat_df, loc_info_df = (
+            gnss_testlog_utils.parse_gpsapilog_to_df(self.log_file))
+        self.assertEqual(len(timestamp_df), 100)
+        self.assertEqual(len(sv_info_df), 1 + 25 * (0 + 1 + 2 + 3))
+        self.assertEqual(len(sv_stat_df), 100)
+        self.assertEqual(len(loc_info_df), 100)
+        self.assertTrue(
+            (loc_info_df['gnsstime'] == loc_info_df['phone_time']).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
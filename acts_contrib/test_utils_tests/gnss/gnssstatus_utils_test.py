@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2022 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import unittest
+
+import numpy
+
+from acts import signals
+from acts_contrib.test_utils.gnss import gnssstatus_utils
+
+GNSSSTATUS_LINES = [
+    'Fix: true Type: NIC SV: 4 C/No: 45.10782, 40.9 Elevation: 78.0 '
+    'Azimuth: 291.0 Signal: L5 Frequency: 1176.45 EPH: true ALM: false',
+    'Fix: false Type: GPS SV: 27 C/No: 34.728134, 30.5 Elevation: 76.0 '
+    'Azimuth: 15.0 Signal: L1 Frequency: 1575.42 EPH: true ALM: true',
+    'Fix: true Type: GPS SV: 3 C/No: 30.0, 28.5 Elevation: 10.0 '
+    'Azimuth: 20.0 Signal: L1 Frequency: 1575.42 EPH: true ALM: true',
+    'Fix: true Type: GPS SV: 3 C/No: 31.0, 29.5 Elevation: 11.0 '
+    'Azimuth: 21.0 Signal: L1 Frequency: 1575.42 EPH: true ALM: true'
+]
+
+
+class GnssStatusUtilsTest(unittest.TestCase):
+    """Unit tests for gnssstatus_utils parsing and aggregation."""
+
+    def test_parse_gnssstatus(self):
+        gnss_status = gnssstatus_utils.GnssStatus(GNSSSTATUS_LINES[0])
+        self.assertTrue(gnss_status.used_in_fix)
+        self.assertEqual(gnss_status.constellation, 'NIC')
+        self.assertEqual(gnss_status.svid, 4)
+        self.assertEqual(gnss_status.cn, 45.10782)
+        self.assertEqual(gnss_status.base_cn, 40.9)
+        self.assertEqual(gnss_status.frequency_band, 'L5')
+        self.assertEqual(gnss_status.carrier_frequency, 1176.45)
+
+    def test_parse_failure(self):
+        for line in [
+                'Fix: true Type: GPS SV: 27 C/No: 34.7 Elevation: 76.0 '
+                'Azimuth: 15.0 Signal: L1 Frequency: 1575.42 EPH: true',
+                'Fix: true Type: GPS', 'Latitude: 25.0'
+        ]:
+            with self.assertRaises(gnssstatus_utils.RegexParseException):
+                gnssstatus_utils.parse_gnssstatus(line)
+
+    def test_table(self):
+        gnssstatus_table = gnssstatus_utils.GnssStatusTable()
+        for line in GNSSSTATUS_LINES:
+            gnssstatus_table.add_line(line)
+        self.assertEqual(len(gnssstatus_table), 4)
+        columns = gnssstatus_table.get_columns()
+        numpy.testing.assert_array_equal(columns['used_in_fix'],
+                                         [True, False, True, True])
+        numpy.testing.assert_array_equal(columns['svid'], [4, 27, 3, 3])
+        numpy.testing.assert_array_equal(columns['base_cn'],
+                                         [40.9, 30.5, 28.5, 29.5])
+        gnssstatus_table.validate()
+
+        gnss_svid_container = gnssstatus_utils.GnssSvidContainer()
+        gnss_svid_container.add_table(gnssstatus_table)
+        self.assertEqual(dict(gnss_svid_container.used_in_fix), {
+            'NIC_L5': {4},
+            'GPS_L1': {3}
+        })
+        self.assertEqual(dict(gnss_svid_container.not_used_in_fix),
+                         {'GPS_L1': {27}})
+
+    def test_table_validate(self):
+        gnssstatus_table = gnssstatus_utils.GnssStatusTable()
+        gnssstatus_table.add_line(GNSSSTATUS_LINES[1])
+        gnssstatus_table.add_line(GNSSSTATUS_LINES[1].replace(
+            'SV: 27', 'SV: 40').replace('Elevation: 76.0', 'Elevation: 91.0'))
+        with self.assertRaisesRegex(signals.TestFailure,
+                                    'GPS ID 40 not in SV Range'):
+            gnssstatus_table.validate()
+
+
+if __name__ == '__main__':
+    unittest.main()
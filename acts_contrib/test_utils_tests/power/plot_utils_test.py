@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2022 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import os
+import tempfile
+import unittest
+
+import numpy
+
+from acts_contrib.test_utils.power import plot_utils
+
+
+class CurrentWaveformPlotTest(unittest.TestCase):
+    """Unit tests for the decimated current waveform plot."""
+
+    def test_envelope_keeps_spikes(self):
+        values = numpy.zeros(100003)
+        values[[5, 50001, 100002]] = [3, -2, 1]
+        indices = plot_utils.get_min_max_envelope_indices(values, 1000)
+        self.assertLessEqual(len(indices), 1002)
+        self.assertTrue(numpy.all(numpy.diff(indices) > 0))
+        for spike in [0, 5, 50001, 100002]:
+            self.assertIn(spike, indices)
+
+    def test_envelope_short_waveform(self):
+        indices = plot_utils.get_min_max_envelope_indices(numpy.ones(10), 100)
+        numpy.testing.assert_array_equal(indices, numpy.arange(10))
+
+    def test_current_waveform_plot(self):
+        timestamps = 1600000000 + numpy.arange(50000) / 5000
+        currents = numpy.linspace(0.1, 0.2, 50000)
+        with tempfile.TemporaryDirectory() as dest_path:
+            plot, dt = plot_utils.current_waveform_plot(
+                list(zip(timestamps, currents)), 4.2, dest_path, 'waveform',
+                max_points=1000, lod_tiers=3)
+            self.assertTrue(
+                os.path.isfile(os.path.join(dest_path, 'waveform.html')))
+        self.assertEqual(len(plot.renderers), 6)
+        self.assertAlmostEqual(dt.source.data['a'][0], 9.9998)
+        self.assertAlmostEqual(dt.source.data['b'][0], 150.0)
+        for renderer in plot.renderers:
+            data = renderer.data_source.data
+            self.assertEqual(sum(data['count']), 50000)
+            self.assertAlmostEqual(sum(data['sum']), 150.0 * 50000, places=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2022 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import os
+import tempfile
+import unittest
+
+import numpy
+
+from acts_contrib.test_utils.power import power_stats
+
+
+class PowerStatsTest(unittest.TestCase):
+    """Unit tests for the streaming power statistics."""
+
+    def setUp(self):
+        self.timestamps = 1600000000 + numpy.arange(10000) / 500
+        self.currents = numpy.random.RandomState(0).uniform(0.05, 0.5, 10000)
+        self.log_dir = tempfile.TemporaryDirectory()
+        self.data_path = os.path.join(self.log_dir.name, 'monsoon.txt')
+        with open(self.data_path, 'w') as monsoon_file:
+            for timestamp, current in zip(self.timestamps, self.currents):
+                monsoon_file.write('{:.6f}s {:.9f}\n'.format(
+                    timestamp, current))
+
+    def tearDown(self):
+        self.log_dir.cleanup()
+
+    def test_read_monsoon_file(self):
+        chunks = list(
+            power_stats.read_monsoon_file(self.data_path, chunk_bytes=4096))
+        self.assertGreater(len(chunks), 1)
+        timestamps = numpy.concatenate([chunk[0] for chunk in chunks])
+        currents = numpy.concatenate([chunk[1] for chunk in chunks])
+        numpy.testing.assert_allclose(timestamps, self.timestamps)
+        numpy.testing.assert_allclose(currents, self.currents, atol=1e-9)
+
+    def test_read_empty_monsoon_file(self):
+        open(self.data_path, 'w').close()
+        self.assertEqual(list(power_stats.read_monsoon_file(self.data_path)),
+                         [])
+
+    def test_read_malformed_monsoon_file(self):
+        for malformed_line in ['1600000000.2s\n', '1600000000.2s 0.1 0.2\n',
+                               '1600000000.2s 0.1x\n']:
+            with self.subTest(line=malformed_line):
+                with open(self.data_path, 'w') as monsoon_file:
+                    monsoon_file.write('1600000000.0s 0.1\n')
+                    monsoon_file.write(malformed_line)
+                with self.assertRaises(ValueError):
+                    list(power_stats.read_monsoon_file(self.data_path))
+
+    def test_power_stats(self):
+        stats = power_stats.PowerStats(window_duration=2)
+        for timestamps, currents in power_stats.read_monsoon_file(
+                self.data_path, chunk_bytes=4096):
+            stats.update(timestamps, currents)
+        milli_amps = self.currents * 1000
+        self.assertEqual(stats.count, 10000)
+        self.assertAlmostEqual(stats.mean, numpy.mean(milli_amps), places=4)
+        self.assertAlmostEqual(stats.min_current,
+                               numpy.min(milli_amps),
+                               places=5)
+        self.assertAlmostEqual(stats.max_current,
+                               numpy.max(milli_amps),
+                               places=5)
+        self.assertAlmostEqual(stats.duration, 19.998, places=3)
+        self.assertAlmostEqual(stats.energy(4.2),
+                               stats.mean * 4.2 * stats.duration)
+        for percent in [1, 50, 99]:
+            self.assertAlmostEqual(stats.percentile(percent),
+                                   numpy.percentile(milli_amps, percent),
+                                   delta=stats.histogram_bin_width)
+        numpy.testing.assert_allclose(stats.window_averages,
+                                      milli_amps.reshape(10, 1000).mean(1),
+                                      atol=1e-4)
+        self.assertEqual(stats.histogram.sum(), 10000)
+
+
+if __name__ == '__main__':
+    unittest.main()
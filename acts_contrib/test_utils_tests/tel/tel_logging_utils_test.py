@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2022 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+from datetime import datetime
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from acts_contrib.test_utils.tel import tel_logging_utils
+
+LOGCAT_LINES = [
+    '--------- beginning of main\n',
+    '2022-03-01 10:00:00.100  1000  1001 I ImsPhone: register [11]\n',
+    '2022-03-01 10:00:00.200  1000  1001 I ImsPhone: deregister\n',
+    '2022-03-01 10:00:00.200  1000  1001 I Telephony: onServiceStateChanged\n',
+    # Logged late by another buffer
+    '2022-03-01 10:00:00.150  2000  2001 D RILJ: [0012]> SETUP_DATA_CALL\n',
+    '2022-03-01 10:00:01.000  1000  1001 I ImsPhone: register [13]\n',
+]
+
+
+class LogcatIndexTest(unittest.TestCase):
+    """Unit tests for tel_logging_utils.LogcatIndex."""
+
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.logcat_path = os.path.join(self.log_dir, 'adblog.txt')
+        self.write_lines(LOGCAT_LINES)
+        self.logcat_index = tel_logging_utils.LogcatIndex(self.logcat_path)
+        self.logcat_index.update()
+
+    def tearDown(self):
+        shutil.rmtree(self.log_dir)
+
+    def write_lines(self, lines):
+        with open(self.logcat_path, 'a') as logcat_file:
+            logcat_file.write(''.join(lines))
+
+    def get_lines(self, begin_time=None, end_time=None):
+        return list(
+            self.logcat_index.read_lines(
+                self.logcat_index.get_range(begin_time, end_time)))
+
+    def test_lines_are_sorted_by_time_stamp(self):
+        self.assertEqual(len(self.logcat_index), 5)
+        self.assertEqual(self.get_lines(), [
+            LOGCAT_LINES[idx].rstrip('\n') for idx in [1, 4, 2, 3, 5]
+        ])
+
+    def test_get_range(self):
+        self.assertEqual(
+            self.logcat_index.get_range(datetime(2022, 3, 1, 10, 0, 0,
+                                                 150000),
+                                        datetime(2022, 3, 1, 10, 0, 0,
+                                                 200000)), range(1, 4))
+        self.assertEqual(
+            self.logcat_index.get_range(
+                begin_time=datetime(2022, 3, 1, 10, 0, 0, 200000)),
+            range(2, 5))
+        self.assertEqual(
+            self.logcat_index.get_range(
+                end_time=datetime(2022, 3, 1, 10, 0, 0, 199000)), range(0, 2))
+        self.assertEqual(
+            self.logcat_index.get_range(datetime(2022, 3, 1, 11),
+                                        datetime(2022, 3, 1, 12)),
+            range(5, 5))
+
+    def test_get_range_truncates_to_logged_precision(self):
+        # Lines are logged in ms, so 10:00:00.200999 includes the .200 lines
+        self.assertEqual(
+            self.logcat_index.get_range(
+                datetime(2022, 3, 1, 10, 0, 0, 200999),
+                datetime(2022, 3, 1, 10, 0, 0, 200999)), range(2, 4))
+
+    def test_get_range_with_epoch_time(self):
+        epoch_time = datetime(2022, 3, 1, 10, 0, 0, 500000).timestamp() * 1000
+        self.assertEqual(self.logcat_index.get_range(begin_time=epoch_time),
+                         range(4, 5))
+
+    def test_search(self):
+        result = self.logcat_index.search(['register', 'SETUP_DATA_CALL'],
+                                          end_time=datetime(
+                                              2022, 3, 1, 10, 0, 0, 500000))
+        self.assertEqual([log['log_message'] for log in result], [
+            LOGCAT_LINES[idx].rstrip('\n') for idx in [1, 4, 2]
+        ])
+        self.assertEqual(result[0]['time_stamp'], '2022-03-01 10:00:00.100')
+        self.assertEqual(result[0]['datetime_obj'],
+                         datetime(2022, 3, 1, 10, 0, 0, 100000))
+
+    def test_message_id(self):
+        result = self.logcat_index.search(['ImsPhone', 'RILJ'])
+        self.assertEqual([log['message_id'] for log in result],
+                         ['11', '0012', None, '13'])
+
+    def test_incremental_update(self):
+        partial_line = '2022-03-01 10:00:02.000  1000  1001 I ImsPhone: reg'
+        self.write_lines([partial_line])
+        self.logcat_index.update()
+        self.assertEqual(len(self.logcat_index), 5)
+        self.write_lines(['ister [14]\n'])
+        self.logcat_index.update()
+        result = self.logcat_index.search(
+            ['register'], begin_time=datetime(2022, 3, 1, 10, 0, 1, 500000))
+        self.assertEqual([log['message_id'] for log in result], ['14'])
+
+    def test_recreated_file(self):
+        os.remove(self.logcat_path)
+        self.write_lines(LOGCAT_LINES[5:])
+        self.logcat_index.update()
+        self.assertEqual(self.get_lines(), [LOGCAT_LINES[5].rstrip('\n')])
+
+
+class GetLogcatIndexTest(unittest.TestCase):
+    """Unit tests for the shared LogcatIndex of each device."""
+
+    def setUp(self):
+        self.log_dirs = [tempfile.mkdtemp(), tempfile.mkdtemp()]
+        self.ad = mock.Mock(serial='SERIAL', device_log_path=self.log_dirs[0])
+
+    def tearDown(self):
+        tel_logging_utils.release_logcat_index(self.ad)
+        for log_dir in self.log_dirs:
+            shutil.rmtree(log_dir)
+
+    def test_index_per_log_path(self):
+        logcat_index = tel_logging_utils.get_logcat_index(self.ad)
+        self.assertIs(tel_logging_utils.get_logcat_index(self.ad),
+                      logcat_index)
+        self.ad.device_log_path = self.log_dirs[1]
+        new_index = tel_logging_utils.get_logcat_index(self.ad)
+        self.assertIsNot(new_index, logcat_index)
+        self.assertTrue(new_index.logcat_path.startswith(self.log_dirs[1]))
+
+    def test_release_logcat_index(self):
+        logcat_index = tel_logging_utils.get_logcat_index(self.ad)
+        tel_logging_utils.release_logcat_index(self.ad)
+        self.assertIsNot(tel_logging_utils.get_logcat_index(self.ad),
+                         logcat_index)
+
+
+class LogcatTailerTest(unittest.TestCase):
+    """Unit tests for tel_logging_utils.LogcatTailer."""
+
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.ad = mock.Mock(serial='SERIAL', device_log_path=self.log_dir)
+        self.logcat_path = tel_logging_utils._get_logcat_path(self.ad)
+        self.write_lines(LOGCAT_LINES)
+        self.tailer = tel_logging_utils.LogcatTailer(self.ad,
+                                                     poll_interval=0.01)
+
+    def tearDown(self):
+        for logcat_watch in list(self.tailer._watches):
+            logcat_watch.cancel()
+        tel_logging_utils.release_logcat_index(self.ad)
+        shutil.rmtree(self.log_dir)
+
+    def write_lines(self, lines):
+        with open(self.logcat_path, 'a') as logcat_file:
+            logcat_file.write(''.join(lines))
+
+    def test_watch(self):
+        logcat_watch = self.tailer.watch('ImsPhone: register',
+                                         begin_time=datetime(
+                                             2022, 3, 1, 10, 0, 0, 500000))
+        self.assertEqual([log['message_id'] for log in logcat_watch.matches],
+                         ['13'])
+        self.assertEqual(len(logcat_watch.get_new_matches()), 1)
+        self.write_lines([
+            '2022-03-01 10:00:02.000  1000  1001 I ImsPhone: register [14]\n',
+            '2022-03-01 10:00:02.000  1000  1001 I ImsPhone: deregister\n'
+        ])
+        new_matches = logcat_watch.get_new_matches(timeout=5)
+        self.assertEqual([log['message_id'] for log in new_matches], ['14'])
+
+    def test_cancel_from_callback(self):
+        matches = []
+
+        def cancel_after_first_match(log):
+            matches.append(log)
+            logcat_watch.cancel()
+
+        other_watch = self.tailer.watch('Telephony')
+        logcat_watch = self.tailer.watch('ImsPhone: register',
+                                         callback=cancel_after_first_match,
+                                         begin_time=datetime(2022, 3, 1, 11))
+        self.write_lines([
+            '2022-03-01 11:00:00.000  1000  1001 I ImsPhone: register [14]\n',
+            '2022-03-01 11:00:00.100  1000  1001 I ImsPhone: register [15]\n'
+        ])
+        self.assertTrue(logcat_watch.wait(5))
+        # The tailer keeps following for the other watch
+        self.write_lines([
+            '2022-03-01 11:00:01.000  1000  1001 I Telephony: onCallEnded\n'
+        ])
+        self.assertEqual(len(other_watch.get_new_matches(timeout=5)), 1)
+        self.assertEqual([log['message_id'] for log in matches], ['14'])
+        self.assertEqual(self.tailer._watches, [other_watch])
+
+        follow_thread = self.tailer._thread
+        other_watch.cancel()
+        follow_thread.join(5)
+        self.assertFalse(follow_thread.is_alive())
+
+    def test_callback_thread(self):
+        callback_threads = []
+        logcat_watch = self.tailer.watch(
+            'onCallEnded',
+            callback=lambda _: callback_threads.append(threading.
+                                                       current_thread()))
+        self.write_lines([
+            '2022-03-01 11:00:01.000  1000  1001 I Telephony: onCallEnded\n'
+        ])
+        self.assertTrue(logcat_watch.wait(5))
+        self.assertEqual(callback_threads, [self.tailer._thread])
+
+    def test_timeout(self):
+        logcat_watch = self.tailer.watch('onCallEnded')
+        self.assertEqual(logcat_watch.wait(0.1), [])
+        self.assertEqual(logcat_watch.get_new_matches(timeout=0.1), [])
+
+    def test_wait_for_log(self):
+        with mock.patch.object(tel_logging_utils,
+                               'get_logcat_tailer',
+                               return_value=self.tailer):
+            self.assertIsNone(
+                tel_logging_utils.wait_for_log(self.ad,
+                                               'onCallEnded',
+                                               max_wait_time=0.1))
+            result = tel_logging_utils.wait_for_log(self.ad,
+                                                    'ImsPhone: register',
+                                                    max_wait_time=0.1)
+        self.assertEqual([log['message_id'] for log in result], ['11', '13'])
+        self.assertEqual(self.tailer._watches, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
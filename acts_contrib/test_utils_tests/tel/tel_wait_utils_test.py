@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2022 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import threading
+import unittest
+from unittest import mock
+
+from acts_contrib.test_utils.tel import tel_wait_utils
+
+
+class FakeClock(object):
+    """Monotonic clock advanced by sleeps instead of real time."""
+
+    def __init__(self):
+        self.now = 0
+        self.sleeps = []
+        self._lock = threading.Lock()
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, duration):
+        with self._lock:
+            self.sleeps.append(duration)
+            self.now += duration
+
+
+class FakeCheck(object):
+    """State check returning a sequence of results, then the last one."""
+
+    def __init__(self, results, clock=None, check_time=0):
+        self.results = list(results)
+        self.clock = clock
+        self.check_time = check_time
+        self.num_calls = 0
+
+    def __call__(self):
+        if self.clock:
+            self.clock.sleep(self.check_time)
+        result = self.results[min(self.num_calls, len(self.results) - 1)]
+        self.num_calls += 1
+        return result
+
+
+class StateWaiterTest(unittest.TestCase):
+    """Unit tests for tel_wait_utils.StateWaiter."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.multiple(tel_wait_utils.time,
+                                      monotonic=self.clock.monotonic,
+                                      sleep=self.clock.sleep)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.metrics = tel_wait_utils.WaitMetrics()
+        self.waiter = tel_wait_utils.StateWaiter(interval=1,
+                                                 backoff=2,
+                                                 max_interval=4,
+                                                 metrics=self.metrics)
+
+    def test_wait(self):
+        check = FakeCheck([False] * 4 + [True])
+        self.assertTrue(self.waiter.wait(check, 30, name='check'))
+        self.assertEqual(check.num_calls, 5)
+        self.assertEqual(self.clock.sleeps, [1, 2, 4, 4])
+        summary = self.metrics.get_summary()['check']
+        self.assertEqual(summary['count'], 1)
+        self.assertEqual(summary['timeouts'], 0)
+        self.assertEqual(summary['max_time'], 11)
+
+    def test_wait_timeout_counts_check_time(self):
+        check = FakeCheck([False], self.clock, check_time=3)
+        self.assertFalse(self.waiter.wait(check, 10, name='check'))
+        # Checks at 0, 4 and 9 take 3s each and count against the 10s
+        self.assertEqual(self.clock.sleeps, [3, 1, 3, 2, 3])
+        self.assertEqual(self.clock.now, 12)
+        self.assertEqual(self.metrics.get_summary()['check']['timeouts'], 1)
+
+    def test_wait_with_waker(self):
+        waker = mock.Mock()
+        check = FakeCheck([False, True])
+        self.assertTrue(self.waiter.wait(check, 10, waker=waker))
+        waker.assert_called_once_with(1)
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_wait_all(self):
+        checks = [FakeCheck([True]), FakeCheck([False] * 3 + [True])]
+        self.assertTrue(self.waiter.wait_all(checks, 30, name='checks'))
+        # The first check passed once, then once more after the second one
+        self.assertEqual(checks[0].num_calls, 2)
+        self.assertEqual(checks[1].num_calls, 5)
+        self.assertEqual(self.metrics.get_summary()['checks']['count'], 1)
+
+    def test_wait_all_rechecks_passed_states(self):
+        checks = [
+            FakeCheck([True, False, False, True]),
+            FakeCheck([False, False, True])
+        ]
+        self.assertTrue(self.waiter.wait_all(checks, 30))
+        self.assertEqual(checks[0].num_calls, 5)
+
+    def test_wait_all_fails_if_passed_state_is_lost(self):
+        checks = [FakeCheck([True, False]), FakeCheck([False, True])]
+        self.assertFalse(self.waiter.wait_all(checks, 30, name='checks'))
+        self.assertGreaterEqual(self.clock.now, 30)
+        self.assertEqual(self.metrics.get_summary()['checks']['timeouts'], 1)
+
+    def test_wait_all_timeout(self):
+        checks = [FakeCheck([True]), FakeCheck([False])]
+        self.assertFalse(self.waiter.wait_all(checks, 10))
+        self.assertEqual(checks[0].num_calls, 1)
+
+
+class WaitMetricsTest(unittest.TestCase):
+    """Unit tests for tel_wait_utils.WaitMetrics."""
+
+    def test_summary(self):
+        metrics = tel_wait_utils.WaitMetrics(bins=(1, 10))
+        metrics.record('check', 0.5, True)
+        metrics.record('check', 5, True)
+        metrics.record('check', 30, False)
+        summary = metrics.get_summary()['check']
+        self.assertEqual(summary['count'], 3)
+        self.assertEqual(summary['timeouts'], 1)
+        self.assertEqual(summary['mean_time'], 35.5 / 3)
+        self.assertEqual(summary['max_time'], 30)
+        self.assertEqual(summary['histogram'], [1, 1, 1])
+        log = mock.Mock()
+        metrics.log_summary(log)
+        self.assertEqual(log.info.call_count, 1)
+        metrics.reset()
+        self.assertEqual(metrics.get_summary(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
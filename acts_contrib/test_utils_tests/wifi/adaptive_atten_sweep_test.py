@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2022 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import unittest
+
+from acts_contrib.test_utils.wifi import wifi_performance_test_utils as wputils
+
+
+def get_linear_range_index(failing):
+    """Gets the range index like WifiPingTest.process_ping_results."""
+    for idx in range(len(failing)):
+        if all(failing[idx:]):
+            return max(idx, 1) - 1
+    return -1
+
+
+class AdaptiveAttenSweepTest(unittest.TestCase):
+    """Unit tests for wputils.adaptive_atten_sweep."""
+
+    def run_sweep(self, atten_range, edge, **kwargs):
+        measured = []
+
+        def measure(atten):
+            measured.append(atten)
+            return atten
+
+        sweep_results = wputils.adaptive_atten_sweep(
+            atten_range, measure, lambda atten: atten >= edge, **kwargs)
+        return sweep_results, measured
+
+    def test_sweep_finds_linear_range(self):
+        atten_range = list(range(0, 60))
+        for edge in range(0, 62):
+            sweep_results, measured = self.run_sweep(atten_range, edge)
+            failing = [atten >= edge for _, atten in sweep_results]
+            range_index = get_linear_range_index(failing)
+            expected_range_index = get_linear_range_index(
+                [atten >= edge for atten in atten_range])
+            self.assertEqual(sweep_results[range_index][1],
+                             atten_range[expected_range_index])
+            self.assertEqual(len(measured), len(set(measured)))
+            self.assertEqual([atten for _, atten in sweep_results],
+                             sorted(measured))
+
+    def test_sweep_measures_fewer_points(self):
+        atten_range = list(range(0, 60))
+        _, measured = self.run_sweep(atten_range, 37)
+        self.assertLess(len(measured), len(atten_range) / 3)
+
+    def test_sweep_initial_failures(self):
+        atten_range = list(range(0, 40))
+
+        def measure(atten):
+            return atten
+
+        # Fails at the first points and after 30dB
+        sweep_results = wputils.adaptive_atten_sweep(
+            atten_range,
+            measure,
+            lambda atten: atten < 6 or atten >= 30,
+            max_initial_failures=4)
+        failing = [atten < 6 or atten >= 30 for _, atten in sweep_results]
+        self.assertEqual(sweep_results[get_linear_range_index(failing)][1],
+                         29)
+
+
+if __name__ == '__main__':
+    unittest.main()
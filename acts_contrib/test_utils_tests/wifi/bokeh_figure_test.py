@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2022 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy
+
+from acts_contrib.test_utils.wifi.wifi_performance_test_utils import bokeh_figure
+
+NAN = float('nan')
+
+
+class BokehFigureTest(unittest.TestCase):
+    """Unit tests for bokeh_figure.BokehFigure."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def get_figure(self):
+        figure = bokeh_figure.BokehFigure(title='RvR',
+                                          x_label='Attenuation (dB)',
+                                          primary_y_label='Throughput (Mbps)')
+        figure.add_line([0, 1, 2, 3], [100, NAN, 80.5, 70],
+                        'line_0',
+                        hover_text=['a', 'b', 'c'])
+        figure.add_line([0, 1, 2, 3], [50, 40, 30, 20], 'line_1')
+        figure.add_line([0, 1, 2, 3], [5, 4, 3, 2], 'line_2')
+        return figure
+
+    def test_filter_line(self):
+        figure = self.get_figure()
+        line = figure.figure_data[0]
+        self.assertEqual(line['x_data'], [0, 2, 3])
+        self.assertEqual(line['y_data'], [100, 80.5, 70])
+        self.assertEqual(line['hover_text'], {'info': ['a', 'c', '']})
+        # Points without x values are padded with NaN
+        x_data, y_data, _ = figure._filter_line([0, 1], [1, NAN, 3])
+        self.assertEqual(x_data[0], 0)
+        self.assertNotEqual(x_data[1], x_data[1])
+        self.assertEqual(y_data, [1, 3])
+
+    def test_filter_line_keeps_datetimes(self):
+        figure = self.get_figure()
+        x_data = numpy.array(['2022-05-03T17:39:29.1', '2022-05-03T17:39:29.2'],
+                             dtype='datetime64[ns]')
+        x_filtered, y_filtered, _ = figure._filter_line(x_data, [1, NAN, 3])
+        self.assertEqual(x_filtered[0], x_data[0])
+        # Points without x values are padded with NaT
+        self.assertTrue(numpy.isnat(x_filtered[1]))
+        self.assertTrue(
+            all(isinstance(value, numpy.datetime64) for value in x_filtered))
+        self.assertEqual(y_filtered, [1, 3])
+        figure.add_line(x_data, [1, 2], 'line_3')
+        self.assertEqual(figure.figure_data[-1]['x_data'], list(x_data))
+        file_path = os.path.join(self.tmp_dir, 'plot_data.npz')
+        figure._save_figure_data(file_path, bokeh_figure.NPZ_FORMAT)
+        loaded_figure = bokeh_figure.BokehFigure(json_file=file_path)
+        self.assertEqual(loaded_figure.figure_data[-1]['x_data'], [
+            '2022-05-03T17:39:29.100000000', '2022-05-03T17:39:29.200000000'
+        ])
+
+    def test_shared_sources(self):
+        figure = self.get_figure()
+        figure.init_plot()
+        sources = figure._get_sources()
+        self.assertIsNot(sources[0][0], sources[1][0])
+        self.assertIs(sources[1][0], sources[2][0])
+        self.assertEqual([y_column for _, y_column in sources],
+                         ['y0', 'y0', 'y1'])
+        self.assertEqual(sources[2][0].data['y1'], [5, 4, 3, 2])
+
+    def test_sources_are_grouped_by_x_data_and_hover_text(self):
+        figure = self.get_figure()
+        figure.add_line([0, 1, 2, 3], [1, 1, 1, 1], 'line_3')
+        figure.add_line([0, 1, 2, 4], [1, 1, 1, 1], 'line_4')
+        figure.add_line([0, 2, 3], [1, 1, 1],
+                        'line_5',
+                        hover_text=['a', 'c', ''])
+        figure.add_line([0, 2, 3], [1, 1, 1],
+                        'line_6',
+                        hover_text={'other': ['a', 'c', '']})
+        figure.add_scatter(numpy.arange(4), [1, 1, 1, 1], 'scatter')
+        figure.add_scatter([[0], [1]], [1, 1], 'unhashable')
+        figure.add_scatter([[0], [1]], [1, 1], 'unhashable')
+        figure.init_plot()
+        sources = figure._get_sources()
+        source_idx = [
+            [source for source, _ in sources].index(source)
+            for source, _ in sources
+        ]
+        self.assertEqual(source_idx, [0, 1, 1, 1, 4, 0, 6, 1, 8, 9])
+        self.assertEqual([y_column for _, y_column in sources],
+                         ['y0', 'y0', 'y1', 'y2', 'y0', 'y1', 'y0', 'y3', 'y0',
+                          'y0'])
+
+    def test_save_and_load_plot_data(self):
+        figure = self.get_figure()
+        file_path = os.path.join(self.tmp_dir, 'plot_data.npz')
+        figure._save_figure_data(file_path, bokeh_figure.NPZ_FORMAT)
+        loaded_figure = bokeh_figure.BokehFigure(json_file=file_path)
+        self.assertEqual(loaded_figure.fig_property, figure.fig_property)
+        self.assertEqual(loaded_figure.figure_data, figure.figure_data)
+        file_path = os.path.join(self.tmp_dir, 'plot_data.json')
+        figure._save_figure_data(file_path, bokeh_figure.JSON_FORMAT)
+        loaded_figure = bokeh_figure.BokehFigure(json_file=file_path)
+        for line, loaded_line in zip(figure.figure_data,
+                                     loaded_figure.figure_data):
+            for key in ['x_data', 'y_data', 'legend', 'hover_text']:
+                self.assertEqual(loaded_line[key], line[key])
+
+    def test_plot_data_is_saved_lazily(self):
+        figure = self.get_figure()
+        file_path = os.path.join(self.tmp_dir, 'plot_data.npz')
+        figure._save_figure_data(file_path)
+        modified_time = os.path.getmtime(file_path)
+        os.utime(file_path, (0, 0))
+        figure._save_figure_data(file_path)
+        self.assertEqual(os.path.getmtime(file_path), 0)
+        figure.add_line([0, 1], [1, 2], 'line_3')
+        figure._save_figure_data(file_path)
+        self.assertGreaterEqual(os.path.getmtime(file_path), modified_time)
+        loaded_figure = bokeh_figure.BokehFigure(json_file=file_path)
+        self.assertEqual(len(loaded_figure.figure_data), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
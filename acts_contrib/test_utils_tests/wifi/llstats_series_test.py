@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2022 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import subprocess
+import time
+import unittest
+from unittest import mock
+
+import numpy
+
+from acts_contrib.test_utils.wifi.wifi_performance_test_utils import brcm_utils
+
+# Cumulative llstats after $i + 1 samples, printed by a shell function
+LLSTATS_FUNCTION = (
+    'llstats() { j=$((i+1)); '
+    'echo "RX VHT  :  $((10*j))(50%) $((10*j))(50%)"; echo "        :  "; '
+    'echo "TX VHT  :  $((20*j))(50%) $((20*j))(50%)"; echo "        :  "; '
+    'echo "VHT PER  :  $j(10%) 0(0%)"; echo "        :  "; '
+    'echo "rxmpduperampdu 12"; echo " mpduperampdu 20"; '
+    'echo "goodfcs $((99*j)) rxbadfcs $j"; }; ')
+
+
+REAL_POPEN = subprocess.Popen
+
+
+def local_popen(args, **kwargs):
+    """Runs 'adb -s <serial> shell <command>' llstats loops on the host."""
+    if isinstance(args, list) and args[:1] == ['adb']:
+        command = args[4].replace(brcm_utils.LinkLayerStats.LLSTATS_CMD[:-1],
+                                  'llstats')
+        args = ['sh', '-c', LLSTATS_FUNCTION + command]
+    return REAL_POPEN(args, **kwargs)
+
+
+def failing_popen(args, **kwargs):
+    raise OSError('adb connection lost')
+
+
+class LocalAdb(object):
+    """Answers wl queries and discards shell_nb output like run_async."""
+
+    def shell(self, command, **kwargs):
+        return 'Chanspec: 5GHz channel 36 80MHz (0xe02a)'
+
+    def shell_nb(self, command):
+        return subprocess.Popen(command,
+                                shell=True,
+                                stdout=subprocess.DEVNULL,
+                                stderr=subprocess.STDOUT)
+
+
+class LocalDevice(object):
+    def __init__(self):
+        self.adb = LocalAdb()
+        self.serial = 'local'
+
+
+class LinkLayerStatsSeriesTest(unittest.TestCase):
+    """Unit tests for brcm_utils.LinkLayerStats time-resolved collection."""
+
+    @mock.patch('subprocess.Popen', side_effect=local_popen)
+    def test_collection(self, popen):
+        llstats_obj = brcm_utils.LinkLayerStats(LocalDevice())
+        llstats_obj.start_collection(duration=0.5, interval=0.05)
+        time.sleep(1)
+        llstats_series = llstats_obj.stop_collection()
+        num_samples = len(llstats_series['time_stamp'])
+        self.assertGreater(num_samples, 5)
+        self.assertEqual(llstats_series['mcs_ids'],
+                         ['VHT Nss1 MCS0 GI0', 'VHT Nss1 MCS1 GI0'])
+        # Counters increase linearly, so per sample deltas are constant
+        numpy.testing.assert_array_equal(llstats_series['tx_mpdu'],
+                                         numpy.full((num_samples, 2), 20))
+        numpy.testing.assert_array_equal(llstats_series['rx_mpdu'],
+                                         numpy.full((num_samples, 2), 10))
+        numpy.testing.assert_array_equal(llstats_series['tx_retries'][:, 0],
+                                         numpy.ones(num_samples))
+        numpy.testing.assert_allclose(llstats_series['mean_tx_phy_rate'],
+                                      (32.5 + 65) / 2)
+        numpy.testing.assert_allclose(llstats_series['rx_per'], 1)
+        numpy.testing.assert_array_equal(llstats_series['tx_aggregation'],
+                                         20)
+
+    @mock.patch('subprocess.Popen', side_effect=local_popen)
+    def test_stop_collection(self, popen):
+        llstats_obj = brcm_utils.LinkLayerStats(LocalDevice())
+        llstats_obj.start_collection(duration=100, interval=0.05)
+        time.sleep(0.3)
+        start_time = time.time()
+        llstats_series = llstats_obj.stop_collection()
+        self.assertLess(time.time() - start_time, 1)
+        self.assertGreater(len(llstats_series['time_stamp']), 0)
+
+    @mock.patch('subprocess.Popen', side_effect=failing_popen)
+    def test_collector_error_is_logged(self, popen):
+        llstats_obj = brcm_utils.LinkLayerStats(LocalDevice())
+        llstats_obj.start_collection(duration=1, interval=0.05)
+        with self.assertLogs(level='WARNING') as logs:
+            llstats_series = llstats_obj.stop_collection()
+        self.assertEqual(len(llstats_series['time_stamp']), 0)
+        self.assertIn('adb connection lost', logs.output[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
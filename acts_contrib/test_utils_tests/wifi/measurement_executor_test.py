@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2022 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import concurrent.futures
+import threading
+import time
+import unittest
+
+from acts_contrib.test_utils.wifi.wifi_performance_test_utils import measurement_executor
+
+
+def sample_until_cancelled(started, num_samples=1000):
+    started.set()
+    samples = 0
+    while samples < num_samples and not measurement_executor.is_cancelled():
+        samples += 1
+        time.sleep(0.01)
+    return samples
+
+
+class MeasurementExecutorTest(unittest.TestCase):
+    """Unit tests for measurement_executor.MeasurementExecutor."""
+
+    def setUp(self):
+        self.executor = measurement_executor.MeasurementExecutor(
+            max_workers=2)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_pools_are_bounded_and_reused(self):
+        thread_names = set()
+
+        def get_thread_name():
+            time.sleep(0.01)
+            thread_names.add(threading.current_thread().name)
+
+        for pool_name in ['dut_0', 'dut_1']:
+            for _ in range(10):
+                self.executor.submit(pool_name, get_thread_name)
+        # Wait for the worker threads to record task metrics
+        self.executor.shutdown()
+        self.assertEqual(len(thread_names), 4)
+        self.assertEqual(
+            self.executor.get_metrics_summary()['get_thread_name']['count'],
+            20)
+
+    def test_cancel(self):
+        started = [threading.Event() for _ in range(3)]
+        futures = [
+            self.executor.submit('dut', sample_until_cancelled, (event, ))
+            for event in started
+        ]
+        other_pool = self.executor.submit('other', sum, ([1, 2], ))
+        # Only two tasks run in the pool, the third one is pending
+        started[0].wait()
+        started[1].wait()
+        self.assertEqual(other_pool.result(), 3)
+        self.assertEqual(self.executor.cancel('dut'), 3)
+        self.assertLess(futures[0].result(timeout=5), 1000)
+        self.assertLess(futures[1].result(timeout=5), 1000)
+        self.assertTrue(futures[2].cancelled())
+        self.assertFalse(started[2].is_set())
+        self.executor.shutdown()
+        statuses = [
+            metrics.status for metrics in self.executor.task_metrics
+            if metrics.pool == 'dut'
+        ]
+        self.assertEqual(statuses, ['cancelled'] * 3)
+
+    def test_timeout(self):
+        started = threading.Event()
+        future = self.executor.submit('dut',
+                                      sample_until_cancelled, (started, ),
+                                      timeout=0.1)
+        self.assertLess(future.result(timeout=5), 1000)
+        future = self.executor.submit('dut', sample_until_cancelled,
+                                      (started, ))
+        with self.assertRaises(concurrent.futures.TimeoutError):
+            self.executor.get_result(future, timeout=0.1)
+        self.assertLess(future.result(timeout=5), 1000)
+
+    def test_long_running_tasks_do_not_hold_pool_workers(self):
+        started = [threading.Event() for _ in range(3)]
+        collectors = [
+            self.executor.submit('dut',
+                                 sample_until_cancelled, (event, ),
+                                 long_running=True) for event in started
+        ]
+        for event in started:
+            self.assertTrue(event.wait(timeout=5))
+        # Both pool workers are free while the three collectors run
+        short_tasks = [
+            self.executor.submit('dut', sum, ([1, idx], )) for idx in range(4)
+        ]
+        self.assertEqual([task.result(timeout=5) for task in short_tasks],
+                         [1, 2, 3, 4])
+        self.assertTrue(all(not collector.done() for collector in collectors))
+        self.assertEqual(self.executor.cancel('dut'), 3)
+        for collector in collectors:
+            self.assertLess(collector.result(timeout=5), 1000)
+        self.executor.shutdown()
+        statuses = [
+            metrics.status for metrics in self.executor.task_metrics
+            if metrics.name == 'sample_until_cancelled'
+        ]
+        self.assertEqual(statuses, ['cancelled'] * 3)
+
+    def test_long_running_task_exception(self):
+        future = self.executor.submit('dut',
+                                      int, ('not a number', ),
+                                      long_running=True)
+        with self.assertRaises(ValueError):
+            future.result(timeout=5)
+        self.executor.shutdown()
+        self.assertEqual(self.executor.task_metrics[-1].status, 'failed')
+
+    def test_is_cancelled_outside_of_tasks(self):
+        self.assertFalse(measurement_executor.is_cancelled())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2022 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import os
+import tempfile
+import unittest
+
+import numpy
+
+from acts_contrib.test_utils.wifi import ota_sniffer
+
+STA = '00:11:22:33:44:55'
+AP = '66:77:88:99:aa:bb'
+
+
+def get_tshark_line(**fields):
+    values = dict((column, '')
+                  for column in ota_sniffer.TsharkSnifferBase.TSHARK_COLUMNS)
+    values.update(fields)
+    return '^'.join(
+        values[column]
+        for column in ota_sniffer.TsharkSnifferBase.TSHARK_COLUMNS) + '\n'
+
+
+TSHARK_DUMP = [
+    # VHT data frame, 2 antennas RSSI
+    get_tshark_line(frame_number='1', frame_len='1500', rssi='-40,-42',
+                    ta=STA, ra=AP, type='2', subtype='40', retry='False',
+                    vht_mcs='9', vht_nss='2', **{'11ac_bw': '4',
+                                                 'wlan_data_rate': '1200'}),
+    # Retried VHT data frame
+    get_tshark_line(frame_number='2', frame_len='1500', rssi='-42', ta=STA,
+                    ra=AP, type='2', subtype='40', retry='True', vht_mcs='7',
+                    vht_nss='2', **{'11ac_bw': '4', 'wlan_data_rate': '600'}),
+    # HT data frame, MCS 12 is MCS 4 with 2 spatial streams
+    get_tshark_line(frame_number='3', frame_len='100', rssi='-50', ta=STA,
+                    ra=AP, type='2', subtype='40', retry='0',
+                    **{'11n_mcs_index': '12', '11n_bw': '1'}),
+    # Beacon from AP and ACK without TA
+    get_tshark_line(frame_number='4', frame_len='300', rssi='-30', ta=AP,
+                    bssid=AP, type='0', subtype='8', ds='0x00000000'),
+    get_tshark_line(frame_number='5', frame_len='14', rssi='-30', ra=STA,
+                    type='1', subtype='29'),
+    'malformed line\n'
+]
+
+
+class TsharkDumpParserTest(unittest.TestCase):
+    """Unit tests for ota_sniffer.TsharkDumpParser."""
+
+    def setUp(self):
+        self.parser = ota_sniffer.TsharkDumpParser(
+            ota_sniffer.TsharkSnifferBase.TSHARK_COLUMNS)
+        for line in TSHARK_DUMP:
+            self.parser.feed(line)
+
+    def test_columns(self):
+        self.assertEqual(self.parser.num_frames, 5)
+        self.assertEqual(self.parser.num_invalid_lines, 1)
+        columns = self.parser.get_columns()
+        self.assertEqual(list(columns.keys()),
+                         ota_sniffer.TsharkSnifferBase.TSHARK_COLUMNS)
+        numpy.testing.assert_array_equal(columns['rssi'],
+                                         [-40, -42, -50, -30, -30])
+        numpy.testing.assert_array_equal(columns['retry'][:3], [0, 1, 0])
+        self.assertTrue(numpy.isnan(columns['retry'][3]))
+        self.assertEqual(columns['ds'][3], 0)
+        self.assertEqual(list(columns['ta']), [STA, STA, STA, AP, ''])
+
+    def test_save_columns(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'capture.npz')
+            self.parser.save_columns(file_path)
+            with numpy.load(file_path) as columns:
+                numpy.testing.assert_array_equal(columns['frame_number'],
+                                                 [1, 2, 3, 4, 5])
+                self.assertEqual(columns['ra'][4], STA)
+
+    def test_station_summaries(self):
+        summaries = self.parser.get_station_summaries()
+        self.assertEqual(list(summaries.keys()), [STA, AP])
+        summary = summaries[STA]
+        self.assertEqual(summary['data_frames'], 3)
+        self.assertEqual(summary['retries'], 1)
+        self.assertAlmostEqual(summary['retry_rate'], 1 / 3)
+        self.assertAlmostEqual(summary['airtime'], 30e-6)
+        self.assertEqual(summary['mcs_histogram'], {4: 1, 7: 1, 9: 1})
+        self.assertEqual(summary['nss_histogram'], {2: 3})
+        self.assertEqual(summary['bw_histogram'], {40: 1, 80: 2})
+        self.assertEqual(summary['rssi_histogram'], {-50: 1, -42: 1, -40: 1})
+        self.assertAlmostEqual(summary['rssi_median'], -42)
+        self.assertEqual(summaries[AP]['data_frames'], 0)
+        self.assertEqual(summaries[AP]['mcs_histogram'], {})
+
+
+if __name__ == '__main__':
+    unittest.main()
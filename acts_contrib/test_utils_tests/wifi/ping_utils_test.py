@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2022 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import time
+import unittest
+
+import numpy
+
+from acts_contrib.test_utils.wifi.wifi_performance_test_utils import ping_utils
+
+PING_HEADER = 'PING 192.168.1.1 (192.168.1.1) 56(84) bytes of data.'
+PING_LINE = ('[{:.6f}] 64 bytes from 192.168.1.1: icmp_seq={} ttl=64 '
+             'time={:.3f} ms')
+PING_SUMMARY = [
+    '', '--- 192.168.1.1 ping statistics ---',
+    '{} packets transmitted, {} received, {:.1f}% packet loss, time 1000ms'
+]
+
+
+def get_ping_output(sequence_numbers, rtts, interval=0.02, transmitted=None):
+    transmitted = transmitted or max(sequence_numbers)
+    lines = [PING_HEADER]
+    for seq, rtt in zip(sequence_numbers, rtts):
+        lines.append(
+            PING_LINE.format(1600000000 + (seq - 1) * interval, seq, rtt))
+    lines.extend(PING_SUMMARY[:-1])
+    lines.append(PING_SUMMARY[-1].format(
+        transmitted, len(rtts),
+        100 * (transmitted - len(rtts)) / transmitted))
+    return lines
+
+
+class PingResultTest(unittest.TestCase):
+    """Unit tests for ping_utils.PingResult."""
+
+    def test_parse(self):
+        ping_result = ping_utils.PingResult(
+            get_ping_output([1, 2, 4, 5], [1.5, 2.5, 3.5, 4.5]))
+        self.assertTrue(ping_result.connected)
+        self.assertEqual(ping_result.packet_loss_percentage, 20)
+        numpy.testing.assert_allclose(ping_result.rtts, [1.5, 2.5, 3.5, 4.5])
+        numpy.testing.assert_allclose(ping_result['rtt'], ping_result.rtts)
+        numpy.testing.assert_allclose(ping_result.timestamps,
+                                      [0, 0.02, 0.06, 0.08],
+                                      atol=1e-6)
+        numpy.testing.assert_allclose(ping_result.ping_interarrivals,
+                                      [0.02, 0.04, 0.02],
+                                      atol=1e-6)
+        self.assertEqual(ping_result.transmission_times[1].rtt, 2.5)
+        result_dict = ping_result.as_dict()
+        self.assertEqual(result_dict['rtt'], [1.5, 2.5, 3.5, 4.5])
+        self.assertEqual(len(result_dict['ping_interarrivals']), 3)
+
+    def test_disconnected(self):
+        ping_result = ping_utils.PingResult([
+            PING_HEADER, PING_SUMMARY[1],
+            '10 packets transmitted, 0 received, 100% packet loss'
+        ])
+        self.assertFalse(ping_result.connected)
+        self.assertEqual(len(ping_result.rtts), 0)
+        stats = ping_result.get_stats()
+        self.assertTrue(numpy.isnan(stats['rtt_mean']))
+        self.assertEqual(stats['loss_burst_count'], 0)
+        self.assertEqual(ping_result.as_dict()['time_stamp'], [])
+
+    def test_stats(self):
+        rtts = numpy.arange(1, 101, dtype=float)
+        sequence_numbers = numpy.arange(1, 111)
+        sequence_numbers = numpy.delete(sequence_numbers,
+                                        [10, 50, 51, 52, 80, 81, 82, 83, 84, 85])
+        ping_result = ping_utils.PingResult(
+            get_ping_output(sequence_numbers, rtts))
+        stats = ping_result.get_stats(percentiles=[50, 99])
+        self.assertAlmostEqual(stats['rtt_mean'], 50.5)
+        self.assertAlmostEqual(stats['rtt_p50'], numpy.percentile(rtts, 50))
+        self.assertAlmostEqual(stats['rtt_p99'], numpy.percentile(rtts, 99))
+        self.assertAlmostEqual(stats['rtt_jitter'], 1)
+        numpy.testing.assert_array_equal(ping_result.get_loss_bursts(),
+                                         [1, 3, 6])
+        self.assertEqual(stats['max_loss_burst'], 6)
+        histogram = stats['interarrival_histogram']
+        self.assertEqual(sum(histogram['counts']), 99)
+        compact_dict = ping_result.as_dict(compact=True)
+        self.assertNotIn('ping_interarrivals', compact_dict)
+        self.assertEqual(compact_dict['stats'], ping_result.get_stats())
+
+    def test_parse_speed(self):
+        num_pings = 100000
+        ping_output = get_ping_output(numpy.arange(1, num_pings + 1),
+                                      numpy.full(num_pings, 3.0))
+        start_time = time.time()
+        ping_result = ping_utils.PingResult(ping_output, num_pings)
+        ping_result.as_dict()
+        ping_result.get_stats()
+        elapsed_time = time.time() - start_time
+        self.assertEqual(len(ping_result.rtts), num_pings)
+        self.assertLess(elapsed_time, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2022 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy
+
+from acts_contrib.test_utils.wifi.wifi_performance_test_utils import results_store
+
+
+def get_params(channel, mode='VHT80', chain_mask='2x2', orientation=0):
+    return {
+        'channel': channel,
+        'mode': mode,
+        'traffic_type': 'TCP',
+        'traffic_direction': 'DL',
+        'chain_mask': chain_mask,
+        'orientation': orientation
+    }
+
+
+class ResultsStoreTest(unittest.TestCase):
+    """Unit tests for results_store.ResultsStore."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, 'results.db')
+        self.store = results_store.ResultsStore(self.db_path, run_id='run_1')
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def add_results(self, store):
+        for orientation, offset in enumerate([0, 10, 20]):
+            store.add_result('WifiOtaRvrTest',
+                             'test_rvr_TCP_DL_ch36_VHT80_{}deg'.format(
+                                 orientation),
+                             get_params(36, orientation=orientation),
+                             attenuation=[0, 10, 20],
+                             series={
+                                 'throughput_receive':
+                                 [500 + offset, 400 + offset, 300 + offset],
+                                 'rx_phy_rate': [866, 650]
+                             },
+                             scalars={'high_tput_range': numpy.int64(10)},
+                             extras={'hover_text': {'info': ['a', 'b', 'c']}})
+        store.add_result('WifiOtaRvrTest', 'test_rvr_TCP_DL_ch6_HT20',
+                         get_params(6, mode='HT20'),
+                         attenuation=[0, 10],
+                         series={'throughput_receive': [100, 50]})
+
+    def test_get_results(self):
+        self.add_results(self.store)
+        results = self.store.get_results('WifiOtaRvrTest', channel=36)
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0].params['channel'], 36)
+        self.assertEqual(results[0].scalars['high_tput_range'], 10)
+        self.assertEqual(results[0].extras['hover_text']['info'],
+                         ['a', 'b', 'c'])
+        self.assertEqual(
+            len(self.store.get_results(test_name='test_rvr_TCP_DL_ch6_HT20')),
+            1)
+        self.assertEqual(self.store.get_results('WifiRvrTest'), [])
+
+    def test_get_series(self):
+        self.add_results(self.store)
+        result_ids = [
+            result.result_id for result in self.store.get_results(channel=36)
+        ]
+        series = self.store.get_series(result_ids, 'rx_phy_rate')
+        self.assertEqual(list(series.keys()), result_ids)
+        attenuation, values = series[result_ids[0]]
+        numpy.testing.assert_array_equal(attenuation, [0, 10, 20])
+        numpy.testing.assert_array_equal(values, [866, 650, numpy.nan])
+
+    def test_aggregate(self):
+        self.add_results(self.store)
+        aggregates = self.store.aggregate('throughput_receive',
+                                          group_by=['channel', 'mode'])
+        self.assertEqual(list(aggregates.keys()), [(36, 'VHT80'),
+                                                   (6, 'HT20')])
+        aggregate = aggregates[(36, 'VHT80')]
+        numpy.testing.assert_array_equal(aggregate['attenuation'],
+                                         [0, 10, 20])
+        numpy.testing.assert_array_equal(aggregate['mean'], [510, 410, 310])
+        numpy.testing.assert_array_equal(aggregate['min'], [500, 400, 300])
+        numpy.testing.assert_array_equal(aggregate['count'], [3, 3, 3])
+        aggregates = self.store.aggregate('rx_phy_rate', group_by=[])
+        numpy.testing.assert_array_equal(aggregates[()]['count'], [3, 3, 0])
+
+    def test_runs(self):
+        self.add_results(self.store)
+        self.store.close()
+        self.store = results_store.ResultsStore(self.db_path, run_id='run_2')
+        self.assertEqual(self.store.get_results(), [])
+        self.add_results(self.store)
+        self.assertEqual(self.store.get_run_ids(), ['run_1', 'run_2'])
+        self.assertEqual(
+            len(self.store.get_results(run_id=results_store.ALL_RUNS)), 8)
+        aggregates = self.store.aggregate('throughput_receive',
+                                          group_by=['channel'],
+                                          run_id='run_1')
+        numpy.testing.assert_array_equal(aggregates[(36, )]['count'],
+                                         [3, 3, 3])
+
+
+class GoldenResultsTest(unittest.TestCase):
+    """Unit tests for results_store.GoldenResults."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.golden_path = os.path.join(self.tmp_dir,
+                                        'test_rvr_TCP_DL_ch36_VHT80.json')
+        with open(self.golden_path, 'w') as golden_file:
+            json.dump(
+                {
+                    'attenuation': [0, 10, 20, 30, 40],
+                    'fixed_attenuation': 5,
+                    'throughput_receive': [500, 400, 300, 200, 0]
+                }, golden_file)
+        self.golden_results = results_store.GoldenResults([self.golden_path])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_get(self):
+        golden_results = self.golden_results.get('test_rvr_TCP_DL_ch36_VHT80')
+        self.assertEqual(golden_results['total_attenuation'],
+                         [5, 15, 25, 35, 45])
+        # Golden files are only loaded once
+        os.remove(self.golden_path)
+        self.assertIs(self.golden_results.get('test_rvr_TCP_DL_ch36_VHT80'),
+                      golden_results)
+        with self.assertRaises(KeyError):
+            self.golden_results.get('test_rvr_TCP_DL_ch6_HT20')
+
+    def test_get_limits(self):
+        limits = self.golden_results.get_limits('test_rvr_TCP_DL_ch36_VHT80',
+                                                [5, 26, 50],
+                                                abs_tolerance=20,
+                                                pct_tolerance=10)
+        self.assertEqual(limits['attenuation'], [5, 26, 50])
+        # Limits are based on the 3 closest golden points
+        numpy.testing.assert_allclose(limits['lower_limit'], [270, 180, 0])
+        numpy.testing.assert_allclose(limits['upper_limit'], [550, 440, 330])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2022 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import subprocess
+import unittest
+from unittest import mock
+
+from acts_contrib.test_utils.wifi.wifi_performance_test_utils import shell_sampler
+
+COMMANDS = [('status', 'echo bssid=00:11:22:33:44:55'),
+            ('signal_poll', 'echo RSSI=-50; echo FREQUENCY=5180')]
+
+
+REAL_POPEN = subprocess.Popen
+
+
+def local_popen(args, **kwargs):
+    """Runs 'adb -s <serial> shell <command>' processes on the host."""
+    if isinstance(args, list) and args[:1] == ['adb']:
+        args = ['sh', '-c', args[4]]
+    return REAL_POPEN(args, **kwargs)
+
+
+class LocalAdb(object):
+    """Runs adb shell commands on the host."""
+
+    def shell(self, command):
+        return subprocess.check_output(command, shell=True).decode('utf-8')
+
+    def shell_nb(self, command):
+        # Like job.run_async, the output of the command is discarded
+        return subprocess.Popen(command,
+                                shell=True,
+                                stdout=subprocess.DEVNULL,
+                                stderr=subprocess.STDOUT)
+
+
+class LocalDevice(object):
+    def __init__(self):
+        self.adb = LocalAdb()
+        self.serial = 'local'
+
+
+class ShellSamplerTest(unittest.TestCase):
+    """Unit tests for shell_sampler."""
+
+    def test_parse_device_loop_output(self):
+        lines = [
+            'stale output\n', '##SAMPLE## 100.5\n', '##OUTPUT## status\n',
+            'bssid=00:11:22:33:44:55\n', 'ssid=test\n',
+            '##OUTPUT## signal_poll\n', 'RSSI=-50\n', '##SAMPLE## %N\n',
+            '##OUTPUT## status\n'
+        ]
+        records = list(shell_sampler.parse_device_loop_output(lines))
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0][0], 100.5)
+        self.assertEqual(list(records[0][1].items()),
+                         [('status', 'bssid=00:11:22:33:44:55\nssid=test\n'),
+                          ('signal_poll', 'RSSI=-50\n')])
+        self.assertIsNone(records[1][0])
+        self.assertEqual(records[1][1], {'status': ''})
+
+    @mock.patch('subprocess.Popen', side_effect=local_popen)
+    def test_samples_match_across_modes(self, popen):
+        for device_loop in [False, True]:
+            samples = list(
+                shell_sampler.iter_shell_samples(LocalDevice(),
+                                                 COMMANDS,
+                                                 num_samples=3,
+                                                 interval=0.05,
+                                                 device_loop=device_loop))
+            self.assertEqual(len(samples), 3)
+            for _, outputs in samples:
+                self.assertEqual(outputs['status'],
+                                 'bssid=00:11:22:33:44:55\n')
+                self.assertEqual(outputs['signal_poll'],
+                                 'RSSI=-50\nFREQUENCY=5180\n')
+            time_stamps = [time_stamp for time_stamp, _ in samples]
+            self.assertEqual(time_stamps, sorted(time_stamps))
+        self.assertEqual(popen.call_args[0][0][:4],
+                         ['adb', '-s', 'local', 'shell'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2022 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import importlib.util
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from acts_contrib.test_utils.wifi.wifi_performance_test_utils import results_store
+
+WIFI_RVR_TEST_PATH = os.path.join(os.path.dirname(__file__), os.pardir,
+                                  os.pardir, os.pardir, 'tests', 'google',
+                                  'wifi', 'WifiRvrTest.py')
+
+
+def load_wifi_rvr_test():
+    spec = importlib.util.spec_from_file_location('WifiRvrTest',
+                                                  WIFI_RVR_TEST_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def get_rvr_result(orientation, offset):
+    return {
+        'test_name':
+        'test_rvr_TCP_DL_ch36_VHT80_{}deg'.format(orientation),
+        'testcase_params': {
+            'channel': 36,
+            'mode': 'VHT80',
+            'traffic_type': 'TCP',
+            'traffic_direction': 'DL',
+            'orientation': orientation
+        },
+        'total_attenuation': [30, 40, 50],
+        'throughput_receive': [500 + offset, 400 + offset, 300 + offset],
+        'rx_phy_rate': [866, 650, 400],
+        'tx_phy_rate': [866, 585, 390],
+        'metrics': {
+            'peak_tput': 500 + offset,
+            'high_tput_range': -1 if offset else 40
+        },
+        'hover_text': {
+            'mcs': ['9', '7', '5']
+        }
+    }
+
+
+class WifiOtaRvrTestResultsTest(unittest.TestCase):
+    """Unit tests for the class results of WifiRvrTest.WifiOtaRvrTest."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.wifi_rvr_test = load_wifi_rvr_test()
+
+    def setUp(self):
+        self.log_path = tempfile.mkdtemp()
+        test_class = self.wifi_rvr_test.WifiOtaRvrTest
+        self.test_class = test_class.__new__(test_class)
+        self.test_class.log_path = self.log_path
+        self.test_class.testclass_metric_logger = mock.Mock()
+        self.test_class.results_store = results_store.ResultsStore(
+            os.path.join(self.log_path, results_store.RESULTS_STORE_FILE))
+        for orientation, offset in [(0, 0), (90, 20)]:
+            self.test_class.store_rvr_result(
+                get_rvr_result(orientation, offset))
+
+    def tearDown(self):
+        self.test_class.results_store.close()
+        shutil.rmtree(self.log_path)
+
+    def test_process_testclass_results(self):
+        self.test_class.process_testclass_results()
+        metrics = dict(call[0] for call in
+                       self.test_class.testclass_metric_logger.add_metric.
+                       call_args_list)
+        self.assertEqual(metrics['TCP_DL_ch36_VHT80.avg_peak_tput'], 510)
+        self.assertEqual(metrics['TCP_DL_ch36_VHT80.high_tput_hit_freq'],
+                         0.5)
+        self.assertTrue(
+            os.path.exists(os.path.join(self.log_path, 'results.html')))
+
+    def test_teardown_class_closes_results_store(self):
+        self.test_class.access_point = mock.Mock()
+        self.test_class.android_devices = []
+        self.test_class.ota_chamber = mock.Mock()
+        self.test_class.teardown_class()
+        self.test_class.ota_chamber.reset_chamber.assert_called_once_with()
+        with self.assertRaises(sqlite3.ProgrammingError):
+            self.test_class.results_store.get_results()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -572,6 +572,7 @@ class WlanWmmTest(WifiBaseTest):
 
         # Run parallel phases
         pass_test = True
+        start_skews = {}
         for phase_id, phase in phases.items():
             self.log.info('Setting up phase: %s' % phase_id)
 
@@ -623,6 +624,16 @@ class WlanWmmTest(WifiBaseTest):
             for transmitter in transmitters:
                 transmitter.cleanup_asynchronous_streams()
 
+            # Report how far apart the streams of the phase actually started
+            start_skew = wmm_transceiver.get_start_skew([
+                stream['transmitter'].get_start_time(stream['uuid'])
+                for stream in phase.values()
+            ])
+            if start_skew is not None:
+                start_skews[phase_id] = round(start_skew * 1000, 3)
+                self.log.info('Phase %s stream start skew: %.3f ms' %
+                              (phase_id, start_skews[phase_id]))
+
             # Validate streams
             pass_test = pass_test and self.validate_streams_in_phase(
                 phase_id, phases, max_bw)
@@ -630,10 +641,12 @@ class WlanWmmTest(WifiBaseTest):
         self.graph_test(phases, max_bw)
         if pass_test:
             asserts.explicit_pass(
-                'Validation criteria met for all streams in all phases.')
+                'Validation criteria met for all streams in all phases.',
+                extras={'start_skews_ms': start_skews})
         else:
             asserts.fail(
-                'At least one stream failed to meet validation criteria.')
+                'At least one stream failed to meet validation criteria.',
+                extras={'start_skews_ms': start_skews})
 
 # Test Cases
 
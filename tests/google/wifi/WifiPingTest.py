@@ -19,7 +19,6 @@ import itertools
 import json
 import logging
 import os
-import statistics
 from acts import asserts
 from acts import context
 from acts import base_test
@@ -30,6 +29,7 @@ from acts_contrib.test_utils.wifi import ota_chamber
 from acts_contrib.test_utils.wifi import ota_sniffer
 from acts_contrib.test_utils.wifi import wifi_performance_test_utils as wputils
 from acts_contrib.test_utils.wifi.wifi_performance_test_utils.bokeh_figure import BokehFigure
+from acts_contrib.test_utils.wifi.wifi_performance_test_utils import results_store
 from acts_contrib.test_utils.wifi import wifi_retail_ap as retail_ap
 from acts_contrib.test_utils.wifi import wifi_test_utils as wutils
 from functools import partial
@@ -89,6 +89,10 @@ class WifiPingTest(base_test.BaseTestClass):
             self.access_point.ap_settings))
         self.log_path = os.path.join(logging.log_path, 'results')
         os.makedirs(self.log_path, exist_ok=True)
+        self.results_store = results_store.ResultsStore(
+            self.testclass_params.get(
+                'results_store_path',
+                os.path.join(self.log_path, results_store.RESULTS_STORE_FILE)))
         self.atten_dut_chain_map = {}
         self.testclass_results = []
 
@@ -111,11 +115,13 @@ class WifiPingTest(base_test.BaseTestClass):
             wutils.wifi_toggle_state(dev, False)
             dev.go_to_sleep()
         self.process_testclass_results()
+        self.results_store.close()
 
     def setup_test(self):
         self.retry_flag = False
 
     def teardown_test(self):
+        wputils.cancel_measurements()
         self.retry_flag = False
 
     def on_retry(self):
@@ -134,9 +140,9 @@ class WifiPingTest(base_test.BaseTestClass):
     def process_testclass_results(self):
         """Saves all test results to enable comparison."""
         testclass_summary = {}
-        for test in self.testclass_results:
-            if 'range' in test['test_name']:
-                testclass_summary[test['test_name']] = test['range']
+        for test in self.results_store.get_results(self.__class__.__name__):
+            if 'range' in test.test_name:
+                testclass_summary[test.test_name] = test.scalars['range']
         # Save results
         results_file_path = os.path.join(self.log_path,
                                          'testclass_summary.json')
@@ -239,13 +245,13 @@ class WifiPingTest(base_test.BaseTestClass):
                 break
         else:
             range_index = -1
-        ping_range_result['atten_at_range'] = testcase_params['atten_range'][
-            range_index]
+        ping_range_result['atten_at_range'] = ping_range_result[
+            'attenuation'][range_index]
         ping_range_result['peak_throughput_pct'] = 100 - min(
             ping_loss_over_att)
         ping_range_result['total_attenuation'] = [
             ping_range_result['fixed_attenuation'] + att
-            for att in testcase_params['atten_range']
+            for att in ping_range_result['attenuation']
         ]
         ping_range_result['range'] = (ping_range_result['atten_at_range'] +
                                       ping_range_result['fixed_attenuation'])
@@ -319,71 +325,111 @@ class WifiPingTest(base_test.BaseTestClass):
                 duration=testcase_params['ping_duration'] *
                 len(testcase_params['atten_range']) + self.TEST_TIMEOUT)
         # Run ping and sweep attenuation as needed
+        if testcase_params.get('adaptive_atten_sweep', 0):
+            self.run_adaptive_ping_sweep(testcase_params, llstats_obj,
+                                         test_result)
+        else:
+            self.run_linear_ping_sweep(testcase_params, llstats_obj,
+                                       test_result)
+        # Set attenuator to initial setting
+        for attenuator in self.attenuators:
+            attenuator.set_atten(testcase_params['atten_range'][0],
+                                 strict=False,
+                                 retry=True)
+        if self.testbed_params['sniffer_enable']:
+            self.sniffer.stop_capture()
+        return test_result
+
+    def run_ping_at_atten(self, testcase_params, atten, llstats_obj):
+        """Sets the attenuation and measures ping, RSSI and link layer stats.
+
+        Args:
+            testcase_params: dict containing all test parameters
+            atten: attenuation to set on all attenuators
+            llstats_obj: LinkLayerStats object of the DUT
+        Returns:
+            A tuple of ping stats, RSSI result and incremental llstats
+        """
+        for attenuator in self.attenuators:
+            attenuator.set_atten(atten, strict=False, retry=True)
+        if self.testclass_params.get('monitor_rssi', 1):
+            rssi_future = wputils.get_connected_rssi_nb(
+                self.dut,
+                int(testcase_params['ping_duration'] / 2 /
+                    self.RSSI_POLL_INTERVAL),
+                self.RSSI_POLL_INTERVAL,
+                testcase_params['ping_duration'] / 2,
+                device_loop=self.testclass_params.get('rssi_device_loop', 0))
+        # Refresh link layer stats
+        llstats_obj.update_stats()
+        if testcase_params.get('ping_from_dut', False):
+            current_ping_stats = wputils.get_ping_stats(
+                self.dut,
+                wputils.get_server_address(self.ping_server, self.dut_ip,
+                                           '255.255.255.0'),
+                testcase_params['ping_duration'],
+                testcase_params['ping_interval'],
+                testcase_params['ping_size'])
+        else:
+            current_ping_stats = wputils.get_ping_stats(
+                self.ping_server, self.dut_ip,
+                testcase_params['ping_duration'],
+                testcase_params['ping_interval'],
+                testcase_params['ping_size'])
+        if self.testclass_params.get('monitor_rssi', 1):
+            current_rssi = rssi_future.result()
+        else:
+            current_rssi = collections.OrderedDict([
+                ('time_stamp', []), ('bssid', []), ('ssid', []),
+                ('frequency', []),
+                ('signal_poll_rssi', wputils.empty_rssi_result()),
+                ('signal_poll_avg_rssi', wputils.empty_rssi_result()),
+                ('chain_0_rssi', wputils.empty_rssi_result()),
+                ('chain_1_rssi', wputils.empty_rssi_result())
+            ])
+        llstats_obj.update_stats()
+        curr_llstats = llstats_obj.llstats_incremental.copy()
+        if current_ping_stats['connected']:
+            llstats_str = 'TX MCS = {0} ({1:.1f}%). RX MCS = {2} ({3:.1f}%)'.format(
+                curr_llstats['summary']['common_tx_mcs'],
+                curr_llstats['summary']['common_tx_mcs_freq'] * 100,
+                curr_llstats['summary']['common_rx_mcs'],
+                curr_llstats['summary']['common_rx_mcs_freq'] * 100)
+            self.log.info(
+                'Attenuation = {0}dB\tPacket Loss = {1:.1f}%\t'
+                'Avg RTT = {2:.2f}ms\tRSSI = {3:.1f} [{4:.1f},{5:.1f}]\t{6}\t'
+                .format(atten, current_ping_stats['packet_loss_percentage'],
+                        current_ping_stats.get_stats()['rtt_mean'],
+                        current_rssi['signal_poll_rssi']['mean'],
+                        current_rssi['chain_0_rssi']['mean'],
+                        current_rssi['chain_1_rssi']['mean'], llstats_str))
+        else:
+            self.log.info('Attenuation = {}dB. Disconnected.'.format(atten))
+        return current_ping_stats, current_rssi, curr_llstats
+
+    def run_linear_ping_sweep(self, testcase_params, llstats_obj,
+                              test_result):
+        """Runs ping at every attenuation until ping loss is stable at 100%.
+
+        Args:
+            testcase_params: dict containing all test parameters
+            llstats_obj: LinkLayerStats object of the DUT
+            test_result: dict to which ping results are added
+        """
         zero_counter = 0
         pending_first_ping = 1
         for atten in testcase_params['atten_range']:
-            for attenuator in self.attenuators:
-                attenuator.set_atten(atten, strict=False, retry=True)
-            if self.testclass_params.get('monitor_rssi', 1):
-                rssi_future = wputils.get_connected_rssi_nb(
-                    self.dut,
-                    int(testcase_params['ping_duration'] / 2 /
-                        self.RSSI_POLL_INTERVAL), self.RSSI_POLL_INTERVAL,
-                    testcase_params['ping_duration'] / 2)
-            # Refresh link layer stats
-            llstats_obj.update_stats()
-            if testcase_params.get('ping_from_dut', False):
-                current_ping_stats = wputils.get_ping_stats(
-                    self.dut,
-                    wputils.get_server_address(self.ping_server, self.dut_ip,
-                                               '255.255.255.0'),
-                    testcase_params['ping_duration'],
-                    testcase_params['ping_interval'],
-                    testcase_params['ping_size'])
-            else:
-                current_ping_stats = wputils.get_ping_stats(
-                    self.ping_server, self.dut_ip,
-                    testcase_params['ping_duration'],
-                    testcase_params['ping_interval'],
-                    testcase_params['ping_size'])
-            if self.testclass_params.get('monitor_rssi', 1):
-                current_rssi = rssi_future.result()
-            else:
-                current_rssi = collections.OrderedDict([
-                    ('time_stamp', []), ('bssid', []), ('ssid', []),
-                    ('frequency', []),
-                    ('signal_poll_rssi', wputils.empty_rssi_result()),
-                    ('signal_poll_avg_rssi', wputils.empty_rssi_result()),
-                    ('chain_0_rssi', wputils.empty_rssi_result()),
-                    ('chain_1_rssi', wputils.empty_rssi_result())
-                ])
+            current_ping_stats, current_rssi, curr_llstats = (
+                self.run_ping_at_atten(testcase_params, atten, llstats_obj))
             test_result['rssi_results'].append(current_rssi)
-            llstats_obj.update_stats()
-            curr_llstats = llstats_obj.llstats_incremental.copy()
             test_result['llstats'].append(curr_llstats)
             if current_ping_stats['connected']:
-                llstats_str = 'TX MCS = {0} ({1:.1f}%). RX MCS = {2} ({3:.1f}%)'.format(
-                    curr_llstats['summary']['common_tx_mcs'],
-                    curr_llstats['summary']['common_tx_mcs_freq'] * 100,
-                    curr_llstats['summary']['common_rx_mcs'],
-                    curr_llstats['summary']['common_rx_mcs_freq'] * 100)
-                self.log.info(
-                    'Attenuation = {0}dB\tPacket Loss = {1:.1f}%\t'
-                    'Avg RTT = {2:.2f}ms\tRSSI = {3:.1f} [{4:.1f},{5:.1f}]\t{6}\t'
-                    .format(atten,
-                            current_ping_stats['packet_loss_percentage'],
-                            statistics.mean(current_ping_stats['rtt']),
-                            current_rssi['signal_poll_rssi']['mean'],
-                            current_rssi['chain_0_rssi']['mean'],
-                            current_rssi['chain_1_rssi']['mean'], llstats_str))
                 if current_ping_stats['packet_loss_percentage'] == 100:
                     zero_counter = zero_counter + 1
                 else:
                     zero_counter = 0
                     pending_first_ping = 0
             else:
-                self.log.info(
-                    'Attenuation = {}dB. Disconnected.'.format(atten))
                 zero_counter = zero_counter + 1
             test_result['ping_results'].append(current_ping_stats.as_dict())
             # Test ends when ping loss stable at 0. If test has successfully
@@ -401,14 +447,47 @@ class WifiPingTest(base_test.BaseTestClass):
                     test_result['ping_results'].append(
                         self.DISCONNECTED_PING_RESULT)
                 break
-        # Set attenuator to initial setting
-        for attenuator in self.attenuators:
-            attenuator.set_atten(testcase_params['atten_range'][0],
-                                 strict=False,
-                                 retry=True)
-        if self.testbed_params['sniffer_enable']:
-            self.sniffer.stop_capture()
-        return test_result
+
+    def run_adaptive_ping_sweep(self, testcase_params, llstats_obj,
+                                test_result):
+        """Runs ping at the attenuations needed to find the range.
+
+        Uses wputils.adaptive_atten_sweep to measure a coarse sweep and bisect
+        around the point where ping loss exceeds range_ping_loss_threshold.
+        Only the measured attenuations are added to the results.
+
+        Args:
+            testcase_params: dict containing all test parameters
+            llstats_obj: LinkLayerStats object of the DUT
+            test_result: dict to which ping results are added
+        """
+        def is_failing(result):
+            ping_stats = result[0]
+            return (not ping_stats['connected']
+                    or ping_stats['packet_loss_percentage'] >
+                    self.testclass_params['range_ping_loss_threshold'])
+
+        confirm_failures = self.testclass_params.get(
+            'adaptive_sweep_confirm_points', 2)
+        sweep_results = wputils.adaptive_atten_sweep(
+            testcase_params['atten_range'],
+            lambda atten: self.run_ping_at_atten(testcase_params, atten,
+                                                 llstats_obj),
+            is_failing,
+            coarse_step=self.testclass_params.get('adaptive_sweep_coarse_step',
+                                                  4),
+            confirm_failures=confirm_failures,
+            max_initial_failures=(confirm_failures**2
+                                  if self.retry_flag else confirm_failures))
+        test_result['attenuation'] = [
+            testcase_params['atten_range'][idx] for idx, _ in sweep_results
+        ]
+        for _, (ping_stats, rssi, llstats) in sweep_results:
+            test_result['ping_results'].append(ping_stats.as_dict())
+            test_result['rssi_results'].append(rssi)
+            test_result['llstats'].append(llstats)
+        self.log.info('Adaptive sweep measured {} of {} attenuations.'.format(
+            len(sweep_results), len(testcase_params['atten_range'])))
 
     def setup_ap(self, testcase_params):
         """Sets up the access point in the configuration required by the test.
@@ -577,6 +656,8 @@ class WifiPingTest(base_test.BaseTestClass):
                 ping_interval=self.testclass_params['range_ping_interval'],
                 ping_duration=self.testclass_params['range_ping_duration'],
                 ping_size=self.testclass_params['ping_size'],
+                adaptive_atten_sweep=self.testclass_params.get(
+                    'adaptive_atten_sweep', 0),
             )
         elif testcase_params['test_type'] == 'test_fast_ping_rtt':
             testcase_params.update(
@@ -623,8 +704,33 @@ class WifiPingTest(base_test.BaseTestClass):
         # Postprocess results
         self.process_ping_results(testcase_params, ping_result)
         self.testclass_results.append(ping_result)
+        self.store_ping_result(ping_result)
         self.pass_fail_check(ping_result)
 
+    def store_ping_result(self, ping_result, series=None):
+        """Adds a ping result to the results store.
+
+        Args:
+            ping_result: dict containing ping results and other meta data
+            series: dict of metric series measured over attenuation
+        """
+        self.results_store.add_result(
+            self.__class__.__name__,
+            ping_result['test_name'],
+            ping_result['testcase_params'],
+            attenuation=ping_result.get('total_attenuation'),
+            series=series,
+            scalars={
+                key: ping_result[key]
+                for key in [
+                    'range', 'atten_at_range', 'peak_throughput_pct',
+                    'sensitivity'
+                ] if key in ping_result
+            },
+            extras={
+                'llstats_at_range': ping_result.get('llstats_at_range')
+            })
+
     def generate_test_cases(self, ap_power, channels, modes, chain_mask,
                             test_types, **kwargs):
         """Function that auto-generates test cases for a test class."""
@@ -730,7 +836,6 @@ class WifiOtaPingTest(WifiPingTest):
 
     def teardown_class(self):
         WifiPingTest.teardown_class(self)
-        self.process_testclass_results()
         self.ota_chamber.reset_chamber()
 
     def process_testclass_results(self):
@@ -738,8 +843,11 @@ class WifiOtaPingTest(WifiPingTest):
         WifiPingTest.process_testclass_results(self)
 
         range_vs_angle = collections.OrderedDict()
-        for test in self.testclass_results:
-            curr_params = test['testcase_params']
+        stored_results = self.results_store.get_results(
+            self.__class__.__name__)
+        for stored_result in stored_results:
+            test = dict(stored_result.scalars, **stored_result.extras)
+            curr_params = stored_result.params
             curr_config = wputils.extract_sub_dict(
                 curr_params, ['channel', 'mode', 'chain_mask'])
             curr_config_id = tuple(curr_config.items())
@@ -762,8 +870,7 @@ class WifiOtaPingTest(WifiPingTest):
                     'range': [test['range']],
                     'llstats_at_range': [test['llstats_at_range']]
                 }
-        chamber_mode = self.testclass_results[0]['testcase_params'][
-            'chamber_mode']
+        chamber_mode = stored_results[0].params['chamber_mode']
         if chamber_mode == 'orientation':
             x_label = 'Angle (deg)'
         elif chamber_mode == 'stepped stirrers':
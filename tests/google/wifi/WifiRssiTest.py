@@ -32,6 +32,7 @@ from acts.metrics.loggers.blackbox import BlackboxMappedMetricLogger
 from acts_contrib.test_utils.wifi import ota_chamber
 from acts_contrib.test_utils.wifi import wifi_performance_test_utils as wputils
 from acts_contrib.test_utils.wifi.wifi_performance_test_utils.bokeh_figure import BokehFigure
+from acts_contrib.test_utils.wifi.wifi_performance_test_utils import results_store
 from acts_contrib.test_utils.wifi import wifi_retail_ap as retail_ap
 from acts_contrib.test_utils.wifi import wifi_test_utils as wutils
 from concurrent.futures import ThreadPoolExecutor
@@ -80,6 +81,10 @@ class WifiRssiTest(base_test.BaseTestClass):
         os.makedirs(self.log_path, exist_ok=True)
         self.log.info('Access Point Configuration: {}'.format(
             self.access_point.ap_settings))
+        self.results_store = results_store.ResultsStore(
+            self.testclass_params.get(
+                'results_store_path',
+                os.path.join(self.log_path, results_store.RESULTS_STORE_FILE)))
         self.testclass_results = []
 
         # Turn WiFi ON
@@ -98,6 +103,7 @@ class WifiRssiTest(base_test.BaseTestClass):
         for dev in self.android_devices:
             wutils.wifi_toggle_state(dev, False)
             dev.go_to_sleep()
+        self.results_store.close()
 
     def pass_fail_check_rssi_stability(self, testcase_params,
                                        postprocessed_results):
@@ -294,6 +300,18 @@ class WifiRssiTest(base_test.BaseTestClass):
                     for idx in range(
                         len(postprocessed_results['predicted_rssi']))
                 ]
+        self.results_store.add_result(
+            self.__class__.__name__,
+            self.current_test_name,
+            rssi_result['testcase_params'],
+            attenuation=postprocessed_results['total_attenuation'],
+            series={
+                key: postprocessed_results[key]['mean']
+                for key in [
+                    'signal_poll_rssi', 'signal_poll_avg_rssi', 'scan_rssi',
+                    'chain_0_rssi', 'chain_1_rssi'
+                ]
+            })
         return postprocessed_results
 
     def plot_rssi_vs_attenuation(self, postprocessed_results):
@@ -903,9 +921,10 @@ class WifiOtaRssiTest(WifiRssiTest):
             self.user_params['OTAChamber'])[0]
 
     def teardown_class(self):
+        # Results are processed before the results store is closed
+        self.process_testclass_results()
         WifiRssiTest.teardown_class(self)
         self.ota_chamber.reset_chamber()
-        self.process_testclass_results()
 
     def teardown_test(self):
         if self.ota_chamber.current_mode == 'continuous':
@@ -919,8 +938,16 @@ class WifiOtaRssiTest(WifiRssiTest):
     def process_testclass_results(self):
         """Saves all test results to enable comparison."""
         testclass_data = collections.OrderedDict()
-        for test_result in self.testclass_results:
-            current_params = test_result['testcase_params']
+        stored_results = self.results_store.get_results(
+            self.__class__.__name__)
+        result_ids = [result.result_id for result in stored_results]
+        rssi_series = {
+            rssi_metric: self.results_store.get_series(result_ids, rssi_metric)
+            for rssi_metric in
+            ['signal_poll_rssi', 'chain_0_rssi', 'chain_1_rssi']
+        }
+        for test_result in stored_results:
+            current_params = test_result.params
 
             channel = current_params['channel']
             channel_data = testclass_data.setdefault(
@@ -932,15 +959,9 @@ class WifiOtaRssiTest(WifiRssiTest):
                                             chain_1_rssi=[])))
 
             channel_data['orientation'].append(current_params['orientation'])
-            channel_data['rssi']['signal_poll_rssi'].append(
-                test_result['postprocessed_results']['signal_poll_rssi']
-                ['mean'][0])
-            channel_data['rssi']['chain_0_rssi'].append(
-                test_result['postprocessed_results']['chain_0_rssi']['mean']
-                [0])
-            channel_data['rssi']['chain_1_rssi'].append(
-                test_result['postprocessed_results']['chain_1_rssi']['mean']
-                [0])
+            for rssi_metric, metric_series in rssi_series.items():
+                channel_data['rssi'][rssi_metric].append(
+                    metric_series[test_result.result_id][1][0])
 
         # Publish test class metrics
         for channel, channel_data in testclass_data.items():
@@ -952,8 +973,7 @@ class WifiOtaRssiTest(WifiRssiTest):
                     metric_name, metric_value)
 
         # Plot test class results
-        chamber_mode = self.testclass_results[0]['testcase_params'][
-            'chamber_mode']
+        chamber_mode = stored_results[0].params['chamber_mode']
         if chamber_mode == 'orientation':
             x_label = 'Angle (deg)'
         elif chamber_mode == 'stepped stirrers':
@@ -31,6 +31,7 @@ from acts_contrib.test_utils.wifi import ota_chamber
 from acts_contrib.test_utils.wifi import ota_sniffer
 from acts_contrib.test_utils.wifi import wifi_performance_test_utils as wputils
 from acts_contrib.test_utils.wifi.wifi_performance_test_utils.bokeh_figure import BokehFigure
+from acts_contrib.test_utils.wifi.wifi_performance_test_utils import results_store
 from acts_contrib.test_utils.wifi import wifi_retail_ap as retail_ap
 from acts_contrib.test_utils.wifi import wifi_test_utils as wutils
 from functools import partial
@@ -98,6 +99,12 @@ class WifiRvrTest(base_test.BaseTestClass):
             else:
                 self.log.warning('No golden files found.')
                 self.golden_files_list = []
+        self.golden_results = results_store.GoldenResults(
+            self.golden_files_list)
+        self.results_store = results_store.ResultsStore(
+            self.testclass_params.get(
+                'results_store_path',
+                os.path.join(self.log_path, results_store.RESULTS_STORE_FILE)))
         self.testclass_results = []
 
         # Turn WiFi ON
@@ -110,6 +117,7 @@ class WifiRvrTest(base_test.BaseTestClass):
                 wutils.wifi_toggle_state(dev, True)
 
     def teardown_test(self):
+        wputils.cancel_measurements()
         self.iperf_server.stop()
 
     def teardown_class(self):
@@ -119,41 +127,92 @@ class WifiRvrTest(base_test.BaseTestClass):
             wutils.wifi_toggle_state(dev, False)
             dev.go_to_sleep()
         self.process_testclass_results()
+        self.results_store.close()
+
+    def store_rvr_result(self, rvr_result, scalars=None):
+        """Adds an RvR result to the results store.
+
+        Args:
+            rvr_result: dict containing attenuation, throughput and other data
+            scalars: dict of scalar results, defaults to the result metrics
+        """
+        self.results_store.add_result(
+            self.__class__.__name__,
+            rvr_result['test_name'],
+            rvr_result['testcase_params'],
+            attenuation=rvr_result['total_attenuation'],
+            series={
+                key: rvr_result[key]
+                for key in ['throughput_receive', 'rx_phy_rate', 'tx_phy_rate']
+                if key in rvr_result
+            },
+            scalars=rvr_result.get('metrics', {}) if scalars is None else
+            scalars,
+            extras={'hover_text': rvr_result.get('hover_text', {})})
+
+    def get_stored_rvr_results(self):
+        """Gets the RvR results of the test class from the results store.
+
+        Returns:
+            A list of (StoredResult, series) tuples, where series is a dict
+            containing the total attenuation and each stored RvR metric.
+        """
+        stored_results = self.results_store.get_results(
+            self.__class__.__name__)
+        result_ids = [result.result_id for result in stored_results]
+        metric_series = {
+            metric: self.results_store.get_series(result_ids, metric)
+            for metric in ['throughput_receive', 'rx_phy_rate', 'tx_phy_rate']
+        }
+        rvr_results = []
+        for result in stored_results:
+            if result.result_id not in metric_series['throughput_receive']:
+                continue
+            series = {
+                'total_attenuation':
+                metric_series['throughput_receive'][result.result_id][0]
+            }
+            for metric, metric_data in metric_series.items():
+                if result.result_id in metric_data:
+                    series[metric] = metric_data[result.result_id][1]
+            rvr_results.append((result, series))
+        return rvr_results
 
     def process_testclass_results(self):
         """Saves plot with all test results to enable comparison."""
         # Plot and save all results
         plots = collections.OrderedDict()
-        for result in self.testclass_results:
-            plot_id = (result['testcase_params']['channel'],
-                       result['testcase_params']['mode'])
+        for result, series in self.get_stored_rvr_results():
+            plot_id = (result.params['channel'], result.params['mode'])
             if plot_id not in plots:
                 plots[plot_id] = BokehFigure(
                     title='Channel {} {} ({})'.format(
-                        result['testcase_params']['channel'],
-                        result['testcase_params']['mode'],
-                        result['testcase_params']['traffic_type']),
+                        result.params['channel'], result.params['mode'],
+                        result.params['traffic_type']),
                     x_label='Attenuation (dB)',
                     primary_y_label='Throughput (Mbps)')
-            plots[plot_id].add_line(result['total_attenuation'],
-                                    result['throughput_receive'],
-                                    result['test_name'].strip('test_rvr_'),
-                                    hover_text=result['hover_text'],
+            hover_text = result.extras['hover_text']
+            plots[plot_id].add_line(series['total_attenuation'],
+                                    series['throughput_receive'],
+                                    result.test_name.strip('test_rvr_'),
+                                    hover_text=hover_text,
                                     marker='circle')
-            plots[plot_id].add_line(result['total_attenuation'],
-                                    result['rx_phy_rate'],
-                                    result['test_name'].strip('test_rvr_') +
-                                    ' (Rx PHY)',
-                                    hover_text=result['hover_text'],
-                                    style='dashed',
-                                    marker='inverted_triangle')
-            plots[plot_id].add_line(result['total_attenuation'],
-                                    result['tx_phy_rate'],
-                                    result['test_name'].strip('test_rvr_') +
-                                    ' (Tx PHY)',
-                                    hover_text=result['hover_text'],
-                                    style='dashed',
-                                    marker='triangle')
+            if 'rx_phy_rate' in series:
+                plots[plot_id].add_line(series['total_attenuation'],
+                                        series['rx_phy_rate'],
+                                        result.test_name.strip('test_rvr_') +
+                                        ' (Rx PHY)',
+                                        hover_text=hover_text,
+                                        style='dashed',
+                                        marker='inverted_triangle')
+            if 'tx_phy_rate' in series:
+                plots[plot_id].add_line(series['total_attenuation'],
+                                        series['tx_phy_rate'],
+                                        result.test_name.strip('test_rvr_') +
+                                        ' (Tx PHY)',
+                                        hover_text=hover_text,
+                                        style='dashed',
+                                        marker='triangle')
 
         figure_list = []
         for plot_id, plot in plots.items():
@@ -213,51 +272,14 @@ class WifiRvrTest(base_test.BaseTestClass):
         Returns:
             throughput_limits: dict containing attenuation and throughput limit data
         """
-        test_name = self.current_test_name
-        golden_path = next(file_name for file_name in self.golden_files_list
-                           if test_name in file_name)
-        with open(golden_path, 'r') as golden_file:
-            golden_results = json.load(golden_file)
-            golden_attenuation = [
-                att + golden_results['fixed_attenuation']
-                for att in golden_results['attenuation']
-            ]
-        attenuation = []
-        lower_limit = []
-        upper_limit = []
-        for idx, current_throughput in enumerate(
-                rvr_result['throughput_receive']):
-            current_att = rvr_result['attenuation'][idx] + rvr_result[
-                'fixed_attenuation']
-            att_distances = [
-                abs(current_att - golden_att)
-                for golden_att in golden_attenuation
-            ]
-            sorted_distances = sorted(enumerate(att_distances),
-                                      key=lambda x: x[1])
-            closest_indeces = [dist[0] for dist in sorted_distances[0:3]]
-            closest_throughputs = [
-                golden_results['throughput_receive'][index]
-                for index in closest_indeces
-            ]
-            closest_throughputs.sort()
-
-            attenuation.append(current_att)
-            lower_limit.append(
-                max(
-                    closest_throughputs[0] - max(
-                        self.testclass_params['abs_tolerance'],
-                        closest_throughputs[0] *
-                        self.testclass_params['pct_tolerance'] / 100), 0))
-            upper_limit.append(closest_throughputs[-1] + max(
-                self.testclass_params['abs_tolerance'], closest_throughputs[-1]
-                * self.testclass_params['pct_tolerance'] / 100))
-        throughput_limits = {
-            'attenuation': attenuation,
-            'lower_limit': lower_limit,
-            'upper_limit': upper_limit
-        }
-        return throughput_limits
+        num_points = len(rvr_result['throughput_receive'])
+        total_attenuation = numpy.add(
+            rvr_result['attenuation'][:num_points],
+            rvr_result['fixed_attenuation'])
+        return self.golden_results.get_limits(
+            self.current_test_name, total_attenuation,
+            self.testclass_params['abs_tolerance'],
+            self.testclass_params['pct_tolerance'])
 
     def plot_rvr_result(self, rvr_result):
         """Saves plots and JSON formatted results.
@@ -278,15 +300,8 @@ class WifiRvrTest(base_test.BaseTestClass):
                              x_label='Attenuation (dB)',
                              primary_y_label='Throughput (Mbps)')
         try:
-            golden_path = next(file_name
-                               for file_name in self.golden_files_list
-                               if self.current_test_name in file_name)
-            with open(golden_path, 'r') as golden_file:
-                golden_results = json.load(golden_file)
-            golden_attenuation = [
-                att + golden_results['fixed_attenuation']
-                for att in golden_results['attenuation']
-            ]
+            golden_results = self.golden_results.get(self.current_test_name)
+            golden_attenuation = golden_results['total_attenuation']
             throughput_limits = self.compute_throughput_limits(rvr_result)
             shaded_region = {
                 'x_vector': throughput_limits['attenuation'],
@@ -445,12 +460,19 @@ class WifiRvrTest(base_test.BaseTestClass):
                     1,
                     1,
                     interface=self.monitored_interface)
+            if self.testclass_params.get('monitor_llstats_series', 0):
+                llstats_obj.start_collection(
+                    self.testclass_params['iperf_duration'])
             self.iperf_server.start(tag=str(atten))
             client_output_path = self.iperf_client.start(
                 testcase_params['iperf_server_address'],
                 testcase_params['iperf_args'], str(atten),
                 self.testclass_params['iperf_duration'] + self.TEST_TIMEOUT)
             server_output_path = self.iperf_server.stop()
+            if self.testclass_params.get('monitor_llstats_series', 0):
+                llstats_series = llstats_obj.stop_collection()
+            else:
+                llstats_series = None
             if self.testclass_params.get('monitor_rssi', 1):
                 rssi_result = rssi_future.result()
                 current_rssi = {
@@ -486,6 +508,8 @@ class WifiRvrTest(base_test.BaseTestClass):
             throughput.append(curr_throughput)
             llstats_obj.update_stats()
             curr_llstats = llstats_obj.llstats_incremental.copy()
+            if llstats_series is not None:
+                curr_llstats['series'] = llstats_series
             llstats.append(curr_llstats)
             rx_phy_rate.append(curr_llstats['summary'].get(
                 'mean_rx_phy_rate', 0))
@@ -715,6 +739,7 @@ class WifiRvrTest(base_test.BaseTestClass):
         # Post-process results
         self.testclass_results.append(rvr_result)
         self.process_test_results(rvr_result)
+        self.store_rvr_result(rvr_result)
         self.pass_fail_check(rvr_result)
 
     def generate_test_cases(self, channels, modes, traffic_types,
@@ -920,9 +945,9 @@ class WifiOtaRvrTest(WifiRvrTest):
         # Plot individual test id results raw data and compile metrics
         plots = collections.OrderedDict()
         compiled_data = collections.OrderedDict()
-        for result in self.testclass_results:
+        for result, series in self.get_stored_rvr_results():
             test_id = tuple(
-                self.extract_test_id(result['testcase_params'], [
+                self.extract_test_id(result.params, [
                     'channel', 'mode', 'traffic_type', 'traffic_direction',
                     'chain'
                 ]).items())
@@ -936,56 +961,56 @@ class WifiOtaRvrTest(WifiRvrTest):
                 }
                 compiled_data[test_id]['metrics'] = {
                     key: []
-                    for key in result['metrics'].keys()
+                    for key in result.scalars.keys()
                 }
                 plots[test_id] = BokehFigure(
                     title='Channel {} {} ({} {})'.format(
-                        result['testcase_params']['channel'],
-                        result['testcase_params']['mode'],
-                        result['testcase_params']['traffic_type'],
-                        result['testcase_params']['traffic_direction']),
+                        result.params['channel'],
+                        result.params['mode'],
+                        result.params['traffic_type'],
+                        result.params['traffic_direction']),
                     x_label='Attenuation (dB)',
                     primary_y_label='Throughput (Mbps)')
                 test_id_phy = test_id + tuple('PHY')
                 plots[test_id_phy] = BokehFigure(
                     title='Channel {} {} ({} {}) (PHY Rate)'.format(
-                        result['testcase_params']['channel'],
-                        result['testcase_params']['mode'],
-                        result['testcase_params']['traffic_type'],
-                        result['testcase_params']['traffic_direction']),
+                        result.params['channel'],
+                        result.params['mode'],
+                        result.params['traffic_type'],
+                        result.params['traffic_direction']),
                     x_label='Attenuation (dB)',
                     primary_y_label='PHY Rate (Mbps)')
             # Compile test id data and metrics
             compiled_data[test_id]['throughput'].append(
-                result['throughput_receive'])
-            compiled_data[test_id]['rx_phy_rate'].append(result['rx_phy_rate'])
-            compiled_data[test_id]['tx_phy_rate'].append(result['tx_phy_rate'])
-            compiled_data[test_id]['total_attenuation'] = result[
+                series['throughput_receive'])
+            compiled_data[test_id]['rx_phy_rate'].append(series['rx_phy_rate'])
+            compiled_data[test_id]['tx_phy_rate'].append(series['tx_phy_rate'])
+            compiled_data[test_id]['total_attenuation'] = series[
                 'total_attenuation']
-            for metric_key, metric_value in result['metrics'].items():
+            for metric_key, metric_value in result.scalars.items():
                 compiled_data[test_id]['metrics'][metric_key].append(
                     metric_value)
             # Add test id to plots
-            plots[test_id].add_line(result['total_attenuation'],
-                                    result['throughput_receive'],
-                                    result['test_name'].strip('test_rvr_'),
-                                    hover_text=result['hover_text'],
+            plots[test_id].add_line(series['total_attenuation'],
+                                    series['throughput_receive'],
+                                    result.test_name.strip('test_rvr_'),
+                                    hover_text=result.extras['hover_text'],
                                     width=1,
                                     style='dashed',
                                     marker='circle')
             plots[test_id_phy].add_line(
-                result['total_attenuation'],
-                result['rx_phy_rate'],
-                result['test_name'].strip('test_rvr_') + ' Rx PHY Rate',
-                hover_text=result['hover_text'],
+                series['total_attenuation'],
+                series['rx_phy_rate'],
+                result.test_name.strip('test_rvr_') + ' Rx PHY Rate',
+                hover_text=result.extras['hover_text'],
                 width=1,
                 style='dashed',
                 marker='inverted_triangle')
             plots[test_id_phy].add_line(
-                result['total_attenuation'],
-                result['tx_phy_rate'],
-                result['test_name'].strip('test_rvr_') + ' Tx PHY Rate',
-                hover_text=result['hover_text'],
+                series['total_attenuation'],
+                series['tx_phy_rate'],
+                result.test_name.strip('test_rvr_') + ' Tx PHY Rate',
+                hover_text=result.extras['hover_text'],
                 width=1,
                 style='dashed',
                 marker='triangle')
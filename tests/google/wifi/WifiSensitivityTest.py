@@ -30,6 +30,7 @@ from acts.metrics.loggers.blackbox import BlackboxMappedMetricLogger
 from acts_contrib.test_utils.wifi import ota_chamber
 from acts_contrib.test_utils.wifi import wifi_performance_test_utils as wputils
 from acts_contrib.test_utils.wifi.wifi_performance_test_utils.bokeh_figure import BokehFigure
+from acts_contrib.test_utils.wifi.wifi_performance_test_utils import results_store
 from acts_contrib.test_utils.wifi import wifi_test_utils as wutils
 from acts_contrib.test_utils.wifi import wifi_retail_ap as retail_ap
 from acts_contrib.test_utils.wifi import ota_sniffer
@@ -167,6 +168,12 @@ class WifiSensitivityTest(WifiRvrTest, WifiPingTest):
             self.access_point.ap_settings))
         self.log_path = os.path.join(logging.log_path, 'results')
         os.makedirs(self.log_path, exist_ok=True)
+        self.golden_results = results_store.GoldenResults(
+            getattr(self, 'golden_files_list', []))
+        self.results_store = results_store.ResultsStore(
+            self.testclass_params.get(
+                'results_store_path',
+                os.path.join(self.log_path, results_store.RESULTS_STORE_FILE)))
         self.atten_dut_chain_map = {}
         self.testclass_results = []
 
@@ -187,6 +194,7 @@ class WifiSensitivityTest(WifiRvrTest, WifiPingTest):
             wutils.wifi_toggle_state(dev, False)
             dev.go_to_sleep()
         self.process_testclass_results()
+        self.results_store.close()
 
     def setup_test(self):
         self.retry_flag = False
@@ -258,8 +266,10 @@ class WifiSensitivityTest(WifiRvrTest, WifiPingTest):
         testclass_results_dict = collections.OrderedDict()
         id_fields = ['mode', 'rate', 'num_streams', 'chain_mask']
         channels_tested = []
-        for result in self.testclass_results:
-            testcase_params = result['testcase_params']
+        for stored_result in self.results_store.get_results(
+                self.__class__.__name__):
+            result = dict(stored_result.scalars)
+            testcase_params = stored_result.params
             test_id = self.extract_test_id(testcase_params, id_fields)
             test_id = tuple(test_id.items())
             if test_id not in testclass_results_dict:
@@ -600,6 +610,17 @@ class WifiSensitivityTest(WifiRvrTest, WifiPingTest):
 
         # Post-process results
         self.testclass_results.append(result)
+        if testcase_params['traffic_type'].lower() == 'ping':
+            self.store_ping_result(result)
+        else:
+            self.store_rvr_result(result,
+                                  scalars={
+                                      key: result[key]
+                                      for key in [
+                                          'range', 'atten_at_range',
+                                          'peak_throughput_pct', 'sensitivity'
+                                      ]
+                                  })
         self.pass_fail_check(result)
 
     def generate_test_cases(self, channels, modes, chain_mask):
@@ -761,7 +782,10 @@ class WifiOtaSensitivityTest(WifiSensitivityTest):
         testclass_results_dict = collections.OrderedDict()
         id_fields = ['channel', 'mode', 'rate']
         plots = []
-        for result in self.testclass_results:
+        for stored_result in self.results_store.get_results(
+                self.__class__.__name__):
+            result = dict(stored_result.scalars,
+                          testcase_params=stored_result.params)
             test_id = self.extract_test_id(result['testcase_params'],
                                            id_fields)
             test_id = tuple(test_id.items())